@@ -0,0 +1,61 @@
+"""Add indexes for keyset pagination of conversations, tickets and users
+
+Revision ID: 20261018_1000
+Revises: 20251107_1500
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_1000'
+down_revision: Union[str, None] = '20251107_1500'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add indexes matching the (sort key, id) order of paginated lists."""
+
+    # A user's conversations, most recently active first
+    op.create_index(
+        'idx_conversations_user_activity',
+        'conversations',
+        [
+            'user_id',
+            sa.text('coalesce(last_message_at, created_at) DESC'),
+            sa.text('id DESC'),
+        ],
+    )
+
+    # A user's tickets, newest first
+    op.create_index(
+        'idx_support_tickets_user_created',
+        'support_tickets',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+
+    # All tickets, highest priority then newest first
+    op.create_index(
+        'idx_support_tickets_priority_created',
+        'support_tickets',
+        [sa.text('priority DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+
+    # Admin user list, newest first
+    op.create_index(
+        'idx_users_created',
+        'users',
+        [sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+
+
+def downgrade() -> None:
+    """Remove keyset pagination indexes."""
+    op.drop_index('idx_users_created', table_name='users')
+    op.drop_index('idx_support_tickets_priority_created', table_name='support_tickets')
+    op.drop_index('idx_support_tickets_user_created', table_name='support_tickets')
+    op.drop_index('idx_conversations_user_activity', table_name='conversations')
@@ -0,0 +1,31 @@
+"""Add index for paging and streaming a conversation's messages
+
+Revision ID: 20261018_1100
+Revises: 20261018_1000
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_1100'
+down_revision: Union[str, None] = '20261018_1000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add (conversation_id, created_at, id) index on messages."""
+    # Serves message history pages and streams in order without a sort
+    op.create_index(
+        'idx_messages_conversation_created',
+        'messages',
+        ['conversation_id', 'created_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Remove message history index."""
+    op.drop_index('idx_messages_conversation_created', table_name='messages')
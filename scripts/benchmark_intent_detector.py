@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark intent detection over a Persian/English/Arabic message corpus.
+
+Compares the single-pass matcher (Aho-Corasick keywords + combined regex)
+against the naive per-keyword / per-pattern scan it replaced, checks that
+both agree on every message, and reports per-message latency.
+
+Usage:
+    python scripts/benchmark_intent_detector.py [--iterations 2000]
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from app.services.intent_detector import IntentDetector
+
+# Realistic chat traffic: mostly plain religious questions, some tool requests
+CORPUS = [
+    # English - questions
+    "What is the ruling on combining Dhuhr and Asr prayers while travelling for work?",
+    "How should I calculate khums on savings that I kept for a year?",
+    "Is it permissible to pray in clothes that have a small spot of blood on them?",
+    "Can you explain the difference between wajib and mustahab acts in simple terms?",
+    "Tell me about the life of Imam Ali ibn Abi Talib and his years in Kufa",
+    "Who were the companions present at the event of Ghadir Khumm?",
+    "When does the fast of Ramadan start if the moon is not sighted in my city?",
+    "My father passed away and owed qadha prayers, who is responsible for them now?",
+    "Please summarize the main themes of Dua Kumayl in a few sentences",
+    "I feel distant from prayer lately, do you have any advice?",
+    "Thanks, that was very helpful. May God reward you.",
+    "Hello, how are you today?",
+    # English - tool requests
+    "Generate an image of the shrine of Imam Husayn at sunset with pilgrims walking",
+    "Search the web for the latest fatwas about cryptocurrency trading",
+    "Do a thorough search for scholarly opinions on organ donation",
+    "Search my documents for the section on inheritance shares",
+    "What do my documents say about the conditions of a valid marriage contract?",
+    "Transcribe this audio recording of the Friday sermon",
+    "Analyze this PDF document and tell me its main arguments",
+    "Review this code and explain what it does",
+    "Look up the prayer times for Qom online",
+    # Persian - questions
+    "حکم نماز مسافر برای کسی که هر هفته بین دو شهر رفت و آمد می‌کند چیست؟",
+    "آیا روزه گرفتن برای کسی که بیماری قند دارد واجب است؟",
+    "لطفا درباره زندگی امام رضا علیه السلام توضیح بده",
+    "خمس به چه اموالی تعلق می‌گیرد و چطور محاسبه می‌شود؟",
+    "نماز آیات در چه مواقعی واجب می‌شود؟",
+    "فرق بین غسل جنابت و غسل جمعه چیست؟",
+    "سلام، وقت بخیر. یک سوال درباره احکام وضو داشتم",
+    "ممنون از پاسخ شما، خیلی کمک کرد",
+    # Persian - tool requests
+    "یک تصویر بساز از حرم امام رضا در شب با نورهای سبز",
+    "جستجو در اینترنت کن درباره تاریخ ساخت مسجد جمکران",
+    "جستجوی عمیق انجام بده درباره دیدگاه فقها درباره بانکداری اسلامی",
+    "در اسناد من بگرد و بخش مربوط به ارث را پیدا کن",
+    "این صدا رو متن کن لطفا",
+    "این فایل چیه و درباره چه موضوعی صحبت می‌کند؟",
+    # Arabic - questions
+    "ما هو حكم صلاة الجمعة في زمن الغيبة عند علماء الشيعة؟",
+    "هل يجوز الجمع بين الصلاتين في الحضر من دون عذر؟",
+    "متى تجب زكاة الفطرة وما هو مقدارها؟",
+    "اشرح لي معنى التقليد وشروط المرجع",
+    "السلام عليكم، عندي سؤال عن أحكام الصوم",
+    # Arabic - tool requests
+    "اصنع صورة لمسجد الكوفة عند الغروب",
+    "ابحث في الإنترنت عن تاريخ بناء حرم الإمام الحسين",
+    "بحث عميق عن آراء العلماء في التلقيح الصناعي",
+    "ابحث في المستندات عن شروط صحة البيع",
+    "تفريغ صوتي لهذه المحاضرة من فضلك",
+    # Long messages
+    (
+        "I have been reading about the history of the twelve Imams and I am trying to understand "
+        "the period of the minor occultation, the role of the four deputies, and how the "
+        "scholars after them derived rulings without direct access to the Imam. Could you walk me "
+        "through this period and point out the most important books written during that time?"
+    ),
+    (
+        "سلام. من در یک شرکت خصوصی کار می‌کنم و حقوق ماهانه می‌گیرم. بخشی از حقوقم را پس‌انداز "
+        "می‌کنم و بخشی را برای خرید خانه کنار گذاشته‌ام. سوالم این است که خمس این پس‌انداز "
+        "چطور محاسبه می‌شود و آیا پولی که برای خرید خانه جمع می‌کنم هم خمس دارد یا نه؟"
+    ),
+]
+
+
+# Per-pattern compiled regexes for the naive matcher (built on first use)
+_naive_patterns: dict[str, list[re.Pattern]] = {}
+
+
+def naive_categories(detector: IntentDetector, message: str) -> set[str]:
+    """Match categories the way the detector did before: one scan per keyword and pattern."""
+    if not _naive_patterns:
+        for category, (_, patterns) in detector.category_rules.items():
+            _naive_patterns[category] = [re.compile(p, re.IGNORECASE) for p in patterns]
+
+    message_lower = message.lower().strip()
+    categories = set()
+    for category, (keywords, _) in detector.category_rules.items():
+        if any(keyword.lower() in message_lower for keyword in keywords) or any(
+            pattern.search(message_lower) for pattern in _naive_patterns[category]
+        ):
+            categories.add(category)
+    return categories
+
+
+def single_pass_categories(detector: IntentDetector, message: str) -> set[str]:
+    """Match categories with the automaton and combined regex."""
+    keyword_categories = {category for category, _ in detector.keyword_matcher.values_in(message.lower())}
+    return keyword_categories | detector._pattern_categories(message.lower().strip())
+
+
+def time_per_message(func, detector: IntentDetector, iterations: int) -> list[float]:
+    """Run func over the corpus and return per-message latencies in microseconds."""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        for message in CORPUS:
+            func(detector, message)
+        samples.append((time.perf_counter() - started) / len(CORPUS) * 1_000_000)
+    return samples
+
+
+def report(label: str, samples: list[float]) -> float:
+    """Print latency statistics and return the median."""
+    median = statistics.median(samples)
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    print(f"{label:<28} median {median:8.2f} µs/msg   p95 {p95:8.2f} µs/msg")
+    return median
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    detector = IntentDetector()
+
+    mismatches = [
+        message
+        for message in CORPUS
+        if naive_categories(detector, message) != single_pass_categories(detector, message)
+    ]
+    if mismatches:
+        print("Matchers disagree on:")
+        for message in mismatches:
+            print(f"  {message}")
+        sys.exit(1)
+
+    print(f"Corpus: {len(CORPUS)} messages, {args.iterations} iterations")
+    print(f"Keywords: {detector.keyword_matcher.pattern_count}, categories: {len(detector.category_rules)}")
+    print()
+
+    naive = report("naive category matching", time_per_message(naive_categories, detector, args.iterations))
+    single = report("single-pass matching", time_per_message(single_pass_categories, detector, args.iterations))
+    report(
+        "detect_intents (end to end)",
+        time_per_message(lambda d, m: d.detect_intents(m), detector, args.iterations),
+    )
+
+    print()
+    print(f"Category matching speedup: {naive / single:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
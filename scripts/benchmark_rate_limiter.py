@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Redis rate limiter against a live Redis.
+
+Compares the single-EVALSHA GCRA limiter with the previous implementation
+(two GETs, then INCR+EXPIRE per window: six round trips) and with the
+local-lease HybridRateLimiter in front of it, and reports checks/s for one
+worker process. Also fires a concurrent burst at a fresh client to show
+how many requests each approach lets through over the limit.
+
+Usage:
+    python scripts/benchmark_rate_limiter.py [--checks 20000] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from app.services.rate_limiter_service import HybridRateLimiter, RateLimiterService
+
+LIMIT_PER_MINUTE = 1_000_000  # High enough that throughput runs never hit the limit
+LIMIT_PER_DAY = 10_000_000
+
+
+async def legacy_check(service: RateLimiterService, client_id: str, limit_per_minute: int, limit_per_day: int) -> bool:
+    """Check the way the limiter did before: read both counters, then increment."""
+    minute_key = f"rate_limit_bench:minute:{client_id}"
+    day_key = f"rate_limit_bench:day:{client_id}"
+
+    minute_count = int(await service.redis.get(minute_key) or 0)
+    day_count = int(await service.redis.get(day_key) or 0)
+    is_allowed = minute_count < limit_per_minute and day_count < limit_per_day
+
+    if is_allowed:
+        await service.redis.incr(minute_key)
+        await service.redis.expire(minute_key, 60)
+        await service.redis.incr(day_key)
+        await service.redis.expire(day_key, 86400)
+
+    return is_allowed
+
+
+async def script_check(service: RateLimiterService, client_id: str, limit_per_minute: int, limit_per_day: int) -> bool:
+    """Check with the atomic GCRA script."""
+    is_allowed, _ = await service.check_rate_limit(client_id, limit_per_minute, limit_per_day)
+    return is_allowed
+
+
+def hybrid_check(limiter: HybridRateLimiter):
+    """Build a check function that admits from local leases."""
+
+    async def check(service: RateLimiterService, client_id: str, limit_per_minute: int, limit_per_day: int) -> bool:
+        is_allowed, _ = await limiter.check_rate_limit(client_id, limit_per_minute, limit_per_day)
+        return is_allowed
+
+    return check
+
+
+async def run_throughput(check, service: RateLimiterService, checks: int, concurrency: int, clients: int) -> float:
+    """Run checks from concurrent tasks and return checks per second."""
+    client_ids = [str(uuid4()) for _ in range(clients)]
+    per_task = checks // concurrency
+
+    async def worker(offset: int):
+        for i in range(per_task):
+            await check(service, client_ids[(offset + i) % clients], LIMIT_PER_MINUTE, LIMIT_PER_DAY)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return per_task * concurrency / elapsed
+
+
+async def run_burst(check, service: RateLimiterService, burst: int, limit: int) -> int:
+    """Fire a concurrent burst at one fresh client and count admitted requests."""
+    client_id = str(uuid4())
+    results = await asyncio.gather(*(check(service, client_id, limit, LIMIT_PER_DAY) for _ in range(burst)))
+    return sum(results)
+
+
+async def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--burst-limit", type=int, default=60)
+    args = parser.parse_args()
+
+    service = RateLimiterService()
+    try:
+        await service.redis.ping()
+    except Exception as e:
+        print(f"Redis not reachable: {e}")
+        sys.exit(1)
+
+    print(f"{args.checks} checks, {args.concurrency} concurrent tasks, {args.clients} clients, 1 worker")
+    print()
+
+    try:
+        legacy = await run_throughput(legacy_check, service, args.checks, args.concurrency, args.clients)
+        print(f"{'GET/INCR/EXPIRE (6 trips)':<28} {legacy:10.0f} checks/s")
+        script = await run_throughput(script_check, service, args.checks, args.concurrency, args.clients)
+        print(f"{'GCRA script (1 EVALSHA)':<28} {script:10.0f} checks/s")
+        hybrid_limiter = HybridRateLimiter(service)
+        hybrid = await run_throughput(hybrid_check(hybrid_limiter), service, args.checks, args.concurrency, args.clients)
+        print(f"{'Local leases + GCRA':<28} {hybrid:10.0f} checks/s")
+        local_share = hybrid_limiter.local_checks / max(1, hybrid_limiter.local_checks + hybrid_limiter.redis_checks)
+        print(f"Local leases answered {local_share:.1%} of checks without Redis")
+        print(f"Speedup: {script / legacy:.2f}x (script), {hybrid / legacy:.2f}x (local leases)")
+        print()
+
+        print(f"Burst of {args.burst} concurrent requests against a limit of {args.burst_limit}/min:")
+        legacy_admitted = await run_burst(legacy_check, service, args.burst, args.burst_limit)
+        print(f"{'GET/INCR/EXPIRE (6 trips)':<28} {legacy_admitted:6d} admitted")
+        script_admitted = await run_burst(script_check, service, args.burst, args.burst_limit)
+        print(f"{'GCRA script (1 EVALSHA)':<28} {script_admitted:6d} admitted")
+        hybrid_admitted = await run_burst(hybrid_check(HybridRateLimiter(service)), service, args.burst, args.burst_limit)
+        print(f"{'Local leases + GCRA':<28} {hybrid_admitted:6d} admitted")
+    finally:
+        async for key in service.redis.scan_iter("rate_limit_bench:*"):
+            await service.redis.delete(key)
+        await service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
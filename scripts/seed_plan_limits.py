@@ -13,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.logging import get_logger
 from app.db.base import async_session_maker
 from app.models.subscription import PlanLimit
+from app.services.plan_cache_service import plan_cache_service
 
 logger = get_logger(__name__)
 
@@ -129,6 +130,9 @@ async def seed_plan_limits():
         await db.commit()
         logger.info("plan_limits_seeded", total_plans=len(plans))
 
+    # Tell running workers to reload their plan cache
+    await plan_cache_service.publish_plans_changed()
+
 
 async def main():
     """Main function."""
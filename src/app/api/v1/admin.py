@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.dependencies import get_admin_user
 from app.core.logging import get_logger
 from app.db.base import get_db
+from app.repositories.base import InvalidCursorError
 from app.models.user import User
 from app.schemas.admin import (
     APIKeyResponse,
@@ -199,8 +200,8 @@ async def revoke_api_key(
 async def list_users(
     db: Annotated[AsyncSession, Depends(get_db)],
     admin_user: AdminUser,
-    page: int = Query(default=1, ge=1, description="Page number"),
     page_size: int = Query(default=50, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
     search_query: Optional[str] = Query(default=None, description="Search by email or name"),
     role_filter: Optional[str] = Query(default=None, description="Filter by role"),
 ) -> UserListPaginatedResponse:
@@ -210,8 +211,8 @@ async def list_users(
     Args:
         db: Database session
         admin_user: Authenticated admin user
-        page: Page number
         page_size: Items per page
+        cursor: next_cursor of the previous page
         search_query: Search query
         role_filter: Role filter
 
@@ -225,14 +226,19 @@ async def list_users(
 
         result = await admin_service.list_users(
             admin_user_id=admin_user_id,
-            page=page,
             page_size=page_size,
+            cursor=cursor,
             search_query=search_query,
             role_filter=role_filter,
         )
 
         return UserListPaginatedResponse(**result)
 
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
     except Exception as e:
         logger.error("list_users_failed", error=str(e))
         raise HTTPException(
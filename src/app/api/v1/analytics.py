@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_current_user
 from app.core.logging import get_logger
-from app.db.base import get_db
+from app.db.base import get_read_only_db
 from app.models.chat import Conversation, Message
 from app.models.subscription import (
     GeneratedImage,
@@ -103,7 +103,7 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
 @router.get("/system-stats", response_model=SystemStatsResponse)
 async def get_system_stats(
     current_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_only_db),
 ) -> SystemStatsResponse:
     """
     Get system-wide statistics.
@@ -197,7 +197,7 @@ async def get_system_stats(
 @router.get("/plan-distribution", response_model=List[PlanDistributionResponse])
 async def get_plan_distribution(
     current_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_only_db),
 ) -> List[PlanDistributionResponse]:
     """
     Get subscription plan distribution.
@@ -245,7 +245,7 @@ async def get_plan_distribution(
 async def get_usage_trends(
     days: int = 30,
     current_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_only_db),
 ) -> List[UsageTrendResponse]:
     """
     Get usage trends over time.
@@ -300,7 +300,7 @@ async def get_usage_trends(
 async def get_top_users(
     limit: int = 10,
     current_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_only_db),
 ) -> List[TopUsersResponse]:
     """
     Get top users by usage.
@@ -361,7 +361,7 @@ async def get_top_users(
 @router.get("/model-usage", response_model=List[ModelUsageResponse])
 async def get_model_usage(
     current_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_only_db),
 ) -> List[ModelUsageResponse]:
     """
     Get model usage statistics.
@@ -410,7 +410,7 @@ async def get_model_usage(
 @router.get("/cache-performance", response_model=CachePerformanceResponse)
 async def get_cache_performance(
     current_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_only_db),
 ) -> CachePerformanceResponse:
     """
     Get prompt caching performance metrics.
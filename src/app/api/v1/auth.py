@@ -257,10 +257,10 @@ async def logout(
     """
     Logout current user.
 
-    Revokes current session.
+    Revokes the user's sessions and access tokens on all devices.
     """
-    # TODO: Implement session revocation
-    logger.info("user_logged_out", user_id=str(current_user.id))
+    auth_service = AuthService(db)
+    await auth_service.logout(current_user.id)
 
     return LogoutResponse(
         message="Logged out successfully",
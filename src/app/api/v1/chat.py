@@ -8,6 +8,7 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.adaptive_limiter import LoadSheddingError
 from app.core.config import settings
 from app.core.dependencies import get_current_user
 from app.core.logging import get_logger
@@ -15,6 +16,7 @@ from app.core.langfuse_client import trace_request, trace_span, log_event
 from app.db.base import get_db
 from app.models.user import User
 from app.services.enhanced_chat_service import enhanced_chat_service
+from app.services.usage_quota_service import QuotaUnavailableError
 from uuid import uuid4
 from temporalio.client import Client
 from app.core.temporal_client import get_temporal_client
@@ -268,6 +270,18 @@ async def send_message(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=str(e),
             )
+        except QuotaUnavailableError as e:
+            # Limits not loaded yet: retryable, not a server error
+            log_event(trace, "request-failed", metadata={"error": "quota_unavailable"})
+            logger.warning("chat_quota_unavailable", user_id=str(current_user.id), error=str(e))
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+            )
+        except LoadSheddingError:
+            # Handled by the app-level handler (503 + Retry-After)
+            log_event(trace, "request-failed", metadata={"error": "load_shed"})
+            raise
         except Exception as e:
             log_event(trace, "request-error", metadata={"error": str(e)})
             logger.error(
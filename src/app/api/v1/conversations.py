@@ -1,19 +1,25 @@
 """Conversation management API endpoints."""
 
 from datetime import datetime
-from typing import List
+from typing import Any, AsyncIterator, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
+from app.core.config import settings
 from app.core.dependencies import get_current_user
 from app.core.logging import get_logger
-from app.db.base import get_db
+from app.db.base import RoutingSessionLocal, get_db
 from app.models.chat import Conversation, Message
 from app.models.user import User
+from app.repositories.base import InvalidCursorError, paginate
+from app.services.conversation_cache_service import conversation_cache_service
+from app.services.leaderboard_service import leaderboard_service
 from app.services.openrouter_service import OpenRouterService
 
 router = APIRouter()
@@ -55,10 +61,11 @@ class ConversationResponse(BaseModel):
 
 
 class ConversationListResponse(BaseModel):
-    """List of conversations."""
+    """Page of conversations."""
 
     conversations: List[ConversationResponse]
-    total: int
+    total: int  # Conversations in this page
+    next_cursor: str | None = None  # Pass as cursor to get the next page
 
 
 class MessageResponse(BaseModel):
@@ -89,7 +96,59 @@ class ConversationDetailResponse(BaseModel):
     created_at: str
     updated_at: str
     last_message_at: str | None
-    messages: List[MessageResponse]
+    messages: List[MessageResponse]  # One page, oldest first
+    next_cursor: str | None = None  # Pass as cursor to get the next page of messages
+
+
+# Columns read for message history; the rest of the row (token breakdowns,
+# routing details, promotion fields) is never loaded
+MESSAGE_COLUMNS = (
+    Message.id,
+    Message.role,
+    Message.content,
+    Message.final_model_used,
+    Message.total_tokens_used,
+    Message.cached_tokens_read,
+    Message.cache_discount_usd,
+    Message.created_at,
+)
+
+
+def _message_response(msg: Any) -> MessageResponse:
+    """Build a MessageResponse from a Message or a row of MESSAGE_COLUMNS."""
+    return MessageResponse(
+        id=msg.id,
+        role=msg.role,
+        content=msg.content,
+        model_used=msg.final_model_used,
+        tokens_used=msg.total_tokens_used,
+        cached_tokens_read=msg.cached_tokens_read,
+        cache_discount_usd=float(msg.cache_discount_usd) if msg.cache_discount_usd else None,
+        created_at=msg.created_at.isoformat(),
+    )
+
+
+async def _get_owned_conversation(conversation_id: UUID, user: User, db: AsyncSession) -> Conversation:
+    """
+    Load a conversation owned by the user.
+
+    Raises:
+        HTTPException: 404 if it doesn't exist or belongs to another user
+    """
+    result = await db.execute(
+        select(Conversation).where(
+            Conversation.id == conversation_id,
+            Conversation.user_id == user.id,
+        )
+    )
+    conversation = result.scalar_one_or_none()
+
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found",
+        )
+    return conversation
 
 
 @router.post("/", response_model=ConversationResponse, status_code=status.HTTP_201_CREATED)
@@ -119,6 +178,7 @@ async def create_conversation(
         db.add(conversation)
         await db.commit()
         await db.refresh(conversation)
+        await leaderboard_service.record_conversation(conversation.user_id)
 
         logger.info(
             "conversation_created",
@@ -152,8 +212,8 @@ async def create_conversation(
 
 @router.get("/", response_model=ConversationListResponse)
 async def list_conversations(
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
     include_inactive: bool = False,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
@@ -162,10 +222,10 @@ async def list_conversations(
     List user's conversations.
 
     - **limit**: Maximum conversations to return (default: 50)
-    - **offset**: Number of conversations to skip (default: 0)
+    - **cursor**: next_cursor from the previous page (omit for the first page)
     - **include_inactive**: Include inactive conversations
 
-    Returns list of conversations sorted by last activity.
+    Returns a page of conversations sorted by last activity.
     """
     try:
         query = select(Conversation).where(Conversation.user_id == current_user.id)
@@ -173,10 +233,9 @@ async def list_conversations(
         if not include_inactive:
             query = query.where(Conversation.is_active == True)
 
-        query = query.order_by(desc(Conversation.last_message_at)).limit(limit).offset(offset)
-
-        result = await db.execute(query)
-        conversations = result.scalars().all()
+        # Conversations without messages sort by creation time
+        last_activity = func.coalesce(Conversation.last_message_at, Conversation.created_at)
+        page = await paginate(db, query, [last_activity], Conversation.id, limit, cursor)
 
         return ConversationListResponse(
             conversations=[
@@ -194,11 +253,17 @@ async def list_conversations(
                     updated_at=conv.updated_at.isoformat(),
                     last_message_at=conv.last_message_at.isoformat() if conv.last_message_at else None,
                 )
-                for conv in conversations
+                for conv in page.items
             ],
-            total=len(conversations),
+            total=len(page.items),
+            next_cursor=page.next_cursor,
         )
 
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
     except Exception as e:
         logger.error("list_conversations_error", user_id=str(current_user.id), error=str(e))
         raise HTTPException(
@@ -210,38 +275,35 @@ async def list_conversations(
 @router.get("/{conversation_id}", response_model=ConversationDetailResponse)
 async def get_conversation(
     conversation_id: UUID,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> ConversationDetailResponse:
     """
-    Get a conversation with all messages.
+    Get a conversation with a page of its messages.
 
     - **conversation_id**: Conversation ID
+    - **limit**: Maximum messages to return (default: 100)
+    - **cursor**: next_cursor from the previous page (omit for the first page)
 
-    Returns conversation details with message history.
+    Returns conversation details with message history, oldest first. Use
+    GET /{conversation_id}/messages/stream to read the whole history.
     """
     try:
-        result = await db.execute(
-            select(Conversation).where(
-                Conversation.id == conversation_id,
-                Conversation.user_id == current_user.id,
-            )
-        )
-        conversation = result.scalar_one_or_none()
-
-        if not conversation:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found",
-            )
+        conversation = await _get_owned_conversation(conversation_id, current_user, db)
 
-        # Load messages
-        messages_result = await db.execute(
+        page = await paginate(
+            db,
             select(Message)
-            .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at)
+            .options(load_only(*MESSAGE_COLUMNS))
+            .where(Message.conversation_id == conversation_id),
+            [Message.created_at],
+            Message.id,
+            limit,
+            cursor,
+            descending=False,
         )
-        messages = messages_result.scalars().all()
 
         return ConversationDetailResponse(
             id=conversation.id,
@@ -256,23 +318,17 @@ async def get_conversation(
             created_at=conversation.created_at.isoformat(),
             updated_at=conversation.updated_at.isoformat(),
             last_message_at=conversation.last_message_at.isoformat() if conversation.last_message_at else None,
-            messages=[
-                MessageResponse(
-                    id=msg.id,
-                    role=msg.role,
-                    content=msg.content,
-                    model_used=msg.model_used,
-                    tokens_used=msg.tokens_used,
-                    cached_tokens_read=msg.cached_tokens_read,
-                    cache_discount_usd=float(msg.cache_discount_usd) if msg.cache_discount_usd else None,
-                    created_at=msg.created_at.isoformat(),
-                )
-                for msg in messages
-            ],
+            messages=[_message_response(msg) for msg in page.items],
+            next_cursor=page.next_cursor,
         )
 
     except HTTPException:
         raise
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
     except Exception as e:
         logger.error("get_conversation_error", user_id=str(current_user.id), error=str(e))
         raise HTTPException(
@@ -281,6 +337,66 @@ async def get_conversation(
         )
 
 
+async def _stream_messages(conversation_id: UUID, user_id: UUID) -> AsyncIterator[bytes]:
+    """
+    Yield a conversation's messages as NDJSON lines, oldest first.
+
+    Rows come from a server-side cursor in batches of
+    conversation_message_stream_batch_size and are serialized as they
+    arrive, so memory doesn't grow with the conversation. Uses its own
+    read-only (replica) session because the request session is closed
+    before the body is sent.
+    """
+    query = (
+        select(*MESSAGE_COLUMNS)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.created_at, Message.id)
+        .execution_options(yield_per=settings.conversation_message_stream_batch_size)
+    )
+
+    count = 0
+    try:
+        async with RoutingSessionLocal(read_only=True) as session:
+            result = await session.stream(query)
+            async for row in result:
+                yield _message_response(row).model_dump_json().encode() + b"\n"
+                count += 1
+    except Exception as e:
+        # Headers are already sent: the client sees a truncated stream
+        logger.error(
+            "conversation_stream_error",
+            user_id=str(user_id),
+            conversation_id=str(conversation_id),
+            messages_sent=count,
+            error=str(e),
+        )
+        raise
+
+    logger.debug("conversation_streamed", conversation_id=str(conversation_id), messages_sent=count)
+
+
+@router.get("/{conversation_id}/messages/stream")
+async def stream_conversation_messages(
+    conversation_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Stream a conversation's full message history as NDJSON.
+
+    - **conversation_id**: Conversation ID
+
+    Returns one MessageResponse JSON object per line, oldest first.
+    """
+    await _get_owned_conversation(conversation_id, current_user, db)
+
+    return StreamingResponse(
+        _stream_messages(conversation_id, current_user.id),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"},
+    )
+
+
 @router.patch("/{conversation_id}", response_model=ConversationResponse)
 async def update_conversation(
     conversation_id: UUID,
@@ -389,6 +505,8 @@ async def delete_conversation(
         await db.delete(conversation)
         await db.commit()
 
+        await conversation_cache_service.invalidate(conversation_id)
+
         logger.info(
             "conversation_deleted",
             user_id=str(current_user.id),
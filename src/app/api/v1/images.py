@@ -12,6 +12,7 @@ from app.core.logging import get_logger
 from app.db.base import get_db
 from app.models.user import User
 from app.services.image_generation_service import image_generation_service
+from app.services.usage_quota_service import QuotaUnavailableError
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -95,6 +96,12 @@ async def generate_image(
             created_at=result["created_at"].isoformat(),
         )
 
+    except QuotaUnavailableError as e:
+        logger.warning("image_generation_quota_unavailable", user_id=str(current_user.id), error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
     except ValueError as e:
         logger.warning("image_generation_failed", user_id=str(current_user.id), error=str(e))
         raise HTTPException(
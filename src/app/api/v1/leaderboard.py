@@ -8,9 +8,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
-from app.db.base import get_db
+from app.db.base import get_read_only_db
 from app.schemas.admin import LeaderboardResponse, UserStatisticsResponse
-from app.services.leaderboard_service import LeaderboardService
+from app.services.leaderboard_service import leaderboard_service
 
 logger = get_logger(__name__)
 
@@ -38,7 +38,7 @@ router = APIRouter()
     """,
 )
 async def get_document_upload_leaderboard(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_only_db)],
     timeframe: Literal["all_time", "month", "week"] = Query(
         default="all_time", description="Time period"
     ),
@@ -56,11 +56,10 @@ async def get_document_upload_leaderboard(
         Leaderboard data
     """
     try:
-        leaderboard_service = LeaderboardService(db)
-
         leaderboard = await leaderboard_service.get_document_upload_leaderboard(
             timeframe=timeframe,
             limit=limit,
+            db=db,
         )
 
         return LeaderboardResponse(
@@ -98,7 +97,7 @@ async def get_document_upload_leaderboard(
     """,
 )
 async def get_chat_activity_leaderboard(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_only_db)],
     timeframe: Literal["all_time", "month", "week"] = Query(
         default="all_time", description="Time period"
     ),
@@ -116,11 +115,10 @@ async def get_chat_activity_leaderboard(
         Leaderboard data
     """
     try:
-        leaderboard_service = LeaderboardService(db)
-
         leaderboard = await leaderboard_service.get_chat_activity_leaderboard(
             timeframe=timeframe,
             limit=limit,
+            db=db,
         )
 
         return LeaderboardResponse(
@@ -158,7 +156,7 @@ async def get_chat_activity_leaderboard(
     """,
 )
 async def get_conversation_leaderboard(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_only_db)],
     timeframe: Literal["all_time", "month", "week"] = Query(
         default="all_time", description="Time period"
     ),
@@ -176,11 +174,10 @@ async def get_conversation_leaderboard(
         Leaderboard data
     """
     try:
-        leaderboard_service = LeaderboardService(db)
-
         leaderboard = await leaderboard_service.get_conversation_leaderboard(
             timeframe=timeframe,
             limit=limit,
+            db=db,
         )
 
         return LeaderboardResponse(
@@ -223,7 +220,7 @@ async def get_conversation_leaderboard(
     """,
 )
 async def get_overall_leaderboard(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_only_db)],
     timeframe: Literal["all_time", "month", "week"] = Query(
         default="all_time", description="Time period"
     ),
@@ -241,11 +238,10 @@ async def get_overall_leaderboard(
         Leaderboard data with combined scoring
     """
     try:
-        leaderboard_service = LeaderboardService(db)
-
         leaderboard = await leaderboard_service.get_overall_leaderboard(
             timeframe=timeframe,
             limit=limit,
+            db=db,
         )
 
         return LeaderboardResponse(
@@ -286,7 +282,7 @@ async def get_overall_leaderboard(
 )
 async def get_user_statistics(
     user_id: UUID,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_only_db)],
 ) -> UserStatisticsResponse:
     """
     Get user statistics.
@@ -299,9 +295,7 @@ async def get_user_statistics(
         User statistics and rank
     """
     try:
-        leaderboard_service = LeaderboardService(db)
-
-        result = await leaderboard_service.get_user_statistics(user_id=user_id)
+        result = await leaderboard_service.get_user_statistics(user_id=user_id, db=db)
 
         return UserStatisticsResponse(**result)
 
@@ -325,7 +319,7 @@ async def get_user_statistics(
     description="Get statistics for the currently authenticated user.",
 )
 async def get_my_statistics(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_only_db)],
 ) -> UserStatisticsResponse:
     """
     Get current user's statistics.
@@ -340,9 +334,7 @@ async def get_my_statistics(
     user_id = UUID("00000000-0000-0000-0000-000000000000")
 
     try:
-        leaderboard_service = LeaderboardService(db)
-
-        result = await leaderboard_service.get_user_statistics(user_id=user_id)
+        result = await leaderboard_service.get_user_statistics(user_id=user_id, db=db)
 
         return UserStatisticsResponse(**result)
 
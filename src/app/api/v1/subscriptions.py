@@ -11,6 +11,7 @@ from app.core.logging import get_logger
 from app.db.base import get_db
 from app.models.user import User
 from app.services.subscription_service import subscription_service
+from app.services.usage_quota_service import usage_quota_service
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -210,7 +211,7 @@ async def get_usage_stats(
     Returns usage limits and current usage.
     """
     try:
-        limits = await subscription_service.check_usage_limits(
+        limits = await usage_quota_service.get_usage_limits(
             user_id=current_user.id,
             db=db,
         )
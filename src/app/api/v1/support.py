@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
 from app.db.base import get_db
+from app.repositories.base import InvalidCursorError
 from app.schemas.admin import (
     AddTicketResponseRequest,
     AddTicketResponseResponse,
@@ -111,16 +112,16 @@ async def create_ticket(
 async def list_my_tickets(
     db: Annotated[AsyncSession, Depends(get_db)],
     status_filter: Optional[str] = Query(default=None, description="Filter by status"),
-    page: int = Query(default=1, ge=1, description="Page number"),
     page_size: int = Query(default=20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
 ) -> TicketListResponse:
     """
     List user's own tickets.
 
     Args:
         status_filter: Filter by status
-        page: Page number
         page_size: Items per page
+        cursor: next_cursor of the previous page
         db: Database session
 
     Returns:
@@ -134,12 +135,17 @@ async def list_my_tickets(
         result = await support_service.list_user_tickets(
             user_id=user_id,
             status_filter=status_filter,
-            page=page,
             page_size=page_size,
+            cursor=cursor,
         )
 
         return TicketListResponse(**result)
 
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
     except Exception as e:
         logger.error("list_my_tickets_failed", error=str(e))
         raise HTTPException(
@@ -164,8 +170,8 @@ async def list_all_tickets(
     category_filter: Optional[str] = Query(default=None, description="Filter by category"),
     priority_filter: Optional[str] = Query(default=None, description="Filter by priority"),
     assigned_to_me: bool = Query(default=False, description="Show only my assigned tickets"),
-    page: int = Query(default=1, ge=1, description="Page number"),
     page_size: int = Query(default=50, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
 ) -> TicketListResponse:
     """
     List all tickets (admin view).
@@ -175,8 +181,8 @@ async def list_all_tickets(
         category_filter: Filter by category
         priority_filter: Filter by priority
         assigned_to_me: Show only assigned tickets
-        page: Page number
         page_size: Items per page
+        cursor: next_cursor of the previous page
         db: Database session
 
     Returns:
@@ -193,12 +199,17 @@ async def list_all_tickets(
             category_filter=category_filter,
             priority_filter=priority_filter,
             assigned_to_me=assigned_to_me,
-            page=page,
             page_size=page_size,
+            cursor=cursor,
         )
 
         return TicketListResponse(**result)
 
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
     except Exception as e:
         logger.error("list_all_tickets_failed", error=str(e))
         raise HTTPException(
@@ -0,0 +1,312 @@
+"""
+Adaptive concurrency limiting for upstream calls.
+
+A fixed concurrency cap is either too low (wasted capacity) or too high
+(provider 429s and slowdowns turn into timeouts). The limiter adjusts its
+limit with AIMD driven by latency and rate limiting:
+
+- Additive increase: +1 per limit's worth of healthy responses
+- Multiplicative decrease: when recent latency rises well above its
+  long-term average, or the upstream answers 429
+
+Calls above the limit wait in a FIFO queue. Admission is deadline-aware:
+if the expected wait (queue position x average latency / limit) exceeds
+the caller's deadline, the call is shed immediately with LoadSheddingError
+instead of timing out later.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+from app.core.logging import get_logger
+from app.core.metrics import track_concurrency_limiter, track_load_shed
+
+logger = get_logger(__name__)
+
+
+class LoadSheddingError(Exception):
+    """Raised when a call is rejected because the upstream is saturated."""
+
+    def __init__(self, message: str, retry_after_seconds: float = 1.0):
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Check whether an upstream error is a 429 (rate limited) response."""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code == 429
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limiter with a deadline-aware admission queue.
+
+    Features:
+    - Limit grows while latency stays near its long-term average
+    - Limit shrinks on latency spikes and 429 responses (at most once per
+      average latency, so one slow burst doesn't collapse it)
+    - FIFO queue above the limit, bounded by queue_size
+    - Early shedding when the expected wait exceeds the caller's deadline
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        queue_size: int = 100,
+        backoff_ratio: float = 0.7,
+        latency_tolerance: float = 2.0,
+    ):
+        """
+        Initialize adaptive limiter.
+
+        Args:
+            name: Limiter name (for logging and metrics)
+            initial_limit: Starting concurrency limit
+            min_limit: Lowest concurrency limit
+            max_limit: Highest concurrency limit
+            queue_size: Maximum calls waiting for a slot
+            backoff_ratio: Limit multiplier on overload
+            latency_tolerance: Short/long-term latency ratio treated as overload
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_size = queue_size
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+        # Latency EWMAs (seconds): recent vs long-term
+        self._short_latency: Optional[float] = None
+        self._long_latency: Optional[float] = None
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Number of calls waiting for a slot."""
+        return len(self._waiters)
+
+    @property
+    def average_latency(self) -> Optional[float]:
+        """Long-term average latency in seconds (None before the first sample)."""
+        return self._long_latency
+
+    def expected_wait(self, position: int) -> float:
+        """
+        Estimate how long a call at a queue position waits for a slot.
+
+        Args:
+            position: 1-based position in the queue
+
+        Returns:
+            Expected wait in seconds (0 before any latency is known)
+        """
+        if self._long_latency is None:
+            return 0.0
+        return math.ceil(position / max(1, int(self.limit))) * self._long_latency
+
+    def _report(self) -> None:
+        """Export limiter state to metrics."""
+        track_concurrency_limiter(
+            name=self.name,
+            limit=int(self.limit),
+            in_flight=self.in_flight,
+            queued=len(self._waiters),
+        )
+
+    def _shed(self, reason: str, retry_after: float) -> LoadSheddingError:
+        """Record and build a load shedding error."""
+        track_load_shed(name=self.name, reason=reason)
+        logger.warning(
+            "concurrency_limiter_shed",
+            name=self.name,
+            reason=reason,
+            limit=int(self.limit),
+            in_flight=self.in_flight,
+            queued=len(self._waiters),
+        )
+        return LoadSheddingError(
+            f"'{self.name}' is overloaded ({reason}); retry in {retry_after:.0f}s",
+            retry_after_seconds=retry_after,
+        )
+
+    async def acquire(self, deadline: Optional[float] = None) -> None:
+        """
+        Acquire a slot, waiting in the queue if the limit is reached.
+
+        Args:
+            deadline: time.monotonic() by which the call must be admitted
+
+        Raises:
+            LoadSheddingError: If the queue is full or the deadline can't be met
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self._report()
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            raise self._shed("queue_full", retry_after=max(1.0, self.expected_wait(self.queue_size)))
+
+        expected_wait = self.expected_wait(len(self._waiters) + 1)
+        timeout = None
+        if deadline is not None:
+            timeout = deadline - time.monotonic()
+            if expected_wait > timeout:
+                raise self._shed("deadline", retry_after=max(1.0, expected_wait))
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._report()
+
+        try:
+            await asyncio.wait_for(waiter, timeout=timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just as we gave up; pass it on
+                self._release_slot()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+                self._report()
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._shed("queue_timeout", retry_after=max(1.0, expected_wait)) from None
+            raise
+
+    def release(self, latency: Optional[float] = None, rate_limited: bool = False) -> None:
+        """
+        Release a slot and adapt the limit.
+
+        Args:
+            latency: Call latency in seconds (None if it shouldn't be sampled)
+            rate_limited: Whether the upstream answered 429
+        """
+        if rate_limited:
+            self._decrease("rate_limited")
+        elif latency is not None:
+            self._sample(latency)
+
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        """Free a slot and admit queued calls up to the limit."""
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+        self._report()
+
+    def _sample(self, latency: float) -> None:
+        """Update latency averages and grow or shrink the limit."""
+        if self._long_latency is None:
+            self._short_latency = self._long_latency = latency
+        else:
+            self._short_latency = 0.8 * self._short_latency + 0.2 * latency
+            self._long_latency = 0.98 * self._long_latency + 0.02 * latency
+
+        if self._short_latency > self._long_latency * self.latency_tolerance:
+            self._decrease("latency")
+        elif self.in_flight >= int(self.limit):
+            # Only grow when the current limit is actually used
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def _decrease(self, reason: str) -> None:
+        """Shrink the limit (at most once per average latency)."""
+        now = time.monotonic()
+        if now - self._last_decrease < (self._long_latency or 0.0):
+            return
+        self._last_decrease = now
+
+        previous = int(self.limit)
+        self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+        logger.info(
+            "concurrency_limit_decreased",
+            name=self.name,
+            reason=reason,
+            previous_limit=previous,
+            limit=int(self.limit),
+        )
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args,
+        deadline: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Run an async function within the concurrency limit.
+
+        Args:
+            func: Async function to execute
+            *args: Positional arguments for func
+            deadline: time.monotonic() by which the call must be admitted
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Function result
+
+        Raises:
+            LoadSheddingError: If the call was shed
+        """
+        await self.acquire(deadline)
+        started = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            self.release(rate_limited=is_rate_limit_error(e))
+            raise
+        self.release(latency=time.perf_counter() - started)
+        return result
+
+    def get_state(self) -> dict:
+        """Get current limiter state."""
+        return {
+            "name": self.name,
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "average_latency_seconds": self._long_latency,
+        }
+
+
+class ConcurrencyLimiterRegistry:
+    """Registry creating one limiter per key (e.g. per model) with shared defaults."""
+
+    def __init__(self, **defaults: Any):
+        """
+        Initialize limiter registry.
+
+        Args:
+            **defaults: AdaptiveConcurrencyLimiter arguments for new limiters
+        """
+        self.defaults = defaults
+        self._limiters: dict[str, AdaptiveConcurrencyLimiter] = {}
+
+    def get_or_create(self, name: str) -> AdaptiveConcurrencyLimiter:
+        """Get existing or create new limiter."""
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            limiter = self._limiters[name] = AdaptiveConcurrencyLimiter(name=name, **self.defaults)
+        return limiter
+
+    def get_all_states(self) -> list[dict]:
+        """Get states of all limiters."""
+        return [limiter.get_state() for limiter in self._limiters.values()]
@@ -0,0 +1,105 @@
+"""
+Bounded thread pools for blocking work called from async code.
+
+Some calls (bcrypt at 12 rounds takes ~250 ms of CPU) block the event loop
+if run inline in an async handler, stalling every other request on the
+worker, chat streams included. asyncio.to_thread moves them off the loop,
+but onto the shared default pool, where a burst can take every thread and
+queue without limit.
+
+BoundedExecutor runs them on a dedicated pool instead:
+
+- A fixed number of threads, so a burst can't occupy every core
+- A bounded queue in front of them; beyond it, calls are shed with
+  LoadSheddingError (503 + Retry-After) instead of piling up
+- In-flight and queued calls exported as metrics
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.core.adaptive_limiter import LoadSheddingError
+from app.core.logging import get_logger
+from app.core.metrics import track_executor, track_executor_rejected
+
+logger = get_logger(__name__)
+
+
+class BoundedExecutor:
+    """Dedicated thread pool with a bounded queue."""
+
+    def __init__(self, name: str, workers: int, queue_size: int):
+        """
+        Initialize bounded executor.
+
+        Args:
+            name: Executor name (for logging, metrics and thread names)
+            workers: Number of threads
+            queue_size: Maximum calls waiting for a thread
+        """
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._pending = 0  # Submitted calls not yet finished
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls running on a thread."""
+        return min(self._pending, self.workers)
+
+    @property
+    def queued(self) -> int:
+        """Number of calls waiting for a thread."""
+        return max(0, self._pending - self.workers)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking function on the pool.
+
+        Args:
+            func: Blocking function to execute
+            *args: Positional arguments for func
+
+        Returns:
+            Function result
+
+        Raises:
+            LoadSheddingError: If the queue is full
+        """
+        if self.queued >= self.queue_size:
+            track_executor_rejected(self.name)
+            logger.warning(
+                "bounded_executor_shed",
+                name=self.name,
+                in_flight=self.in_flight,
+                queued=self.queued,
+            )
+            raise LoadSheddingError(f"'{self.name}' is overloaded (queue_full); retry in 1s")
+
+        self._pending += 1
+        self._report()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            self._report()
+
+    def shutdown(self) -> None:
+        """Stop accepting calls; running calls finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _report(self) -> None:
+        """Export executor state to metrics."""
+        track_executor(self.name, in_flight=self.in_flight, queued=self.queued)
+
+    def get_state(self) -> dict:
+        """Get current executor state."""
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+        }
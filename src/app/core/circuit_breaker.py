@@ -4,19 +4,54 @@ Circuit Breaker pattern implementation for external API calls.
 Prevents cascading failures when external services are down.
 Automatically opens circuit after failure threshold, then allows
 periodic retries to check if service recovered.
+
+Client errors (4xx responses, including 429) are not counted as failures:
+they reflect the request or one model's quota, not the service being down.
+
+Each breaker can also act as a bulkhead (a cap on concurrent calls to its
+service), and can optionally share its open state through Redis so that an
+outage detected by one worker trips the circuit in every worker.
 """
 
 import asyncio
+import time
 from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Callable, Optional, TypeVar, Any
 
+from app.core.config import settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 T = TypeVar('T')
 
+# How often a breaker re-reads the shared state from Redis
+SHARED_STATE_CHECK_INTERVAL_SECONDS = 1.0
+
+# Count a failure in the shared window; open the circuit fleet-wide once the
+# threshold is reached (or when the local breaker already opened).
+_RECORD_FAILURE_SCRIPT = """
+local failures = redis.call('INCR', KEYS[1])
+if failures == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+if failures >= tonumber(ARGV[1]) or ARGV[4] == '1' then
+    redis.call('SET', KEYS[2], '1', 'PX', ARGV[3])
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+return 0
+"""
+
+
+def is_client_error(error: BaseException) -> bool:
+    """Check whether an upstream error is a 4xx response (other than 408 Request Timeout)."""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status_code, int) and 400 <= status_code < 500 and status_code != 408
+
 
 class CircuitState(str, Enum):
     """Circuit breaker states."""
@@ -30,6 +65,11 @@ class CircuitBreakerError(Exception):
     pass
 
 
+class BulkheadFullError(CircuitBreakerError):
+    """Raised when a breaker's concurrency limit is reached."""
+    pass
+
+
 class CircuitBreaker:
     """
     Circuit Breaker implementation for async functions.
@@ -43,6 +83,8 @@ class CircuitBreaker:
     - failure_threshold: Number of failures before opening
     - recovery_timeout: Seconds before trying half-open
     - success_threshold: Successes needed to close from half-open
+    - max_concurrent: Bulkhead limit on concurrent calls (None = unlimited)
+    - shared_state: Share failures and open state across workers via Redis
     """
 
     def __init__(
@@ -52,6 +94,9 @@ class CircuitBreaker:
         recovery_timeout: int = 60,
         success_threshold: int = 2,
         timeout_seconds: int = 30,
+        max_concurrent: Optional[int] = None,
+        max_queue_wait_seconds: float = 1.0,
+        shared_state: bool = False,
     ):
         """
         Initialize circuit breaker.
@@ -62,12 +107,27 @@ class CircuitBreaker:
             recovery_timeout: Seconds before attempting recovery
             success_threshold: Successes needed to close circuit
             timeout_seconds: Request timeout in seconds
+            max_concurrent: Maximum concurrent calls (bulkhead)
+            max_queue_wait_seconds: Time to wait for a bulkhead slot before rejecting
+            shared_state: Share failures and open state across workers via Redis
         """
         self.name = name
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.success_threshold = success_threshold
         self.timeout_seconds = timeout_seconds
+        self.max_concurrent = max_concurrent
+        self.max_queue_wait_seconds = max_queue_wait_seconds
+        self.shared_state = shared_state
+
+        # Bulkhead
+        self._bulkhead = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+        self.in_flight = 0
+
+        # Shared state (Redis)
+        self._redis = None
+        self._record_failure_script = None
+        self._next_shared_check = 0.0
 
         # State
         self.state = CircuitState.CLOSED
@@ -149,6 +209,71 @@ class CircuitBreaker:
             # Reset failure count on success
             self.failure_count = 0
 
+    def _get_redis(self):
+        """Get Redis client for shared state (created on first use)."""
+        if self._redis is None:
+            from app.core.redis_client import get_redis_client
+
+            self._redis = get_redis_client("default")
+            self._record_failure_script = self._redis.register_script(_RECORD_FAILURE_SCRIPT)
+        return self._redis
+
+    def _shared_key(self, suffix: str) -> str:
+        """Get Redis key for shared breaker state."""
+        return f"circuit_breaker:{self.name}:{suffix}"
+
+    async def _sync_shared_state(self):
+        """Adopt an open circuit published by another worker."""
+        if not self.shared_state or self.state == CircuitState.OPEN:
+            return
+
+        now = time.monotonic()
+        if now < self._next_shared_check:
+            return
+        self._next_shared_check = now + SHARED_STATE_CHECK_INTERVAL_SECONDS
+
+        try:
+            remaining_ms = await self._get_redis().pttl(self._shared_key("open"))
+        except Exception as e:
+            logger.warning("circuit_breaker_shared_state_error", name=self.name, error=str(e))
+            return
+
+        if remaining_ms > 0:
+            logger.warning(
+                "circuit_breaker_opened_remotely",
+                name=self.name,
+                remaining_seconds=round(remaining_ms / 1000, 1),
+            )
+            self.state = CircuitState.OPEN
+            # Align local recovery with the shared open window
+            self.last_failure_time = datetime.now(timezone.utc) - timedelta(
+                milliseconds=max(0, self.recovery_timeout * 1000 - remaining_ms)
+            )
+            self.last_state_change = datetime.now(timezone.utc)
+
+    async def _publish_failure(self):
+        """Record a failure in the shared window (opens the circuit fleet-wide at threshold)."""
+        if not self.shared_state:
+            return
+
+        try:
+            self._get_redis()
+            opened = await self._record_failure_script(
+                keys=[self._shared_key("failures"), self._shared_key("open")],
+                args=[
+                    self.failure_threshold,
+                    self.recovery_timeout * 1000,  # Failure window
+                    self.recovery_timeout * 1000,  # Open duration
+                    "1" if self.state == CircuitState.OPEN else "0",
+                ],
+            )
+        except Exception as e:
+            logger.warning("circuit_breaker_shared_state_error", name=self.name, error=str(e))
+            return
+
+        if opened and self.state != CircuitState.OPEN:
+            self._transition_to_open()
+
     def record_failure(self):
         """Record failed request."""
         self.failure_count += 1
@@ -189,7 +314,8 @@ class CircuitBreaker:
         Raises:
             CircuitBreakerError: If circuit is open and no fallback
         """
-        # Check if circuit is open
+        # Check if circuit is open (locally or in another worker)
+        await self._sync_shared_state()
         if self.is_open:
             logger.warning(
                 "circuit_breaker_request_blocked",
@@ -208,7 +334,22 @@ class CircuitBreaker:
                 f"Circuit breaker '{self.name}' is OPEN. Service unavailable."
             )
 
+        # Bulkhead: wait briefly for a slot, then shed the call
+        if self._bulkhead is not None:
+            try:
+                await asyncio.wait_for(self._bulkhead.acquire(), timeout=self.max_queue_wait_seconds)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "circuit_breaker_bulkhead_full",
+                    name=self.name,
+                    max_concurrent=self.max_concurrent,
+                )
+                raise BulkheadFullError(
+                    f"Circuit breaker '{self.name}' bulkhead is full ({self.max_concurrent} concurrent calls)."
+                )
+
         # Execute with timeout
+        self.in_flight += 1
         try:
             result = await asyncio.wait_for(
                 func(*args, **kwargs),
@@ -224,9 +365,20 @@ class CircuitBreaker:
                 timeout=self.timeout_seconds,
             )
             self.record_failure()
+            await self._publish_failure()
             raise
 
         except Exception as e:
+            if is_client_error(e):
+                # The service answered; the request (or its quota) was the problem
+                logger.info(
+                    "circuit_breaker_client_error",
+                    name=self.name,
+                    error=str(e),
+                    error_type=type(e).__name__,
+                )
+                raise
+
             logger.error(
                 "circuit_breaker_error",
                 name=self.name,
@@ -234,8 +386,14 @@ class CircuitBreaker:
                 error_type=type(e).__name__,
             )
             self.record_failure()
+            await self._publish_failure()
             raise
 
+        finally:
+            self.in_flight -= 1
+            if self._bulkhead is not None:
+                self._bulkhead.release()
+
     def get_state(self) -> dict:
         """Get current circuit breaker state."""
         return {
@@ -246,6 +404,9 @@ class CircuitBreaker:
             "failure_threshold": self.failure_threshold,
             "last_failure_time": self.last_failure_time.isoformat() if self.last_failure_time else None,
             "last_state_change": self.last_state_change.isoformat(),
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "shared_state": self.shared_state,
         }
 
 
@@ -263,6 +424,9 @@ class CircuitBreakerRegistry:
         recovery_timeout: int = 60,
         success_threshold: int = 2,
         timeout_seconds: int = 30,
+        max_concurrent: Optional[int] = None,
+        max_queue_wait_seconds: float = 1.0,
+        shared_state: Optional[bool] = None,
     ) -> CircuitBreaker:
         """
         Get existing or create new circuit breaker.
@@ -273,6 +437,9 @@ class CircuitBreakerRegistry:
             recovery_timeout: Seconds before recovery attempt
             success_threshold: Successes needed to close
             timeout_seconds: Request timeout
+            max_concurrent: Bulkhead limit on concurrent calls
+            max_queue_wait_seconds: Time to wait for a bulkhead slot
+            shared_state: Share state via Redis (uses config default if None)
 
         Returns:
             CircuitBreaker instance
@@ -284,6 +451,12 @@ class CircuitBreakerRegistry:
                 recovery_timeout=recovery_timeout,
                 success_threshold=success_threshold,
                 timeout_seconds=timeout_seconds,
+                max_concurrent=max_concurrent,
+                max_queue_wait_seconds=max_queue_wait_seconds,
+                shared_state=(
+                    shared_state if shared_state is not None
+                    else settings.circuit_breaker_shared_state_enabled
+                ),
             )
 
         return self._breakers[name]
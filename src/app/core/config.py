@@ -43,9 +43,11 @@ class Settings(BaseSettings):
     database_max_overflow: int = Field(default=10)
 
     # Database Read Replica (for read scaling)
-    database_read_replica_host: str | None = Field(default=None)  # If None, uses primary
-    database_read_replica_port: int | None = Field(default=None)
+    database_read_replica_host: str | None = Field(default=None)  # Comma-separated host[:port]; if None, uses primary
+    database_read_replica_port: int | None = Field(default=None)  # Default port for hosts without one
     database_read_replica_enabled: bool = Field(default=False)
+    database_replica_max_lag_seconds: float = Field(default=5.0)  # Drop replicas lagging more than this
+    database_replica_check_interval_seconds: float = Field(default=5.0)  # Replica health check period
 
     # Database - Connection parameters (recommended for production)
     # Note: Individual parameters are always used to build the connection URL
@@ -72,6 +74,10 @@ class Settings(BaseSettings):
     jwt_algorithm: str = Field(default="HS256")
     jwt_access_token_expire_minutes: int = Field(default=30)
     jwt_refresh_token_expire_days: int = Field(default=7)
+    api_key_pepper: str = Field(default="change-in-production")  # HMAC key for API key digests; changing it invalidates keys
+    password_bcrypt_rounds: int = Field(default=12)  # Hashes with other rounds are rehashed on login
+    password_hash_workers: int = Field(default=4)  # Threads running bcrypt
+    password_hash_queue_size: int = Field(default=64)  # Waiting hashes before shedding with 503
 
     # Google OAuth
     google_client_id: str | None = Field(default=None)
@@ -128,6 +134,18 @@ class Settings(BaseSettings):
     cache_control_strategy: Literal["auto", "manual"] = Field(default="auto")
     cache_min_tokens: int = Field(default=1024)  # Minimum tokens for OpenAI caching
 
+    # Conversation Context Cache (hot chat history in Redis)
+    conversation_cache_enabled: bool = Field(default=True)
+    conversation_cache_max_messages: int = Field(default=50)  # History window per conversation
+    conversation_cache_ttl_seconds: int = Field(default=3600)  # Evict idle conversations
+
+    # Message History (paged GET /conversations/{id}, NDJSON stream)
+    conversation_message_stream_batch_size: int = Field(default=200)  # Rows per server-side cursor fetch
+
+    # Leaderboards (Redis sorted sets, rebuilt from PostgreSQL periodically)
+    leaderboard_redis_enabled: bool = Field(default=True)  # False serves leaderboards from GROUP BY queries
+    leaderboard_reconcile_interval_seconds: float = Field(default=900.0)  # Full rebuild; ages out week/month entries
+
     # Model Routing & Fallbacks
     model_routing_enabled: bool = Field(default=True)
     default_fallback_models: list[str] = Field(
@@ -136,6 +154,44 @@ class Settings(BaseSettings):
     routing_strategy: Literal["auto", "price", "latency", "uptime"] = Field(default="auto")
     enable_auto_router: bool = Field(default=False)  # Use openrouter/auto
 
+    # In-flight Deduplication (identical concurrent completions share one upstream call)
+    llm_dedup_enabled: bool = Field(default=True)
+    llm_dedup_max_temperature: float = Field(default=0.0)  # Only coalesce deterministic requests
+
+    # Adaptive Concurrency (per-model AIMD limit on in-flight LLM calls per worker)
+    llm_concurrency_enabled: bool = Field(default=True)
+    llm_concurrency_initial_limit: int = Field(default=20)
+    llm_concurrency_min_limit: int = Field(default=2)
+    llm_concurrency_max_limit: int = Field(default=100)
+    llm_concurrency_queue_size: int = Field(default=200)  # Waiting calls per model before shedding
+    llm_request_deadline_seconds: float = Field(default=30.0)  # Max time a call may wait for a slot
+
+    # Model Catalog (cached OpenRouter /models: pricing, context length, capabilities)
+    model_catalog_refresh_interval_seconds: int = Field(default=3600)  # Background refresh period
+    model_catalog_redis_ttl_seconds: int = Field(default=86400)  # Shared copy lifetime
+
+    # Intent Classifier (optional embedding-centroid second stage for ambiguous intents)
+    intent_classifier_centroids_path: str | None = Field(default=None)  # .npz from scripts/build_intent_centroids.py
+    intent_classifier_min_similarity: float = Field(default=0.5)  # Min cosine similarity to trust a prediction
+    intent_classifier_veto_margin: float = Field(default=0.05)  # Score lead needed to drop a keyword intent
+
+    # Circuit Breakers
+    circuit_breaker_shared_state_enabled: bool = Field(default=False)  # Trip breakers fleet-wide via Redis
+
+    # Outbound HTTP Clients (shared connection pools, see core/http_client.py)
+    http_client_http2_enabled: bool = Field(default=True)  # Requires the h2 package
+    http_client_keepalive_expiry_seconds: float = Field(default=30.0)
+    http_client_pool_timeout_seconds: float = Field(default=10.0)  # Max wait for a free connection
+
+    # Hedged Requests (send a backup request to the next fallback model when slow)
+    llm_hedging_enabled: bool = Field(default=False)
+    llm_hedge_percentile: float = Field(default=0.95)  # Per-model latency percentile deadline
+    llm_hedge_min_delay_seconds: float = Field(default=1.0)
+    llm_hedge_default_delay_seconds: float = Field(default=10.0)  # Until enough samples exist
+    llm_hedge_stream_default_delay_seconds: float = Field(default=3.0)  # Time to first chunk, until enough samples exist
+    llm_hedge_budget_ratio: float = Field(default=0.05)  # Max hedges per request (1 in 20)
+    llm_hedge_max_attempts: int = Field(default=2)  # Primary + hedges per request
+
     # Usage Accounting
     usage_tracking_enabled: bool = Field(default=True)
     track_user_ids: bool = Field(default=True)  # Send user parameter to OpenRouter
@@ -192,11 +248,43 @@ class Settings(BaseSettings):
     langfuse_host: str = Field(default="http://localhost:3000")
 
     # Rate Limiting
+    rate_limit_enabled: bool = Field(default=False)  # Plan-aware RateLimitMiddleware (requests per minute below); set the proxy count before enabling
     rate_limit_anonymous: int = Field(default=5)
     rate_limit_free: int = Field(default=10)
     rate_limit_premium: int = Field(default=50)
     rate_limit_unlimited: int = Field(default=1000)
     rate_limit_test: int = Field(default=10000)
+    rate_limit_anonymous_per_day: int = Field(default=500)
+    rate_limit_free_per_day: int = Field(default=2000)
+    rate_limit_premium_per_day: int = Field(default=20000)
+    rate_limit_unlimited_per_day: int = Field(default=500000)
+    rate_limit_test_per_day: int = Field(default=1000000)
+    rate_limit_policy_refresh_seconds: float = Field(default=300.0)  # Reload paid plans and API clients
+    rate_limit_api_key_cache_ttl_seconds: float = Field(default=300.0)  # Verified API keys (incl. unknown keys)
+    rate_limit_api_key_cache_size: int = Field(default=10000)
+    rate_limit_trusted_proxy_count: int = Field(default=0)  # Reverse proxies that append to X-Forwarded-For (0 = use the peer address)
+    rate_limit_local_leases_enabled: bool = Field(default=True)  # Admit from per-worker token leases, Redis only on refill
+    rate_limit_lease_max_tokens: int = Field(default=50)  # Largest lease a worker takes per client
+    rate_limit_lease_fraction: float = Field(default=0.1)  # Max share of the client's remaining daily quota per lease
+    rate_limit_lease_ttl_seconds: float = Field(default=2.0)  # Minimum lease lifetime (low-rate clients keep leases up to a minute)
+    rate_limit_local_max_clients: int = Field(default=10000)  # LRU bound on clients with a local lease
+
+    # Monthly Usage Quotas
+    usage_quota_redis_enabled: bool = Field(default=True)  # Check and count usage in Redis counters, flush to PostgreSQL
+    usage_quota_flush_interval_seconds: float = Field(default=5.0)  # Persist pending deltas to MonthlyUsageQuota
+    usage_quota_flush_batch_size: int = Field(default=1000)  # User-months flushed per batch
+    usage_quota_counter_ttl_seconds: int = Field(default=3456000)  # 40 days; cold counters rebuild from PostgreSQL
+
+    # Plan and Subscription Cache
+    plan_cache_subscription_ttl_seconds: float = Field(default=60.0)  # Per-user subscription lookups (incl. none)
+    plan_cache_subscription_max_users: int = Field(default=50000)
+    plan_cache_version_check_seconds: float = Field(default=60.0)  # Catch up on missed pub/sub invalidations
+
+    # Authenticated User Cache
+    user_cache_enabled: bool = Field(default=True)  # Serve get_current_user from cached snapshots
+    user_cache_ttl_seconds: float = Field(default=30.0)  # In-process snapshots
+    user_cache_max_users: int = Field(default=50000)
+    user_cache_redis_ttl_seconds: int = Field(default=300)  # Shared snapshots in Redis
 
     # CORS
     cors_origins: str = Field(default="http://localhost:3000,http://localhost:8000")
@@ -205,6 +293,7 @@ class Settings(BaseSettings):
     # External API
     external_api_enabled: bool = Field(default=True)
     external_api_default_rate_limit: int = Field(default=100)
+    external_api_default_rate_limit_per_day: int = Field(default=10000)
 
     # Ahkam Tool
     ahkam_cache_ttl_hours: int = Field(default=24)
@@ -391,6 +480,12 @@ class Settings(BaseSettings):
                     "JWT_SECRET_KEY must be changed in production environment"
                 )
 
+            # Check API key pepper
+            if self.api_key_pepper == "change-in-production":
+                raise ValueError(
+                    "API_KEY_PEPPER must be changed in production environment"
+                )
+
             # Warn about debug mode in production
             if self.debug:
                 import warnings
@@ -495,6 +590,28 @@ class Settings(BaseSettings):
             f"@{self.database_host}:{self.database_port}/{db_name}"
         )
 
+    def get_replica_database_urls(self) -> list[str]:
+        """
+        Build read replica URLs from the replica host list.
+
+        Replicas use the primary's credentials and database name.
+
+        Returns:
+            list[str]: One URL per replica (empty if replicas are disabled)
+        """
+        if not self.database_read_replica_enabled or not self.database_read_replica_host:
+            return []
+
+        urls = []
+        for address in self.database_read_replica_host.split(","):
+            host, _, port = address.strip().partition(":")
+            port = port or self.database_read_replica_port or self.database_port
+            urls.append(
+                f"{self.database_driver}://{self.database_user}:{self.database_password}"
+                f"@{host}:{port}/{self.database_name}"
+            )
+        return urls
+
     @property
     def database_url(self) -> str:
         """
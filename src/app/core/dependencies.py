@@ -6,12 +6,12 @@ from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_user_id_from_token
+from app.core.security import get_token_identity
 from app.db.base import get_db
 from app.models.user import User
+from app.services.user_cache_service import user_cache_service
 
 # HTTP Bearer token security
 security = HTTPBearer()
@@ -24,6 +24,10 @@ async def get_current_user(
     """
     Get the current authenticated user from JWT token.
 
+    The user comes from user_cache_service, so hot paths don't query the
+    database. The returned User is a transient snapshot: load the row
+    before changing it.
+
     Args:
         credentials: HTTP Bearer credentials
         db: Database session
@@ -32,12 +36,12 @@ async def get_current_user(
         User: Current authenticated user
 
     Raises:
-        HTTPException: If token is invalid or user not found
+        HTTPException: If token is invalid or revoked, or user not found
     """
     token = credentials.credentials
 
     try:
-        user_id = get_user_id_from_token(token)
+        user_id, token_version = get_token_identity(token)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -45,9 +49,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Fetch user from database
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await user_cache_service.get_user(user_id, token_version, db)
 
     if user is None:
         raise HTTPException(
@@ -56,13 +58,20 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if token_version < user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="AUTH_TOKEN_REVOKED",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="AUTH_USER_INACTIVE",
         )
 
-    return user
+    return user.to_user()
 
 
 async def get_current_active_user(
@@ -110,13 +119,12 @@ async def get_optional_current_user(
 
     try:
         token = credentials.credentials
-        user_id = get_user_id_from_token(token)
+        user_id, token_version = get_token_identity(token)
 
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        user = await user_cache_service.get_user(user_id, token_version, db)
 
-        if user and user.is_active:
-            return user
+        if user and user.is_active and token_version >= user.token_version:
+            return user.to_user()
 
         return None
     except (JWTError, HTTPException):
@@ -101,12 +101,11 @@ class HealthChecker:
             dict: Qdrant health status
         """
         try:
-            import httpx
+            from app.core.http_client import get_http_client
 
             start = time.time()
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{settings.qdrant_url}/healthz")
-                response.raise_for_status()
+            response = await get_http_client().get(f"{settings.qdrant_url}/healthz", timeout=5.0)
+            response.raise_for_status()
             latency_ms = round((time.time() - start) * 1000, 2)
 
             return {
@@ -0,0 +1,275 @@
+"""
+Hedged requests for latency-sensitive external calls.
+
+A slow-but-alive upstream never fails, so failover never kicks in and it
+dominates tail latency. Hedging sends a backup request to the next
+candidate once the current one is slower than a latency percentile of its
+recent history. Whichever answers first wins and the loser is cancelled.
+
+An attempt can complete before the whole response does (e.g. a stream
+that has produced its first chunk); latency is then measured up to that
+point, and losers that already completed are handed to a discard callback
+so their resources are released.
+
+Hedges are paid for from a budget that grows with ordinary traffic (e.g.
+at most one hedge per 20 requests), so extra upstream load and cost stay
+predictable even when an upstream degrades.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+
+
+class LatencyTracker:
+    """Rolling latency samples per key with percentile lookup."""
+
+    def __init__(self, window_size: int = 200, min_samples: int = 20):
+        """
+        Initialize latency tracker.
+
+        Args:
+            window_size: Samples kept per key
+            min_samples: Samples required before a percentile is reported
+        """
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, key: str, seconds: float) -> None:
+        """Record a latency sample for a key."""
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window_size)
+        samples.append(seconds)
+
+    def percentile(self, key: str, percentile: float) -> Optional[float]:
+        """
+        Get a latency percentile for a key.
+
+        Args:
+            key: Tracked key (e.g. model name)
+            percentile: Percentile between 0 and 1
+
+        Returns:
+            Latency in seconds, or None if there are too few samples
+        """
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(percentile * len(ordered)) - 1))
+        return ordered[index]
+
+
+class HedgeBudget:
+    """
+    Token bucket limiting hedges to a fraction of requests.
+
+    Every request deposits `ratio` tokens (up to `max_tokens`); every hedge
+    withdraws one.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float = 10.0):
+        """
+        Initialize hedge budget.
+
+        Args:
+            ratio: Hedges allowed per request (0.05 = one in twenty)
+            max_tokens: Maximum burst of hedges
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self) -> None:
+        """Earn budget for one request."""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        """Spend budget for one hedge; False if exhausted."""
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+@dataclass
+class HedgeOutcome(Generic[T]):
+    """Result of a hedged execution."""
+
+    key: str
+    result: T
+    attempted: list[str] = field(default_factory=list)
+
+    @property
+    def hedged(self) -> bool:
+        """Whether more than one attempt was launched."""
+        return len(self.attempted) > 1
+
+
+class HedgingPolicy:
+    """
+    Runs an ordered list of attempts with percentile-based hedging.
+
+    Features:
+    - Per-key hedge deadline from the rolling latency percentile
+    - Fixed default deadline until enough samples exist
+    - First successful attempt wins, the others are cancelled
+    - Failover to the next attempt on errors (no budget needed)
+    - Hedges bounded by a traffic-proportional budget
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 0.95,
+        min_delay_seconds: float = 1.0,
+        default_delay_seconds: float = 10.0,
+        budget_ratio: float = 0.05,
+        window_size: int = 200,
+        min_samples: int = 20,
+    ):
+        """
+        Initialize hedging policy.
+
+        Args:
+            name: Policy name (for logging)
+            percentile: Latency percentile after which a hedge is sent
+            min_delay_seconds: Lower bound of the hedge deadline
+            default_delay_seconds: Hedge deadline before enough samples exist
+            budget_ratio: Hedges allowed per request
+            window_size: Latency samples kept per key
+            min_samples: Samples required before using the percentile
+        """
+        self.name = name
+        self.percentile = percentile
+        self.min_delay_seconds = min_delay_seconds
+        self.default_delay_seconds = default_delay_seconds
+        self.latency = LatencyTracker(window_size=window_size, min_samples=min_samples)
+        self.budget = HedgeBudget(ratio=budget_ratio)
+
+    def hedge_delay(self, key: str) -> float:
+        """Get the hedge deadline in seconds for a key."""
+        observed = self.latency.percentile(key, self.percentile)
+        if observed is None:
+            return self.default_delay_seconds
+        return max(self.min_delay_seconds, observed)
+
+    def record_latency(self, key: str, seconds: float) -> None:
+        """Record the latency of a completed call (hedged or not)."""
+        self.latency.record(key, seconds)
+
+    async def execute(
+        self,
+        attempts: list[tuple[str, Callable[[], Awaitable[T]]]],
+        discard: Optional[Callable[[T], Awaitable[None]]] = None,
+    ) -> HedgeOutcome[T]:
+        """
+        Execute attempts in order, hedging slow ones.
+
+        Args:
+            attempts: (key, factory) pairs in preference order
+            discard: Releases the result of an attempt that completed but lost
+
+        Returns:
+            HedgeOutcome with the winning key and result
+
+        Raises:
+            ValueError: If no attempts are given
+            Exception: The last error if every attempt failed
+        """
+        if not attempts:
+            raise ValueError("At least one attempt is required")
+
+        self.budget.deposit()
+
+        pending: dict[asyncio.Task, tuple[str, float]] = {}
+        attempted: list[str] = []
+        errors: list[Exception] = []
+        hedging_allowed = True
+
+        def launch() -> str:
+            key, factory = attempts[len(attempted)]
+            task = asyncio.create_task(factory())
+            pending[task] = (key, time.perf_counter())
+            attempted.append(key)
+            return key
+
+        current = launch()
+
+        try:
+            while pending:
+                can_hedge = hedging_allowed and len(attempted) < len(attempts)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay(current) if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if not done:
+                    # Deadline passed without an answer
+                    if self.budget.try_withdraw():
+                        previous = current
+                        current = launch()
+                        logger.info(
+                            "hedge_launched",
+                            policy=self.name,
+                            slow_key=previous,
+                            hedge_key=current,
+                            delay_seconds=round(self.hedge_delay(previous), 3),
+                        )
+                    else:
+                        hedging_allowed = False
+                        logger.warning(
+                            "hedge_budget_exhausted",
+                            policy=self.name,
+                            slow_key=current,
+                        )
+                    continue
+
+                for task in done:
+                    key, started = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        self.record_latency(key, time.perf_counter() - started)
+                        if len(attempted) > 1:
+                            logger.info(
+                                "hedge_completed",
+                                policy=self.name,
+                                winner=key,
+                                attempted=attempted,
+                            )
+                        return HedgeOutcome(key=key, result=task.result(), attempted=attempted)
+
+                    errors.append(error)
+                    logger.warning(
+                        "hedge_attempt_failed",
+                        policy=self.name,
+                        key=key,
+                        error=str(error),
+                    )
+
+                # Fail over immediately when nothing is left in flight
+                if not pending and len(attempted) < len(attempts):
+                    current = launch()
+
+        finally:
+            for task in pending:
+                task.cancel()
+            if discard is not None:
+                for task in pending:
+                    if task.done() and not task.cancelled() and task.exception() is None:
+                        await discard(task.result())
+
+        raise errors[-1]
@@ -0,0 +1,185 @@
+"""
+Shared HTTP client management.
+
+Provides:
+- One connection-pooled httpx.AsyncClient per outbound API (openrouter, serper, ...)
+- Keep-alive and HTTP/2 (when the h2 package is installed)
+- Per-client connection limits and timeouts
+- Pool saturation metrics and graceful shutdown for the application lifespan
+
+httpx pools connections per host inside a client, so reusing a client skips
+the TCP and TLS handshakes a fresh client pays on every call.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class HTTPClientProfile:
+    """Pool and timeout settings for a shared client."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    follow_redirects: bool = False
+
+
+# Client profiles keyed by name (unknown names use "default")
+HTTP_CLIENT_PROFILES: dict[str, HTTPClientProfile] = {
+    "default": HTTPClientProfile(),
+    # Chat, image generation and search models; long generations
+    "openrouter": HTTPClientProfile(
+        max_connections=200,
+        max_keepalive_connections=50,
+        read_timeout=120.0,
+    ),
+    "serper": HTTPClientProfile(max_connections=50, read_timeout=30.0),
+    # Official Marja websites (many hosts, few requests each)
+    "scraping": HTTPClientProfile(
+        max_connections=20,
+        max_keepalive_connections=10,
+        read_timeout=30.0,
+        follow_redirects=True,
+    ),
+}
+
+# Clients keyed by name (initialized lazily on first use)
+_http_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _http2_available() -> bool:
+    """Check whether HTTP/2 support (the h2 package) is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_http_client(name: str = "default") -> httpx.AsyncClient:
+    """
+    Get shared HTTP client by name.
+
+    Clients are created once per process and reuse their connection pools.
+    Callers must not close the returned client (see close_http_clients).
+
+    Args:
+        name: Client name (see HTTP_CLIENT_PROFILES)
+
+    Returns:
+        Async httpx client
+    """
+    client = _http_clients.get(name)
+    if client is None or client.is_closed:
+        profile = HTTP_CLIENT_PROFILES.get(name, HTTP_CLIENT_PROFILES["default"])
+        http2 = settings.http_client_http2_enabled and _http2_available()
+
+        client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=profile.max_connections,
+                max_keepalive_connections=profile.max_keepalive_connections,
+                keepalive_expiry=settings.http_client_keepalive_expiry_seconds,
+            ),
+            timeout=httpx.Timeout(
+                profile.read_timeout,
+                connect=profile.connect_timeout,
+                pool=settings.http_client_pool_timeout_seconds,
+            ),
+            follow_redirects=profile.follow_redirects,
+        )
+        _http_clients[name] = client
+
+        logger.info(
+            "http_client_initialized",
+            name=name,
+            http2=http2,
+            max_connections=profile.max_connections,
+        )
+
+    return client
+
+
+def get_pool_stats(name: str) -> Optional[dict[str, Optional[int]]]:
+    """
+    Get connection pool usage of a shared client.
+
+    httpx doesn't expose pool state, so the counts are read from the
+    underlying httpcore pool. Those are private attributes: if a httpx or
+    httpcore upgrade changes them, the affected counts are reported as
+    unknown (None) instead of failing.
+
+    Args:
+        name: Client name
+
+    Returns:
+        Dict with active, idle, waiting (None if unknown) and max
+        connections, or None if the client doesn't exist
+    """
+    client = _http_clients.get(name)
+    if client is None:
+        return None
+
+    profile = HTTP_CLIENT_PROFILES.get(name, HTTP_CLIENT_PROFILES["default"])
+    stats: dict[str, Optional[int]] = {
+        "active": None,
+        "idle": None,
+        "waiting": None,
+        "max_connections": profile.max_connections,
+    }
+
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    if pool is None:
+        return stats
+
+    try:
+        connections = list(pool.connections)
+        idle = sum(1 for connection in connections if connection.is_idle())
+        stats["active"] = len(connections) - idle
+        stats["idle"] = idle
+    except (AttributeError, TypeError) as e:
+        logger.debug("http_pool_connections_unknown", name=name, error=str(e))
+
+    try:
+        stats["waiting"] = sum(1 for request in list(pool._requests) if request.is_queued())
+    except (AttributeError, TypeError) as e:
+        logger.debug("http_pool_waiting_unknown", name=name, error=str(e))
+
+    return stats
+
+
+def collect_http_pool_metrics() -> None:
+    """Update Prometheus gauges with the pool usage of every shared client."""
+    from app.core.metrics import track_http_pool
+
+    for name in list(_http_clients):
+        stats = get_pool_stats(name)
+        if stats is not None:
+            track_http_pool(
+                client=name,
+                active=stats["active"],
+                idle=stats["idle"],
+                waiting=stats["waiting"],
+                max_connections=stats["max_connections"],
+            )
+
+
+async def close_http_clients() -> None:
+    """Close all shared HTTP clients."""
+    for name, client in list(_http_clients.items()):
+        try:
+            await client.aclose()
+            logger.info("http_client_closed", name=name)
+        except Exception as e:
+            logger.error("http_client_close_error", name=name, error=str(e))
+
+    _http_clients.clear()
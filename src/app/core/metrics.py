@@ -119,6 +119,18 @@ db_query_duration_seconds = Histogram(
     buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
 )
 
+db_replica_lag_seconds = Gauge(
+    'db_replica_lag_seconds',
+    'Replication lag of a read replica at the last health check',
+    ['replica', 'environment']
+)
+
+db_replica_healthy = Gauge(
+    'db_replica_healthy',
+    'Whether a read replica receives reads (1) or was dropped (0)',
+    ['replica', 'environment']
+)
+
 # ============================================================================
 # LLM METRICS
 # ============================================================================
@@ -154,6 +166,86 @@ llm_cache_hits = Counter(
     ['provider', 'model', 'environment']
 )
 
+llm_hedged_requests = Counter(
+    'llm_hedged_requests_total',
+    'Total LLM requests that launched a hedge',
+    ['provider', 'winner', 'environment']  # winner: primary, hedge
+)
+
+llm_deduplicated_requests = Counter(
+    'llm_deduplicated_requests_total',
+    'LLM requests served by joining an identical in-flight request',
+    ['provider', 'mode', 'environment']  # mode: completion, stream
+)
+
+llm_concurrency_limit = Gauge(
+    'llm_concurrency_limit',
+    'Current adaptive concurrency limit per LLM model',
+    ['limiter', 'environment']
+)
+
+llm_concurrency_in_flight = Gauge(
+    'llm_concurrency_in_flight',
+    'LLM calls currently holding a concurrency slot',
+    ['limiter', 'environment']
+)
+
+llm_concurrency_queue_depth = Gauge(
+    'llm_concurrency_queue_depth',
+    'LLM calls waiting for a concurrency slot',
+    ['limiter', 'environment']
+)
+
+llm_load_shed_total = Counter(
+    'llm_load_shed_total',
+    'LLM calls rejected by the adaptive concurrency limiter',
+    ['limiter', 'reason', 'environment']  # reason: queue_full, deadline, queue_timeout
+)
+
+# ============================================================================
+# OUTBOUND HTTP CLIENT METRICS
+# ============================================================================
+
+http_client_pool_connections = Gauge(
+    'http_client_pool_connections',
+    'Connections in a shared outbound HTTP client pool',
+    ['client', 'state', 'environment']  # state: active, idle
+)
+
+http_client_pool_waiting_requests = Gauge(
+    'http_client_pool_waiting_requests',
+    'Requests waiting for a connection from a shared HTTP client pool',
+    ['client', 'environment']
+)
+
+http_client_pool_saturation = Gauge(
+    'http_client_pool_saturation_ratio',
+    'Active connections divided by the pool connection limit',
+    ['client', 'environment']
+)
+
+# ============================================================================
+# BLOCKING WORK EXECUTOR METRICS
+# ============================================================================
+
+executor_tasks_in_flight = Gauge(
+    'executor_tasks_in_flight',
+    'Blocking calls running on a bounded executor thread',
+    ['executor', 'environment']
+)
+
+executor_queue_depth = Gauge(
+    'executor_queue_depth',
+    'Blocking calls waiting for a bounded executor thread',
+    ['executor', 'environment']
+)
+
+executor_rejected_total = Counter(
+    'executor_rejected_total',
+    'Blocking calls rejected because the executor queue was full',
+    ['executor', 'environment']
+)
+
 # ============================================================================
 # REDIS METRICS
 # ============================================================================
@@ -233,7 +325,37 @@ audio_transcribed_minutes = Counter(
 rate_limit_exceeded = Counter(
     'rate_limit_exceeded_total',
     'Total rate limit exceeded events',
-    ['endpoint', 'plan', 'environment']
+    ['endpoint', 'plan', 'environment']  # endpoint: route cost class
+)
+
+rate_limit_checks_total = Counter(
+    'rate_limit_checks_total',
+    'Rate limit decisions by where they were made',
+    ['source', 'environment']  # source: local, lease, exact
+)
+
+usage_quota_checks_total = Counter(
+    'usage_quota_checks_total',
+    'Monthly usage quota check-and-increment outcomes',
+    ['result', 'environment']  # result: allowed, denied, recorded, cold, error
+)
+
+usage_quota_flushed_rows_total = Counter(
+    'usage_quota_flushed_rows_total',
+    'Monthly usage quota rows persisted from Redis counters',
+    ['environment']
+)
+
+user_cache_lookups_total = Counter(
+    'user_cache_lookups_total',
+    'Authenticated user lookups by where they were served from',
+    ['source', 'environment']  # source: local, redis, database
+)
+
+leaderboard_reads_total = Counter(
+    'leaderboard_reads_total',
+    'Leaderboard reads by where they were served from',
+    ['source', 'environment']  # source: redis, database
 )
 
 # ============================================================================
@@ -330,3 +452,129 @@ def track_cache_hit(provider: str, model: str):
         model=model,
         environment=settings.environment
     ).inc()
+
+
+def track_llm_hedge(provider: str, hedge_won: bool):
+    """Track a hedged LLM request."""
+    llm_hedged_requests.labels(
+        provider=provider,
+        winner="hedge" if hedge_won else "primary",
+        environment=settings.environment
+    ).inc()
+
+
+def track_llm_dedup(provider: str, mode: str):
+    """Track an LLM request that joined an identical in-flight request."""
+    llm_deduplicated_requests.labels(
+        provider=provider,
+        mode=mode,
+        environment=settings.environment
+    ).inc()
+
+
+def track_http_pool(
+    client: str,
+    active: int | None,
+    idle: int | None,
+    waiting: int | None,
+    max_connections: int,
+):
+    """Track connection pool usage of a shared outbound HTTP client (unknown counts are skipped)."""
+    if active is not None:
+        http_client_pool_connections.labels(
+            client=client,
+            state="active",
+            environment=settings.environment
+        ).set(active)
+        http_client_pool_saturation.labels(
+            client=client,
+            environment=settings.environment
+        ).set(active / max_connections if max_connections else 0.0)
+    if idle is not None:
+        http_client_pool_connections.labels(
+            client=client,
+            state="idle",
+            environment=settings.environment
+        ).set(idle)
+    if waiting is not None:
+        http_client_pool_waiting_requests.labels(
+            client=client,
+            environment=settings.environment
+        ).set(waiting)
+
+
+def track_concurrency_limiter(name: str, limit: int, in_flight: int, queued: int):
+    """Track adaptive concurrency limiter state."""
+    llm_concurrency_limit.labels(limiter=name, environment=settings.environment).set(limit)
+    llm_concurrency_in_flight.labels(limiter=name, environment=settings.environment).set(in_flight)
+    llm_concurrency_queue_depth.labels(limiter=name, environment=settings.environment).set(queued)
+
+
+def track_load_shed(name: str, reason: str):
+    """Track a call rejected by the adaptive concurrency limiter."""
+    llm_load_shed_total.labels(
+        limiter=name,
+        reason=reason,
+        environment=settings.environment
+    ).inc()
+
+
+def track_rate_limit_check(source: str):
+    """Track a rate limit decision made locally or against Redis."""
+    rate_limit_checks_total.labels(
+        source=source,
+        environment=settings.environment
+    ).inc()
+
+
+def track_rate_limit_exceeded(cost_class: str, plan: str):
+    """Track a request rejected by the rate limiter."""
+    rate_limit_exceeded.labels(
+        endpoint=cost_class,
+        plan=plan,
+        environment=settings.environment
+    ).inc()
+
+
+def track_usage_quota_check(result: str):
+    """Track a monthly usage quota check or increment."""
+    usage_quota_checks_total.labels(
+        result=result,
+        environment=settings.environment
+    ).inc()
+
+
+def track_usage_quota_flush(rows: int):
+    """Track usage quota rows written by the background flusher."""
+    usage_quota_flushed_rows_total.labels(environment=settings.environment).inc(rows)
+
+
+def track_user_cache_lookup(source: str):
+    """Track an authenticated user lookup served from memory, Redis or the database."""
+    user_cache_lookups_total.labels(
+        source=source,
+        environment=settings.environment
+    ).inc()
+
+
+def track_executor(name: str, in_flight: int, queued: int):
+    """Track bounded executor state."""
+    executor_tasks_in_flight.labels(executor=name, environment=settings.environment).set(in_flight)
+    executor_queue_depth.labels(executor=name, environment=settings.environment).set(queued)
+
+
+def track_executor_rejected(name: str):
+    """Track a call rejected by a bounded executor."""
+    executor_rejected_total.labels(executor=name, environment=settings.environment).inc()
+
+
+def track_db_replica(replica: str, lag_seconds: float | None, healthy: bool):
+    """Track a read replica health check (lag None if unreachable)."""
+    if lag_seconds is not None:
+        db_replica_lag_seconds.labels(replica=replica, environment=settings.environment).set(lag_seconds)
+    db_replica_healthy.labels(replica=replica, environment=settings.environment).set(1 if healthy else 0)
+
+
+def track_leaderboard_read(source: str):
+    """Track a leaderboard read served from Redis or the database."""
+    leaderboard_reads_total.labels(source=source, environment=settings.environment).inc()
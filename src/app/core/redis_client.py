@@ -0,0 +1,83 @@
+"""
+Shared Redis client management.
+
+Provides:
+- One connection-pooled async Redis client per purpose (cache, queue, ...)
+- Environment-specific DB selection via settings.get_redis_db()
+- Graceful shutdown for the application lifespan
+"""
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Clients keyed by purpose (initialized lazily on first use)
+_redis_clients: dict[str, redis.Redis] = {}
+
+
+def build_redis_url(purpose: str) -> str:
+    """
+    Build Redis URL pointing at the environment-specific DB for a purpose.
+
+    Args:
+        purpose: Redis purpose (default, cache, queue, rate_limit)
+
+    Returns:
+        Redis URL with the DB number replaced
+    """
+    redis_db = settings.get_redis_db(purpose)
+    base_redis_url = settings.redis_url
+
+    # Remove existing DB number if present
+    if "/" in base_redis_url.split("//", 1)[-1]:
+        base_url = base_redis_url.rsplit("/", 1)[0]
+    else:
+        base_url = base_redis_url
+
+    return f"{base_url}/{redis_db}"
+
+
+def get_redis_client(purpose: str = "cache") -> redis.Redis:
+    """
+    Get shared Redis client for a purpose.
+
+    Clients are created once per process and reuse their connection pool.
+
+    Args:
+        purpose: Redis purpose (default, cache, queue, rate_limit)
+
+    Returns:
+        Async Redis client with decoded responses
+    """
+    client = _redis_clients.get(purpose)
+    if client is None:
+        client = redis.from_url(
+            build_redis_url(purpose),
+            encoding="utf-8",
+            decode_responses=True,
+            socket_connect_timeout=5,
+        )
+        _redis_clients[purpose] = client
+
+        logger.info(
+            "redis_client_initialized",
+            purpose=purpose,
+            redis_db=settings.get_redis_db(purpose),
+        )
+
+    return client
+
+
+async def close_redis_clients() -> None:
+    """Close all shared Redis clients."""
+    for purpose, client in list(_redis_clients.items()):
+        try:
+            await client.close()
+            logger.info("redis_client_closed", purpose=purpose)
+        except Exception as e:
+            logger.error("redis_client_close_error", purpose=purpose, error=str(e))
+
+    _redis_clients.clear()
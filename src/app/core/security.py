@@ -1,5 +1,7 @@
 """Security utilities for JWT tokens and password hashing."""
 
+import hashlib
+import hmac
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 from uuid import UUID
@@ -7,17 +9,34 @@ from uuid import UUID
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.bounded_executor import BoundedExecutor
 from app.core.config import settings
 
 # Password hashing context
-# Configure bcrypt with explicit truncate to avoid compatibility issues
+# Configure bcrypt with explicit truncate to avoid compatibility issues.
+# Hashes made with other rounds need an update (rehashed on login).
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__default_rounds=12,
+    bcrypt__default_rounds=settings.password_bcrypt_rounds,
+    bcrypt__min_rounds=settings.password_bcrypt_rounds,
+    bcrypt__max_rounds=settings.password_bcrypt_rounds,
     bcrypt__truncate_error=False
 )
 
+# Dedicated threads for bcrypt, so hashing doesn't block the event loop
+password_executor = BoundedExecutor(
+    "password_hash",
+    workers=settings.password_hash_workers,
+    queue_size=settings.password_hash_queue_size,
+)
+
+# Access token claim holding the user's token version (see user_cache_service)
+TOKEN_VERSION_CLAIM = "ver"
+
+# Prefix of HMAC API key digests (other API key hashes are legacy bcrypt)
+API_KEY_HASH_PREFIX = "hmac-sha256$"
+
 
 def hash_password(password: str) -> str:
     """
@@ -46,6 +65,42 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the password executor.
+
+    Args:
+        password: Plain text password
+
+    Returns:
+        str: Hashed password
+
+    Raises:
+        LoadSheddingError: If too many hashes are queued
+    """
+    return await password_executor.run(pwd_context.hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password on the password executor, rehashing outdated hashes.
+
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password to verify against
+
+    Returns:
+        tuple: (True if password matches, new hash to store or None if the
+            hash is current)
+
+    Raises:
+        LoadSheddingError: If too many hashes are queued
+    """
+    return await password_executor.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(
     user_id: UUID,
     additional_claims: Optional[dict[str, Any]] = None,
@@ -145,6 +200,25 @@ def get_user_id_from_token(token: str) -> UUID:
     Returns:
         UUID: User ID
 
+    Raises:
+        JWTError: If token is invalid or user ID is missing
+    """
+    user_id, _ = get_token_identity(token)
+    return user_id
+
+
+def get_token_identity(token: str) -> tuple[UUID, int]:
+    """
+    Extract the user ID and token version from a JWT token.
+
+    Tokens issued without a version claim are version 0.
+
+    Args:
+        token: JWT token
+
+    Returns:
+        tuple: (User ID, token version)
+
     Raises:
         JWTError: If token is invalid or user ID is missing
     """
@@ -155,28 +229,43 @@ def get_user_id_from_token(token: str) -> UUID:
         raise JWTError("Token does not contain user ID")
 
     try:
-        return UUID(user_id_str)
+        user_id = UUID(user_id_str)
     except ValueError:
         raise JWTError("Invalid user ID in token")
 
+    try:
+        token_version = int(payload.get(TOKEN_VERSION_CLAIM, 0))
+    except (TypeError, ValueError):
+        raise JWTError("Invalid token version in token")
+
+    return user_id, token_version
+
 
 def hash_api_key(api_key: str) -> str:
     """
-    Hash an API key (for external API clients).
+    Hash an API key with HMAC-SHA256 and the server-side pepper.
+
+    API keys are long random strings, so a keyed digest is as safe as a
+    slow hash and takes microseconds to check. The digest is deterministic,
+    so a key can be looked up by it.
 
     Args:
         api_key: Plain API key
 
     Returns:
-        str: Hashed API key
+        str: API key digest ("hmac-sha256$<hex>")
     """
-    return pwd_context.hash(api_key)
+    digest = hmac.new(settings.api_key_pepper.encode(), api_key.encode(), hashlib.sha256).hexdigest()
+    return f"{API_KEY_HASH_PREFIX}{digest}"
 
 
 def verify_api_key(plain_api_key: str, hashed_api_key: str) -> bool:
     """
     Verify an API key against a hash.
 
+    Digests are compared in constant time. Legacy bcrypt hashes are still
+    verified (slowly); see is_legacy_api_key_hash.
+
     Args:
         plain_api_key: Plain API key
         hashed_api_key: Hashed API key
@@ -184,7 +273,22 @@ def verify_api_key(plain_api_key: str, hashed_api_key: str) -> bool:
     Returns:
         bool: True if API key matches
     """
-    return pwd_context.verify(plain_api_key, hashed_api_key)
+    if is_legacy_api_key_hash(hashed_api_key):
+        return pwd_context.verify(plain_api_key, hashed_api_key)
+    return hmac.compare_digest(hash_api_key(plain_api_key), hashed_api_key)
+
+
+def is_legacy_api_key_hash(hashed_api_key: str) -> bool:
+    """
+    Check whether an API key hash predates HMAC digests (bcrypt).
+
+    Args:
+        hashed_api_key: Hashed API key
+
+    Returns:
+        bool: True if the hash should be migrated with hash_api_key
+    """
+    return not hashed_api_key.startswith(API_KEY_HASH_PREFIX)
 
 
 def generate_api_key_prefix(api_key: str, length: int = 8) -> str:
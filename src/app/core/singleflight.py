@@ -0,0 +1,211 @@
+"""
+In-flight request coalescing ("singleflight").
+
+When many callers ask for the same thing at the same time (a popular
+question before the response cache is populated), only the first caller
+runs the upstream call. Everyone else with the same key waits for that
+call and shares its result:
+
+- SingleFlight: coalesces awaitables; every caller gets the same result
+  (or exception)
+- StreamFanout: coalesces async streams; every subscriber receives the
+  full stream, late joiners replay what was already produced
+
+The upstream call is cancelled only when every caller has gone away.
+"""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Generic, Optional, TypeVar
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+
+
+class _Flight(Generic[T]):
+    """An in-flight call and the number of callers waiting for it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Coalesces concurrent calls with the same key into one."""
+
+    def __init__(self, name: str):
+        """
+        Initialize singleflight group.
+
+        Args:
+            name: Group name (for logging)
+        """
+        self.name = name
+        self._flights: dict[str, _Flight[T]] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._flights)
+
+    def _forget(self, key: str, flight: _Flight[T]) -> None:
+        """Remove a flight unless a newer one already replaced it."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Run factory once for all concurrent callers with the same key.
+
+        Args:
+            key: Coalescing key
+            factory: Creates the upstream call (only invoked by the first caller)
+
+        Returns:
+            (result, shared) where shared is True if another caller's call was joined
+
+        Raises:
+            Exception: The upstream call's exception (for every waiting caller)
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+
+        if flight is None:
+            flight = _Flight(asyncio.create_task(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            logger.debug("singleflight_joined", group=self.name, waiters=flight.waiters + 1)
+
+        flight.waiters += 1
+        try:
+            # Shield so one caller's cancellation doesn't cancel the shared call
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is waiting anymore
+                self._forget(key, flight)
+                flight.task.cancel()
+
+
+class _Broadcast(Generic[T]):
+    """A stream being produced once and replayed to every subscriber."""
+
+    def __init__(self):
+        self.items: list[T] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def notify(self) -> None:
+        """Wake up subscribers waiting for new items."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self) -> None:
+        """Wait until the stream produces an item or ends."""
+        await self._changed.wait()
+
+
+class StreamFanout(Generic[T]):
+    """Shares one upstream async stream between concurrent subscribers with the same key."""
+
+    def __init__(self, name: str):
+        """
+        Initialize stream fan-out group.
+
+        Args:
+            name: Group name (for logging)
+        """
+        self.name = name
+        self._broadcasts: dict[str, _Broadcast[T]] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct streams currently running."""
+        return len(self._broadcasts)
+
+    def _forget(self, key: str, broadcast: _Broadcast[T]) -> None:
+        """Remove a broadcast unless a newer one already replaced it."""
+        if self._broadcasts.get(key) is broadcast:
+            del self._broadcasts[key]
+
+    async def _produce(
+        self,
+        key: str,
+        broadcast: _Broadcast[T],
+        source: Callable[[], AsyncIterator[T]],
+    ) -> None:
+        """Consume the upstream stream into the broadcast buffer."""
+        try:
+            async for item in source():
+                broadcast.items.append(item)
+                broadcast.notify()
+        except asyncio.CancelledError:
+            broadcast.error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            broadcast.done = True
+            self._forget(key, broadcast)
+            broadcast.notify()
+
+    def is_shared(self, key: str) -> bool:
+        """Whether a stream for the key is already running."""
+        return key in self._broadcasts
+
+    async def subscribe(
+        self,
+        key: str,
+        source: Callable[[], AsyncIterator[T]],
+    ) -> AsyncIterator[T]:
+        """
+        Subscribe to the stream for a key, starting it if needed.
+
+        Args:
+            key: Coalescing key
+            source: Creates the upstream stream (only invoked by the first subscriber)
+
+        Yields:
+            Every item of the stream, from the beginning
+
+        Raises:
+            Exception: The upstream stream's exception
+        """
+        broadcast = self._broadcasts.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._broadcasts[key] = broadcast
+            broadcast.task = asyncio.create_task(self._produce(key, broadcast, source))
+        else:
+            logger.debug("stream_fanout_joined", group=self.name, subscribers=broadcast.subscribers + 1)
+
+        broadcast.subscribers += 1
+        position = 0
+        try:
+            while True:
+                if position < len(broadcast.items):
+                    item = broadcast.items[position]
+                    position += 1
+                    yield item
+                    continue
+
+                if broadcast.done:
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+
+                await broadcast.wait()
+
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.done:
+                # Last subscriber left before the stream ended
+                self._forget(key, broadcast)
+                broadcast.task.cancel()
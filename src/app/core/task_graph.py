@@ -0,0 +1,241 @@
+"""
+Async task-graph executor for request pipelines.
+
+Runs named async steps as soon as their dependencies have completed, so
+independent I/O (tool actions, history loads, LLM calls) overlaps instead
+of running back to back. The latency of a pipeline becomes its slowest
+path rather than the sum of all steps.
+
+Features:
+- Dependency-ordered execution (results passed as keyword arguments)
+- Per-step timeouts
+- Optional steps whose failures are logged instead of raised
+- Completion callbacks fired as each step finishes
+- Cancellation of all pending steps
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class TaskGraphError(Exception):
+    """Raised when a task graph is misconfigured or a required step fails."""
+    pass
+
+
+@dataclass
+class TaskNode:
+    """A single step in a task graph."""
+
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    depends_on: tuple[str, ...] = ()
+    timeout_seconds: Optional[float] = None
+    required: bool = True
+    on_complete: Optional[Callable[[str, Any], None]] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+
+class TaskGraph:
+    """
+    Executes a DAG of async steps concurrently.
+
+    Usage:
+        graph = TaskGraph(name="chat-turn")
+        graph.add("history", load_history)
+        graph.add("image", generate_image, timeout_seconds=90, required=False)
+        graph.add("completion", call_llm, depends_on=("history",))
+        graph.start()
+        completion = await graph.result("completion")
+        await graph.wait_all()
+    """
+
+    def __init__(self, name: str = "task_graph"):
+        """
+        Initialize task graph.
+
+        Args:
+            name: Graph name (for logging)
+        """
+        self.name = name
+        self.results: dict[str, Any] = {}
+        self.errors: dict[str, BaseException] = {}
+        self._nodes: dict[str, TaskNode] = {}
+        self._started = False
+
+    def add(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        depends_on: tuple[str, ...] = (),
+        timeout_seconds: Optional[float] = None,
+        required: bool = True,
+        on_complete: Optional[Callable[[str, Any], None]] = None,
+    ) -> None:
+        """
+        Add a step to the graph.
+
+        Args:
+            name: Unique step name
+            func: Async callable receiving dependency results as keyword arguments
+            depends_on: Names of steps that must complete first
+            timeout_seconds: Optional timeout for this step
+            required: If False, failures and timeouts are logged and swallowed
+            on_complete: Optional callback (name, result) fired on success
+
+        Raises:
+            TaskGraphError: If the graph already started or the step is invalid
+        """
+        if self._started:
+            raise TaskGraphError(f"Task graph '{self.name}' already started")
+        if name in self._nodes:
+            raise TaskGraphError(f"Duplicate step '{name}' in task graph '{self.name}'")
+
+        for dependency in depends_on:
+            if dependency not in self._nodes:
+                raise TaskGraphError(
+                    f"Step '{name}' depends on unknown step '{dependency}'"
+                )
+
+        self._nodes[name] = TaskNode(
+            name=name,
+            func=func,
+            depends_on=tuple(depends_on),
+            timeout_seconds=timeout_seconds,
+            required=required,
+            on_complete=on_complete,
+        )
+
+    def start(self) -> None:
+        """Schedule all steps; each runs as soon as its dependencies finish."""
+        if self._started:
+            return
+        self._started = True
+
+        # Dependencies must be added first, so insertion order is topological
+        for node in self._nodes.values():
+            node.task = asyncio.create_task(self._run_node(node), name=f"{self.name}:{node.name}")
+
+    async def _run_node(self, node: TaskNode) -> Any:
+        """Run a single step after its dependencies."""
+        kwargs = {}
+        for dependency in node.depends_on:
+            kwargs[dependency] = await self._nodes[dependency].task
+
+        start = time.perf_counter()
+        try:
+            if node.timeout_seconds is not None:
+                result = await asyncio.wait_for(node.func(**kwargs), timeout=node.timeout_seconds)
+            else:
+                result = await node.func(**kwargs)
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            self.errors[node.name] = e
+            is_timeout = isinstance(e, asyncio.TimeoutError)
+            logger.warning(
+                "task_graph_step_timeout" if is_timeout else "task_graph_step_failed",
+                graph=self.name,
+                step=node.name,
+                required=node.required,
+                timeout=node.timeout_seconds,
+                duration_ms=round((time.perf_counter() - start) * 1000, 2),
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+            if node.required:
+                raise
+            return None
+
+        self.results[node.name] = result
+
+        logger.debug(
+            "task_graph_step_completed",
+            graph=self.name,
+            step=node.name,
+            duration_ms=round((time.perf_counter() - start) * 1000, 2),
+        )
+
+        if node.on_complete is not None:
+            try:
+                node.on_complete(node.name, result)
+            except Exception as e:
+                logger.error(
+                    "task_graph_callback_failed",
+                    graph=self.name,
+                    step=node.name,
+                    error=str(e),
+                )
+
+        return result
+
+    async def result(self, name: str) -> Any:
+        """
+        Wait for a step and return its result.
+
+        Args:
+            name: Step name
+
+        Returns:
+            Step result (None for failed optional steps)
+
+        Raises:
+            TaskGraphError: If the step is unknown or the graph not started
+            Exception: The step's error if a required step failed
+        """
+        node = self._nodes.get(name)
+        if node is None:
+            raise TaskGraphError(f"Unknown step '{name}' in task graph '{self.name}'")
+        if node.task is None:
+            raise TaskGraphError(f"Task graph '{self.name}' not started")
+
+        return await node.task
+
+    async def wait_all(self) -> dict[str, Any]:
+        """
+        Wait for every step to finish.
+
+        Returns:
+            Results of all successful steps
+
+        Raises:
+            Exception: The first error of a required step
+        """
+        self.start()
+        tasks = [node.task for node in self._nodes.values()]
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+        for node, outcome in zip(self._nodes.values(), outcomes):
+            if isinstance(outcome, BaseException) and node.required:
+                raise outcome
+
+        return self.results
+
+    def cancel(self, *names: str) -> None:
+        """
+        Cancel pending steps.
+
+        Args:
+            *names: Steps to cancel (all steps if none given)
+        """
+        nodes = [self._nodes[name] for name in names] if names else self._nodes.values()
+        for node in nodes:
+            if node.task is not None and not node.task.done():
+                node.task.cancel()
+
+    @property
+    def pending(self) -> list[str]:
+        """Names of steps that have not finished yet."""
+        return [
+            node.name
+            for node in self._nodes.values()
+            if node.task is None or not node.task.done()
+        ]
@@ -1,10 +1,16 @@
 """Database base classes and session management."""
 
 from typing import AsyncGenerator
+
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
+from app.db.routing import ReplicaPool, RoutingSession
+
+# Requests that only read; other methods pin their session to the primary
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
 
 # SQLAlchemy Base
@@ -23,7 +29,24 @@ engine = create_async_engine(
     pool_pre_ping=True,
 )
 
-# Create async session factory
+# Read replicas (health-checked in the background, see db/routing.py)
+replica_pool = ReplicaPool(
+    engines=[
+        create_async_engine(
+            url,
+            echo=settings.debug,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_pre_ping=True,
+        )
+        for url in settings.get_replica_database_urls()
+    ],
+    max_lag_seconds=settings.database_replica_max_lag_seconds,
+    check_interval_seconds=settings.database_replica_check_interval_seconds,
+)
+
+# Create async session factory (primary only; for background jobs that
+# read then write)
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -32,17 +55,33 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Session factory that reads from replicas until the session writes.
+# RoutingSessionLocal(read_only=True) never uses the primary.
+RoutingSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=replica_pool,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency to get database session.
 
+    GET requests read from a replica until they write; other requests
+    use the primary throughout, so read-modify-write handlers never
+    start from a stale row.
+
     Usage:
         @app.get("/users")
         async def get_users(db: AsyncSession = Depends(get_db)):
             ...
     """
-    async with AsyncSessionLocal() as session:
+    async with RoutingSessionLocal(pinned=request.method not in SAFE_METHODS) as session:
         try:
             yield session
             await session.commit()
@@ -51,3 +90,22 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+async def get_read_only_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get a read-only database session.
+
+    Reads go to a replica when one is healthy. Writes raise
+    ReadOnlySessionError.
+
+    Usage:
+        @app.get("/leaderboard")
+        async def get_leaderboard(db: AsyncSession = Depends(get_read_only_db)):
+            ...
+    """
+    async with RoutingSessionLocal(read_only=True) as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,235 @@
+"""
+Read-replica routing for database sessions.
+
+A RoutingSession sends reads to a streaming replica and writes to the
+primary:
+
+- Reads go to one healthy replica, kept for the whole session so a
+  request never sees data go backwards between two replicas
+- The first write (flush, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE, raw
+  SQL) pins the session to the primary; later reads follow it, so a
+  request reads its own writes
+- Statements with execution_options(use_primary=True) always go to the
+  primary (reads that must not be stale, e.g. before caching)
+- Read-only sessions never touch the primary and raise on writes
+
+ReplicaPool checks replication lag in the background. Replicas lagging
+more than database_replica_max_lag_seconds, or unreachable, are dropped
+until a later check passes. With no healthy replica, reads go to the
+primary.
+"""
+
+import asyncio
+import random
+from typing import Any, Optional
+
+from sqlalchemy import Engine, TextClause, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core.logging import get_logger
+from app.core.metrics import track_db_replica
+
+logger = get_logger(__name__)
+
+# Seconds since the last replayed transaction, 0 when caught up with
+# everything received (an idle primary writes nothing to replay)
+_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class ReadOnlySessionError(Exception):
+    """Raised when a read-only session tries to write."""
+
+
+class ReplicaPool:
+    """Read replicas with background lag checks."""
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+    ):
+        """
+        Initialize replica pool.
+
+        Replicas receive reads only after their first health check passes.
+
+        Args:
+            engines: One engine per replica
+            max_lag_seconds: Replicas lagging more than this are dropped
+            check_interval_seconds: Time between health checks
+        """
+        self.engines = engines
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+
+        self._healthy: list[AsyncEngine] = []
+        self._lag: dict[str, Optional[float]] = {}
+        self._check_task: Optional[asyncio.Task] = None
+
+    @property
+    def healthy(self) -> list[AsyncEngine]:
+        """Replicas currently receiving reads."""
+        return list(self._healthy)
+
+    def choose(self) -> Optional[Engine]:
+        """
+        Pick a healthy replica for a session.
+
+        Returns:
+            Sync engine of a replica, or None if none is healthy
+        """
+        if not self._healthy:
+            return None
+        return random.choice(self._healthy).sync_engine
+
+    async def check(self) -> None:
+        """Measure each replica's lag and update the healthy set."""
+        healthy = []
+        for engine in self.engines:
+            name = self._name(engine)
+            lag = await self._measure_lag(engine)
+            ok = lag is not None and lag <= self.max_lag_seconds
+
+            if ok != (engine in self._healthy):
+                log = logger.info if ok else logger.warning
+                log("db_replica_health_changed", replica=name, healthy=ok, lag_seconds=lag)
+
+            self._lag[name] = lag
+            track_db_replica(name, lag, ok)
+            if ok:
+                healthy.append(engine)
+
+        self._healthy = healthy
+
+    def start_background_refresh(self) -> None:
+        """Start periodic health checks (idempotent, no-op without replicas)."""
+        if not self.engines:
+            return
+        if self._check_task is None or self._check_task.done():
+            self._check_task = asyncio.create_task(self._run())
+
+    async def stop_background_refresh(self) -> None:
+        """Stop health checks and stop sending reads to replicas."""
+        if self._check_task is not None:
+            self._check_task.cancel()
+            try:
+                await self._check_task
+            except asyncio.CancelledError:
+                pass
+            self._check_task = None
+        self._healthy = []
+
+    async def dispose(self) -> None:
+        """Close all replica connections."""
+        for engine in self.engines:
+            await engine.dispose()
+
+    async def _run(self) -> None:
+        """Check replicas until cancelled."""
+        while True:
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("db_replica_check_failed", error=str(e))
+            await asyncio.sleep(self.check_interval_seconds)
+
+    async def _measure_lag(self, engine: AsyncEngine) -> Optional[float]:
+        """Get a replica's lag in seconds (None if unreachable or unknown)."""
+        try:
+            async with asyncio.timeout(self.check_interval_seconds):
+                async with engine.connect() as conn:
+                    lag = (await conn.execute(_LAG_QUERY)).scalar()
+        except Exception as e:
+            logger.warning("db_replica_unreachable", replica=self._name(engine), error=str(e))
+            return None
+        return float(lag) if lag is not None else None
+
+    @staticmethod
+    def _name(engine: AsyncEngine) -> str:
+        """Replica label for logs and metrics (host:port)."""
+        return f"{engine.url.host}:{engine.url.port}"
+
+    def get_state(self) -> dict:
+        """Get current replica state."""
+        return {
+            "replicas": len(self.engines),
+            "healthy": [self._name(engine) for engine in self._healthy],
+            "lag_seconds": dict(self._lag),
+        }
+
+
+class RoutingSession(Session):
+    """Session that reads from a replica until it writes."""
+
+    def __init__(
+        self,
+        *args: Any,
+        replicas: Optional[ReplicaPool] = None,
+        read_only: bool = False,
+        pinned: bool = False,
+        **kwargs: Any,
+    ):
+        """
+        Initialize routing session.
+
+        Args:
+            replicas: Replica pool (None reads from the primary)
+            read_only: Only read, from a replica if one is healthy; writes raise
+            pinned: Start pinned to the primary
+            *args: Session arguments
+            **kwargs: Session keyword arguments
+        """
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.read_only = read_only
+        self.pinned = pinned and not read_only
+        self._replica: Optional[Engine] = None
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Any:
+        """
+        Route a statement to the primary or the session's replica.
+
+        Raises:
+            ReadOnlySessionError: If a read-only session writes
+        """
+        primary = super().get_bind(mapper, clause=clause, **kw)
+
+        if self._flushing or self._is_write(clause):
+            if self.read_only:
+                raise ReadOnlySessionError("Write attempted in a read-only session")
+            self.pinned = True
+
+        if self.pinned or self.replicas is None or self._wants_primary(clause):
+            return primary
+
+        if self._replica is None:
+            self._replica = self.replicas.choose()
+        return self._replica or primary
+
+    def _is_write(self, clause: Any) -> bool:
+        """Whether a statement must run on the primary."""
+        if isinstance(clause, UpdateBase):
+            return True
+        if getattr(clause, "_for_update_arg", None) is not None:
+            return True
+        # Raw SQL may write; read-only sessions have vouched for it
+        return isinstance(clause, TextClause) and not self.read_only
+
+    @staticmethod
+    def _wants_primary(clause: Any) -> bool:
+        """Whether a read asked for the primary with use_primary=True."""
+        options = getattr(clause, "get_execution_options", None)
+        return bool(options and options().get("use_primary"))
@@ -10,6 +10,7 @@ from fastapi.responses import JSONResponse, Response
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from prometheus_fastapi_instrumentator import Instrumentator
 
+from app.core.adaptive_limiter import LoadSheddingError
 from app.core.config import settings
 from app.core.constants import (
     APP_DESCRIPTION,
@@ -18,10 +19,22 @@ from app.core.constants import (
     HTTPStatusDetail,
 )
 from app.core.health import cleanup_health_checker, get_health_status
+from app.core.http_client import close_http_clients, collect_http_pool_metrics
 from app.core.logging import get_logger, setup_logging
+from app.core.redis_client import close_redis_clients
+from app.core.security import password_executor
 from app.core.startup import startup_checks
 from app.core.stats import get_application_stats
 from app.core.temporal_client import init_temporal_client, close_temporal_client
+from app.db.base import engine, replica_pool
+from app.middleware.security import RateLimitMiddleware
+from app.services.leaderboard_service import leaderboard_service
+from app.services.model_catalog_service import model_catalog_service
+from app.services.plan_cache_service import plan_cache_service
+from app.services.rate_limit_policy_service import rate_limit_policy_service
+from app.services.rate_limiter_service import create_rate_limiter
+from app.services.usage_quota_service import usage_quota_service
+from app.services.user_cache_service import user_cache_service
 
 # Set up logging
 setup_logging()
@@ -60,15 +73,66 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             if settings.is_production:
                 raise
 
+    # Send reads to read replicas once their lag checks pass
+    replica_pool.start_background_refresh()
+
+    # Load the OpenRouter model catalog and keep it fresh in the background
+    model_catalog_service.start_background_refresh()
+
+    # Load plan limits and follow plan/subscription invalidations
+    plan_cache_service.start_background_refresh()
+
+    # Drop cached users invalidated by other workers
+    if user_cache_service.enabled:
+        user_cache_service.start_background_refresh()
+
+    # Bulk-load rate limit plans and API clients, then reload periodically
+    # (usage quotas also read user plans from these tables)
+    if rate_limiter is not None or usage_quota_service.enabled:
+        rate_limit_policy_service.start_background_refresh()
+
+    # Persist Redis usage quota counters to PostgreSQL in the background
+    if usage_quota_service.enabled:
+        usage_quota_service.start_background_flush()
+
+    # Rebuild Redis leaderboards from PostgreSQL periodically
+    if leaderboard_service.enabled:
+        leaderboard_service.start_background_refresh()
+
     yield
 
     # Shutdown
     logger.info("application_shutdown")
+
+    await model_catalog_service.stop_background_refresh()
+    await plan_cache_service.stop_background_refresh()
+
+    if user_cache_service.enabled:
+        await user_cache_service.stop_background_refresh()
+
+    if usage_quota_service.enabled:
+        await usage_quota_service.stop_background_flush()
+
+    if leaderboard_service.enabled:
+        await leaderboard_service.stop_background_refresh()
+
+    if rate_limiter is not None or usage_quota_service.enabled:
+        await rate_limit_policy_service.stop_background_refresh()
+    if rate_limiter is not None:
+        await rate_limiter.close()
+
+    password_executor.shutdown()
     
     # Close Temporal client
     if settings.temporal_enabled:
         await close_temporal_client()
 
+    await replica_pool.stop_background_refresh()
+    await replica_pool.dispose()
+    await engine.dispose()
+
+    await close_http_clients()
+    await close_redis_clients()
     await cleanup_health_checker()
 
 
@@ -82,6 +146,11 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Add plan-aware rate limiting (added before CORS so 429s carry CORS headers)
+rate_limiter = create_rate_limiter() if settings.rate_limit_enabled else None
+if rate_limiter is not None:
+    app.add_middleware(RateLimitMiddleware, rate_limiter_service=rate_limiter)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -126,6 +195,7 @@ def metrics() -> Response:
     Returns:
         Response: Prometheus metrics in text format
     """
+    collect_http_pool_metrics()
     return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
@@ -201,6 +271,27 @@ async def root() -> dict[str, Any]:
     }
 
 
+@app.exception_handler(LoadSheddingError)
+async def load_shedding_exception_handler(request, exc: LoadSheddingError) -> JSONResponse:
+    """
+    Return 503 with Retry-After when an LLM call or password hash was shed under load.
+
+    Args:
+        request: The request object
+        exc: The load shedding error
+
+    Returns:
+        JSONResponse: Error response
+    """
+    logger.warning("request_load_shed", path=request.url.path, error=str(exc))
+
+    return JSONResponse(
+        status_code=503,
+        content={"detail": HTTPStatus.SERVICE_UNAVAILABLE, "error": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after_seconds)))},
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc: Exception) -> JSONResponse:
     """
@@ -7,6 +7,8 @@ from typing import Callable
 import re
 
 from app.core.logging import get_logger
+from app.core.metrics import track_rate_limit_exceeded
+from app.services.rate_limit_policy_service import rate_limit_policy_service, route_cost
 
 logger = get_logger(__name__)
 
@@ -171,18 +173,25 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware using Redis."""
+    """
+    Plan-aware rate limiting middleware using Redis.
 
-    def __init__(self, app, rate_limiter_service=None):
+    Limits come from the caller's plan (or API client) and each request
+    consumes tokens according to its route cost class.
+    """
+
+    def __init__(self, app, rate_limiter_service=None, policy_service=None):
         """
         Initialize middleware.
 
         Args:
             app: FastAPI application
-            rate_limiter_service: RateLimiterService instance
+            rate_limiter_service: RateLimiterService or HybridRateLimiter instance
+            policy_service: RateLimitPolicyService (defaults to the shared instance)
         """
         super().__init__(app)
         self.rate_limiter_service = rate_limiter_service
+        self.policy_service = policy_service or rate_limit_policy_service
 
     async def dispatch(self, request: Request, call_next: Callable):
         """Apply rate limiting."""
@@ -190,53 +199,52 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             # Rate limiting not configured
             return await call_next(request)
 
-        # Extract client identifier (API key, user ID, or IP)
-        client_id = self._get_client_id(request)
+        cost_class, cost = route_cost(request.method, request.url.path)
+        if cost == 0:
+            return await call_next(request)
 
-        if client_id:
-            # Check rate limit
-            is_allowed, rate_info = await self.rate_limiter_service.check_rate_limit(
-                client_id=client_id,
-                limit_per_minute=60,  # Default limits
-                limit_per_day=10000,
+        policy = await self.policy_service.resolve(request)
+
+        is_allowed, rate_info = await self.rate_limiter_service.check_rate_limit(
+            client_id=policy.client_key,
+            limit_per_minute=policy.limit_per_minute,
+            limit_per_day=policy.limit_per_day,
+            cost=cost,
+        )
+
+        if not is_allowed:
+            logger.warn(
+                "rate_limit_exceeded",
+                client_key=policy.client_key,
+                plan=policy.plan,
+                cost_class=cost_class,
+                path=request.url.path,
+            )
+            track_rate_limit_exceeded(cost_class, policy.plan)
+
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "detail": "Rate limit exceeded",
+                    "retry_after": rate_info["retry_after"],
+                },
+                headers={
+                    **self._rate_limit_headers(rate_info),
+                    "Retry-After": str(rate_info["retry_after"]),
+                },
             )
-
-            if not is_allowed:
-                logger.warn(
-                    "rate_limit_exceeded",
-                    client_id=str(client_id),
-                    path=request.url.path,
-                )
-
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={
-                        "detail": "Rate limit exceeded",
-                        "retry_after": rate_info["reset_minute"],
-                    },
-                    headers={
-                        "X-RateLimit-Limit-Minute": str(rate_info["limit_per_minute"]),
-                        "X-RateLimit-Limit-Day": str(rate_info["limit_per_day"]),
-                        "X-RateLimit-Remaining-Minute": str(rate_info["remaining_per_minute"]),
-                        "X-RateLimit-Remaining-Day": str(rate_info["remaining_per_day"]),
-                        "X-RateLimit-Reset-Minute": str(rate_info["reset_minute"]),
-                        "Retry-After": str(rate_info["reset_minute"]),
-                    },
-                )
 
         response = await call_next(request)
+        response.headers.update(self._rate_limit_headers(rate_info))
         return response
 
-    def _get_client_id(self, request: Request):
-        """Extract client identifier from request."""
-        # Try to get from API key header
-        api_key = request.headers.get("X-API-Key")
-        if api_key:
-            return api_key
-
-        # Fall back to IP address
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
-
-        return request.client.host if request.client else None
+    @staticmethod
+    def _rate_limit_headers(rate_info: dict) -> dict[str, str]:
+        """Build X-RateLimit-* headers."""
+        return {
+            "X-RateLimit-Limit-Minute": str(rate_info["limit_per_minute"]),
+            "X-RateLimit-Limit-Day": str(rate_info["limit_per_day"]),
+            "X-RateLimit-Remaining-Minute": str(rate_info["remaining_per_minute"]),
+            "X-RateLimit-Remaining-Day": str(rate_info["remaining_per_day"]),
+            "X-RateLimit-Reset-Minute": str(rate_info["reset_minute"]),
+        }
@@ -1,5 +1,17 @@
 """Repository package for environment-aware data access."""
 
-from app.repositories.base import EnvironmentAwareRepository
+from app.repositories.base import (
+    EnvironmentAwareRepository,
+    InvalidCursorError,
+    Page,
+    estimate_count,
+    paginate,
+)
 
-__all__ = ["EnvironmentAwareRepository"]
+__all__ = [
+    "EnvironmentAwareRepository",
+    "InvalidCursorError",
+    "Page",
+    "estimate_count",
+    "paginate",
+]
@@ -4,12 +4,22 @@ Provides environment-scoped data access with automatic:
 - Environment filtering (only query current environment's data)
 - Test data exclusion (optional, enabled by default in prod)
 - Promotion support helpers
+
+Also provides keyset (cursor) pagination for list endpoints. Instead of
+OFFSET, which scans and discards every skipped row, a page continues after
+the (sort key, id) of the previous page's last row, so deep pages cost the
+same as the first. Cursors are opaque to clients. Totals are optional
+estimates from pg_class.reltuples instead of a COUNT(*) per page.
 """
 
-from typing import Any, Generic, Optional, TypeVar
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Generic, Optional, Sequence, TypeVar
 from uuid import UUID
 
-from sqlalchemy import Select, select
+from sqlalchemy import ColumnElement, DateTime, Select, select, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
@@ -21,6 +31,218 @@ settings = get_settings()
 logger = get_logger(__name__)
 
 ModelType = TypeVar("ModelType", bound=Base)
+T = TypeVar("T")
+
+
+# ============================================================================
+# Keyset Pagination
+# ============================================================================
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded."""
+
+
+# Range of a PostgreSQL BIGINT
+_INT_RANGE = range(-(2**63), 2**63)
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of a keyset-paginated query."""
+
+    items: list[T]
+    next_cursor: Optional[str]  # None on the last page
+    estimated_total: Optional[int] = None
+
+    @property
+    def has_more(self) -> bool:
+        """Whether another page follows."""
+        return self.next_cursor is not None
+
+
+def _encode_value(value: Any) -> Any:
+    """Make a sort key value JSON-serializable, keeping its type."""
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Restore a sort key value encoded by _encode_value."""
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "uuid" in value:
+            return UUID(value["uuid"])
+        raise ValueError("Unknown cursor value")
+    return value
+
+
+def _check_value(value: Any, key: ColumnElement) -> Any:
+    """
+    Check a decoded cursor value against the type of its sort key.
+
+    Cursors come from clients, so a value of the wrong type must be
+    rejected here rather than fail in the database.
+
+    Args:
+        value: Decoded cursor value
+        key: Sort key column or expression
+
+    Returns:
+        The value, converted to the key's Python type where lossless
+
+    Raises:
+        InvalidCursorError: If the value doesn't fit the key's type
+    """
+    try:
+        expected = key.type.python_type
+    except NotImplementedError:
+        # Type without a Python equivalent: only JSON scalars get through
+        if isinstance(value, (str, int, float, datetime, UUID)):
+            return value
+        raise InvalidCursorError("Invalid pagination cursor")
+
+    if expected is float and isinstance(value, int) and not isinstance(value, bool):
+        value = float(value)
+    if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+        raise InvalidCursorError("Invalid pagination cursor")
+    if expected is int and value not in _INT_RANGE:
+        raise InvalidCursorError("Invalid pagination cursor")
+    if isinstance(key.type, DateTime):
+        # Match the column's timezone awareness (naive values are UTC)
+        if key.type.timezone and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        elif not key.type.timezone and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort key values of a row as an opaque cursor.
+
+    Args:
+        values: Sort key values followed by the row ID
+
+    Returns:
+        URL-safe cursor string
+    """
+    data = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str,
+    size: int,
+    keys: Optional[Sequence[ColumnElement]] = None,
+) -> list[Any]:
+    """
+    Decode a cursor made by encode_cursor.
+
+    Args:
+        cursor: Cursor string from a previous page
+        size: Expected number of values (sort keys + ID)
+        keys: Sort keys followed by the ID column, to check value types against
+
+    Returns:
+        Sort key values followed by the row ID
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or for another query
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = [_decode_value(value) for value in json.loads(base64.urlsafe_b64decode(padded))]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+    if len(values) != size or any(value is None for value in values):
+        raise InvalidCursorError("Invalid pagination cursor")
+    if keys is not None:
+        values = [_check_value(value, key) for value, key in zip(values, keys)]
+    return values
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    sort_keys: Sequence[ColumnElement],
+    id_column: ColumnElement,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+) -> Page:
+    """
+    Fetch one page of a query with keyset pagination.
+
+    Rows are ordered by (*sort_keys, id_column) and a page continues after
+    the cursor's row, so an index on the same columns serves any page
+    without scanning skipped rows. Sort keys must not be NULL (wrap nullable
+    columns in coalesce).
+
+    Args:
+        db: Database session
+        query: Select of one entity, with filters but without ordering
+        sort_keys: Columns or expressions to order by
+        id_column: Unique tie-breaker (primary key)
+        limit: Maximum items per page
+        cursor: next_cursor of the previous page (None for the first page)
+        descending: Newest/highest first
+
+    Returns:
+        Page of entities with the cursor of the next page
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or its values don't
+            match the types of the sort keys
+    """
+    keys = [*sort_keys, id_column]
+    query = query.add_columns(*keys).order_by(None)
+
+    if cursor is not None:
+        after = tuple(decode_cursor(cursor, len(keys), keys))
+        position = tuple_(*keys)
+        query = query.where(position < after if descending else position > after)
+
+    query = query.order_by(*[key.desc() if descending else key.asc() for key in keys]).limit(limit + 1)
+
+    result = await db.execute(query)
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1:])
+
+    return Page(items=[row[0] for row in rows], next_cursor=next_cursor)
+
+
+async def estimate_count(db: AsyncSession, model: type[Base]) -> Optional[int]:
+    """
+    Estimate a table's row count from planner statistics.
+
+    Reads pg_class.reltuples (kept current by autovacuum/ANALYZE) instead
+    of counting. Only meaningful for unfiltered listings.
+
+    Args:
+        db: Database session
+        model: SQLAlchemy model class
+
+    Returns:
+        Estimated row count, or None if the table hasn't been analyzed
+    """
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": model.__tablename__},
+    )
+    estimate = result.scalar_one_or_none()
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
 
 
 class EnvironmentAwareRepository(Generic[ModelType]):
@@ -132,30 +354,25 @@ class EnvironmentAwareRepository(Generic[ModelType]):
 
     async def get_all(
         self,
-        skip: int = 0,
         limit: int = 100,
+        cursor: Optional[str] = None,
         include_test_data: bool = False,
-    ) -> list[ModelType]:
+    ) -> Page[ModelType]:
         """
-        Get all records (scoped to current environment).
+        Get all records (scoped to current environment), newest first.
 
         Args:
-            skip: Number of records to skip
             limit: Maximum number of records
+            cursor: next_cursor of the previous page
             include_test_data: Include test data
 
         Returns:
-            List of model instances
+            Page of model instances
         """
-        query = (
-            self._build_base_query(include_test_data=include_test_data)
-            .offset(skip)
-            .limit(limit)
+        return await self._paginate(
+            self._build_base_query(include_test_data=include_test_data), limit, cursor
         )
 
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
-
     async def create(
         self,
         obj_in: dict[str, Any],
@@ -251,38 +468,32 @@ class EnvironmentAwareRepository(Generic[ModelType]):
 
     async def get_promotable_items(
         self,
-        skip: int = 0,
         limit: int = 100,
-    ) -> list[ModelType]:
+        cursor: Optional[str] = None,
+    ) -> Page[ModelType]:
         """
         Get items that can be promoted to next environment.
 
         Returns only approved, non-test items.
 
         Args:
-            skip: Number of records to skip
             limit: Maximum number of records
+            cursor: next_cursor of the previous page
 
         Returns:
-            List of promotable model instances
+            Page of promotable model instances
         """
         if not self._has_environment:
-            return []
-
-        query = (
-            select(self.model)
-            .where(
-                self.model.environment == settings.environment,
-                self.model.is_promotable == True,  # noqa: E712
-                self.model.promotion_status == "approved",
-                self.model.is_test_data == False,  # noqa: E712
-            )
-            .offset(skip)
-            .limit(limit)
+            return Page(items=[], next_cursor=None)
+
+        query = select(self.model).where(
+            self.model.environment == settings.environment,
+            self.model.is_promotable == True,  # noqa: E712
+            self.model.promotion_status == "approved",
+            self.model.is_test_data == False,  # noqa: E712
         )
 
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return await self._paginate(query, limit, cursor)
 
     async def approve_for_promotion(self, id: UUID) -> Optional[ModelType]:
         """
@@ -347,34 +558,34 @@ class EnvironmentAwareRepository(Generic[ModelType]):
 
     async def get_test_data_items(
         self,
-        skip: int = 0,
         limit: int = 100,
-    ) -> list[ModelType]:
+        cursor: Optional[str] = None,
+    ) -> Page[ModelType]:
         """
         Get all test data items in current environment.
 
         Args:
-            skip: Number of records to skip
             limit: Maximum number of records
+            cursor: next_cursor of the previous page
 
         Returns:
-            List of test data model instances
+            Page of test data model instances
         """
         if not self._has_environment:
-            return []
+            return Page(items=[], next_cursor=None)
 
-        query = (
-            select(self.model)
-            .where(
-                self.model.environment == settings.environment,
-                self.model.is_test_data == True,  # noqa: E712
-            )
-            .offset(skip)
-            .limit(limit)
+        query = select(self.model).where(
+            self.model.environment == settings.environment,
+            self.model.is_test_data == True,  # noqa: E712
         )
 
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return await self._paginate(query, limit, cursor)
+
+    async def _paginate(self, query: Select, limit: int, cursor: Optional[str]) -> Page[ModelType]:
+        """Paginate a query of this model by (created_at, id), newest first."""
+        created_at = getattr(self.model, "created_at", None)
+        sort_keys = [created_at] if created_at is not None else []
+        return await paginate(self.db, query, sort_keys, self.model.id, limit, cursor)
 
     # ========================================================================
     # Cross-Environment Operations
@@ -9,10 +9,13 @@ from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
+from app.core.security import hash_api_key
 from app.models.admin import AdminActivityLog, AdminAPIKey, ContentModerationLog
 from app.models.chat import Conversation
 from app.models.document import Document
 from app.models.user import User
+from app.repositories.base import estimate_count, paginate
+from app.services.user_cache_service import user_cache_service
 
 logger = get_logger(__name__)
 
@@ -55,7 +58,7 @@ class AdminService:
         """
         # Generate secure random API key
         api_key = f"sk_{secrets.token_urlsafe(32)}"
-        api_key_hash = secrets.token_hex(16)  # In production, use proper hashing
+        api_key_hash = hash_api_key(api_key)
 
         # Calculate expiration
         expires_at = None
@@ -193,23 +196,26 @@ class AdminService:
     async def list_users(
         self,
         admin_user_id: UUID,
-        page: int = 1,
         page_size: int = 50,
+        cursor: Optional[str] = None,
         search_query: Optional[str] = None,
         role_filter: Optional[str] = None,
     ) -> dict:
         """
-        List all users with filtering and pagination.
+        List all users with filtering and pagination, newest first.
 
         Args:
             admin_user_id: ID of admin requesting the list
-            page: Page number
             page_size: Items per page
+            cursor: next_cursor of the previous page
             search_query: Search by email or display name
             role_filter: Filter by role
 
         Returns:
-            Paginated user list
+            Paginated user list (estimated_total only without filters)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
         """
         query = select(User)
 
@@ -223,17 +229,11 @@ class AdminService:
         if role_filter:
             query = query.where(User.role == role_filter)
 
-        # Count total
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
-
-        # Paginate
-        offset = (page - 1) * page_size
-        query = query.offset(offset).limit(page_size)
+        page = await paginate(self.db, query, [User.created_at], User.id, page_size, cursor)
 
-        result = await self.db.execute(query)
-        users = result.scalars().all()
+        estimated_total = None
+        if not search_query and not role_filter:
+            estimated_total = await estimate_count(self.db, User)
 
         return {
             "users": [
@@ -247,13 +247,13 @@ class AdminService:
                     "created_at": user.created_at.isoformat(),
                     "last_login": user.last_login.isoformat() if user.last_login else None,
                 }
-                for user in users
+                for user in page.items
             ],
             "pagination": {
-                "page": page,
                 "page_size": page_size,
-                "total": total,
-                "total_pages": (total + page_size - 1) // page_size,
+                "next_cursor": page.next_cursor,
+                "has_more": page.has_more,
+                "estimated_total": estimated_total,
             },
         }
 
@@ -297,6 +297,7 @@ class AdminService:
         )
 
         await self.db.commit()
+        await user_cache_service.invalidate_user(user_id)
 
         logger.warn(
             "user_banned",
@@ -345,6 +346,7 @@ class AdminService:
         )
 
         await self.db.commit()
+        await user_cache_service.invalidate_user(user_id)
 
         logger.info(
             "user_unbanned",
@@ -393,6 +395,7 @@ class AdminService:
         )
 
         await self.db.commit()
+        await user_cache_service.invalidate_user(user_id)
 
         logger.info(
             "user_role_changed",
@@ -9,14 +9,16 @@ with maximum citations and direct links.
 import hashlib
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+from urllib.parse import urlparse
 from uuid import UUID
 
-import aiohttp
 from bs4 import BeautifulSoup
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.circuit_breaker import CircuitBreaker, circuit_breaker_registry
 from app.core.config import settings
+from app.core.http_client import get_http_client
 from app.core.logging import get_logger
 from app.models.marja import AhkamFetchLog, MarjaOfficialSource
 
@@ -159,6 +161,17 @@ class AhkamService:
         )
         return result.scalar_one_or_none()
 
+    def _circuit_breaker(self, marja_source: MarjaOfficialSource) -> CircuitBreaker:
+        """Get the circuit breaker for a Marja's website (one per host)."""
+        host = urlparse(marja_source.official_website_url).netloc or marja_source.marja_name
+        return circuit_breaker_registry.get_or_create(
+            name=f"ahkam:{host}",
+            failure_threshold=5,
+            recovery_timeout=60,
+            timeout_seconds=self.fetch_timeout + 5,  # Above the request timeout
+            max_concurrent=10,
+        )
+
     async def _fetch_from_api(
         self,
         marja_source: MarjaOfficialSource,
@@ -173,32 +186,34 @@ class AhkamService:
         if not marja_source.api_endpoint:
             raise ValueError("API endpoint not configured")
 
-        async with aiohttp.ClientSession() as session:
-            # Build API request
-            params = marja_source.search_parameters or {}
-            params["query"] = question
-            if category:
-                params["category"] = category
+        # Build API request (copy so the source's stored parameters aren't mutated)
+        params = dict(marja_source.search_parameters or {})
+        params["query"] = question
+        if category:
+            params["category"] = category
 
-            try:
-                async with session.get(
+        try:
+            async def get_ruling() -> dict:
+                response = await get_http_client("scraping").get(
                     marja_source.api_endpoint,
                     params=params,
-                    timeout=aiohttp.ClientTimeout(total=self.fetch_timeout),
-                ) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-
-                    return {
-                        "ruling_text": data.get("ruling", ""),
-                        "direct_url": data.get("url", marja_source.official_website_url),
-                        "reference": data.get("reference", ""),
-                        "confidence": 0.95,  # High confidence for API responses
-                    }
-
-            except Exception as e:
-                logger.error("api_fetch_failed", error=str(e))
-                raise
+                    timeout=self.fetch_timeout,
+                )
+                response.raise_for_status()
+                return response.json()
+
+            data = await self._circuit_breaker(marja_source).call(get_ruling)
+
+            return {
+                "ruling_text": data.get("ruling", ""),
+                "direct_url": data.get("url", marja_source.official_website_url),
+                "reference": data.get("reference", ""),
+                "confidence": 0.95,  # High confidence for API responses
+            }
+
+        except Exception as e:
+            logger.error("api_fetch_failed", error=str(e))
+            raise
 
     async def _fetch_via_web_scraping(
         self,
@@ -215,52 +230,56 @@ class AhkamService:
         if not marja_source.search_url:
             raise ValueError("Search URL not configured")
 
-        async with aiohttp.ClientSession() as session:
-            # Build search URL
-            search_url = marja_source.search_url
-            params = {"q": question}
+        # Build search request
+        search_url = marja_source.search_url
+        params = {"q": question}
 
-            if marja_source.search_method == "POST":
-                method = session.post
-                kwargs = {"data": params}
-            else:
-                method = session.get
-                kwargs = {"params": params}
+        if marja_source.search_method == "POST":
+            method = "POST"
+            kwargs = {"data": params}
+        else:
+            method = "GET"
+            kwargs = {"params": params}
 
-            try:
-                async with method(
+        try:
+            async def fetch_page():
+                response = await get_http_client("scraping").request(
+                    method,
                     search_url,
-                    timeout=aiohttp.ClientTimeout(total=self.fetch_timeout),
+                    timeout=self.fetch_timeout,
                     **kwargs,
-                ) as response:
-                    response.raise_for_status()
-                    html = await response.text()
-
-                    # Parse HTML
-                    soup = BeautifulSoup(html, "lxml")
-
-                    # Extract ruling using configured selectors
-                    selectors = marja_source.content_selectors or {}
-                    title_selector = selectors.get("title", "h1")
-                    content_selector = selectors.get("content", "div.content")
-
-                    title_elem = soup.select_one(title_selector)
-                    content_elem = soup.select_one(content_selector)
-
-                    ruling_text = ""
-                    if content_elem:
-                        ruling_text = content_elem.get_text(strip=True)
-
-                    return {
-                        "ruling_text": ruling_text,
-                        "direct_url": str(response.url),
-                        "reference": title_elem.get_text(strip=True) if title_elem else "",
-                        "confidence": 0.8,  # Moderate confidence for scraped content
-                    }
-
-            except Exception as e:
-                logger.error("web_scraping_failed", error=str(e))
-                raise
+                )
+                response.raise_for_status()
+                return response
+
+            response = await self._circuit_breaker(marja_source).call(fetch_page)
+            html = response.text
+
+            # Parse HTML
+            soup = BeautifulSoup(html, "lxml")
+
+            # Extract ruling using configured selectors
+            selectors = marja_source.content_selectors or {}
+            title_selector = selectors.get("title", "h1")
+            content_selector = selectors.get("content", "div.content")
+
+            title_elem = soup.select_one(title_selector)
+            content_elem = soup.select_one(content_selector)
+
+            ruling_text = ""
+            if content_elem:
+                ruling_text = content_elem.get_text(strip=True)
+
+            return {
+                "ruling_text": ruling_text,
+                "direct_url": str(response.url),
+                "reference": title_elem.get_text(strip=True) if title_elem else "",
+                "confidence": 0.8,  # Moderate confidence for scraped content
+            }
+
+        except Exception as e:
+            logger.error("web_scraping_failed", error=str(e))
+            raise
 
     def _format_response(
         self,
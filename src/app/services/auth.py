@@ -6,18 +6,20 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
 from app.core.security import (
+    TOKEN_VERSION_CLAIM,
     create_access_token,
     create_refresh_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password,
 )
 from app.models.user import LinkedAuthProvider, OTPCode, User, UserSession, UserSettings
 from app.services.email_service import EmailService
+from app.services.user_cache_service import user_cache_service
 
 logger = get_logger(__name__)
 
@@ -60,7 +62,7 @@ class AuthService:
             raise ValueError("AUTH_EMAIL_ALREADY_EXISTS")
 
         # Hash password
-        password_hash = hash_password(password)
+        password_hash = await hash_password_async(password)
 
         # Create user
         user = User(
@@ -143,14 +145,21 @@ class AuthService:
             raise ValueError("AUTH_INVALID_CREDENTIALS")
 
         # Verify password
-        if not verify_password(password, user.password_hash):
+        valid, new_password_hash = await verify_and_update_password(password, user.password_hash)
+        if not valid:
             raise ValueError("AUTH_INVALID_CREDENTIALS")
 
         if not user.is_active:
             raise ValueError("AUTH_USER_INACTIVE")
 
+        # Rehash if the hashing cost changed (saved with the login below)
+        if new_password_hash is not None:
+            user.password_hash = new_password_hash
+            logger.info("user_password_rehashed", user_id=str(user.id))
+
         # Generate tokens
-        access_token = create_access_token(user.id)
+        token_version = await user_cache_service.get_token_version(user.id)
+        access_token = create_access_token(user.id, {TOKEN_VERSION_CLAIM: token_version})
         refresh_token = create_refresh_token(user.id)
 
         # Create session
@@ -234,6 +243,9 @@ class AuthService:
         await self.db.commit()
         await self.db.refresh(user)
 
+        # Cached snapshots still say unverified; the user stays signed in
+        await user_cache_service.evict_user(user.id)
+
         logger.info("email_verified", user_id=str(user.id), email=email)
 
         return user
@@ -349,15 +361,23 @@ class AuthService:
                 )
 
             # Update user profile if needed
+            profile_changed = not existing_user.is_email_verified
             if profile_picture_url and not existing_user.profile_picture_url:
                 existing_user.profile_picture_url = profile_picture_url
+                profile_changed = True
 
             if full_name and not existing_user.full_name:
                 existing_user.full_name = full_name
+                profile_changed = True
 
             # Mark email as verified (Google accounts are verified)
             existing_user.is_email_verified = True
 
+            if profile_changed:
+                # Drop cached snapshots without signing out other devices
+                await self.db.commit()
+                await user_cache_service.evict_user(existing_user.id)
+
             user = existing_user
         else:
             # Create new user with Google OAuth
@@ -394,7 +414,8 @@ class AuthService:
             logger.info("new_user_created_via_google_oauth", user_id=str(user.id), email=email)
 
         # Generate tokens
-        access_token = create_access_token(user.id)
+        token_version = await user_cache_service.get_token_version(user.id)
+        access_token = create_access_token(user.id, {TOKEN_VERSION_CLAIM: token_version})
         refresh_token = create_refresh_token(user.id)
 
         # Create session
@@ -419,6 +440,26 @@ class AuthService:
 
         return user, access_token, refresh_token, is_new_user
 
+    async def logout(self, user_id: UUID) -> None:
+        """
+        Logout user from all sessions.
+
+        Revokes the user's active sessions and access tokens.
+
+        Args:
+            user_id: User ID
+        """
+        await self.db.execute(
+            update(UserSession)
+            .where(UserSession.user_id == user_id, UserSession.is_active.is_(True))
+            .values(is_active=False, revoked_at=datetime.now(timezone.utc))
+        )
+        await self.db.commit()
+
+        await user_cache_service.invalidate_user(user_id)
+
+        logger.info("user_logged_out", user_id=str(user_id))
+
     def _generate_otp(self, length: int = 6) -> str:
         """Generate a random OTP code."""
         return "".join(random.choices(string.digits, k=length))
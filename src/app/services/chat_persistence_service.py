@@ -0,0 +1,251 @@
+"""
+Unit of work for persisting a chat turn.
+
+A chat turn writes the user message, the assistant message, the
+conversation counters and the monthly usage increment. Instead of
+committing and refreshing each row separately, the writes are collected
+and flushed in a single transaction:
+
+- One multi-row INSERT ... RETURNING for both messages (no refresh)
+- Per-row created_at (clock_timestamp() plus a microsecond per row), so
+  the assistant reply sorts after the question it answers; now() would
+  give every row of the transaction the same timestamp
+- One UPDATE for the conversation counters
+- One COMMIT (one fsync) per turn
+
+The usage increment goes to the Redis quota counters after the commit
+(persisted in bulk by the usage quota flusher); with Redis counters
+disabled it is an UPSERT in the same transaction.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.models.chat import Conversation, Message
+from app.services.conversation_cache_service import conversation_cache_service
+from app.services.leaderboard_service import leaderboard_service
+from app.services.subscription_service import subscription_service
+from app.services.usage_quota_service import usage_quota_service
+
+logger = get_logger(__name__)
+
+# Columns a chat turn may set on a message row
+_MESSAGE_COLUMNS = {column.key: column for column in Message.__table__.columns}
+
+
+@dataclass
+class ChatTurnMessage:
+    """A message queued for insertion in a chat turn."""
+
+    id: UUID
+    role: str
+    content: str
+    fields: dict[str, Any] = field(default_factory=dict)
+    created_at: Optional[datetime] = None
+
+
+@dataclass
+class ChatTurnUsage:
+    """Usage increment recorded with a chat turn."""
+
+    messages: int = 0
+    tokens: int = 0
+    cost_usd: float = 0.0
+    cache_savings_usd: float = 0.0
+
+
+def _column_default(key: str) -> Any:
+    """Get the scalar Python-side default of a message column (or None)."""
+    default = _MESSAGE_COLUMNS[key].default
+    if default is not None and default.is_scalar:
+        return default.arg
+    return None
+
+
+class ChatTurnUnitOfWork:
+    """
+    Collects the writes of one chat turn and commits them together.
+
+    Usage:
+        unit = ChatTurnUnitOfWork(db, user_id=user_id, conversation_id=conversation_id)
+        unit.add_message("user", "What is Khums?")
+        assistant = unit.add_message("assistant", answer, llm_model=model)
+        unit.add_usage(messages=1, tokens=tokens, cost_usd=cost)
+        await unit.commit()
+    """
+
+    def __init__(self, db: AsyncSession, user_id: UUID, conversation_id: UUID):
+        """
+        Initialize unit of work.
+
+        Args:
+            db: Database session (committed once by commit())
+            user_id: User ID for usage accounting
+            conversation_id: Conversation the messages belong to
+        """
+        self.db = db
+        self.user_id = user_id
+        self.conversation_id = conversation_id
+        self.messages: list[ChatTurnMessage] = []
+        self.usage = ChatTurnUsage()
+
+    def add_message(
+        self,
+        role: str,
+        content: str,
+        message_id: UUID | None = None,
+        **fields: Any,
+    ) -> ChatTurnMessage:
+        """
+        Queue a message for insertion.
+
+        Args:
+            role: Message role (user, assistant, system)
+            content: Message content
+            message_id: Optional pre-generated ID (e.g. already sent to the client)
+            **fields: Additional Message columns
+
+        Returns:
+            The queued message (created_at is set after commit)
+
+        Raises:
+            ValueError: If a field is not a Message column
+        """
+        unknown = set(fields) - set(_MESSAGE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown message fields: {', '.join(sorted(unknown))}")
+
+        message = ChatTurnMessage(
+            id=message_id or uuid4(),
+            role=role,
+            content=content,
+            fields=fields,
+        )
+        self.messages.append(message)
+        return message
+
+    def add_usage(
+        self,
+        messages: int = 0,
+        tokens: int = 0,
+        cost_usd: float = 0.0,
+        cache_savings_usd: float = 0.0,
+    ) -> None:
+        """Accumulate a usage increment for the user's monthly quota."""
+        self.usage.messages += messages
+        self.usage.tokens += tokens
+        self.usage.cost_usd += cost_usd or 0.0
+        self.usage.cache_savings_usd += cache_savings_usd or 0.0
+
+    def _has_usage(self) -> bool:
+        """Whether a usage increment was accumulated."""
+        return bool(self.usage.messages or self.usage.tokens or self.usage.cost_usd)
+
+    def _build_rows(self) -> list[dict[str, Any]]:
+        """Build uniform INSERT VALUES rows for all queued messages, in order."""
+        extra_keys = sorted({key for message in self.messages for key in message.fields})
+
+        rows = []
+        for index, message in enumerate(self.messages):
+            row = {
+                "id": message.id,
+                "conversation_id": self.conversation_id,
+                "role": message.role,
+                "content": message.content,
+                "created_at": func.clock_timestamp() + timedelta(microseconds=index),
+            }
+            for key in extra_keys:
+                row[key] = message.fields.get(key, _column_default(key))
+            rows.append(row)
+
+        return rows
+
+    async def commit(self) -> list[ChatTurnMessage]:
+        """
+        Write all queued changes in a single transaction.
+
+        Returns:
+            Persisted messages with created_at populated from RETURNING
+
+        Raises:
+            Exception: Database errors (the transaction is rolled back)
+        """
+        try:
+            if self.messages:
+                result = await self.db.execute(
+                    insert(Message)
+                    .values(self._build_rows())
+                    .returning(Message.id, Message.created_at)
+                )
+                created_at = {row.id: row.created_at for row in result.all()}
+                for message in self.messages:
+                    message.created_at = created_at.get(message.id)
+
+                await self.db.execute(
+                    update(Conversation)
+                    .where(Conversation.id == self.conversation_id)
+                    .values(
+                        message_count=Conversation.message_count + len(self.messages),
+                        total_tokens_used=Conversation.total_tokens_used + self.usage.tokens,
+                        last_message_at=func.now(),
+                    )
+                )
+
+            if self._has_usage() and not usage_quota_service.enabled:
+                await subscription_service.track_usage(
+                    user_id=self.user_id,
+                    db=self.db,
+                    messages=self.usage.messages,
+                    tokens=self.usage.tokens,
+                    cost_usd=self.usage.cost_usd,
+                    cache_savings_usd=self.usage.cache_savings_usd,
+                    commit=False,
+                )
+
+            await self.db.commit()
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(
+                "chat_turn_commit_failed",
+                user_id=str(self.user_id),
+                conversation_id=str(self.conversation_id),
+                message_count=len(self.messages),
+                error=str(e),
+            )
+            raise
+
+        logger.debug(
+            "chat_turn_committed",
+            conversation_id=str(self.conversation_id),
+            message_count=len(self.messages),
+            tokens=self.usage.tokens,
+        )
+
+        if self._has_usage() and usage_quota_service.enabled:
+            await usage_quota_service.record(
+                self.user_id,
+                messages=self.usage.messages,
+                tokens=self.usage.tokens,
+                cost_usd=self.usage.cost_usd,
+                cache_savings_usd=self.usage.cache_savings_usd,
+            )
+
+        await leaderboard_service.record_messages(
+            self.user_id,
+            sum(1 for message in self.messages if message.role == "user"),
+        )
+
+        # Write-through to the hot context cache
+        await conversation_cache_service.append_messages(
+            self.conversation_id,
+            [conversation_cache_service.serialize_message(message) for message in self.messages],
+        )
+
+        return self.messages
@@ -0,0 +1,239 @@
+"""
+Hot conversation context cache backed by Redis.
+
+Every chat turn needs the recent message history of its conversation to
+build the LLM prompt. Instead of re-querying PostgreSQL on each turn, the
+most recent messages of active conversations are kept in Redis:
+
+- conv_ctx:{conversation_id}:messages -> capped list of serialized messages
+- conv_ctx:{conversation_id}:meta     -> hash marking the window as primed
+
+PostgreSQL stays the source of truth. The cache is primed from the database
+on a miss, appended to after every successful message write, and expires
+when a conversation goes idle.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.redis_client import get_redis_client
+from app.models.chat import Message
+
+logger = get_logger(__name__)
+
+# Append only when the conversation is already cached, so a partial history
+# is never mistaken for the full window.
+_APPEND_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    return 0
+end
+for i = 3, #ARGV do
+    redis.call('RPUSH', KEYS[1], ARGV[i])
+end
+redis.call('LTRIM', KEYS[1], -tonumber(ARGV[1]), -1)
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return 1
+"""
+
+
+@dataclass
+class ConversationContext:
+    """Cached context of a conversation."""
+
+    messages: list[dict[str, Any]] = field(default_factory=list)
+
+
+class ConversationCacheService:
+    """
+    Redis cache of recent conversation history.
+
+    Features:
+    - Capped list of the most recent messages per conversation
+    - Write-through updates after messages are persisted
+    - Idle expiration (TTL refreshed on every write)
+    - Fail-open: Redis errors fall back to PostgreSQL
+    """
+
+    def __init__(self):
+        """Initialize conversation cache service."""
+        self.redis = get_redis_client("cache")
+        self.max_messages = settings.conversation_cache_max_messages
+        self.ttl_seconds = settings.conversation_cache_ttl_seconds
+
+        # Scripts are loaded once and invoked with EVALSHA
+        self._append_script = self.redis.register_script(_APPEND_SCRIPT)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the conversation cache is enabled."""
+        return settings.conversation_cache_enabled
+
+    def _messages_key(self, conversation_id: UUID) -> str:
+        """Get Redis key for the cached message window."""
+        return f"conv_ctx:{conversation_id}:messages"
+
+    def _meta_key(self, conversation_id: UUID) -> str:
+        """Get Redis key for the cached conversation metadata."""
+        return f"conv_ctx:{conversation_id}:meta"
+
+    @staticmethod
+    def serialize_message(message: Message) -> dict[str, Any]:
+        """
+        Serialize a message for the context cache.
+
+        Only the fields needed to rebuild the LLM prompt are kept.
+        """
+        return {
+            "id": str(message.id),
+            "role": message.role,
+            "content": message.content,
+            "created_at": message.created_at.isoformat() if message.created_at else None,
+        }
+
+    async def get_context(self, conversation_id: UUID) -> Optional[ConversationContext]:
+        """
+        Get cached context of a conversation.
+
+        Args:
+            conversation_id: Conversation ID
+
+        Returns:
+            ConversationContext on a hit, None on a miss or Redis error
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hgetall(self._meta_key(conversation_id))
+                pipe.lrange(self._messages_key(conversation_id), 0, -1)
+                meta, raw_messages = await pipe.execute()
+
+            if not meta:
+                return None
+
+            return ConversationContext(messages=[json.loads(raw) for raw in raw_messages])
+
+        except Exception as e:
+            logger.warning(
+                "conversation_cache_get_failed",
+                conversation_id=str(conversation_id),
+                error=str(e),
+            )
+            return None
+
+    async def prime(
+        self,
+        conversation_id: UUID,
+        messages: list[dict[str, Any]],
+    ) -> bool:
+        """
+        Replace cached context with history loaded from the database.
+
+        Args:
+            conversation_id: Conversation ID
+            messages: Serialized messages in chronological order
+
+        Returns:
+            True if cached successfully, False otherwise
+        """
+        if not self.enabled:
+            return False
+
+        messages_key = self._messages_key(conversation_id)
+        meta_key = self._meta_key(conversation_id)
+        window = messages[-self.max_messages:] if self.max_messages > 0 else []
+
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(messages_key, meta_key)
+                if window:
+                    pipe.rpush(messages_key, *[json.dumps(m) for m in window])
+                    pipe.expire(messages_key, self.ttl_seconds)
+                pipe.hset(meta_key, mapping={"primed": 1})
+                pipe.expire(meta_key, self.ttl_seconds)
+                await pipe.execute()
+
+            logger.debug(
+                "conversation_cache_primed",
+                conversation_id=str(conversation_id),
+                message_count=len(window),
+            )
+            return True
+
+        except Exception as e:
+            logger.warning(
+                "conversation_cache_prime_failed",
+                conversation_id=str(conversation_id),
+                error=str(e),
+            )
+            return False
+
+    async def append_messages(
+        self,
+        conversation_id: UUID,
+        messages: list[dict[str, Any]],
+    ) -> bool:
+        """
+        Append newly persisted messages to the cached window.
+
+        No-op when the conversation is not cached; the next read primes it.
+
+        Args:
+            conversation_id: Conversation ID
+            messages: Serialized messages in chronological order
+
+        Returns:
+            True if the cached window was updated, False otherwise
+        """
+        if not self.enabled or not messages:
+            return False
+
+        try:
+            updated = await self._append_script(
+                keys=[self._messages_key(conversation_id), self._meta_key(conversation_id)],
+                args=[
+                    self.max_messages,
+                    self.ttl_seconds,
+                    *[json.dumps(m) for m in messages],
+                ],
+            )
+            return bool(updated)
+
+        except Exception as e:
+            logger.warning(
+                "conversation_cache_append_failed",
+                conversation_id=str(conversation_id),
+                error=str(e),
+            )
+            # Drop possibly stale context so the next turn reloads from PostgreSQL
+            await self.invalidate(conversation_id)
+            return False
+
+    async def invalidate(self, conversation_id: UUID) -> None:
+        """
+        Remove cached context of a conversation.
+
+        Args:
+            conversation_id: Conversation ID
+        """
+        try:
+            await self.redis.delete(
+                self._messages_key(conversation_id),
+                self._meta_key(conversation_id),
+            )
+        except Exception as e:
+            logger.warning(
+                "conversation_cache_invalidate_failed",
+                conversation_id=str(conversation_id),
+                error=str(e),
+            )
+
+
+# Global conversation cache service instance
+conversation_cache_service = ConversationCacheService()
@@ -12,6 +12,7 @@ from app.core.logging import get_logger
 from app.models.document import Document, DocumentChunk, DocumentEmbedding
 from app.services.chonkie_service import chonkie_service
 from app.services.embeddings_service import embeddings_service
+from app.services.leaderboard_service import leaderboard_service
 from app.services.qdrant_service import qdrant_service
 from app.services.reranker_service import reranker_service
 
@@ -127,6 +128,7 @@ class DocumentService:
 
             await self.db.commit()
             await self.db.refresh(document)
+            await leaderboard_service.record_document_upload(uploaded_by)
 
             logger.info(
                 "document_created",
@@ -241,6 +243,7 @@ class DocumentService:
         language: Optional[str] = None,
         use_reranker: bool = True,
         rerank_multiplier: int = 5,
+        query_embedding: Optional[list[float]] = None,
     ) -> list[dict]:
         """
         Search for similar chunks using 2-stage retrieval (vector search + reranking).
@@ -257,6 +260,7 @@ class DocumentService:
             language: Filter by language
             use_reranker: Enable 2-stage retrieval with reranking
             rerank_multiplier: How many candidates to retrieve before reranking (e.g., 5x limit)
+            query_embedding: Precomputed query embedding (skips embedding the query)
 
         Returns:
             List of similar chunks with metadata and rerank scores
@@ -283,7 +287,8 @@ class DocumentService:
         vector_search_limit = limit * rerank_multiplier if use_reranker else limit
 
         # Generate query embedding (optimized for RETRIEVAL_QUERY)
-        query_embedding = await embeddings_service.embed_text(query, is_query=True)
+        if query_embedding is None:
+            query_embedding = await embeddings_service.embed_text(query, is_query=True)
 
         # Build filters
         filters = {}
@@ -7,6 +7,7 @@ from langchain_cohere import CohereEmbeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_openai import OpenAIEmbeddings
 
+from app.core.circuit_breaker import circuit_breaker_registry
 from app.core.config import settings
 from app.core.logging import get_logger
 
@@ -92,6 +93,16 @@ class EmbeddingsService:
         else:
             raise ValueError(f"Unsupported embedding provider: {self.provider}")
 
+        # Circuit breaker + bulkhead for the embedding provider API
+        self.circuit_breaker = circuit_breaker_registry.get_or_create(
+            name=f"embeddings_{self.provider}",
+            failure_threshold=5,
+            recovery_timeout=30,
+            timeout_seconds=60,
+            max_concurrent=20,
+            max_queue_wait_seconds=5.0,
+        )
+
     async def embed_text(self, text: str, is_query: bool = True) -> list[float]:
         """
         Generate embedding for a single text.
@@ -106,7 +117,7 @@ class EmbeddingsService:
         try:
             # Use appropriate embedding client based on task type
             embeddings_client = self.embeddings_query if is_query else self.embeddings_document
-            embedding = await embeddings_client.aembed_query(text)
+            embedding = await self.circuit_breaker.call(embeddings_client.aembed_query, text)
 
             logger.debug(
                 "text_embedded",
@@ -138,7 +149,9 @@ class EmbeddingsService:
         """
         try:
             # Use document-optimized embeddings
-            embeddings = await self.embeddings_document.aembed_documents(texts)
+            embeddings = await self.circuit_breaker.call(
+                self.embeddings_document.aembed_documents, texts
+            )
 
             logger.info(
                 "documents_embedded",
@@ -205,7 +218,9 @@ class EmbeddingsService:
                     )
 
                 # Embed batch using document-optimized embeddings
-                batch_embeddings = await self.embeddings_document.aembed_documents(batch)
+                batch_embeddings = await self.circuit_breaker.call(
+                    self.embeddings_document.aembed_documents, batch
+                )
                 all_embeddings.extend(batch_embeddings)
 
                 # Small delay between batches to avoid rate limiting
@@ -268,7 +283,9 @@ class EmbeddingsService:
 
             async def process_batch(batch):
                 async with semaphore:
-                    return await self.embeddings_document.aembed_documents(batch)
+                    return await self.circuit_breaker.call(
+                        self.embeddings_document.aembed_documents, batch
+                    )
 
             # Run all batches concurrently
             results = await asyncio.gather(*[process_batch(batch) for batch in batches])
@@ -1,17 +1,28 @@
 """Enhanced chat service with OpenRouter advanced features and Langfuse tracing."""
 
+import asyncio
+import functools
 import json
 from datetime import datetime
 from typing import Any, AsyncGenerator
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.langfuse_client import get_langfuse_client, trace_span, log_event
+from app.core.task_graph import TaskGraph
+from app.db.base import AsyncSessionLocal
 from app.models.chat import Conversation, Message
+from app.services.chat_persistence_service import ChatTurnUnitOfWork
+from app.services.conversation_cache_service import (
+    ConversationContext,
+    conversation_cache_service,
+)
+from app.services.embeddings_service import embeddings_service
+from app.services.model_catalog_service import model_catalog_service
 from app.services.openrouter_service import OpenRouterService
-from app.services.subscription_service import subscription_service
-from app.services.intent_detector import intent_detector, IntentType
+from app.services.usage_quota_service import usage_quota_service
+from app.services.intent_detector import Intent, IntentType, intent_detector
 from app.services.image_generation_service import image_generation_service
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -30,6 +41,12 @@ logger = get_logger(__name__)
 # Get Langfuse client for adding spans
 langfuse = get_langfuse_client()
 
+# Per-action timeouts (seconds) for intents executed alongside the LLM call
+INTENT_ACTION_TIMEOUTS = {
+    IntentType.IMAGE_GENERATION: 90.0,
+}
+DEFAULT_INTENT_ACTION_TIMEOUT = 10.0
+
 
 class EnhancedChatService:
     """
@@ -53,6 +70,7 @@ class EnhancedChatService:
     def __init__(self):
         """Initialize enhanced chat service."""
         self.openrouter = OpenRouterService()
+        self._background_tasks: set[asyncio.Task] = set()
 
     @observe(name="enhanced-chat")
     async def chat(
@@ -92,15 +110,18 @@ class EnhancedChatService:
             If streaming: AsyncGenerator yielding chunks
             If not streaming: Complete response dict (may include generated_image)
         """
-        # Check user's subscription and quota
-        try:
-            await subscription_service.check_usage_limits(user_id=user_id, db=db)
-        except ValueError as e:
-            logger.warning("quota_exceeded", user_id=str(user_id), error=str(e))
-            raise
-
-        # Detect all user intents and execute appropriate actions
+        # Check the monthly quota and count the message (one Redis round trip)
+        quota = await usage_quota_service.consume(user_id, messages=1, also_check=("tokens",))
+        if not quota.allowed:
+            logger.warning("quota_exceeded", user_id=str(user_id), counter=quota.exceeded)
+            raise ValueError(f"Monthly {quota.exceeded} quota exceeded")
+
+        # Detect all user intents; their actions run concurrently with the
+        # history load and the LLM call instead of blocking them.
         intent_results = {}
+        detected_intents = []
+        graph = TaskGraph(name="enhanced-chat")
+
         if auto_detect_images:
             # Build context for intent detection
             context = {
@@ -109,8 +130,9 @@ class EnhancedChatService:
                 "has_code": False,  # TODO: Check if message contains code
             }
 
-            # Detect all intents
+            # Detect all intents, verifying keyword-only matches before acting on them
             detected_intents = intent_detector.detect_intents(message_content, context)
+            detected_intents = await self._refine_intents(message_content, detected_intents)
 
             logger.info(
                 "intents_detected_in_chat",
@@ -121,117 +143,52 @@ class EnhancedChatService:
                 all_intents=[i.intent_type.value for i in detected_intents],
             )
 
-            # Execute actions for high-priority intents
-            for intent in detected_intents:
+            def merge_intent_result(step: str, outcome: tuple[str, Any] | None) -> None:
+                """Merge an intent action result as soon as it completes."""
+                if outcome is not None:
+                    key, value = outcome
+                    intent_results[key] = value
+
+            # Schedule actions for high-priority intents
+            for index, intent in enumerate(detected_intents):
                 # Only process high-confidence, high-priority intents
-                if intent.confidence < 0.70 or intent.priority < 7:
+                if not intent.is_actionable:
                     continue
 
-                try:
-                    # IMAGE GENERATION
-                    if intent.intent_type == IntentType.IMAGE_GENERATION and settings.image_generation_enabled:
-                        logger.info(
-                            "executing_image_generation_intent",
-                            user_id=str(user_id),
-                            prompt=intent.extracted_query,
-                        )
-
-                        generated_image = await image_generation_service.generate_image(
-                            prompt=intent.extracted_query,
-                            user_id=user_id,
-                            db=db,
-                            conversation_id=conversation_id,
-                        )
-
-                        intent_results["generated_image"] = generated_image
-                        logger.info(
-                            "image_generation_intent_success",
-                            user_id=str(user_id),
-                            image_id=str(generated_image["id"]),
-                        )
-
-                    # WEB SEARCH
-                    elif intent.intent_type == IntentType.WEB_SEARCH:
-                        logger.info(
-                            "web_search_intent_detected",
-                            user_id=str(user_id),
-                            query=intent.extracted_query,
-                            intent_type="web_search",
-                        )
-                        intent_results["web_search_requested"] = {
-                            "query": intent.extracted_query,
-                            "type": "standard",
-                            "note": "Web search capability will be integrated with external API"
-                        }
-
-                    # DEEP WEB SEARCH
-                    elif intent.intent_type == IntentType.DEEP_WEB_SEARCH:
-                        logger.info(
-                            "deep_web_search_intent_detected",
-                            user_id=str(user_id),
-                            query=intent.extracted_query,
-                            intent_type="deep_web_search",
-                        )
-                        intent_results["web_search_requested"] = {
-                            "query": intent.extracted_query,
-                            "type": "deep",
-                            "note": "Deep web search capability will be integrated with external API"
-                        }
-
-                    # DOCUMENT SEARCH (RAG)
-                    elif intent.intent_type == IntentType.DOCUMENT_SEARCH:
-                        logger.info(
-                            "document_search_intent_detected",
-                            user_id=str(user_id),
-                            query=intent.extracted_query,
-                            intent_type="document_search",
-                        )
-                        intent_results["document_search_requested"] = {
-                            "query": intent.extracted_query,
-                            "note": "Document search will use RAG pipeline on user's uploaded documents"
-                        }
-
-                    # AUDIO TRANSCRIPTION
-                    elif intent.intent_type == IntentType.AUDIO_TRANSCRIPTION:
-                        logger.info(
-                            "audio_transcription_intent_detected",
-                            user_id=str(user_id),
-                            intent_type="audio_transcription",
-                        )
-                        intent_results["audio_transcription_requested"] = {
-                            "note": "Audio transcription will be processed via ASR service"
-                        }
-
-                    # DOCUMENT/CODE ANALYSIS
-                    elif intent.intent_type in [IntentType.DOCUMENT_ANALYSIS, IntentType.CODE_ANALYSIS]:
-                        logger.info(
-                            "analysis_intent_detected",
-                            user_id=str(user_id),
-                            intent_type=intent.intent_type.value,
-                        )
-                        intent_results["analysis_requested"] = {
-                            "type": intent.intent_type.value,
-                            "query": intent.extracted_query,
-                            "note": "Analysis will be performed on attached documents/code"
-                        }
-
-                except Exception as e:
+                graph.add(
+                    f"intent:{index}:{intent.intent_type.value}",
+                    functools.partial(
+                        self._execute_intent,
+                        intent=intent,
+                        user_id=user_id,
+                        conversation_id=conversation_id,
+                    ),
+                    timeout_seconds=INTENT_ACTION_TIMEOUTS.get(
+                        intent.intent_type, DEFAULT_INTENT_ACTION_TIMEOUT
+                    ),
                     # Don't fail the entire chat if intent execution fails
-                    logger.warning(
-                        "intent_execution_failed",
-                        user_id=str(user_id),
-                        intent_type=intent.intent_type.value,
-                        error=str(e),
-                    )
-                    # Continue with chat response
+                    required=False,
+                    on_complete=merge_intent_result,
+                )
 
         # Build messages from conversation history
-        messages = await self._build_messages(
-            conversation_id=conversation_id,
-            new_message=message_content,
-            system_prompt=system_prompt,
-            db=db,
+        graph.add(
+            "messages",
+            functools.partial(
+                self._build_messages,
+                conversation_id=conversation_id,
+                new_message=message_content,
+                system_prompt=system_prompt,
+                db=db,
+            ),
         )
+        graph.start()
+
+        try:
+            messages = await graph.result("messages")
+        except Exception:
+            graph.cancel()
+            raise
 
         # Determine caching settings
         use_caching = enable_caching if enable_caching is not None else settings.prompt_caching_enabled
@@ -242,7 +199,8 @@ class EnhancedChatService:
             "model": model or settings.llm_model,
             "user_id": user_id,
             "enable_caching": use_caching,
-            "temperature": temperature or settings.llm_temperature,
+            # 0.0 is a valid (deterministic) temperature
+            "temperature": temperature if temperature is not None else settings.llm_temperature,
             "max_tokens": max_tokens or settings.llm_max_tokens,
             "stream": enable_streaming,
         }
@@ -266,14 +224,14 @@ class EnhancedChatService:
                 "auto_detect_images": auto_detect_images,
                 "has_system_prompt": system_prompt is not None,
                 "has_response_schema": response_schema is not None,
-                "temperature": temperature or settings.llm_temperature,
+                "temperature": chat_params["temperature"],
                 "max_tokens": max_tokens or settings.llm_max_tokens,
                 "caching_enabled": use_caching,
                 "streaming": enable_streaming,
                 "num_messages": len(messages),
                 "message_content_length": len(message_content),
                 "intents_detected": [i.intent_type.value for i in detected_intents] if detected_intents else [],
-                "high_priority_intents": len([i for i in detected_intents if i.confidence >= 0.70 and i.priority >= 7]) if detected_intents else 0,
+                "high_priority_intents": len([i for i in detected_intents if i.is_actionable]) if detected_intents else 0,
             }
             chat_params["tags"] = ["chat", "enhanced-service", "openrouter"]
             if auto_detect_images:
@@ -295,30 +253,30 @@ class EnhancedChatService:
                 message_content=message_content,
                 chat_params=chat_params,
                 db=db,
+                intent_graph=graph,
+                intent_results=intent_results,
             )
 
         # Non-streaming response
         try:
             result = await self.openrouter.chat_completion(**chat_params)
 
-            # Save user message
-            user_message = await self._save_message(
-                conversation_id=conversation_id,
-                role="user",
-                content=message_content,
-                db=db,
-            )
-
             # Extract response content
             response_content = result["choices"][0]["message"]["content"]
 
-            # Save assistant message with usage metadata
-            assistant_message = await self._save_message(
+            # Persist both messages and the usage increment in one transaction
+            assistant_message_id = await self._persist_turn(
+                user_id=user_id,
                 conversation_id=conversation_id,
-                role="assistant",
-                content=response_content,
-                model_used=result["model"],
-                tokens_used=result["usage"]["total_tokens"],
+                user_content=message_content,
+                assistant_content=response_content,
+                tokens=result["usage"]["total_tokens"],
+                cost_usd=result.get("total_cost_usd", 0.0),
+                cache_savings_usd=result.get("cache_discount_usd", 0.0),
+                db=db,
+                llm_model=result["model"],
+                total_tokens_used=result["usage"]["total_tokens"],
+                estimated_cost_usd=result.get("total_cost_usd"),
                 cached_tokens_read=result.get("cached_tokens_read"),
                 cached_tokens_write=result.get("cached_tokens_write"),
                 cache_discount_usd=result.get("cache_discount_usd"),
@@ -329,21 +287,11 @@ class EnhancedChatService:
                 fallback_used=result.get("fallback_used", False),
                 models_attempted=result.get("models_attempted"),
                 final_model_used=result.get("final_model_used"),
-                response_schema=json.dumps(response_schema) if response_schema else None,
-                structured_data=json.dumps(result.get("structured_data")) if result.get("structured_data") else None,
+                response_schema=response_schema,
+                structured_data=result.get("structured_data"),
                 schema_validation_passed=result.get("schema_validation_passed", True),
                 langfuse_trace_id=langfuse_trace_id,
                 langfuse_observation_id=result.get("langfuse_observation_id"),
-                db=db,
-            )
-
-            # Track usage
-            await self._track_usage(
-                user_id=user_id,
-                tokens=result["usage"]["total_tokens"],
-                cost_usd=result.get("total_cost_usd", 0.0),
-                cache_savings_usd=result.get("cache_discount_usd", 0.0),
-                db=db,
             )
 
             logger.info(
@@ -356,7 +304,7 @@ class EnhancedChatService:
             )
 
             response = {
-                "message_id": assistant_message.id,
+                "message_id": assistant_message_id,
                 "content": response_content,
                 "model": result["model"],
                 "usage": result["usage"],
@@ -369,6 +317,9 @@ class EnhancedChatService:
                 "langfuse_observation_id": result.get("langfuse_observation_id"),
             }
 
+            # Wait for intent actions still running alongside the LLM call
+            await graph.wait_all()
+
             # Add intent results if any were executed
             if intent_results:
                 response["intent_results"] = intent_results
@@ -376,6 +327,7 @@ class EnhancedChatService:
             return response
 
         except Exception as e:
+            graph.cancel()
             logger.error(
                 "chat_completion_failed",
                 user_id=str(user_id),
@@ -391,28 +343,30 @@ class EnhancedChatService:
         message_content: str,
         chat_params: dict[str, Any],
         db: AsyncSession,
+        intent_graph: TaskGraph | None = None,
+        intent_results: dict[str, Any] | None = None,
     ) -> AsyncGenerator[str, None]:
         """
         Stream chat response.
 
-        Yields JSON lines with chunks and final metadata.
+        Yields JSON lines with chunks and final metadata. Intent actions
+        scheduled on intent_graph keep running while tokens stream; their
+        results are included in the final metadata.
         """
+        # The ID is sent to the client before the reply is written
+        assistant_message_id = uuid4()
+
         try:
-            # Save user message
-            user_message = await self._save_message(
-                conversation_id=conversation_id,
-                role="user",
-                content=message_content,
-                db=db,
-            )
+            # Write the question first so it survives a failed stream
+            await self._persist_user_message(user_id, conversation_id, message_content)
 
             # Variables to accumulate response
             full_content = ""
             usage_data = {}
             model_used = None
 
-            # Stream from OpenRouter
-            async for chunk in self.openrouter.chat_completion(**chat_params):
+            # Stream from OpenRouter (shared with identical in-flight requests)
+            async for chunk in self.openrouter.stream_chat_completion(**chat_params):
                 if "choices" in chunk and len(chunk["choices"]) > 0:
                     delta = chunk["choices"][0].get("delta", {})
                     content = delta.get("content", "")
@@ -428,34 +382,20 @@ class EnhancedChatService:
                 if "usage" in chunk:
                     usage_data = chunk["usage"]
 
-            # Save complete assistant message
-            assistant_message = await self._save_message(
-                conversation_id=conversation_id,
-                role="assistant",
-                content=full_content,
-                model_used=model_used or chat_params["model"],
-                tokens_used=usage_data.get("total_tokens", 0),
-                cached_tokens_read=usage_data.get("prompt_tokens_details", {}).get("cached_tokens"),
-                db=db,
-            )
-
-            # Track usage
-            if usage_data.get("total_tokens"):
-                await self._track_usage(
-                    user_id=user_id,
-                    tokens=usage_data["total_tokens"],
-                    cost_usd=0.0,  # Calculate from usage
-                    cache_savings_usd=0.0,
-                    db=db,
-                )
+            # Wait for intent actions still running alongside the stream
+            if intent_graph is not None:
+                await intent_graph.wait_all()
 
             # Yield final metadata
-            yield json.dumps({
+            metadata = {
                 "type": "metadata",
-                "message_id": str(assistant_message.id),
+                "message_id": str(assistant_message_id),
                 "model": model_used,
                 "usage": usage_data,
-            }) + "\n"
+            }
+            if intent_results:
+                metadata["intent_results"] = intent_results
+            yield json.dumps(metadata, default=str) + "\n"
 
             logger.info(
                 "chat_stream_completed",
@@ -472,6 +412,249 @@ class EnhancedChatService:
             )
             # Yield error
             yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+            return
+
+        finally:
+            # Also runs on client disconnect (GeneratorExit at a yield),
+            # which the except above doesn't catch
+            if intent_graph is not None:
+                intent_graph.cancel()
+
+        # Persist the reply after the response has been delivered.
+        # Streamed chunks carry no cost, so price the usage from the model catalog.
+        tokens = usage_data.get("total_tokens", 0)
+        llm_model = model_used or chat_params["model"]
+        cost_usd = usage_data.get("cost")
+        if cost_usd is None:
+            cost_usd = model_catalog_service.compute_cost(llm_model, usage_data)
+        cache_savings_usd = model_catalog_service.compute_cache_savings(llm_model, usage_data)
+        self._persist_turn_in_background(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            user_content=None,
+            assistant_content=full_content,
+            tokens=tokens,
+            cost_usd=cost_usd or 0.0,
+            cache_savings_usd=cache_savings_usd,
+            assistant_message_id=assistant_message_id,
+            llm_model=llm_model,
+            total_tokens_used=tokens,
+            estimated_cost_usd=cost_usd,
+            cached_tokens_read=(usage_data.get("prompt_tokens_details") or {}).get("cached_tokens"),
+            cache_discount_usd=cache_savings_usd or None,
+        )
+
+    async def _persist_user_message(self, user_id: UUID, conversation_id: UUID, content: str) -> None:
+        """
+        Persist the user message of a streamed turn before streaming starts.
+
+        Uses its own database session because the request session may be
+        closed while the response streams.
+        """
+        async with AsyncSessionLocal() as session:
+            unit = ChatTurnUnitOfWork(db=session, user_id=user_id, conversation_id=conversation_id)
+            unit.add_message(role="user", content=content)
+            await unit.commit()
+
+    async def _persist_turn(
+        self,
+        user_id: UUID,
+        conversation_id: UUID,
+        user_content: str | None,
+        assistant_content: str,
+        tokens: int,
+        cost_usd: float,
+        cache_savings_usd: float,
+        db: AsyncSession,
+        assistant_message_id: UUID | None = None,
+        **assistant_fields: Any,
+    ) -> UUID:
+        """
+        Persist a chat turn in a single transaction.
+
+        Inserts the user and assistant messages (RETURNING instead of
+        refresh), bumps the conversation counters and records the usage
+        increment, then commits once.
+
+        Args:
+            user_content: User message, or None if it was already persisted
+
+        Returns:
+            Assistant message ID
+        """
+        unit = ChatTurnUnitOfWork(db=db, user_id=user_id, conversation_id=conversation_id)
+        if user_content is not None:
+            unit.add_message(role="user", content=user_content)
+        assistant_message = unit.add_message(
+            role="assistant",
+            content=assistant_content,
+            message_id=assistant_message_id,
+            **assistant_fields,
+        )
+        if tokens:
+            # The message itself was counted when the quota was checked
+            unit.add_usage(
+                tokens=tokens,
+                cost_usd=cost_usd,
+                cache_savings_usd=cache_savings_usd,
+            )
+
+        await unit.commit()
+
+        return assistant_message.id
+
+    def _persist_turn_in_background(self, user_id: UUID, conversation_id: UUID, **kwargs: Any) -> None:
+        """
+        Persist a chat turn without blocking the response.
+
+        Uses its own database session because the request session may be
+        closed once the response has been sent.
+        """
+        async def write() -> None:
+            try:
+                async with AsyncSessionLocal() as session:
+                    await self._persist_turn(
+                        user_id=user_id,
+                        conversation_id=conversation_id,
+                        db=session,
+                        **kwargs,
+                    )
+            except Exception as e:
+                logger.error(
+                    "chat_turn_background_persist_failed",
+                    user_id=str(user_id),
+                    conversation_id=str(conversation_id),
+                    error=str(e),
+                )
+
+        task = asyncio.create_task(write())
+        # Keep a reference so the task isn't garbage collected mid-write
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _refine_intents(self, message_content: str, intents: list[Intent]) -> list[Intent]:
+        """
+        Verify ambiguous action intents with the centroid classifier.
+
+        The query is only embedded when the classifier is configured and a
+        keyword or pattern alone matched an action intent. If the embedding
+        fails, keyword-only intents stay unconfirmed and aren't executed.
+        """
+        if intent_detector.classifier is None or not intent_detector.is_ambiguous(intents):
+            return intents
+
+        try:
+            embedding = await embeddings_service.embed_text(message_content)
+        except Exception as e:
+            logger.warning("intent_refinement_failed", error=str(e))
+            return intents
+
+        return intent_detector.refine_intents(message_content, intents, embedding)
+
+    async def _execute_intent(
+        self,
+        intent: Intent,
+        user_id: UUID,
+        conversation_id: UUID,
+    ) -> tuple[str, Any] | None:
+        """
+        Execute the action for a detected intent.
+
+        Runs concurrently with the rest of the chat turn, so actions that
+        touch the database use their own session.
+
+        Returns:
+            (intent_results key, value) or None if the intent has no action
+        """
+        # IMAGE GENERATION
+        if intent.intent_type == IntentType.IMAGE_GENERATION and settings.image_generation_enabled:
+            logger.info(
+                "executing_image_generation_intent",
+                user_id=str(user_id),
+                prompt=intent.extracted_query,
+            )
+
+            async with AsyncSessionLocal() as action_db:
+                generated_image = await image_generation_service.generate_image(
+                    prompt=intent.extracted_query,
+                    user_id=user_id,
+                    db=action_db,
+                    conversation_id=conversation_id,
+                )
+
+            logger.info(
+                "image_generation_intent_success",
+                user_id=str(user_id),
+                image_id=str(generated_image["id"]),
+            )
+            return "generated_image", generated_image
+
+        # WEB SEARCH
+        if intent.intent_type == IntentType.WEB_SEARCH:
+            logger.info(
+                "web_search_intent_detected",
+                user_id=str(user_id),
+                query=intent.extracted_query,
+                intent_type="web_search",
+            )
+            return "web_search_requested", {
+                "query": intent.extracted_query,
+                "type": "standard",
+                "note": "Web search capability will be integrated with external API"
+            }
+
+        # DEEP WEB SEARCH
+        if intent.intent_type == IntentType.DEEP_WEB_SEARCH:
+            logger.info(
+                "deep_web_search_intent_detected",
+                user_id=str(user_id),
+                query=intent.extracted_query,
+                intent_type="deep_web_search",
+            )
+            return "web_search_requested", {
+                "query": intent.extracted_query,
+                "type": "deep",
+                "note": "Deep web search capability will be integrated with external API"
+            }
+
+        # DOCUMENT SEARCH (RAG)
+        if intent.intent_type == IntentType.DOCUMENT_SEARCH:
+            logger.info(
+                "document_search_intent_detected",
+                user_id=str(user_id),
+                query=intent.extracted_query,
+                intent_type="document_search",
+            )
+            return "document_search_requested", {
+                "query": intent.extracted_query,
+                "note": "Document search will use RAG pipeline on user's uploaded documents"
+            }
+
+        # AUDIO TRANSCRIPTION
+        if intent.intent_type == IntentType.AUDIO_TRANSCRIPTION:
+            logger.info(
+                "audio_transcription_intent_detected",
+                user_id=str(user_id),
+                intent_type="audio_transcription",
+            )
+            return "audio_transcription_requested", {
+                "note": "Audio transcription will be processed via ASR service"
+            }
+
+        # DOCUMENT/CODE ANALYSIS
+        if intent.intent_type in [IntentType.DOCUMENT_ANALYSIS, IntentType.CODE_ANALYSIS]:
+            logger.info(
+                "analysis_intent_detected",
+                user_id=str(user_id),
+                intent_type=intent.intent_type.value,
+            )
+            return "analysis_requested", {
+                "type": intent.intent_type.value,
+                "query": intent.extracted_query,
+                "note": "Analysis will be performed on attached documents/code"
+            }
+
+        return None
 
     async def _build_messages(
         self,
@@ -480,103 +663,61 @@ class EnhancedChatService:
         system_prompt: str | None,
         db: AsyncSession,
     ) -> list[dict[str, Any]]:
-        """Build messages array from conversation history."""
-        from sqlalchemy import select
+        """
+        Build messages array from conversation history.
 
+        History is read from the Redis context cache when the conversation is
+        hot; PostgreSQL is only queried (and the cache primed) on a miss.
+        """
         messages = []
 
         # Add system prompt if provided
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
 
-        # Load conversation history
-        result = await db.execute(
-            select(Message)
-            .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at)
-        )
-        history = result.scalars().all()
+        # Load conversation history (cache first)
+        context = await self._load_context(conversation_id=conversation_id, db=db)
 
         # Add historical messages
-        for msg in history:
-            messages.append({"role": msg.role, "content": msg.content})
+        for msg in context.messages:
+            messages.append({"role": msg["role"], "content": msg["content"]})
 
         # Add new user message
         messages.append({"role": "user", "content": new_message})
 
         return messages
 
-    async def _save_message(
+    async def _load_context(
         self,
         conversation_id: UUID,
-        role: str,
-        content: str,
         db: AsyncSession,
-        model_used: str | None = None,
-        tokens_used: int | None = None,
-        cached_tokens_read: int | None = None,
-        cached_tokens_write: int | None = None,
-        cache_discount_usd: float | None = None,
-        cache_breakpoint_count: int = 0,
-        reasoning_tokens: int | None = None,
-        upstream_inference_cost_usd: float | None = None,
-        routing_strategy: str | None = None,
-        fallback_used: bool = False,
-        models_attempted: list[str] | None = None,
-        final_model_used: str | None = None,
-        response_schema: str | None = None,
-        structured_data: str | None = None,
-        schema_validation_passed: bool = True,
-        langfuse_trace_id: str | None = None,
-        langfuse_observation_id: str | None = None,
-    ) -> Message:
-        """Save a message to the database."""
-        message = Message(
-            conversation_id=conversation_id,
-            role=role,
-            content=content,
-            model_used=model_used,
-            tokens_used=tokens_used,
-            cached_tokens_read=cached_tokens_read,
-            cached_tokens_write=cached_tokens_write,
-            cache_discount_usd=cache_discount_usd,
-            cache_breakpoint_count=cache_breakpoint_count,
-            reasoning_tokens=reasoning_tokens,
-            upstream_inference_cost_usd=upstream_inference_cost_usd,
-            routing_strategy=routing_strategy,
-            fallback_used=fallback_used,
-            models_attempted=models_attempted,
-            final_model_used=final_model_used,
-            response_schema=response_schema,
-            structured_data=structured_data,
-            schema_validation_passed=schema_validation_passed,
-            langfuse_trace_id=langfuse_trace_id,
-            langfuse_observation_id=langfuse_observation_id,
-        )
+    ) -> ConversationContext:
+        """Load recent conversation history from cache, falling back to PostgreSQL."""
+        from sqlalchemy import select
 
-        db.add(message)
-        await db.commit()
-        await db.refresh(message)
+        cached = await conversation_cache_service.get_context(conversation_id)
+        if cached is not None:
+            return cached
+
+        # Load only the prompt window (newest first), identical to a cache hit
+        max_messages = settings.conversation_cache_max_messages
+        history = []
+        if max_messages > 0:
+            result = await db.execute(
+                select(Message)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at.desc())
+                .limit(max_messages)
+            )
+            history = [
+                conversation_cache_service.serialize_message(msg)
+                for msg in reversed(result.scalars().all())
+            ]
+        context = ConversationContext(messages=history)
 
-        return message
+        await conversation_cache_service.prime(conversation_id, context.messages)
 
-    async def _track_usage(
-        self,
-        user_id: UUID,
-        tokens: int,
-        cost_usd: float,
-        cache_savings_usd: float,
-        db: AsyncSession,
-    ) -> None:
-        """Track usage for the user."""
-        await subscription_service.track_usage(
-            user_id=user_id,
-            db=db,
-            messages=1,
-            tokens=tokens,
-            cost_usd=cost_usd,
-            cache_savings_usd=cache_savings_usd,
-        )
+        return context
 
 
 # Global service instance
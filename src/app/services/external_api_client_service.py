@@ -9,7 +9,9 @@ from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
+from app.core.security import generate_api_key_prefix, hash_api_key
 from app.models.external_api import ExternalAPIClient, APIUsageLog
+from app.services.rate_limit_policy_service import rate_limit_policy_service
 
 logger = get_logger(__name__)
 
@@ -61,7 +63,7 @@ class ExternalAPIClientService:
         api_secret = f"sk_{secrets.token_urlsafe(48)}"
 
         # In production, hash the secret
-        api_key_hash = secrets.token_hex(16)
+        api_key_hash = hash_api_key(api_key)
         api_secret_hash = secrets.token_hex(24)
 
         # Create client
@@ -70,6 +72,7 @@ class ExternalAPIClientService:
             app_name=app_name,
             app_description=app_description,
             api_key_hash=api_key_hash,
+            api_key_prefix=generate_api_key_prefix(api_key),
             api_secret_hash=api_secret_hash,
             callback_url=callback_url,
             allowed_origins=allowed_origins or [],
@@ -266,6 +269,9 @@ class ExternalAPIClientService:
             owner_user_id=str(owner_user_id),
         )
 
+        # Pick up new limits / status in the rate limiter right away
+        await rate_limit_policy_service.invalidate_api_client(client_id)
+
         return {
             "client_id": str(client.id),
             "app_name": client.app_name,
@@ -354,6 +360,9 @@ class ExternalAPIClientService:
             owner_user_id=str(owner_user_id),
         )
 
+        # Pick up new limits / status in the rate limiter right away
+        await rate_limit_policy_service.invalidate_api_client(client_id)
+
         return {
             "client_id": str(client_id),
             "app_name": client.app_name,
@@ -395,6 +404,9 @@ class ExternalAPIClientService:
             owner_user_id=str(owner_user_id),
         )
 
+        # Pick up new limits / status in the rate limiter right away
+        await rate_limit_policy_service.invalidate_api_client(client_id)
+
         return {
             "client_id": str(client_id),
             "app_name": client.app_name,
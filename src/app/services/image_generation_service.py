@@ -1,16 +1,19 @@
 """Image generation service using OpenRouter with Langfuse tracing."""
 
-from datetime import datetime
 from typing import Any, Literal
 from uuid import UUID
 
 import httpx
+from app.core.circuit_breaker import circuit_breaker_registry
 from app.core.config import settings
+from app.core.http_client import get_http_client
 from app.core.logging import get_logger
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.subscription import GeneratedImage, MonthlyUsageQuota, PlanLimit
+from app.models.subscription import GeneratedImage
+from app.services.plan_cache_service import plan_cache_service
+from app.services.usage_quota_service import usage_quota_service
 
 # Import Langfuse observe decorator when enabled
 if settings.langfuse_enabled:
@@ -47,6 +50,15 @@ class ImageGenerationService:
         self.app_url = settings.openrouter_app_url
         self.app_name = settings.openrouter_app_name
 
+        # Circuit breaker + bulkhead for the OpenRouter images endpoint
+        self.circuit_breaker = circuit_breaker_registry.get_or_create(
+            name="openrouter_images",
+            failure_threshold=5,
+            recovery_timeout=60,
+            timeout_seconds=125,  # Above the 120s request timeout
+            max_concurrent=20,
+        )
+
         logger.info("image_generation_service_initialized")
 
     @observe(name="image-generation")
@@ -82,9 +94,6 @@ class ImageGenerationService:
         if not settings.image_generation_enabled:
             raise ValueError("Image generation is not enabled")
 
-        # Check user's plan and quota
-        await self._check_user_quota(user_id, db)
-
         # Select model
         selected_model = model or settings.image_generation_models[0]
 
@@ -103,16 +112,12 @@ class ImageGenerationService:
         if output_format == "base64":
             payload["response_format"] = "b64_json"
 
+        # Check the user's plan and reserve the image against the monthly quota
+        await self._check_user_quota(user_id, db)
+
+        generated = False
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/images/generations",
-                    json=payload,
-                    headers=self._get_headers(),
-                    timeout=120.0,
-                )
-                response.raise_for_status()
-                data = response.json()
+            data = await self.circuit_breaker.call(self._post_generation, payload)
 
             # Parse response
             result = self._parse_response(data, output_format)
@@ -133,12 +138,13 @@ class ImageGenerationService:
             )
             db.add(generated_image)
 
-            # Update quota
-            await self._update_usage_quota(user_id, db, cost_usd)
-
             await db.commit()
+            generated = True
             await db.refresh(generated_image)
 
+            # The image itself was counted when it was reserved
+            await usage_quota_service.record(user_id, cost_usd=cost_usd)
+
             logger.info(
                 "image_generated",
                 user_id=str(user_id),
@@ -170,24 +176,30 @@ class ImageGenerationService:
             logger.error("image_generation_error", error=str(e))
             raise
 
+        finally:
+            if not generated:
+                await usage_quota_service.refund(user_id, images=1)
+
     async def _check_user_quota(self, user_id: UUID, db: AsyncSession) -> None:
-        """Check if user has quota for image generation."""
-        # Get user's plan
-        from app.models.subscription import Subscription
+        """
+        Check the user's plan and reserve one image of their monthly quota.
 
-        result = await db.execute(
-            select(Subscription).where(Subscription.user_id == user_id)
-        )
-        subscription = result.scalar_one_or_none()
+        With Redis counters the limit check and the increment are one
+        atomic step, so parallel requests can't all pass the check before
+        any of them is counted.
+        The caller refunds the reservation if generation fails.
+
+        Raises:
+            ValueError: If the plan doesn't allow images or the limit is reached
+        """
+        # Get user's plan
+        subscription = await plan_cache_service.get_subscription(user_id, db)
 
         if not subscription:
             raise ValueError("No active subscription found")
 
         # Get plan limits
-        result = await db.execute(
-            select(PlanLimit).where(PlanLimit.plan_type == subscription.plan_type)
-        )
-        plan_limit = result.scalar_one_or_none()
+        plan_limit = await plan_cache_service.get_plan(subscription.plan_type, db)
 
         if not plan_limit:
             raise ValueError(f"Plan limits not found for {subscription.plan_type}")
@@ -198,47 +210,22 @@ class ImageGenerationService:
                 f"Image generation not available on {subscription.plan_type} plan"
             )
 
-        # Get current month usage
-        month_year = datetime.utcnow().strftime("%Y-%m")
-        result = await db.execute(
-            select(MonthlyUsageQuota).where(
-                MonthlyUsageQuota.user_id == user_id,
-                MonthlyUsageQuota.month_year == month_year,
+        quota = await usage_quota_service.consume(user_id, images=1)
+        if not quota.allowed:
+            raise ValueError(
+                f"Monthly image generation limit reached ({plan_limit.max_images_per_month})"
             )
-        )
-        quota = result.scalar_one_or_none()
 
-        if quota:
-            if quota.images_generated >= plan_limit.max_images_per_month:
-                raise ValueError(
-                    f"Monthly image generation limit reached ({plan_limit.max_images_per_month})"
-                )
-
-    async def _update_usage_quota(
-        self, user_id: UUID, db: AsyncSession, cost_usd: float
-    ) -> None:
-        """Update user's monthly usage quota."""
-        month_year = datetime.utcnow().strftime("%Y-%m")
-
-        result = await db.execute(
-            select(MonthlyUsageQuota).where(
-                MonthlyUsageQuota.user_id == user_id,
-                MonthlyUsageQuota.month_year == month_year,
-            )
+    async def _post_generation(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """POST an image generation request and return the JSON body."""
+        response = await get_http_client("openrouter").post(
+            f"{self.base_url}/images/generations",
+            json=payload,
+            headers=self._get_headers(),
+            timeout=120.0,
         )
-        quota = result.scalar_one_or_none()
-
-        if quota:
-            quota.images_generated += 1
-            quota.total_cost_usd += cost_usd
-        else:
-            quota = MonthlyUsageQuota(
-                user_id=user_id,
-                month_year=month_year,
-                images_generated=1,
-                total_cost_usd=cost_usd,
-            )
-            db.add(quota)
+        response.raise_for_status()
+        return response.json()
 
     def _get_headers(self) -> dict[str, str]:
         """Get request headers."""
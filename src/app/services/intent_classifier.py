@@ -0,0 +1,170 @@
+"""
+Embedding-centroid intent classifier.
+
+Second stage of intent detection: each intent is represented by the
+normalized mean embedding (centroid) of labelled example queries. A query
+is scored against every intent with a single matrix-vector product over
+the query embedding the RAG pipeline already computes, so classification
+costs no API call and a few microseconds.
+
+Centroids are built offline with scripts/build_intent_centroids.py and
+stored as a NumPy .npz file (labels + centroid matrix).
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Sequence
+
+from app.core.logging import get_logger
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CentroidPrediction:
+    """Classifier result for a query embedding."""
+
+    intent: str  # Best matching intent label
+    score: float  # Cosine similarity to the best centroid
+    scores: dict[str, float]  # Cosine similarity per intent label
+
+
+class IntentCentroidClassifier:
+    """Nearest-centroid intent classifier over query embeddings."""
+
+    def __init__(self, labels: Sequence[str], centroids: "np.ndarray"):
+        """
+        Initialize classifier.
+
+        Args:
+            labels: Intent label per centroid row (IntentType values)
+            centroids: Centroid matrix (labels x embedding dimension)
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+            ValueError: If labels and centroids don't line up
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for the intent classifier")
+
+        matrix = np.asarray(centroids, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(labels):
+            raise ValueError(
+                f"Expected {len(labels)} centroids, got matrix of shape {matrix.shape}"
+            )
+
+        # Normalize rows so the dot product is the cosine similarity
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.centroids = np.ascontiguousarray(matrix / norms)
+        self.labels = list(labels)
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension the centroids were built for."""
+        return self.centroids.shape[1]
+
+    @classmethod
+    def from_examples(
+        cls, examples: dict[str, Sequence[Sequence[float]]]
+    ) -> "IntentCentroidClassifier":
+        """
+        Build centroids from labelled example embeddings.
+
+        Args:
+            examples: Example query embeddings per intent label
+
+        Returns:
+            Classifier with one centroid per label
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for the intent classifier")
+
+        labels = []
+        centroids = []
+        for label, embeddings in examples.items():
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+            labels.append(label)
+            centroids.append(matrix.mean(axis=0))
+
+        return cls(labels, np.vstack(centroids))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "IntentCentroidClassifier":
+        """Load centroids saved with save()."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls([str(label) for label in data["labels"]], data["centroids"])
+
+    def save(self, path: str | Path) -> None:
+        """Save labels and centroids as an .npz file."""
+        np.savez(path, labels=np.asarray(self.labels), centroids=self.centroids)
+
+    def predict(self, embedding: Sequence[float]) -> Optional[CentroidPrediction]:
+        """
+        Score a query embedding against every intent centroid.
+
+        Args:
+            embedding: Query embedding
+
+        Returns:
+            CentroidPrediction, or None if the embedding doesn't fit the centroids
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        if query.shape != (self.dimension,):
+            return None
+
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0:
+            return None
+
+        scores = self.centroids @ query / norm
+        best = int(np.argmax(scores))
+
+        return CentroidPrediction(
+            intent=self.labels[best],
+            score=float(scores[best]),
+            scores=dict(zip(self.labels, scores.tolist())),
+        )
+
+
+@lru_cache(maxsize=None)
+def load_intent_classifier(path: Optional[str]) -> Optional[IntentCentroidClassifier]:
+    """
+    Load the centroid classifier if it is configured and available.
+
+    Args:
+        path: Path to the centroids .npz file (None disables the classifier)
+
+    Returns:
+        Classifier, or None if disabled, NumPy is missing or loading failed
+    """
+    if not path:
+        return None
+
+    if np is None:
+        logger.warning("intent_classifier_disabled", reason="numpy not installed")
+        return None
+
+    try:
+        classifier = IntentCentroidClassifier.load(path)
+    except Exception as e:
+        logger.warning("intent_classifier_load_failed", path=path, error=str(e))
+        return None
+
+    logger.info(
+        "intent_classifier_loaded",
+        path=path,
+        labels=classifier.labels,
+        dimension=classifier.dimension,
+    )
+    return classifier
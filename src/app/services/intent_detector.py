@@ -5,7 +5,10 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Optional
 
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.services.intent_classifier import IntentCentroidClassifier, load_intent_classifier
+from app.utils.aho_corasick import AhoCorasick, Match
 
 logger = get_logger(__name__)
 
@@ -32,6 +35,10 @@ class IntentType(str, Enum):
     TOOL_USAGE = "tool_usage"
 
 
+# Minimum confidence for an intent to trigger its action
+ACTION_MIN_CONFIDENCE = 0.70
+
+
 @dataclass
 class Intent:
     """Detected intent with metadata."""
@@ -42,6 +49,20 @@ class Intent:
     metadata: dict = field(default_factory=dict)
     priority: int = 0  # Higher priority executes first
 
+    @property
+    def is_actionable(self) -> bool:
+        """
+        Whether the intent is confident enough to trigger its action.
+
+        A lone keyword is how paraphrases misfire, so when the centroid
+        classifier is configured an intent matched only by a keyword also
+        needs its confirmation. Without a classifier the confidence and
+        priority gate alone decides.
+        """
+        if self.confidence < ACTION_MIN_CONFIDENCE or self.priority < IntentDetector.ACTION_PRIORITY:
+            return False
+        return not self.metadata.get("needs_confirmation") or "classifier_score" in self.metadata
+
     def __repr__(self) -> str:
         return f"Intent({self.intent_type.value}, conf={self.confidence:.2f}, query={self.extracted_query[:30] if self.extracted_query else None})"
 
@@ -65,6 +86,9 @@ class IntentDetector:
     - Priority ordering
     - Query extraction for each intent
     - Support for Persian, English, and Arabic
+    - Single-pass matching: one Aho-Corasick automaton over all keywords and
+      one combined regex over all patterns, both tagged by intent category
+    - Optional embedding-centroid second stage for ambiguous action intents
 
     Fully supports Persian, English, and Arabic keywords for all intent categories.
     """
@@ -220,37 +244,112 @@ class IntentDetector:
         r"\?$",  # Ends with question mark
     ]
 
-    def __init__(self):
-        """Initialize comprehensive intent detector."""
-        # Compile patterns for efficiency
+    # Intents at or above this priority trigger actions (image generation, search, ...)
+    ACTION_PRIORITY = 7
+
+    # Keyword/pattern category behind each action intent
+    INTENT_CATEGORIES = {
+        IntentType.IMAGE_GENERATION: "image",
+        IntentType.DEEP_WEB_SEARCH: "deep_web_search",
+        IntentType.WEB_SEARCH: "web_search",
+        IntentType.DOCUMENT_SEARCH: "document_search",
+        IntentType.AUDIO_TRANSCRIPTION: "audio",
+        IntentType.DOCUMENT_ANALYSIS: "analysis",
+        IntentType.CODE_ANALYSIS: "analysis",
+    }
+
+    def __init__(self, classifier: Optional[IntentCentroidClassifier] = None):
+        """
+        Initialize comprehensive intent detector.
+
+        Args:
+            classifier: Second-stage centroid classifier (loaded from
+                settings.intent_classifier_centroids_path if None)
+        """
+        self.classifier = classifier or load_intent_classifier(
+            settings.intent_classifier_centroids_path
+        )
+
+        # Keywords and patterns per intent category
+        self.category_rules: dict[str, tuple[list[str], list[str]]] = {
+            "image": (self.IMAGE_KEYWORDS, self.IMAGE_PATTERNS),
+            "deep_web_search": (self.DEEP_WEB_SEARCH_KEYWORDS, self.DEEP_WEB_SEARCH_PATTERNS),
+            "web_search": (self.WEB_SEARCH_KEYWORDS, self.WEB_SEARCH_PATTERNS),
+            "document_search": (self.DOCUMENT_SEARCH_KEYWORDS, self.DOCUMENT_SEARCH_PATTERNS),
+            "audio": (self.AUDIO_KEYWORDS, self.AUDIO_PATTERNS),
+            "analysis": (self.ANALYSIS_KEYWORDS, self.ANALYSIS_PATTERNS),
+        }
+
+        # One automaton over all keywords, tagged with (category, keyword index)
+        self.keyword_matcher: AhoCorasick[tuple[str, int]] = AhoCorasick(
+            (keyword.lower(), (category, index))
+            for category, (keywords, _) in self.category_rules.items()
+            for index, keyword in enumerate(keywords)
+        )
+
+        # One regex over all patterns; each category is a named zero-width
+        # lookahead so matches of different categories may overlap. Every
+        # pattern starts with an English letter, so other positions (e.g. all
+        # of a Persian message) are skipped before trying the alternatives.
+        self.category_patterns = {
+            category: re.compile(self._alternation(patterns), re.IGNORECASE)
+            for category, (_, patterns) in self.category_rules.items()
+        }
+        self.intent_pattern = re.compile(
+            "(?=[a-z])(?:"
+            + "|".join(
+                f"(?=(?P<{category}>{self._alternation(patterns)}))"
+                for category, (_, patterns) in self.category_rules.items()
+            )
+            + ")",
+            re.IGNORECASE,
+        )
+
         self.image_patterns = [re.compile(p, re.IGNORECASE) for p in self.IMAGE_PATTERNS]
-        self.web_search_patterns = [re.compile(p, re.IGNORECASE) for p in self.WEB_SEARCH_PATTERNS]
-        self.deep_search_patterns = [re.compile(p, re.IGNORECASE) for p in self.DEEP_WEB_SEARCH_PATTERNS]
-        self.doc_search_patterns = [re.compile(p, re.IGNORECASE) for p in self.DOCUMENT_SEARCH_PATTERNS]
-        self.audio_patterns = [re.compile(p, re.IGNORECASE) for p in self.AUDIO_PATTERNS]
-        self.analysis_patterns = [re.compile(p, re.IGNORECASE) for p in self.ANALYSIS_PATTERNS]
-        self.question_patterns = [re.compile(p, re.IGNORECASE) for p in self.QUESTION_PATTERNS]
+        self.question_pattern = re.compile(self._alternation(self.QUESTION_PATTERNS), re.IGNORECASE)
+
+        logger.info(
+            "intent_detector_initialized",
+            keywords_loaded=self.keyword_matcher.pattern_count,
+            categories=len(self.category_rules),
+        )
 
-        logger.info("intent_detector_initialized", patterns_loaded=7)
+    @staticmethod
+    def _alternation(patterns: list[str]) -> str:
+        """Combine regex patterns into one alternation."""
+        return "|".join(f"(?:{pattern})" for pattern in patterns)
 
-    def detect_intents(self, message: str, context: Optional[dict] = None) -> list[Intent]:
+    def detect_intents(
+        self,
+        message: str,
+        context: Optional[dict] = None,
+        query_embedding: Optional[list[float]] = None,
+    ) -> list[Intent]:
         """
         Detect all intents in a message with confidence scores.
 
         Args:
             message: User message text
             context: Optional context (e.g., has_documents, has_audio, etc.)
+            query_embedding: Precomputed query embedding for the second stage (optional)
 
         Returns:
             List of detected intents, sorted by priority (highest first)
         """
-        message_lower = message.lower().strip()
+        lowered = message.lower()
+        message_lower = lowered.strip()
         intents = []
         context = context or {}
 
+        # Single pass over keywords and patterns for all categories
+        keyword_matches = list(self.keyword_matcher.iter_matches(lowered))
+        keyword_categories = {match.value[0] for match in keyword_matches}
+        pattern_categories = self._pattern_categories(message_lower)
+        matched = keyword_categories | pattern_categories
+
         # 1. Check for image generation (Priority: 10)
-        if self._check_intent(message_lower, self.IMAGE_KEYWORDS, self.image_patterns):
-            extracted_prompt = self._extract_image_prompt(message)
+        if "image" in matched:
+            extracted_prompt = self._extract_image_prompt(message, keyword_matches)
             intents.append(Intent(
                 intent_type=IntentType.IMAGE_GENERATION,
                 confidence=0.95,
@@ -260,7 +359,7 @@ class IntentDetector:
             ))
 
         # 2. Check for deep web search (Priority: 9 - must check before regular web search)
-        if self._check_intent(message_lower, self.DEEP_WEB_SEARCH_KEYWORDS, self.deep_search_patterns):
+        if "deep_web_search" in matched:
             query = self._extract_search_query(message, self.DEEP_WEB_SEARCH_KEYWORDS)
             intents.append(Intent(
                 intent_type=IntentType.DEEP_WEB_SEARCH,
@@ -271,7 +370,7 @@ class IntentDetector:
             ))
 
         # 3. Check for regular web search (Priority: 8)
-        elif self._check_intent(message_lower, self.WEB_SEARCH_KEYWORDS, self.web_search_patterns):
+        elif "web_search" in matched:
             query = self._extract_search_query(message, self.WEB_SEARCH_KEYWORDS)
             intents.append(Intent(
                 intent_type=IntentType.WEB_SEARCH,
@@ -282,7 +381,7 @@ class IntentDetector:
             ))
 
         # 4. Check for document search (Priority: 9 - high because it's user's own data)
-        if self._check_intent(message_lower, self.DOCUMENT_SEARCH_KEYWORDS, self.doc_search_patterns):
+        if "document_search" in matched:
             query = self._extract_search_query(message, self.DOCUMENT_SEARCH_KEYWORDS)
             confidence = 0.92 if context.get("has_documents") else 0.70
             intents.append(Intent(
@@ -294,7 +393,7 @@ class IntentDetector:
             ))
 
         # 5. Check for audio transcription (Priority: 8)
-        if self._check_intent(message_lower, self.AUDIO_KEYWORDS, self.audio_patterns):
+        if "audio" in matched:
             confidence = 0.95 if context.get("has_audio") else 0.75
             intents.append(Intent(
                 intent_type=IntentType.AUDIO_TRANSCRIPTION,
@@ -305,7 +404,7 @@ class IntentDetector:
             ))
 
         # 6. Check for analysis requests (Priority: 7)
-        if self._check_intent(message_lower, self.ANALYSIS_KEYWORDS, self.analysis_patterns):
+        if "analysis" in matched:
             confidence = 0.85 if (context.get("has_documents") or context.get("has_code")) else 0.65
             # Determine if it's code or document analysis
             if "code" in message_lower or context.get("has_code"):
@@ -322,7 +421,7 @@ class IntentDetector:
             ))
 
         # 7. Check if it's a question (Priority: 3 - lower priority, most messages might match)
-        if any(pattern.search(message) for pattern in self.question_patterns):
+        if self.question_pattern.search(message):
             intents.append(Intent(
                 intent_type=IntentType.QUESTION_ANSWER,
                 confidence=0.60,
@@ -331,19 +430,29 @@ class IntentDetector:
                 metadata={"is_question": True}
             ))
 
+        # Record which stage-one signals matched each action intent
+        for intent in intents:
+            category = self.INTENT_CATEGORIES.get(intent.intent_type)
+            if category is not None:
+                intent.metadata["matched_by"] = [
+                    source
+                    for source, categories in (("keyword", keyword_categories), ("pattern", pattern_categories))
+                    if category in categories
+                ]
+                # Only a configured classifier can confirm a lone keyword
+                if self.classifier is not None and intent.metadata["matched_by"] == ["keyword"]:
+                    intent.metadata["needs_confirmation"] = True
+
         # 8. Default to conversation if no strong intents detected (Priority: 1)
-        if not intents or all(i.confidence < 0.70 for i in intents):
-            intents.append(Intent(
-                intent_type=IntentType.CONVERSATION,
-                confidence=0.50,
-                extracted_query=message,
-                priority=1,
-                metadata={"default_intent": True}
-            ))
+        self._add_conversation_fallback(message, intents)
 
         # Sort by priority (highest first)
         intents.sort(key=lambda x: x.priority, reverse=True)
 
+        # Second stage for ambiguous action intents
+        if query_embedding is not None:
+            intents = self.refine_intents(message, intents, query_embedding)
+
         # Log detected intents
         if intents:
             logger.info(
@@ -370,45 +479,157 @@ class IntentDetector:
         intents = self.detect_intents(message, context)
         return intents[0] if intents else None
 
-    def _check_intent(
+    def is_ambiguous(self, intents: list[Intent]) -> bool:
+        """
+        Check whether stage one is unsure about an action intent.
+
+        An action intent is ambiguous when only one of its signals (keyword
+        or pattern) matched; a lone keyword is how paraphrases misfire.
+
+        Args:
+            intents: Intents from detect_intents
+
+        Returns:
+            True if any action intent is ambiguous
+        """
+        return any(
+            intent.priority >= self.ACTION_PRIORITY and len(intent.metadata.get("matched_by", ())) == 1
+            for intent in intents
+        )
+
+    def refine_intents(
         self,
-        message_lower: str,
-        keywords: list[str],
-        patterns: list[re.Pattern]
-    ) -> bool:
-        """Check if message matches keywords or patterns."""
-        # Check keywords
-        for keyword in keywords:
-            if keyword.lower() in message_lower:
-                return True
+        message: str,
+        intents: list[Intent],
+        query_embedding: Optional[list[float]],
+    ) -> list[Intent]:
+        """
+        Verify ambiguous action intents with the centroid classifier.
 
-        # Check patterns
-        for pattern in patterns:
-            if pattern.search(message_lower):
-                return True
+        Runs only when stage one is ambiguous and an embedding is available.
+        An ambiguous action intent is dropped when the classifier confidently
+        prefers another intent; otherwise its classifier score is recorded.
 
-        return False
+        Args:
+            message: User message text
+            intents: Intents from detect_intents
+            query_embedding: Query embedding computed by the pipeline
 
-    def _extract_image_prompt(self, message: str) -> str:
+        Returns:
+            Refined intents, sorted by priority (highest first)
+        """
+        if self.classifier is None or query_embedding is None or not self.is_ambiguous(intents):
+            return intents
+
+        prediction = self.classifier.predict(query_embedding)
+        if prediction is None:
+            return intents
+
+        refined = []
+        for intent in intents:
+            score = prediction.scores.get(intent.intent_type.value)
+            if (
+                score is None
+                or intent.priority < self.ACTION_PRIORITY
+                or len(intent.metadata.get("matched_by", ())) != 1
+            ):
+                refined.append(intent)
+                continue
+
+            if (
+                prediction.intent != intent.intent_type.value
+                and prediction.score >= settings.intent_classifier_min_similarity
+                and prediction.score - score >= settings.intent_classifier_veto_margin
+            ):
+                logger.info(
+                    "intent_vetoed_by_classifier",
+                    intent=intent.intent_type.value,
+                    intent_score=round(score, 4),
+                    predicted_intent=prediction.intent,
+                    predicted_score=round(prediction.score, 4),
+                )
+                continue
+
+            intent.metadata["classifier_score"] = round(score, 4)
+            refined.append(intent)
+
+        if len(refined) < len(intents) and not any(
+            i.intent_type == IntentType.CONVERSATION for i in refined
+        ):
+            self._add_conversation_fallback(message, refined)
+            refined.sort(key=lambda x: x.priority, reverse=True)
+
+        return refined
+
+    def _add_conversation_fallback(self, message: str, intents: list[Intent]) -> None:
+        """Add the conversation intent if no strong intent was detected."""
+        if not intents or all(i.confidence < 0.70 for i in intents):
+            intents.append(Intent(
+                intent_type=IntentType.CONVERSATION,
+                confidence=0.50,
+                extracted_query=message,
+                priority=1,
+                metadata={"default_intent": True}
+            ))
+
+    def _pattern_categories(self, message_lower: str) -> set[str]:
+        """
+        Get the intent categories whose regex patterns match.
+
+        Args:
+            message_lower: Lowercased, stripped message
+
+        Returns:
+            Matched category names
+        """
+        categories = set()
+        positions = []
+        for match in self.intent_pattern.finditer(message_lower):
+            categories.add(match.lastgroup)
+            positions.append(match.start())
+
+        # Only the first matching alternative is reported per position, so
+        # recheck categories that may be hidden behind an earlier one there
+        for category in self.category_rules.keys() - categories:
+            pattern = self.category_patterns[category]
+            if any(pattern.match(message_lower, position) for position in positions):
+                categories.add(category)
+
+        return categories
+
+    def _extract_image_prompt(
+        self,
+        message: str,
+        keyword_matches: Optional[list[Match[tuple[str, int]]]] = None,
+    ) -> str:
         """
         Extract the image description from the message.
 
         Args:
             message: Full user message
+            keyword_matches: Keyword automaton matches for message.lower()
+                (computed if not provided)
 
         Returns:
             Extracted image prompt
         """
-        message_lower = message.lower()
-
-        # Try to find and extract after keywords
-        for keyword in self.IMAGE_KEYWORDS:
-            keyword_pos = message_lower.find(keyword.lower())
-            if keyword_pos != -1:
-                after_keyword = message[keyword_pos + len(keyword):].strip()
-                after_keyword = re.sub(r'^(?:of|:|for|that shows?|showing)\s+', '', after_keyword, flags=re.IGNORECASE)
-                if len(after_keyword) > 10:
-                    return after_keyword
+        if keyword_matches is None:
+            keyword_matches = self.keyword_matcher.iter_matches(message.lower())
+
+        # First occurrence of each image keyword
+        keyword_positions: dict[int, int] = {}
+        for match in keyword_matches:
+            category, index = match.value
+            if category == "image" and index not in keyword_positions:
+                keyword_positions[index] = match.start
+
+        # Try to find and extract after keywords (in keyword list order)
+        for index in sorted(keyword_positions):
+            keyword_end = keyword_positions[index] + len(self.IMAGE_KEYWORDS[index])
+            after_keyword = message[keyword_end:].strip()
+            after_keyword = re.sub(r'^(?:of|:|for|that shows?|showing)\s+', '', after_keyword, flags=re.IGNORECASE)
+            if len(after_keyword) > 10:
+                return after_keyword
 
         # Try patterns
         for pattern in self.image_patterns:
@@ -1,7 +1,7 @@
 """LangGraph orchestration service for RAG workflows."""
 
 import json
-from typing import Any, Annotated, TypedDict
+from typing import Any, Annotated, Awaitable, Callable, Optional, TypedDict
 from operator import add
 from uuid import UUID
 
@@ -13,8 +13,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.services.intent_detector import IntentDetector, IntentType
-from app.services.document_service import DocumentService
+from app.services.intent_detector import Intent, IntentDetector, IntentType
+from app.services.speculative_retrieval_service import (
+    build_context,
+    speculative_retrieval_service,
+)
 
 logger = get_logger(__name__)
 
@@ -35,7 +38,9 @@ class RAGState(TypedDict):
 
     # RAG components
     retrieved_chunks: list[dict[str, Any]]
+    retrieval_attempted: bool
     context: str
+    cache_hit: bool
 
     # Output
     response: str
@@ -52,7 +57,8 @@ class LangGraphService:
 
     Handles:
     - Intent classification via IntentDetector
-    - RAG retrieval via DocumentService
+    - Response cache probe and RAG retrieval, started speculatively
+      alongside classification
     - Tool selection
     - Response generation
     """
@@ -118,9 +124,11 @@ class LangGraphService:
         Build the RAG processing graph.
 
         Graph flow:
-        1. classify_intent -> Determine query type using IntentDetector
-        2. retrieve (if needed) -> Get relevant chunks from DocumentService
+        1. classify_intent -> Determine query type using IntentDetector, while
+           probing the response cache and retrieving chunks speculatively
+        2. retrieve (if needed and not already done) -> Get relevant chunks
         3. generate -> Generate response using LLM with context
+        A response cache hit ends the graph after step 1.
         """
         workflow = StateGraph(RAGState)
 
@@ -135,10 +143,11 @@ class LangGraphService:
         # Conditional routing after classification
         workflow.add_conditional_edges(
             "classify_intent",
-            self._should_retrieve,
+            self._route_after_classification,
             {
-                True: "retrieve",
-                False: "generate",
+                "cached": END,
+                "retrieve": "retrieve",
+                "generate": "generate",
             },
         )
 
@@ -147,23 +156,40 @@ class LangGraphService:
 
         return workflow.compile()
 
-    async def _classify_intent(self, state: RAGState) -> RAGState:
+    async def _detect_intent(self, query: str) -> dict[str, Any]:
+        """Classify a query using IntentDetector's keyword stage."""
+        # Use IntentDetector for multi-intent detection (Persian, English, Arabic)
+        return self._classify_intents(query, self.intent_detector.detect_intents(query))
+
+    async def _refine_intent(
+        self,
+        query: str,
+        classification: dict[str, Any],
+        get_embedding: Callable[[], Awaitable[Optional[list[float]]]],
+    ) -> dict[str, Any]:
+        """
+        Verify ambiguous intents with IntentDetector's centroid classifier.
+
+        The query embedding is shared with the cache probe and retrieval, and
+        only awaited when the keyword stage is ambiguous.
+        """
+        detected_intents = classification["detected_intents"]
+        if self.intent_detector.classifier is None or not self.intent_detector.is_ambiguous(detected_intents):
+            return classification
+
+        embedding = await get_embedding()
+        refined = self.intent_detector.refine_intents(query, detected_intents, embedding)
+        return self._classify_intents(query, refined)
+
+    def _classify_intents(self, query: str, detected_intents: list[Intent]) -> dict[str, Any]:
         """
-        Classify the user's intent using IntentDetector.
+        Map detected intents to a classification.
 
         Determines:
         - Query type (image_generation, web_search, document_search, etc.)
         - Whether RAG retrieval is needed
         - Which tools might be needed
         """
-        query = state["query"]
-
-        # Use IntentDetector for multi-intent detection
-        detected_intents = await self.intent_detector.detect_intents(
-            message=query,
-            language="auto"  # Auto-detect language (en, fa, ar)
-        )
-
         # Determine primary intent
         primary_intent = "question_answer"  # Default
         requires_rag = False
@@ -202,10 +228,60 @@ class LangGraphService:
         )
 
         return {
-            **state,
             "intent": primary_intent,
             "requires_rag": requires_rag,
             "requires_tools": requires_tools,
+            "detected_intents": detected_intents,
+        }
+
+    async def _classify_intent(self, state: RAGState) -> RAGState:
+        """
+        Classify the user's intent, speculatively probing the cache and retrieving.
+
+        The response cache probe and knowledge-base retrieval start together
+        with classification. A cache hit short-circuits the graph; retrieval
+        is cancelled when the intent doesn't need RAG.
+        """
+        query = state["query"]
+        user_id = state["user_id"]
+
+        speculation = await speculative_retrieval_service.run(
+            query=query,
+            classify=lambda: self._detect_intent(query),
+            requires_retrieval=lambda classification: classification["requires_rag"],
+            refine_classification=lambda classification, get_embedding: self._refine_intent(
+                query, classification, get_embedding
+            ),
+            db=self.db,
+            user_id=UUID(user_id) if user_id else None,
+        )
+
+        if speculation.cache_hit:
+            cached = speculation.cached_response
+            return {
+                **state,
+                "intent": cached.intent,
+                "requires_rag": False,
+                "requires_tools": [],
+                "cache_hit": True,
+                "response": cached.response,
+                "sources": cached.sources,
+                "tokens_used": 0,
+                "messages": [],
+            }
+
+        classification = {
+            key: value
+            for key, value in speculation.classification.items()
+            if key != "detected_intents"
+        }
+
+        return {
+            **state,
+            **classification,
+            "retrieved_chunks": speculation.chunks,
+            "retrieval_attempted": speculation.retrieval_attempted,
+            "context": build_context(speculation.chunks),
             "messages": [],
         }
 
@@ -214,9 +290,9 @@ class LangGraphService:
         Retrieve relevant chunks from vector DB using DocumentService.
 
         Uses semantic search to find the most relevant Islamic knowledge.
+        Only runs when retrieval wasn't already done speculatively.
         """
         query = state["query"]
-        user_id = state["user_id"]
 
         retrieved_chunks = []
         context = ""
@@ -224,33 +300,11 @@ class LangGraphService:
         # Only retrieve if we have a database session
         if self.db:
             try:
-                # Use DocumentService for semantic search
-                doc_service = DocumentService(self.db)
-
-                # Search for relevant chunks (top 5)
-                chunks = await doc_service.semantic_search(
-                    query=query,
-                    limit=5,
-                    user_id=UUID(user_id) if user_id else None,
-                    min_score=0.7,  # Only high-quality matches
-                )
-
-                # Format chunks for response
-                retrieved_chunks = [
-                    {
-                        "content": chunk.content,
-                        "source": chunk.document.title if hasattr(chunk, 'document') else "Unknown",
-                        "score": getattr(chunk, 'score', 0.0),
-                        "chunk_index": chunk.chunk_index,
-                    }
-                    for chunk in chunks
-                ]
+                # Search for relevant chunks (top 5, high-quality matches only)
+                retrieved_chunks = await speculative_retrieval_service.retrieve(query, self.db)
 
                 # Build context string
-                context = "\n\n---\n\n".join([
-                    f"Source: {chunk['source']} (Relevance: {chunk['score']:.2%})\n{chunk['content']}"
-                    for chunk in retrieved_chunks
-                ])
+                context = build_context(retrieved_chunks)
 
                 logger.info(
                     "chunks_retrieved",
@@ -277,6 +331,7 @@ class LangGraphService:
         return {
             **state,
             "retrieved_chunks": retrieved_chunks,
+            "retrieval_attempted": True,
             "context": context,
         }
 
@@ -358,9 +413,13 @@ Guidelines:
                 "tokens_used": 0,
             }
 
-    def _should_retrieve(self, state: RAGState) -> bool:
-        """Determine if RAG retrieval is needed based on intent classification."""
-        return state.get("requires_rag", True)
+    def _route_after_classification(self, state: RAGState) -> str:
+        """Route to END on a cache hit, else to retrieval (if still needed) or generation."""
+        if state.get("cache_hit"):
+            return "cached"
+        if state.get("requires_rag", True) and not state.get("retrieval_attempted"):
+            return "retrieve"
+        return "generate"
 
     async def process_query(
         self,
@@ -395,7 +454,9 @@ Guidelines:
             requires_rag=True,
             requires_tools=[],
             retrieved_chunks=[],
+            retrieval_attempted=False,
             context="",
+            cache_hit=False,
             response="",
             sources=[],
             tokens_used=0,
@@ -420,6 +481,7 @@ Guidelines:
                 "sources": result.get("sources", []),
                 "tokens_used": result.get("tokens_used", 0),
                 "retrieved_chunks": result.get("retrieved_chunks", []),
+                "from_cache": result.get("cache_hit", False),
             }
 
         except Exception as e:
@@ -1,39 +1,201 @@
-"""Leaderboard service for tracking user contributions."""
+"""
+Leaderboard service for tracking user contributions.
 
-from datetime import datetime, timedelta
+Leaderboards are Redis sorted sets (member: user ID, score: count), one
+per board and timeframe:
+
+- leaderboard:{board}:{timeframe}, board in documents, messages,
+  conversations and overall (weighted sum), timeframe in all_time, month
+  (last 30 days) and week (last 7 days)
+
+Reads are ZREVRANGE (O(log n + k)) followed by one query for the k users'
+profiles. Uploads, chat messages and new conversations ZINCRBY every
+timeframe of their board and the overall board.
+
+A reconciliation job rebuilds all boards from PostgreSQL every
+leaderboard_reconcile_interval_seconds (one worker at a time), which
+ages entries out of the month and week windows and repairs increments
+lost to Redis errors. Boards are rebuilt into a scratch key and renamed
+over the live one, so reads never see a partial board. Every built board
+holds a sentinel member scored -inf, so a board with no activity yet still
+exists and takes increments; reads skip it.
+
+Redis errors fail open: reads fall back to GROUP BY queries.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
 from typing import Literal, Optional
 from uuid import UUID
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import track_leaderboard_read
+from app.core.redis_client import get_redis_client
+from app.db.base import RoutingSessionLocal
 from app.models.chat import Conversation, Message
 from app.models.document import Document
 from app.models.user import User
 
 logger = get_logger(__name__)
 
+Timeframe = Literal["all_time", "month", "week"]
+Board = Literal["documents", "messages", "conversations"]
+
+TIMEFRAMES: tuple[Timeframe, ...] = ("all_time", "month", "week")
+TIMEFRAME_DAYS = {"month": 30, "week": 7}
+
+# Overall score points per contribution
+BOARD_POINTS: dict[str, int] = {
+    "documents": 10,
+    "conversations": 2,
+    "messages": 1,
+}
+
+# Response field holding each board's count
+COUNT_FIELDS = {
+    "documents": "upload_count",
+    "messages": "message_count",
+    "conversations": "conversation_count",
+}
+
+RECONCILE_LOCK_KEY = "leaderboard:reconcile:lock"
+_ZADD_CHUNK_SIZE = 1000
+
+# Member keeping an empty board in existence (always ranked last)
+SENTINEL_MEMBER = "_"
+
+# Increment a board and the overall board in every timeframe. Boards not
+# built yet are skipped: reconciliation creates them from PostgreSQL, and
+# a board holding only recent increments would read as complete.
+# KEYS: board keys, then overall keys (same timeframe order).
+# ARGV: member, count, overall points.
+_INCREMENT_SCRIPT = """
+local n = #KEYS / 2
+for i = 1, n do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('ZINCRBY', KEYS[i], ARGV[2], ARGV[1])
+    end
+    if redis.call('EXISTS', KEYS[n + i]) == 1 then
+        redis.call('ZINCRBY', KEYS[n + i], ARGV[3], ARGV[1])
+    end
+end
+return 1
+"""
+
+
+def _board_key(board: str, timeframe: Timeframe) -> str:
+    """Redis key of a leaderboard."""
+    return f"leaderboard:{board}:{timeframe}"
+
+
+def _count_query(board: Board, timeframe: Timeframe) -> Select:
+    """
+    Build the per-user GROUP BY count of a board.
+
+    Args:
+        board: Board name
+        timeframe: Time period to consider
+
+    Returns:
+        Select of (user_id, count) rows
+    """
+    if board == "documents":
+        user_id, counted, created_at = Document.uploaded_by, Document.id, Document.uploaded_at
+        query = select(user_id, func.count(counted))
+    elif board == "messages":
+        # Messages the user sent in their own conversations
+        user_id, counted, created_at = Conversation.user_id, Message.id, Message.created_at
+        query = (
+            select(user_id, func.count(counted))
+            .join(Conversation, Message.conversation_id == Conversation.id)
+            .where(Message.role == "user")
+        )
+    else:
+        user_id, counted, created_at = Conversation.user_id, Conversation.id, Conversation.created_at
+        query = select(user_id, func.count(counted))
+
+    query = query.where(user_id.is_not(None))
+
+    if timeframe in TIMEFRAME_DAYS:
+        since = datetime.now(timezone.utc) - timedelta(days=TIMEFRAME_DAYS[timeframe])
+        query = query.where(created_at >= since)
+
+    return query.group_by(user_id)
+
 
 class LeaderboardService:
-    """Service for generating user leaderboards."""
+    """
+    Service for generating user leaderboards.
+
+    Features:
+    - Redis sorted sets per board and timeframe
+    - Incremental updates on uploads, messages and conversations
+    - Periodic rebuild from PostgreSQL (single worker, atomic swap)
+    - User profiles hydrated in one query per page
+    - Fail-open: Redis errors fall back to PostgreSQL
+    """
+
+    def __init__(self):
+        """Initialize leaderboard service."""
+        self.redis = get_redis_client("default")
+        self.enabled = settings.leaderboard_redis_enabled
+        self.reconcile_interval_seconds = settings.leaderboard_reconcile_interval_seconds
+
+        self._increment_script = self.redis.register_script(_INCREMENT_SCRIPT)
+        self._reconcile_task: Optional[asyncio.Task] = None
 
-    def __init__(self, db: AsyncSession):
-        """Initialize leaderboard service.
+    # ========================================================================
+    # Incremental Updates
+    # ========================================================================
+
+    async def record_document_upload(self, user_id: Optional[UUID]) -> None:
+        """Count a document uploaded by a user (call after commit)."""
+        await self._increment("documents", user_id, 1)
+
+    async def record_messages(self, user_id: Optional[UUID], count: int = 1) -> None:
+        """Count chat messages sent by a user (call after commit)."""
+        await self._increment("messages", user_id, count)
+
+    async def record_conversation(self, user_id: Optional[UUID]) -> None:
+        """Count a conversation started by a user (call after commit)."""
+        await self._increment("conversations", user_id, 1)
+
+    async def _increment(self, board: Board, user_id: Optional[UUID], count: int) -> None:
+        """
+        ZINCRBY a board and the overall board in every timeframe.
 
         Args:
-            db: Database session
+            board: Board name
+            user_id: Contributing user (None is ignored)
+            count: Number of contributions
         """
-        self.db = db
+        if not self.enabled or user_id is None or count <= 0:
+            return
+
+        keys = [_board_key(board, timeframe) for timeframe in TIMEFRAMES]
+        keys += [_board_key("overall", timeframe) for timeframe in TIMEFRAMES]
+        try:
+            await self._increment_script(
+                keys=keys,
+                args=[str(user_id), count, count * BOARD_POINTS[board]],
+            )
+        except Exception as e:
+            # Repaired by the next reconciliation
+            logger.warning("leaderboard_increment_failed", board=board, user_id=str(user_id), error=str(e))
 
     # ========================================================================
-    # Document Upload Leaderboard
+    # Leaderboards
     # ========================================================================
 
     async def get_document_upload_leaderboard(
         self,
-        timeframe: Literal["all_time", "month", "week"] = "all_time",
-        limit: int = 10,
+        timeframe: Timeframe,
+        limit: int,
+        db: AsyncSession,
     ) -> list[dict]:
         """
         Get leaderboard for document uploads.
@@ -41,63 +203,18 @@ class LeaderboardService:
         Args:
             timeframe: Time period to consider
             limit: Number of top users to return
+            db: Database session (profiles, fallback)
 
         Returns:
             Ranked list of users by document uploads
         """
-        query = select(
-            Document.uploaded_by_user_id,
-            func.count(Document.id).label("upload_count"),
-        ).where(Document.uploaded_by_user_id.is_not(None))
-
-        # Apply timeframe filter
-        if timeframe == "month":
-            one_month_ago = datetime.utcnow() - timedelta(days=30)
-            query = query.where(Document.created_at >= one_month_ago)
-        elif timeframe == "week":
-            one_week_ago = datetime.utcnow() - timedelta(days=7)
-            query = query.where(Document.created_at >= one_week_ago)
-
-        query = (
-            query.group_by(Document.uploaded_by_user_id)
-            .order_by(func.count(Document.id).desc())
-            .limit(limit)
-        )
-
-        result = await self.db.execute(query)
-        upload_counts = result.all()
-
-        # Fetch user details
-        leaderboard = []
-        for rank, (user_id, count) in enumerate(upload_counts, start=1):
-            user_result = await self.db.execute(select(User).where(User.id == user_id))
-            user = user_result.scalar_one_or_none()
-
-            if user:
-                leaderboard.append({
-                    "rank": rank,
-                    "user_id": str(user_id),
-                    "display_name": user.display_name or "Anonymous",
-                    "email": user.email,
-                    "upload_count": count,
-                })
-
-        logger.info(
-            "document_upload_leaderboard_generated",
-            timeframe=timeframe,
-            count=len(leaderboard),
-        )
-
-        return leaderboard
-
-    # ========================================================================
-    # Chat Activity Leaderboard
-    # ========================================================================
+        return await self._get_board_leaderboard("documents", timeframe, limit, db)
 
     async def get_chat_activity_leaderboard(
         self,
-        timeframe: Literal["all_time", "month", "week"] = "all_time",
-        limit: int = 10,
+        timeframe: Timeframe,
+        limit: int,
+        db: AsyncSession,
     ) -> list[dict]:
         """
         Get leaderboard for chat activity (number of messages sent).
@@ -105,68 +222,18 @@ class LeaderboardService:
         Args:
             timeframe: Time period to consider
             limit: Number of top users to return
+            db: Database session (profiles, fallback)
 
         Returns:
             Ranked list of users by chat activity
         """
-        query = select(
-            Message.sender_user_id,
-            func.count(Message.id).label("message_count"),
-        ).where(
-            and_(
-                Message.sender_user_id.is_not(None),
-                Message.sender_type == "user",
-            )
-        )
-
-        # Apply timeframe filter
-        if timeframe == "month":
-            one_month_ago = datetime.utcnow() - timedelta(days=30)
-            query = query.where(Message.created_at >= one_month_ago)
-        elif timeframe == "week":
-            one_week_ago = datetime.utcnow() - timedelta(days=7)
-            query = query.where(Message.created_at >= one_week_ago)
-
-        query = (
-            query.group_by(Message.sender_user_id)
-            .order_by(func.count(Message.id).desc())
-            .limit(limit)
-        )
-
-        result = await self.db.execute(query)
-        message_counts = result.all()
-
-        # Fetch user details
-        leaderboard = []
-        for rank, (user_id, count) in enumerate(message_counts, start=1):
-            user_result = await self.db.execute(select(User).where(User.id == user_id))
-            user = user_result.scalar_one_or_none()
-
-            if user:
-                leaderboard.append({
-                    "rank": rank,
-                    "user_id": str(user_id),
-                    "display_name": user.display_name or "Anonymous",
-                    "email": user.email,
-                    "message_count": count,
-                })
-
-        logger.info(
-            "chat_activity_leaderboard_generated",
-            timeframe=timeframe,
-            count=len(leaderboard),
-        )
-
-        return leaderboard
-
-    # ========================================================================
-    # Conversation Leaderboard
-    # ========================================================================
+        return await self._get_board_leaderboard("messages", timeframe, limit, db)
 
     async def get_conversation_leaderboard(
         self,
-        timeframe: Literal["all_time", "month", "week"] = "all_time",
-        limit: int = 10,
+        timeframe: Timeframe,
+        limit: int,
+        db: AsyncSession,
     ) -> list[dict]:
         """
         Get leaderboard for number of conversations started.
@@ -174,63 +241,18 @@ class LeaderboardService:
         Args:
             timeframe: Time period to consider
             limit: Number of top users to return
+            db: Database session (profiles, fallback)
 
         Returns:
             Ranked list of users by conversation count
         """
-        query = select(
-            Conversation.user_id,
-            func.count(Conversation.id).label("conversation_count"),
-        )
-
-        # Apply timeframe filter
-        if timeframe == "month":
-            one_month_ago = datetime.utcnow() - timedelta(days=30)
-            query = query.where(Conversation.created_at >= one_month_ago)
-        elif timeframe == "week":
-            one_week_ago = datetime.utcnow() - timedelta(days=7)
-            query = query.where(Conversation.created_at >= one_week_ago)
-
-        query = (
-            query.group_by(Conversation.user_id)
-            .order_by(func.count(Conversation.id).desc())
-            .limit(limit)
-        )
-
-        result = await self.db.execute(query)
-        conversation_counts = result.all()
-
-        # Fetch user details
-        leaderboard = []
-        for rank, (user_id, count) in enumerate(conversation_counts, start=1):
-            user_result = await self.db.execute(select(User).where(User.id == user_id))
-            user = user_result.scalar_one_or_none()
-
-            if user:
-                leaderboard.append({
-                    "rank": rank,
-                    "user_id": str(user_id),
-                    "display_name": user.display_name or "Anonymous",
-                    "email": user.email,
-                    "conversation_count": count,
-                })
-
-        logger.info(
-            "conversation_leaderboard_generated",
-            timeframe=timeframe,
-            count=len(leaderboard),
-        )
-
-        return leaderboard
-
-    # ========================================================================
-    # Combined Overall Leaderboard
-    # ========================================================================
+        return await self._get_board_leaderboard("conversations", timeframe, limit, db)
 
     async def get_overall_leaderboard(
         self,
-        timeframe: Literal["all_time", "month", "week"] = "all_time",
-        limit: int = 10,
+        timeframe: Timeframe,
+        limit: int,
+        db: AsyncSession,
     ) -> list[dict]:
         """
         Get overall leaderboard combining multiple metrics.
@@ -243,89 +265,36 @@ class LeaderboardService:
         Args:
             timeframe: Time period to consider
             limit: Number of top users to return
+            db: Database session (profiles, fallback)
 
         Returns:
             Ranked list of users by overall contribution score
         """
-        # Calculate scores for each user
-        user_scores: dict[UUID, dict] = {}
-
-        # Get document uploads
-        doc_leaderboard = await self.get_document_upload_leaderboard(timeframe, limit=100)
-        for entry in doc_leaderboard:
-            user_id = UUID(entry["user_id"])
-            if user_id not in user_scores:
-                user_scores[user_id] = {
-                    "user_id": entry["user_id"],
-                    "display_name": entry["display_name"],
-                    "email": entry["email"],
-                    "score": 0,
-                    "document_uploads": 0,
-                    "conversations": 0,
-                    "messages": 0,
-                }
-            user_scores[user_id]["document_uploads"] = entry["upload_count"]
-            user_scores[user_id]["score"] += entry["upload_count"] * 10
-
-        # Get conversations
-        conv_leaderboard = await self.get_conversation_leaderboard(timeframe, limit=100)
-        for entry in conv_leaderboard:
-            user_id = UUID(entry["user_id"])
-            if user_id not in user_scores:
-                user_result = await self.db.execute(select(User).where(User.id == user_id))
-                user = user_result.scalar_one_or_none()
-                user_scores[user_id] = {
-                    "user_id": str(user_id),
-                    "display_name": user.display_name if user else "Anonymous",
-                    "email": user.email if user else "",
-                    "score": 0,
-                    "document_uploads": 0,
-                    "conversations": 0,
-                    "messages": 0,
-                }
-            user_scores[user_id]["conversations"] = entry["conversation_count"]
-            user_scores[user_id]["score"] += entry["conversation_count"] * 2
-
-        # Get messages
-        chat_leaderboard = await self.get_chat_activity_leaderboard(timeframe, limit=100)
-        for entry in chat_leaderboard:
-            user_id = UUID(entry["user_id"])
-            if user_id not in user_scores:
-                user_result = await self.db.execute(select(User).where(User.id == user_id))
-                user = user_result.scalar_one_or_none()
-                user_scores[user_id] = {
-                    "user_id": str(user_id),
-                    "display_name": user.display_name if user else "Anonymous",
-                    "email": user.email if user else "",
-                    "score": 0,
-                    "document_uploads": 0,
-                    "conversations": 0,
-                    "messages": 0,
-                }
-            user_scores[user_id]["messages"] = entry["message_count"]
-            user_scores[user_id]["score"] += entry["message_count"] * 1
-
-        # Sort by score and assign ranks
-        sorted_users = sorted(
-            user_scores.values(),
-            key=lambda x: x["score"],
-            reverse=True,
-        )
+        ranked = await self._top_from_redis("overall", timeframe, limit)
+        breakdowns = None
+        if ranked is not None:
+            breakdowns = await self._breakdowns_from_redis([user_id for user_id, _ in ranked], timeframe)
+        if breakdowns is None:
+            ranked, breakdowns = await self._overall_from_db(timeframe, limit, db)
+
+        users = await self._load_users([user_id for user_id, _ in ranked], db)
 
         leaderboard = []
-        for rank, user_data in enumerate(sorted_users[:limit], start=1):
-            leaderboard.append({
-                "rank": rank,
-                "user_id": user_data["user_id"],
-                "display_name": user_data["display_name"],
-                "email": user_data["email"],
-                "total_score": user_data["score"],
-                "breakdown": {
-                    "document_uploads": user_data["document_uploads"],
-                    "conversations": user_data["conversations"],
-                    "messages": user_data["messages"],
-                },
-            })
+        for rank, (user_id, score) in enumerate(ranked, start=1):
+            user = users.get(user_id)
+            if user:
+                leaderboard.append({
+                    "rank": rank,
+                    "user_id": str(user_id),
+                    "display_name": user.full_name or "Anonymous",
+                    "email": user.email,
+                    "total_score": score,
+                    "breakdown": {
+                        "document_uploads": breakdowns[user_id]["documents"],
+                        "conversations": breakdowns[user_id]["conversations"],
+                        "messages": breakdowns[user_id]["messages"],
+                    },
+                })
 
         logger.info(
             "overall_leaderboard_generated",
@@ -339,64 +308,283 @@ class LeaderboardService:
     # User Statistics
     # ========================================================================
 
-    async def get_user_statistics(self, user_id: UUID) -> dict:
+    async def get_user_statistics(self, user_id: UUID, db: AsyncSession) -> dict:
         """
         Get detailed statistics for a specific user.
 
         Args:
             user_id: ID of user
+            db: Database session
 
         Returns:
-            User statistics and rank
+            User statistics and rank (None if unranked or Redis is down)
+
+        Raises:
+            ValueError: If the user doesn't exist
         """
-        # Get user
-        user_result = await self.db.execute(select(User).where(User.id == user_id))
+        user_result = await db.execute(select(User).where(User.id == user_id))
         user = user_result.scalar_one_or_none()
 
         if not user:
             raise ValueError("User not found")
 
-        # Document uploads
-        doc_count_result = await self.db.execute(
-            select(func.count(Document.id)).where(Document.uploaded_by_user_id == user_id)
-        )
-        doc_count = doc_count_result.scalar()
-
-        # Conversations
-        conv_count_result = await self.db.execute(
-            select(func.count(Conversation.id)).where(Conversation.user_id == user_id)
-        )
-        conv_count = conv_count_result.scalar()
-
-        # Messages
-        msg_count_result = await self.db.execute(
-            select(func.count(Message.id)).where(
-                and_(Message.sender_user_id == user_id, Message.sender_type == "user")
-            )
-        )
-        msg_count = msg_count_result.scalar()
-
-        # Calculate overall score
-        overall_score = (doc_count * 10) + (conv_count * 2) + (msg_count * 1)
+        counts, rank = await self._user_counts_from_redis(user_id)
+        if counts is None:
+            counts = {}
+            for board in BOARD_POINTS:
+                result = await db.execute(_count_query(board, "all_time").where(self._user_column(board) == user_id))
+                row = result.first()
+                counts[board] = row[1] if row else 0
 
-        # Get rank in overall leaderboard
-        overall_leaderboard = await self.get_overall_leaderboard(timeframe="all_time", limit=1000)
-        rank = None
-        for entry in overall_leaderboard:
-            if entry["user_id"] == str(user_id):
-                rank = entry["rank"]
-                break
+        overall_score = sum(counts[board] * points for board, points in BOARD_POINTS.items())
 
         return {
             "user_id": str(user_id),
-            "display_name": user.display_name or "Anonymous",
+            "display_name": user.full_name or "Anonymous",
             "email": user.email,
             "statistics": {
-                "document_uploads": doc_count,
-                "conversations": conv_count,
-                "messages": msg_count,
+                "document_uploads": counts["documents"],
+                "conversations": counts["conversations"],
+                "messages": counts["messages"],
                 "overall_score": overall_score,
             },
             "rank": rank,
             "member_since": user.created_at.isoformat(),
         }
+
+    # ========================================================================
+    # Reconciliation
+    # ========================================================================
+
+    async def reconcile(self, db: AsyncSession) -> None:
+        """
+        Rebuild every board from PostgreSQL.
+
+        Args:
+            db: Database session
+        """
+        for timeframe in TIMEFRAMES:
+            for board in BOARD_POINTS:
+                result = await db.execute(_count_query(board, timeframe))
+                await self._replace_board(_board_key(board, timeframe), result.all())
+
+            # Overall = weighted union of the boards just rebuilt (the
+            # sentinel stays at -inf)
+            key = _board_key("overall", timeframe)
+            scratch = f"{key}:rebuild"
+            await self.redis.zunionstore(
+                scratch,
+                {_board_key(board, timeframe): points for board, points in BOARD_POINTS.items()},
+            )
+            await self.redis.rename(scratch, key)
+
+        logger.info("leaderboards_reconciled")
+
+    async def _replace_board(self, key: str, rows: list) -> None:
+        """Atomically replace a board with (user_id, count) rows and the sentinel."""
+        scratch = f"{key}:rebuild"
+        await self.redis.delete(scratch)
+        await self.redis.zadd(scratch, {SENTINEL_MEMBER: float("-inf")})
+        for start in range(0, len(rows), _ZADD_CHUNK_SIZE):
+            chunk = rows[start:start + _ZADD_CHUNK_SIZE]
+            await self.redis.zadd(scratch, {str(user_id): count for user_id, count in chunk})
+        await self.redis.rename(scratch, key)
+
+    def start_background_refresh(self) -> None:
+        """Start the periodic reconciliation task (idempotent)."""
+        if self._reconcile_task is None or self._reconcile_task.done():
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop_background_refresh(self) -> None:
+        """Stop the periodic reconciliation task."""
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+    async def _reconcile_loop(self) -> None:
+        """Reconcile every reconcile_interval_seconds on one worker at a time."""
+        while True:
+            try:
+                # Held for the whole interval: other workers skip this round
+                if await self.redis.set(
+                    RECONCILE_LOCK_KEY, "1", nx=True, ex=max(1, int(self.reconcile_interval_seconds))
+                ):
+                    async with RoutingSessionLocal(read_only=True) as db:
+                        await self.reconcile(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("leaderboard_reconcile_failed", error=str(e))
+            await asyncio.sleep(self.reconcile_interval_seconds)
+
+    # ========================================================================
+    # Helpers
+    # ========================================================================
+
+    async def _get_board_leaderboard(
+        self,
+        board: Board,
+        timeframe: Timeframe,
+        limit: int,
+        db: AsyncSession,
+    ) -> list[dict]:
+        """Rank users on one board and attach their profiles."""
+        ranked = await self._top_from_redis(board, timeframe, limit)
+        if ranked is None:
+            result = await db.execute(
+                _count_query(board, timeframe).order_by(func.count().desc()).limit(limit)
+            )
+            ranked = [(user_id, count) for user_id, count in result.all()]
+
+        users = await self._load_users([user_id for user_id, _ in ranked], db)
+
+        leaderboard = []
+        for rank, (user_id, count) in enumerate(ranked, start=1):
+            user = users.get(user_id)
+            if user:
+                leaderboard.append({
+                    "rank": rank,
+                    "user_id": str(user_id),
+                    "display_name": user.full_name or "Anonymous",
+                    "email": user.email,
+                    COUNT_FIELDS[board]: count,
+                })
+
+        logger.info(
+            "leaderboard_generated",
+            board=board,
+            timeframe=timeframe,
+            count=len(leaderboard),
+        )
+
+        return leaderboard
+
+    async def _top_from_redis(self, board: str, timeframe: Timeframe, limit: int) -> Optional[list[tuple[UUID, int]]]:
+        """
+        Read the top of a board from Redis.
+
+        Returns:
+            (user_id, score) pairs, or None if Redis is disabled, down or
+            the board hasn't been built yet
+        """
+        if not self.enabled:
+            track_leaderboard_read("database")
+            return None
+
+        key = _board_key(board, timeframe)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.exists(key)
+                pipe.zrevrange(key, 0, limit - 1, withscores=True)
+                exists, entries = await pipe.execute()
+        except Exception as e:
+            logger.warning("leaderboard_read_failed", board=board, timeframe=timeframe, error=str(e))
+            track_leaderboard_read("database")
+            return None
+
+        if not exists:
+            track_leaderboard_read("database")
+            return None
+
+        track_leaderboard_read("redis")
+        return [(UUID(member), int(score)) for member, score in entries if member != SENTINEL_MEMBER]
+
+    async def _breakdowns_from_redis(
+        self,
+        user_ids: list[UUID],
+        timeframe: Timeframe,
+    ) -> Optional[dict[UUID, dict[str, int]]]:
+        """
+        Get each user's count on every board (one ZMSCORE per board).
+
+        Returns:
+            Counts per user and board, or None if Redis is down
+        """
+        breakdowns: dict[UUID, dict[str, int]] = {user_id: {} for user_id in user_ids}
+        if not user_ids:
+            return breakdowns
+
+        members = [str(user_id) for user_id in user_ids]
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for board in BOARD_POINTS:
+                    pipe.zmscore(_board_key(board, timeframe), members)
+                results = await pipe.execute()
+        except Exception as e:
+            logger.warning("leaderboard_breakdown_read_failed", timeframe=timeframe, error=str(e))
+            return None
+
+        for board, scores in zip(BOARD_POINTS, results):
+            for user_id, score in zip(user_ids, scores):
+                breakdowns[user_id][board] = int(score or 0)
+        return breakdowns
+
+    async def _overall_from_db(
+        self,
+        timeframe: Timeframe,
+        limit: int,
+        db: AsyncSession,
+    ) -> tuple[list[tuple[UUID, int]], dict[UUID, dict[str, int]]]:
+        """Compute the overall board from GROUP BY counts (fallback)."""
+        breakdowns: dict[UUID, dict[str, int]] = {}
+        for board in BOARD_POINTS:
+            result = await db.execute(_count_query(board, timeframe))
+            for user_id, count in result.all():
+                breakdowns.setdefault(user_id, dict.fromkeys(BOARD_POINTS, 0))[board] = count
+
+        scores = {
+            user_id: sum(counts[board] * points for board, points in BOARD_POINTS.items())
+            for user_id, counts in breakdowns.items()
+        }
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return ranked, breakdowns
+
+    async def _user_counts_from_redis(self, user_id: UUID) -> tuple[Optional[dict[str, int]], Optional[int]]:
+        """
+        Get a user's all-time counts and overall rank from Redis.
+
+        Returns:
+            (counts, rank), or (None, None) if Redis is disabled, down or the
+            boards haven't been built yet
+        """
+        if not self.enabled:
+            return None, None
+
+        member = str(user_id)
+        overall_key = _board_key("overall", "all_time")
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.exists(overall_key)
+                for board in BOARD_POINTS:
+                    pipe.zscore(_board_key(board, "all_time"), member)
+                pipe.zrevrank(overall_key, member)
+                exists, *scores, rank = await pipe.execute()
+        except Exception as e:
+            logger.warning("leaderboard_user_read_failed", user_id=member, error=str(e))
+            return None, None
+
+        if not exists:
+            return None, None
+
+        counts = {board: int(score or 0) for board, score in zip(BOARD_POINTS, scores)}
+        return counts, rank + 1 if rank is not None else None
+
+    @staticmethod
+    def _user_column(board: Board):
+        """Column holding the contributing user of a board."""
+        return Document.uploaded_by if board == "documents" else Conversation.user_id
+
+    @staticmethod
+    async def _load_users(user_ids: list[UUID], db: AsyncSession) -> dict[UUID, User]:
+        """Load the profiles of ranked users in one query."""
+        if not user_ids:
+            return {}
+        result = await db.execute(select(User).where(User.id.in_(user_ids)))
+        return {user.id: user for user in result.scalars().all()}
+
+
+leaderboard_service = LeaderboardService()
@@ -1,5 +1,6 @@
 """MinIO object storage service for file management."""
 
+import asyncio
 import io
 from datetime import timedelta
 from typing import BinaryIO, Literal, Optional
@@ -9,6 +10,7 @@ from minio import Minio
 from minio.error import S3Error
 from minio.lifecycleconfig import LifecycleConfig, Rule, Expiration
 
+from app.core.circuit_breaker import circuit_breaker_registry
 from app.core.config import settings
 from app.core.logging import get_logger
 
@@ -33,6 +35,16 @@ class MinIOStorageService:
 
     def __init__(self):
         """Initialize MinIO client and buckets."""
+        # Circuit breaker + bulkhead for object transfers (run in worker threads)
+        self.circuit_breaker = circuit_breaker_registry.get_or_create(
+            name="minio_storage",
+            failure_threshold=5,
+            recovery_timeout=30,
+            timeout_seconds=120,  # Large uploads
+            max_concurrent=16,
+            max_queue_wait_seconds=5.0,
+        )
+
         if not settings.minio_enabled:
             logger.warning("minio_disabled")
             self.client = None
@@ -261,8 +273,10 @@ class MinIOStorageService:
             # Add environment tag to metadata
             final_metadata["environment"] = settings.environment
 
-            # Upload to MinIO (using environment-prefixed bucket)
-            result = self.client.put_object(
+            # Upload to MinIO (using environment-prefixed bucket) off the event loop
+            result = await self.circuit_breaker.call(
+                asyncio.to_thread,
+                self.client.put_object,
                 env_bucket,
                 object_name,
                 file_obj,
@@ -377,10 +391,9 @@ class MinIOStorageService:
         env_bucket = self._get_env_bucket_name(bucket)
 
         try:
-            response = self.client.get_object(env_bucket, object_name)
-            data = response.read()
-            response.close()
-            response.release_conn()
+            data = await self.circuit_breaker.call(
+                asyncio.to_thread, self._read_object, env_bucket, object_name
+            )
 
             logger.info(
                 "file_downloaded",
@@ -402,6 +415,15 @@ class MinIOStorageService:
             )
             raise
 
+    def _read_object(self, env_bucket: str, object_name: str) -> bytes:
+        """Read a whole object (blocking; run in a worker thread)."""
+        response = self.client.get_object(env_bucket, object_name)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
     async def delete_file(self, bucket: str, object_name: str) -> bool:
         """
         Delete file from MinIO.
@@ -420,7 +442,9 @@ class MinIOStorageService:
         env_bucket = self._get_env_bucket_name(bucket)
 
         try:
-            self.client.remove_object(env_bucket, object_name)
+            await self.circuit_breaker.call(
+                asyncio.to_thread, self.client.remove_object, env_bucket, object_name
+            )
 
             logger.info(
                 "file_deleted",
@@ -0,0 +1,479 @@
+"""
+Cached OpenRouter model catalog.
+
+The OpenRouter /models endpoint lists every model with its pricing, context
+length and supported parameters. Fetching it per request is slow and the
+data changes rarely, so the catalog is kept in memory (backed by Redis so
+workers and restarts share one copy) and refreshed in the background:
+
+- model_catalog:openrouter -> {"fetched_at": epoch seconds, "data": raw
+  list of models} (TTL'd)
+
+Every refresh_interval_seconds each worker reads the Redis copy. Only when
+it is older than the interval does one worker (holding
+model_catalog:refresh:lock) fetch /models again; the others pick up the
+new copy on their next round.
+
+Hot-path lookups (cost computation, fallback routing, token budgeting,
+preset validation) only read the in-memory copy and never do I/O. Until the
+catalog is loaded they return None and callers keep their old behaviour.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from app.core.circuit_breaker import circuit_breaker_registry
+from app.core.config import settings
+from app.core.http_client import get_http_client
+from app.core.logging import get_logger
+from app.core.redis_client import get_redis_client
+
+logger = get_logger(__name__)
+
+CATALOG_CACHE_KEY = "model_catalog:openrouter"
+REFRESH_LOCK_KEY = "model_catalog:refresh:lock"
+
+# Retry delay of the background loop until the catalog is loaded
+_LOAD_RETRY_SECONDS = 10
+
+
+def _price(pricing: dict[str, Any], key: str) -> Optional[float]:
+    """Parse an OpenRouter price string (USD per unit); None if missing or invalid."""
+    value = pricing.get(key)
+    if value in (None, ""):
+        return None
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    # Negative prices mark variable pricing (e.g. openrouter/auto)
+    return price if price >= 0 else None
+
+
+@dataclass(frozen=True)
+class ModelInfo:
+    """Pricing, limits and capabilities of a model."""
+
+    id: str
+    name: str
+    context_length: Optional[int] = None
+    max_completion_tokens: Optional[int] = None
+    prompt_price: Optional[float] = None  # USD per token
+    completion_price: Optional[float] = None  # USD per token
+    request_price: float = 0.0  # USD per request
+    cache_read_price: Optional[float] = None  # USD per cached token read
+    cache_write_price: Optional[float] = None  # USD per cached token write
+    supported_parameters: frozenset[str] = field(default_factory=frozenset)
+    input_modalities: frozenset[str] = field(default_factory=frozenset)
+
+    @classmethod
+    def from_api(cls, data: dict[str, Any]) -> "ModelInfo":
+        """Build model info from an OpenRouter /models entry."""
+        pricing = data.get("pricing") or {}
+        top_provider = data.get("top_provider") or {}
+        architecture = data.get("architecture") or {}
+
+        return cls(
+            id=data["id"],
+            name=data.get("name") or data["id"],
+            context_length=top_provider.get("context_length") or data.get("context_length"),
+            max_completion_tokens=top_provider.get("max_completion_tokens"),
+            prompt_price=_price(pricing, "prompt"),
+            completion_price=_price(pricing, "completion"),
+            request_price=_price(pricing, "request") or 0.0,
+            cache_read_price=_price(pricing, "input_cache_read"),
+            cache_write_price=_price(pricing, "input_cache_write"),
+            supported_parameters=frozenset(data.get("supported_parameters") or ()),
+            input_modalities=frozenset(architecture.get("input_modalities") or ()),
+        )
+
+    @property
+    def has_pricing(self) -> bool:
+        """Whether token prices are known."""
+        return self.prompt_price is not None and self.completion_price is not None
+
+    def supports(self, parameter: str) -> bool:
+        """Check whether the model supports an API parameter (e.g. structured_outputs)."""
+        return parameter in self.supported_parameters
+
+    def compute_cost(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: int = 0,
+        cache_write_tokens: int = 0,
+    ) -> Optional[float]:
+        """
+        Compute the cost of a request from its usage.
+
+        Args:
+            prompt_tokens: Prompt tokens (including cached tokens)
+            completion_tokens: Completion tokens (including reasoning tokens)
+            cached_tokens: Prompt tokens read from the provider cache
+            cache_write_tokens: Prompt tokens written to the provider cache
+
+        Returns:
+            Cost in USD, or None if the model has no token pricing
+        """
+        if not self.has_pricing:
+            return None
+
+        cached_tokens = min(cached_tokens, prompt_tokens)
+        cache_write_tokens = min(cache_write_tokens, prompt_tokens - cached_tokens)
+        uncached_tokens = prompt_tokens - cached_tokens - cache_write_tokens
+
+        cache_read_price = (
+            self.cache_read_price if self.cache_read_price is not None else self.prompt_price
+        )
+        cache_write_price = (
+            self.cache_write_price if self.cache_write_price is not None else self.prompt_price
+        )
+
+        return (
+            uncached_tokens * self.prompt_price
+            + cached_tokens * cache_read_price
+            + cache_write_tokens * cache_write_price
+            + completion_tokens * self.completion_price
+            + self.request_price
+        )
+
+    def compute_cache_savings(self, cached_tokens: int) -> float:
+        """Compute the discount from cached prompt tokens (USD)."""
+        if self.prompt_price is None or self.cache_read_price is None:
+            return 0.0
+        return max(0.0, cached_tokens * (self.prompt_price - self.cache_read_price))
+
+
+def usage_token_counts(usage: dict[str, Any]) -> dict[str, int]:
+    """
+    Extract token counts from an OpenAI-format usage dict.
+
+    Args:
+        usage: Usage with prompt_tokens, completion_tokens and optional
+            prompt_tokens_details (cached_tokens, cache_write_tokens)
+
+    Returns:
+        Keyword arguments for ModelInfo.compute_cost
+    """
+    details = usage.get("prompt_tokens_details") or {}
+    return {
+        "prompt_tokens": usage.get("prompt_tokens") or 0,
+        "completion_tokens": usage.get("completion_tokens") or 0,
+        "cached_tokens": details.get("cached_tokens") or 0,
+        "cache_write_tokens": details.get("cache_write_tokens") or 0,
+    }
+
+
+class ModelCatalogUnavailableError(Exception):
+    """Raised when the catalog has never been loaded and can't be fetched."""
+
+
+class ModelCatalogService:
+    """
+    In-memory OpenRouter model catalog with Redis backing.
+
+    Features:
+    - Non-blocking lookups for the request hot path
+    - Local cost computation from usage (streaming and non-streaming)
+    - Shared Redis copy so workers don't each fetch the catalog
+    - Periodic background refresh by one worker at a time (stale data is
+      kept on refresh errors)
+    - Fail-open: Redis and API errors never fail a request
+    """
+
+    def __init__(self):
+        """Initialize model catalog service."""
+        self.redis = get_redis_client("cache")
+        self.refresh_interval_seconds = settings.model_catalog_refresh_interval_seconds
+        self.redis_ttl_seconds = settings.model_catalog_redis_ttl_seconds
+
+        self._models: dict[str, ModelInfo] = {}
+        self._raw_models: list[dict[str, Any]] = []
+        self._loaded_at: Optional[float] = None
+        self._fetched_at: Optional[float] = None  # Epoch seconds of the fetch from OpenRouter
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Circuit breaker for the catalog endpoint
+        self.circuit_breaker = circuit_breaker_registry.get_or_create(
+            name="openrouter_catalog",
+            failure_threshold=3,
+            recovery_timeout=120,
+            timeout_seconds=30,
+            max_concurrent=2,
+        )
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the catalog has been loaded."""
+        return self._loaded_at is not None
+
+    def get_cached_model(self, model_id: str) -> Optional[ModelInfo]:
+        """
+        Look up a model in memory (no I/O).
+
+        Args:
+            model_id: OpenRouter model ID
+
+        Returns:
+            ModelInfo, or None if unknown or the catalog isn't loaded yet
+        """
+        return self._models.get(model_id)
+
+    def compute_cost(self, model_id: str, usage: dict[str, Any]) -> Optional[float]:
+        """
+        Compute the cost of a request from its usage (no I/O).
+
+        Args:
+            model_id: Model that served the request
+            usage: OpenAI-format usage dict
+
+        Returns:
+            Cost in USD, or None if the model or its pricing is unknown
+        """
+        model = self._models.get(model_id)
+        if model is None or not usage:
+            return None
+        return model.compute_cost(**usage_token_counts(usage))
+
+    def compute_cache_savings(self, model_id: str, usage: dict[str, Any]) -> float:
+        """Compute the prompt cache discount of a request (no I/O)."""
+        model = self._models.get(model_id)
+        if model is None or not usage:
+            return 0.0
+        return model.compute_cache_savings(usage_token_counts(usage)["cached_tokens"])
+
+    def clamp_max_tokens(self, model_id: str, max_tokens: Optional[int]) -> Optional[int]:
+        """
+        Limit max_tokens to what the model can generate (no I/O).
+
+        Args:
+            model_id: Model ID
+            max_tokens: Requested completion token limit
+
+        Returns:
+            max_tokens, lowered to the model's completion limit if known
+        """
+        model = self._models.get(model_id)
+        if model is None or max_tokens is None:
+            return max_tokens
+
+        limit = model.max_completion_tokens or model.context_length
+        if limit and max_tokens > limit:
+            return limit
+        return max_tokens
+
+    def filter_fallback_models(
+        self,
+        models: list[str],
+        required_parameters: tuple[str, ...] = (),
+    ) -> list[str]:
+        """
+        Drop fallback models that are unknown or lack required parameters (no I/O).
+
+        Args:
+            models: Fallback model IDs in preference order
+            required_parameters: Parameters every fallback must support
+
+        Returns:
+            Usable fallback models (unchanged if the catalog isn't loaded)
+        """
+        if not self.is_loaded:
+            return models
+
+        usable = []
+        for model_id in models:
+            model = self._models.get(model_id)
+            if model is None:
+                logger.warning("model_catalog_unknown_fallback", model=model_id)
+                continue
+            if not all(model.supports(parameter) for parameter in required_parameters):
+                continue
+            usable.append(model_id)
+
+        return usable
+
+    async def get_model(self, model_id: str) -> Optional[ModelInfo]:
+        """Get a model, loading the catalog first if needed."""
+        await self.ensure_loaded()
+        return self._models.get(model_id)
+
+    async def get_raw_models(self) -> list[dict[str, Any]]:
+        """
+        Get the catalog as returned by the OpenRouter /models endpoint.
+
+        Returns:
+            Raw model entries (the last good copy if a refresh failed)
+
+        Raises:
+            ModelCatalogUnavailableError: If no copy could ever be loaded
+        """
+        await self.ensure_loaded()
+        if not self.is_loaded:
+            raise ModelCatalogUnavailableError("Model catalog is unavailable")
+        return self._raw_models
+
+    async def ensure_loaded(self) -> None:
+        """Load the catalog from Redis or OpenRouter if it isn't loaded yet."""
+        if self.is_loaded:
+            return
+
+        async with self._lock:
+            if self.is_loaded:
+                return
+
+            cached = await self._load_from_redis()
+            if cached is not None:
+                self._set_models(*cached)
+                return
+
+            raw_models = await self._fetch_and_store()
+            if raw_models is not None:
+                self._set_models(raw_models, time.time())
+
+    async def refresh(self) -> bool:
+        """
+        Fetch the catalog from OpenRouter and update memory and Redis.
+
+        Returns:
+            True if the catalog was refreshed (False keeps the previous copy)
+        """
+        async with self._lock:
+            raw_models = await self._fetch_and_store()
+            if raw_models is None:
+                return False
+            self._set_models(raw_models, time.time())
+            return True
+
+    async def sync(self) -> None:
+        """
+        Pick up the shared Redis copy, refetching it on one worker if stale.
+
+        A fresh Redis copy replaces an older in-memory one. A stale or
+        missing copy is refetched by the worker that takes the refresh lock;
+        the lock is held for the whole interval, so the catalog is fetched
+        at most once per interval across workers.
+        """
+        cached = await self._load_from_redis()
+        if cached is not None:
+            raw_models, fetched_at = cached
+            if self._fetched_at is None or fetched_at > self._fetched_at:
+                async with self._lock:
+                    self._set_models(raw_models, fetched_at)
+            if time.time() - fetched_at < self.refresh_interval_seconds:
+                return
+
+        try:
+            acquired = await self.redis.set(
+                REFRESH_LOCK_KEY, "1", nx=True, ex=max(1, int(self.refresh_interval_seconds))
+            )
+        except Exception as e:
+            # Without Redis every worker refreshes its own copy
+            logger.warning("model_catalog_lock_failed", error=str(e))
+            acquired = True
+
+        if acquired:
+            await self.refresh()
+
+    def start_background_refresh(self) -> None:
+        """Start the periodic refresh task (idempotent)."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop_background_refresh(self) -> None:
+        """Stop the periodic refresh task."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self) -> None:
+        """Sync the catalog every refresh_interval_seconds (sooner until loaded)."""
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("model_catalog_sync_failed", error=str(e))
+            await asyncio.sleep(self.refresh_interval_seconds if self.is_loaded else _LOAD_RETRY_SECONDS)
+
+    def _set_models(self, raw_models: list[dict[str, Any]], fetched_at: float) -> None:
+        """Replace the in-memory catalog with a copy fetched at fetched_at."""
+        models = {}
+        for data in raw_models:
+            try:
+                model = ModelInfo.from_api(data)
+            except (KeyError, TypeError, ValueError):
+                continue
+            models[model.id] = model
+
+        self._models = models
+        self._raw_models = raw_models
+        self._loaded_at = time.monotonic()
+        self._fetched_at = fetched_at
+
+        logger.info("model_catalog_loaded", models_count=len(models))
+
+    async def _fetch_and_store(self) -> Optional[list[dict[str, Any]]]:
+        """Fetch the catalog from OpenRouter and store it in Redis."""
+        try:
+            raw_models = await self.circuit_breaker.call(self._fetch_models)
+        except Exception as e:
+            logger.warning("model_catalog_fetch_failed", error=str(e))
+            return None
+
+        try:
+            await self.redis.setex(
+                CATALOG_CACHE_KEY,
+                self.redis_ttl_seconds,
+                json.dumps({"fetched_at": time.time(), "data": raw_models}),
+            )
+        except Exception as e:
+            logger.warning("model_catalog_store_failed", error=str(e))
+
+        return raw_models
+
+    async def _fetch_models(self) -> list[dict[str, Any]]:
+        """GET the OpenRouter /models endpoint."""
+        response = await get_http_client("openrouter").get(
+            f"{settings.openrouter_base_url}/models",
+            headers={
+                "HTTP-Referer": settings.openrouter_app_url,
+                "X-Title": settings.openrouter_app_name,
+            },
+        )
+        response.raise_for_status()
+        return response.json().get("data", [])
+
+    async def _load_from_redis(self) -> Optional[tuple[list[dict[str, Any]], float]]:
+        """
+        Load the shared catalog copy from Redis.
+
+        Returns:
+            (raw models, fetched_at), or None if missing, invalid or Redis is down
+        """
+        try:
+            cached = await self.redis.get(CATALOG_CACHE_KEY)
+        except Exception as e:
+            logger.warning("model_catalog_redis_load_failed", error=str(e))
+            return None
+
+        if not cached:
+            return None
+
+        try:
+            payload = json.loads(cached)
+            return payload["data"], float(payload["fetched_at"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+# Global model catalog service instance
+model_catalog_service = ModelCatalogService()
@@ -1,7 +1,10 @@
 """OpenRouter client service with Langfuse integration for cost tracking."""
 
+import hashlib
+import json
 import os
-from typing import Any, Literal, Optional
+import time
+from typing import Any, AsyncIterator, Literal, Optional
 from uuid import UUID
 
 from app.core.config import settings
@@ -17,7 +20,53 @@ else:
     logger = get_logger(__name__)
 
 
+from app.core.adaptive_limiter import (
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimiterRegistry,
+    is_rate_limit_error,
+)
 from app.core.circuit_breaker import circuit_breaker_registry
+from app.core.hedging import HedgeOutcome, HedgingPolicy
+from app.core.http_client import get_http_client
+from app.core.metrics import track_llm_dedup, track_llm_hedge
+from app.core.singleflight import SingleFlight, StreamFanout
+from app.services.model_catalog_service import model_catalog_service
+
+# Shared across service instances so per-model latency history accumulates
+chat_hedging_policy = HedgingPolicy(
+    name="openrouter_chat",
+    percentile=settings.llm_hedge_percentile,
+    min_delay_seconds=settings.llm_hedge_min_delay_seconds,
+    default_delay_seconds=settings.llm_hedge_default_delay_seconds,
+    budget_ratio=settings.llm_hedge_budget_ratio,
+)
+
+# Streams are hedged on time to first chunk, which doesn't grow with output
+# length, so its samples are kept apart from full-completion latency
+stream_hedging_policy = HedgingPolicy(
+    name="openrouter_stream",
+    percentile=settings.llm_hedge_percentile,
+    min_delay_seconds=settings.llm_hedge_min_delay_seconds,
+    default_delay_seconds=settings.llm_hedge_stream_default_delay_seconds,
+    budget_ratio=settings.llm_hedge_budget_ratio,
+)
+
+# Per-model adaptive concurrency limits on in-flight completions (per worker)
+llm_concurrency_limiters = ConcurrencyLimiterRegistry(
+    initial_limit=settings.llm_concurrency_initial_limit,
+    min_limit=settings.llm_concurrency_min_limit,
+    max_limit=settings.llm_concurrency_max_limit,
+    queue_size=settings.llm_concurrency_queue_size,
+)
+
+# Identical concurrent deterministic completions share one upstream call
+completion_singleflight = SingleFlight(name="openrouter_completion")
+completion_stream_fanout = StreamFanout(name="openrouter_stream")
+
+# Parameters that don't change the completion (excluded from the dedup key)
+_DEDUP_IGNORED_PARAMS = {"user", "extra_headers"}
+
+
 class OpenRouterService:
     """
     Comprehensive OpenRouter client service with Langfuse observability.
@@ -27,6 +76,8 @@ class OpenRouterService:
     - Usage accounting with detailed token tracking
     - User tracking for cache stickiness
     - Model routing and automatic fallbacks
+    - Opt-in hedged requests across fallback models
+    - Per-model adaptive concurrency limits with deadline-aware load shedding
     - Structured outputs with JSON schema
     - Multimodal support (images, PDFs, audio)
     - Enhanced error handling
@@ -71,8 +122,14 @@ class OpenRouterService:
             recovery_timeout=60,  # Try recovery after 60 seconds
             success_threshold=2,  # Need 2 successes to close
             timeout_seconds=120,  # 2 minute timeout for LLM calls
+            # No bulkhead: the per-model adaptive limiters cap concurrency
+            # and shed excess calls as LoadSheddingError (503)
         )
 
+        # Hedging policies (per-model latency percentiles + hedge budget)
+        self.hedging_policy = chat_hedging_policy
+        self.stream_hedging_policy = stream_hedging_policy
+
     async def chat_completion(
         self,
         messages: list[dict[str, Any]],
@@ -89,6 +146,8 @@ class OpenRouterService:
         metadata: dict[str, Any] | None = None,  # Langfuse metadata
         tags: list[str] | None = None,  # Langfuse tags
         session_id: str | None = None,  # Langfuse session ID
+        hedge: bool | None = None,
+        deadline_seconds: float | None = None,
         **kwargs: Any,
     ) -> dict[str, Any]:
         """
@@ -104,15 +163,175 @@ class OpenRouterService:
             response_schema: JSON schema for structured outputs
             temperature: Temperature (0.0-1.0)
             max_tokens: Maximum tokens in response
-            stream: Stream responses
+            stream: Stream responses (use stream_chat_completion to consume chunks)
             name: Name for this generation in Langfuse (optional)
             metadata: Additional metadata for Langfuse tracing (optional)
             tags: Tags for Langfuse tracing (optional)
             session_id: Session ID for Langfuse tracing (optional)
+            hedge: Hedge slow requests across fallback models (uses config default if None)
+            deadline_seconds: Max time to wait for a concurrency slot (uses config default if None)
             **kwargs: Additional parameters
 
         Returns:
             OpenRouter API response with usage data
+
+        Raises:
+            LoadSheddingError: If the model is saturated and the deadline can't be met
+        """
+        completion_params, models_list = self._prepare_completion(
+            messages=messages,
+            model=model,
+            user_id=user_id,
+            fallback_models=fallback_models,
+            enable_caching=enable_caching,
+            cache_breakpoints=cache_breakpoints,
+            response_schema=response_schema,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=stream,
+            name=name,
+            metadata=metadata,
+            tags=tags,
+            session_id=session_id,
+            **kwargs,
+        )
+        selected_model = completion_params["model"]
+        deadline = self._admission_deadline(deadline_seconds)
+
+        # Hedging replaces OpenRouter's sequential fallback for non-streaming calls
+        # (streams are hedged on time to first chunk by stream_chat_completion)
+        should_hedge = (
+            (hedge if hedge is not None else settings.llm_hedging_enabled)
+            and not stream
+            and len(models_list) > 1
+        )
+
+        async def create() -> tuple[Any, HedgeOutcome | None]:
+            if should_hedge:
+                outcome = await self._hedged_completion(
+                    completion_params,
+                    models_list[:settings.llm_hedge_max_attempts],
+                    deadline,
+                )
+                return outcome.result, outcome
+
+            started = time.perf_counter()
+            response = await self._create_completion(completion_params, deadline)
+            if not stream:
+                self.hedging_policy.record_latency(selected_model, time.perf_counter() - started)
+            return response, None
+
+        # Make API call with Langfuse tracing
+        try:
+            dedup_key = None if stream else self._dedup_key(completion_params, temperature)
+            if dedup_key is not None:
+                # Identical concurrent requests share one upstream completion
+                (response, hedge_outcome), shared = await completion_singleflight.do(dedup_key, create)
+                if shared:
+                    track_llm_dedup(provider="openrouter", mode="completion")
+            else:
+                response, hedge_outcome = await create()
+
+            # Convert response to dict (OpenAI SDK returns object)
+            result = self._parse_openai_response(response)
+
+            if hedge_outcome is not None:
+                result["models_attempted"] = hedge_outcome.attempted
+                result["fallback_used"] = hedge_outcome.key != selected_model
+
+            logger.info(
+                "chat_completion_success",
+                model=result.get("model"),
+                tokens=result.get("usage", {}).get("total_tokens"),
+                cached_tokens=result.get("cached_tokens_read", 0),
+                cost_usd=result.get("total_cost_usd"),
+                langfuse_enabled=settings.langfuse_enabled,
+            )
+
+            return result
+
+        except Exception as e:
+            logger.error(
+                "chat_completion_error",
+                error=str(e),
+                model=selected_model,
+                langfuse_enabled=settings.langfuse_enabled,
+            )
+            raise
+
+    async def stream_chat_completion(
+        self,
+        messages: list[dict[str, Any]],
+        **kwargs: Any,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Stream a chat completion as parsed chunks.
+
+        Accepts the same arguments as chat_completion (stream is implied).
+        With hedging, a stream that hasn't produced its first chunk within
+        its model's time-to-first-chunk percentile is raced against the next
+        fallback model. Identical concurrent deterministic requests fan out
+        from a single upstream stream.
+
+        Args:
+            messages: Chat messages
+            **kwargs: chat_completion arguments
+
+        Yields:
+            Chunk dicts with choices[].delta; the final chunk carries usage
+        """
+        kwargs.pop("stream", None)
+        hedge = kwargs.pop("hedge", None)
+        deadline = self._admission_deadline(kwargs.pop("deadline_seconds", None))
+        completion_params, models_list = self._prepare_completion(messages=messages, stream=True, **kwargs)
+        completion_params["stream_options"] = {"include_usage": True}
+
+        should_hedge = (hedge if hedge is not None else settings.llm_hedging_enabled) and len(models_list) > 1
+
+        def upstream() -> AsyncIterator[dict[str, Any]]:
+            if should_hedge:
+                return self._hedged_stream(
+                    completion_params,
+                    models_list[:settings.llm_hedge_max_attempts],
+                    deadline,
+                )
+            return self._stream_completion(completion_params, deadline)
+
+        dedup_key = self._dedup_key(completion_params, kwargs.get("temperature"))
+        if dedup_key is None:
+            chunks = upstream()
+        else:
+            if completion_stream_fanout.is_shared(dedup_key):
+                track_llm_dedup(provider="openrouter", mode="stream")
+            chunks = completion_stream_fanout.subscribe(dedup_key, upstream)
+
+        async for chunk in chunks:
+            yield chunk
+
+    def _prepare_completion(
+        self,
+        messages: list[dict[str, Any]],
+        model: str | None = None,
+        user_id: UUID | str | None = None,
+        fallback_models: list[str] | None = None,
+        enable_caching: bool | None = None,
+        cache_breakpoints: list[int] | None = None,
+        response_schema: dict[str, Any] | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+        stream: bool = False,
+        name: str | None = None,
+        metadata: dict[str, Any] | None = None,
+        tags: list[str] | None = None,
+        session_id: str | None = None,
+        **kwargs: Any,
+    ) -> tuple[dict[str, Any], list[str]]:
+        """
+        Build OpenAI SDK parameters for a chat completion.
+
+        Returns:
+            (completion_params, models_list) where models_list is the primary
+            model followed by usable fallbacks
         """
         # Determine model
         if settings.enable_auto_router and not model:
@@ -138,12 +357,16 @@ class OpenRouterService:
             extra_body["usage"] = {"include": True}
 
         # Model routing / fallbacks
+        use_schema = bool(response_schema and settings.structured_outputs_enabled)
+        models_list = [selected_model]
         if settings.model_routing_enabled:
-            models_list = [selected_model]
-            if fallback_models:
-                models_list.extend(fallback_models)
-            elif settings.default_fallback_models:
-                models_list.extend(settings.default_fallback_models)
+            # Skip fallbacks the catalog doesn't list or that can't honour the schema
+            models_list.extend(
+                model_catalog_service.filter_fallback_models(
+                    fallback_models or settings.default_fallback_models or [],
+                    required_parameters=("structured_outputs",) if use_schema else (),
+                )
+            )
 
             if len(models_list) > 1:
                 extra_body["models"] = models_list
@@ -161,11 +384,13 @@ class OpenRouterService:
         # Add optional parameters
         if temperature is not None:
             completion_params["temperature"] = temperature
+        # Token budget can't exceed what the model can generate
+        max_tokens = model_catalog_service.clamp_max_tokens(selected_model, max_tokens)
         if max_tokens is not None:
             completion_params["max_tokens"] = max_tokens
         if user_id and settings.track_user_ids:
             completion_params["user"] = str(user_id)
-        if response_schema and settings.structured_outputs_enabled:
+        if use_schema:
             completion_params["response_format"] = {
                 "type": "json_schema",
                 "json_schema": response_schema
@@ -205,32 +430,223 @@ class OpenRouterService:
                 "langfuse-session-id": session_id or "",
             }
 
-        # Make API call with Langfuse tracing
-        try:
-            response = await self.client.chat.completions.create(**completion_params)
+        return completion_params, models_list
 
-            # Convert response to dict (OpenAI SDK returns object)
-            result = self._parse_openai_response(response)
+    def _dedup_key(
+        self,
+        completion_params: dict[str, Any],
+        temperature: float | None,
+    ) -> str | None:
+        """
+        Build the in-flight dedup key for a completion.
 
-            logger.info(
-                "chat_completion_success",
-                model=result.get("model"),
-                tokens=result.get("usage", {}).get("total_tokens"),
-                cached_tokens=result.get("cached_tokens_read", 0),
-                cost_usd=result.get("total_cost_usd"),
-                langfuse_enabled=settings.langfuse_enabled,
-            )
+        Only deterministic requests (temperature at or below
+        llm_dedup_max_temperature) are coalesced. The key covers the model,
+        the whitespace-normalized messages and all sampling parameters.
 
-            return result
+        Returns:
+            Dedup key, or None if the request must not be shared
+        """
+        if (
+            not settings.llm_dedup_enabled
+            or temperature is None
+            or temperature > settings.llm_dedup_max_temperature
+        ):
+            return None
+
+        keyed = {
+            key: value
+            for key, value in completion_params.items()
+            if key not in _DEDUP_IGNORED_PARAMS
+        }
+        keyed["messages"] = [
+            {
+                **message,
+                "content": " ".join(message["content"].split())
+                if isinstance(message.get("content"), str)
+                else message.get("content"),
+            }
+            for message in completion_params["messages"]
+        ]
+
+        digest = hashlib.sha256(
+            json.dumps(keyed, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{completion_params['model']}:{digest}"
+
+    def _admission_deadline(self, deadline_seconds: float | None) -> float:
+        """Get the time.monotonic() deadline for acquiring a concurrency slot."""
+        if deadline_seconds is None:
+            deadline_seconds = settings.llm_request_deadline_seconds
+        return time.monotonic() + deadline_seconds
+
+    def _concurrency_limiter(self, model: str) -> AdaptiveConcurrencyLimiter | None:
+        """Get the adaptive concurrency limiter for a model (None if disabled)."""
+        if not settings.llm_concurrency_enabled:
+            return None
+        return llm_concurrency_limiters.get_or_create(model)
+
+    async def _create_completion(
+        self,
+        params: dict[str, Any],
+        deadline: float | None = None,
+    ) -> Any:
+        """
+        Call chat.completions.create within the model's concurrency limit.
 
+        Args:
+            params: Completion parameters
+            deadline: time.monotonic() by which a concurrency slot must be acquired
+
+        Returns:
+            SDK response
+
+        Raises:
+            LoadSheddingError: If the model is saturated and the deadline can't be met
+        """
+        limiter = self._concurrency_limiter(params["model"])
+        if limiter is None:
+            return await self.circuit_breaker.call(self.client.chat.completions.create, **params)
+
+        return await limiter.run(
+            self.circuit_breaker.call,
+            self.client.chat.completions.create,
+            deadline=deadline,
+            **params,
+        )
+
+    async def _stream_completion(
+        self,
+        params: dict[str, Any],
+        deadline: float | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Stream parsed chunks within the model's concurrency limit.
+
+        The slot is held for the whole stream; stream duration depends on
+        output length, so only 429s (not latency) adapt the limit.
+
+        Args:
+            params: Completion parameters (stream=True)
+            deadline: time.monotonic() by which a concurrency slot must be acquired
+
+        Yields:
+            Parsed chunk dicts
+        """
+        limiter = self._concurrency_limiter(params["model"])
+        if limiter is not None:
+            await limiter.acquire(deadline)
+        rate_limited = False
+        try:
+            stream = await self.circuit_breaker.call(self.client.chat.completions.create, **params)
+            async for chunk in stream:
+                yield self._parse_stream_chunk(chunk)
         except Exception as e:
-            logger.error(
-                "chat_completion_error",
-                error=str(e),
-                model=selected_model,
-                langfuse_enabled=settings.langfuse_enabled,
-            )
+            rate_limited = is_rate_limit_error(e)
             raise
+        finally:
+            if limiter is not None:
+                limiter.release(rate_limited=rate_limited)
+
+    async def _hedged_stream(
+        self,
+        completion_params: dict[str, Any],
+        models: list[str],
+        deadline: float | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Stream a completion with hedged requests across models.
+
+        An attempt completes when its stream produces the first chunk, so
+        the hedge deadline follows each model's time to first chunk. The
+        winning stream is then relayed; the others are closed.
+
+        Args:
+            completion_params: Parameters for the primary request
+            models: Candidate models in preference order
+            deadline: time.monotonic() by which each attempt must acquire a concurrency slot
+
+        Yields:
+            Parsed chunk dicts of the winning stream
+        """
+        def attempt(model: str):
+            params = self._single_model_params(completion_params, model)
+
+            async def first_chunk() -> tuple[dict[str, Any] | None, AsyncIterator[dict[str, Any]]]:
+                chunks = self._stream_completion(params, deadline)
+                try:
+                    return await anext(chunks, None), chunks
+                except BaseException:
+                    await chunks.aclose()
+                    raise
+
+            return first_chunk
+
+        async def discard(result: tuple[dict[str, Any] | None, AsyncIterator[dict[str, Any]]]) -> None:
+            await result[1].aclose()
+
+        outcome = await self.stream_hedging_policy.execute(
+            [(model, attempt(model)) for model in models],
+            discard=discard,
+        )
+
+        if outcome.hedged:
+            track_llm_hedge(provider="openrouter", hedge_won=outcome.key != models[0])
+
+        first, chunks = outcome.result
+        try:
+            if first is not None:
+                yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    async def _hedged_completion(
+        self,
+        completion_params: dict[str, Any],
+        models: list[str],
+        deadline: float | None = None,
+    ) -> HedgeOutcome:
+        """
+        Run a completion with hedged requests across models.
+
+        Each attempt targets a single model; the next model is only called
+        when the current one is slower than its latency percentile (or fails).
+
+        Args:
+            completion_params: Parameters for the primary request
+            models: Candidate models in preference order
+            deadline: time.monotonic() by which each attempt must acquire a concurrency slot
+
+        Returns:
+            HedgeOutcome with the winning model and SDK response
+        """
+        def attempt(model: str):
+            params = self._single_model_params(completion_params, model)
+            return lambda: self._create_completion(params, deadline)
+
+        outcome = await self.hedging_policy.execute([(model, attempt(model)) for model in models])
+
+        if outcome.hedged:
+            track_llm_hedge(provider="openrouter", hedge_won=outcome.key != models[0])
+
+        return outcome
+
+    @staticmethod
+    def _single_model_params(completion_params: dict[str, Any], model: str) -> dict[str, Any]:
+        """Target one model, dropping OpenRouter's models-list fallback."""
+        params = {**completion_params, "model": model}
+        extra_body = {
+            key: value
+            for key, value in (params.get("extra_body") or {}).items()
+            if key != "models"
+        }
+        if extra_body:
+            params["extra_body"] = extra_body
+        else:
+            params.pop("extra_body", None)
+        return params
 
     def _prepare_messages_with_caching(
         self,
@@ -343,54 +759,84 @@ class OpenRouterService:
 
             result["usage"] = usage_dict
 
+            # Otherwise price the request locally from the cached model catalog
+            if result.get("total_cost_usd") is None:
+                result["total_cost_usd"] = model_catalog_service.compute_cost(
+                    response.model, usage_dict
+                )
+            if result.get("cached_tokens_read"):
+                result["cache_discount_usd"] = model_catalog_service.compute_cache_savings(
+                    response.model, usage_dict
+                )
+
         return result
 
+    def _parse_stream_chunk(self, chunk) -> dict[str, Any]:
+        """Parse an OpenAI SDK stream chunk to dict (usage arrives on the final chunk)."""
+        result = {
+            "id": chunk.id,
+            "model": chunk.model,
+            "choices": [
+                {
+                    "index": choice.index,
+                    "delta": {
+                        "role": choice.delta.role,
+                        "content": choice.delta.content,
+                    },
+                    "finish_reason": choice.finish_reason,
+                }
+                for choice in chunk.choices
+            ],
+        }
+
+        usage = getattr(chunk, "usage", None)
+        if usage:
+            usage_dict = {
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "total_tokens": usage.total_tokens,
+            }
+            details = getattr(usage, "prompt_tokens_details", None)
+            if details:
+                usage_dict["prompt_tokens_details"] = {
+                    "cached_tokens": getattr(details, "cached_tokens", 0),
+                }
+            # OpenRouter usage accounting reports the cost on the final chunk
+            if getattr(usage, "cost", None) is not None:
+                usage_dict["cost"] = usage.cost
+            result["usage"] = usage_dict
+
+        return result
+
+    async def _get_json(self, url: str) -> Any:
+        """GET an OpenRouter API endpoint and return the JSON body."""
+        # Use the shared pooled client for these endpoints as they're not completions
+        response = await get_http_client("openrouter").get(
+            url,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "HTTP-Referer": self.app_url,
+                "X-Title": self.app_name,
+            },
+        )
+        response.raise_for_status()
+        return response.json()
+
     async def get_models(self) -> list[dict[str, Any]]:
-        """Get list of available models from OpenRouter."""
-        # Use httpx for this endpoint as it's not a completion
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/models",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "HTTP-Referer": self.app_url,
-                    "X-Title": self.app_name,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("data", [])
+        """Get list of available models from OpenRouter (served from the model catalog)."""
+        return await model_catalog_service.get_raw_models()
 
     async def get_credits(self) -> dict[str, Any]:
         """Get OpenRouter credit balance."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://openrouter.ai/api/v1/auth/key",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "HTTP-Referer": self.app_url,
-                    "X-Title": self.app_name,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self.circuit_breaker.call(
+            self._get_json, "https://openrouter.ai/api/v1/auth/key"
+        )
 
     async def get_generation(self, generation_id: str) -> dict[str, Any]:
         """Get generation details including usage data."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://openrouter.ai/api/v1/generation?id={generation_id}",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "HTTP-Referer": self.app_url,
-                    "X-Title": self.app_name,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self.circuit_breaker.call(
+            self._get_json, f"https://openrouter.ai/api/v1/generation?id={generation_id}"
+        )
 
 
 # Global service instance
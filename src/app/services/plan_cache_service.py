@@ -0,0 +1,362 @@
+"""
+Process-local cache of plan limits and user subscriptions.
+
+Plan limits change almost never, but quota checks, preset limits, image
+generation and plan changes all need them. Subscriptions change rarely
+per user but are read on most requests. Both are served from memory:
+
+- Plan limits: the whole PlanLimit table as frozen CachedPlanLimit rows,
+  loaded at startup and stamped with the version it was loaded at
+- Subscriptions: per-user CachedSubscription in a TTL cache (users
+  without a subscription are cached too)
+
+Changes are broadcast on the plan_cache:invalidate Redis channel so every
+worker drops or reloads its copy:
+
+- {"type": "plans", "version": N}: plan limits changed; workers below
+  version N reload the table
+- {"type": "subscription", "user_id": ..., "plan_type": ..., "status": ...}:
+  a user's subscription changed; workers drop the cached entry and update
+  the user's rate limit plan
+
+The current plan version is also kept in Redis, so a worker that missed
+messages (e.g. while the subscription was reconnecting) catches up on its
+next version check. Lookups that miss read through to the database.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.redis_client import get_redis_client
+from app.db.base import AsyncSessionLocal
+from app.models.subscription import PlanLimit, Subscription
+from app.services.rate_limit_policy_service import rate_limit_policy_service
+from app.utils.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+
+INVALIDATION_CHANNEL = "plan_cache:invalidate"
+VERSION_KEY = "plan_cache:version"
+
+
+@dataclass(frozen=True)
+class CachedPlanLimit:
+    """Immutable copy of a PlanLimit row."""
+
+    plan_type: str
+    max_messages_per_month: int
+    max_tokens_per_month: int
+    max_images_per_month: int
+    max_documents_per_month: int
+    max_audio_minutes_per_month: int
+    web_search_enabled: bool = True
+    image_generation_enabled: bool = False
+    pdf_processing_enabled: bool = False
+    audio_processing_enabled: bool = False
+    prompt_caching_enabled: bool = False
+    advanced_models_enabled: bool = False
+    presets_limit: int = 0
+    max_context_length: int = 4096
+    priority_support: bool = False
+    monthly_price_usd: float = 0.0
+    yearly_price_usd: float = 0.0
+
+    @classmethod
+    def from_model(cls, plan: PlanLimit) -> "CachedPlanLimit":
+        """Copy a PlanLimit row (unset columns take the model defaults)."""
+        values: dict[str, Any] = {}
+        for name, default in cls.__dataclass_fields__.items():
+            value = getattr(plan, name)
+            values[name] = default.default if value is None else value
+        values["monthly_price_usd"] = float(values["monthly_price_usd"])
+        values["yearly_price_usd"] = float(values["yearly_price_usd"])
+        return cls(**values)
+
+
+@dataclass(frozen=True)
+class CachedSubscription:
+    """Immutable copy of the Subscription fields read on the hot path."""
+
+    id: UUID
+    user_id: UUID
+    plan_type: str
+    status: str
+    billing_cycle: str
+    current_period_end: Optional[datetime] = None
+    cancel_at_period_end: bool = False
+    trial_ends_at: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, subscription: Subscription) -> "CachedSubscription":
+        """Copy a Subscription row."""
+        return cls(
+            id=subscription.id,
+            user_id=subscription.user_id,
+            plan_type=subscription.plan_type,
+            status=subscription.status,
+            billing_cycle=subscription.billing_cycle,
+            current_period_end=subscription.current_period_end,
+            cancel_at_period_end=bool(subscription.cancel_at_period_end),
+            trial_ends_at=subscription.trial_ends_at,
+        )
+
+
+class PlanCacheService:
+    """
+    In-memory plan limits and subscriptions with Redis pub/sub invalidation.
+
+    Features:
+    - Versioned plan limits table loaded at startup
+    - TTL cache of subscriptions per user, including users without one
+    - Read-through to the database on a miss
+    - Invalidation broadcast to all workers, with a periodic version check
+    - Fail-open: Redis errors leave the TTL as the only invalidation
+    """
+
+    def __init__(self):
+        """Initialize plan cache service."""
+        self.redis = get_redis_client("default")
+        self.version_check_seconds = settings.plan_cache_version_check_seconds
+
+        self._plans: dict[str, CachedPlanLimit] = {}
+        self._plans_loaded = False
+        self._version: Optional[int] = None  # Plan version the table was loaded at
+        self._subscriptions: TTLCache[UUID, Optional[CachedSubscription]] = TTLCache(
+            maxsize=settings.plan_cache_subscription_max_users,
+            ttl_seconds=settings.plan_cache_subscription_ttl_seconds,
+        )
+        self._listener_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the plan limits table has been loaded."""
+        return self._plans_loaded
+
+    @property
+    def version(self) -> Optional[int]:
+        """Plan version of the loaded table (None until loaded)."""
+        return self._version
+
+    def get_cached_plan(self, plan_type: str) -> Optional[CachedPlanLimit]:
+        """Get a plan's limits from memory (no I/O)."""
+        return self._plans.get(plan_type)
+
+    async def get_plan(self, plan_type: str, db: AsyncSession) -> Optional[CachedPlanLimit]:
+        """
+        Get a plan's limits.
+
+        Args:
+            plan_type: Plan type
+            db: Database session used on a miss
+
+        Returns:
+            CachedPlanLimit or None if the plan doesn't exist
+        """
+        plan = self._plans.get(plan_type)
+        if plan is not None:
+            return plan
+
+        result = await db.execute(select(PlanLimit).where(PlanLimit.plan_type == plan_type))
+        row = result.scalar_one_or_none()
+        if row is None:
+            return None
+
+        plan = CachedPlanLimit.from_model(row)
+        self._plans[plan_type] = plan
+        return plan
+
+    async def list_plans(self, db: AsyncSession) -> list[CachedPlanLimit]:
+        """
+        List all plans by monthly price.
+
+        Args:
+            db: Database session used if the table isn't loaded yet
+
+        Returns:
+            Cached plans ordered by monthly price
+        """
+        if self._version is None:
+            await self.reload_plans(db)
+        return sorted(self._plans.values(), key=lambda plan: plan.monthly_price_usd)
+
+    async def get_subscription(self, user_id: UUID, db: AsyncSession) -> Optional[CachedSubscription]:
+        """
+        Get a user's subscription.
+
+        Args:
+            user_id: User ID
+            db: Database session used on a miss
+
+        Returns:
+            CachedSubscription or None if the user has no subscription
+        """
+        cached = self._subscriptions.get(user_id, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        result = await db.execute(select(Subscription).where(Subscription.user_id == user_id))
+        row = result.scalar_one_or_none()
+        subscription = CachedSubscription.from_model(row) if row is not None else None
+        self._subscriptions.set(user_id, subscription)
+        return subscription
+
+    async def reload_plans(self, db: Optional[AsyncSession] = None) -> bool:
+        """
+        Reload the plan limits table.
+
+        The version is read before the rows, so a change published while
+        loading triggers another reload instead of being missed.
+
+        Args:
+            db: Database session (a new one is opened if omitted)
+
+        Returns:
+            True if the table was reloaded (False keeps the previous copy)
+        """
+        version = await self._get_published_version()
+        try:
+            if db is None:
+                async with AsyncSessionLocal() as session:
+                    result = await session.execute(select(PlanLimit))
+                    rows = result.scalars().all()
+            else:
+                result = await db.execute(select(PlanLimit))
+                rows = result.scalars().all()
+        except Exception as e:
+            logger.warning("plan_cache_load_failed", error=str(e))
+            return False
+
+        self._plans = {row.plan_type: CachedPlanLimit.from_model(row) for row in rows}
+        self._plans_loaded = True
+        self._version = version
+
+        logger.info("plan_cache_loaded", plans=len(self._plans), version=version)
+        return True
+
+    async def publish_plans_changed(self) -> None:
+        """Broadcast that plan limits changed (call after committing the change)."""
+        try:
+            version = await self.redis.incr(VERSION_KEY)
+            await self.redis.publish(INVALIDATION_CHANNEL, json.dumps({"type": "plans", "version": version}))
+        except Exception as e:
+            logger.warning("plan_cache_publish_failed", error=str(e))
+
+        await self.reload_plans()
+
+    async def subscription_changed(self, user_id: UUID, plan_type: str, status: str) -> None:
+        """
+        Apply and broadcast a subscription change (call after committing it).
+
+        Args:
+            user_id: User ID
+            plan_type: Subscription plan type
+            status: Subscription status
+        """
+        self._apply_subscription_change(user_id, plan_type, status)
+
+        try:
+            message = json.dumps(
+                {"type": "subscription", "user_id": str(user_id), "plan_type": plan_type, "status": status}
+            )
+            await self.redis.publish(INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            logger.warning("plan_cache_publish_failed", user_id=str(user_id), error=str(e))
+
+    def clear(self) -> None:
+        """Drop all cached plans and subscriptions."""
+        self._plans = {}
+        self._plans_loaded = False
+        self._version = None
+        self._subscriptions.clear()
+
+    def start_background_refresh(self) -> None:
+        """Start the invalidation listener (idempotent)."""
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop_background_refresh(self) -> None:
+        """Stop the invalidation listener."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    async def _listen(self) -> None:
+        """Load plans, then apply invalidations until cancelled (reconnects on errors)."""
+        await self.reload_plans()
+
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                await self._check_version()
+                checked_at = time.monotonic()
+
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        await self._handle_message(message["data"])
+                    if time.monotonic() - checked_at >= self.version_check_seconds:
+                        await self._check_version()
+                        checked_at = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("plan_cache_listener_failed", error=str(e))
+                await asyncio.sleep(self.version_check_seconds)
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+
+    async def _handle_message(self, data: str) -> None:
+        """Apply one invalidation message."""
+        try:
+            message = json.loads(data)
+            if message["type"] == "plans":
+                if self._version is None or int(message["version"]) > self._version:
+                    await self.reload_plans()
+            elif message["type"] == "subscription":
+                self._apply_subscription_change(
+                    UUID(message["user_id"]), message["plan_type"], message["status"]
+                )
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("plan_cache_invalid_message", error=str(e))
+
+    async def _check_version(self) -> None:
+        """Reload plans if a change was published that this worker missed."""
+        version = await self._get_published_version()
+        if self._version is None or version > self._version:
+            await self.reload_plans()
+
+    async def _get_published_version(self) -> int:
+        """Get the latest published plan version (0 if unknown)."""
+        try:
+            return int(await self.redis.get(VERSION_KEY) or 0)
+        except Exception as e:
+            logger.warning("plan_cache_version_read_failed", error=str(e))
+            return self._version or 0
+
+    def _apply_subscription_change(self, user_id: UUID, plan_type: str, status: str) -> None:
+        """Drop the cached subscription and update the user's rate limit plan."""
+        self._subscriptions.pop(user_id)
+        rate_limit_policy_service.set_user_plan(user_id, plan_type, status)
+
+
+plan_cache_service = PlanCacheService()
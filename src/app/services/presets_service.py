@@ -8,7 +8,9 @@ from app.core.logging import get_logger
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.subscription import ModelPreset, PlanLimit, Subscription
+from app.models.subscription import ModelPreset
+from app.services.model_catalog_service import model_catalog_service
+from app.services.plan_cache_service import plan_cache_service
 
 logger = get_logger(__name__)
 
@@ -82,6 +84,7 @@ class PresetsService:
         self._validate_preset_config(
             temperature=temperature, top_p=top_p, max_tokens=max_tokens
         )
+        self._validate_preset_model(model=model, max_tokens=max_tokens)
 
         # Create preset
         preset = ModelPreset(
@@ -194,6 +197,11 @@ class PresetsService:
                 top_p=updates.get("top_p"),
                 max_tokens=updates.get("max_tokens"),
             )
+        if "model" in updates or "max_tokens" in updates:
+            self._validate_preset_model(
+                model=updates.get("model") or preset.model,
+                max_tokens=updates.get("max_tokens", preset.max_tokens),
+            )
 
         # Update fields
         for key, value in updates.items():
@@ -313,19 +321,13 @@ class PresetsService:
     async def _check_preset_limit(self, user_id: UUID, db: AsyncSession) -> None:
         """Check if user has reached preset limit."""
         # Get user's subscription
-        result = await db.execute(
-            select(Subscription).where(Subscription.user_id == user_id)
-        )
-        subscription = result.scalar_one_or_none()
+        subscription = await plan_cache_service.get_subscription(user_id, db)
 
         if not subscription:
             raise ValueError("No active subscription found")
 
         # Get plan limits
-        result = await db.execute(
-            select(PlanLimit).where(PlanLimit.plan_type == subscription.plan_type)
-        )
-        plan_limit = result.scalar_one_or_none()
+        plan_limit = await plan_cache_service.get_plan(subscription.plan_type, db)
 
         if not plan_limit:
             raise ValueError(f"Plan limits not found for {subscription.plan_type}")
@@ -357,6 +359,24 @@ class PresetsService:
         if max_tokens is not None and max_tokens < 1:
             raise ValueError("Max_tokens must be positive")
 
+    def _validate_preset_model(self, model: str, max_tokens: int | None = None) -> None:
+        """
+        Validate the model and token budget against the cached model catalog.
+
+        Skipped while the catalog isn't loaded so presets can still be saved
+        when OpenRouter is unreachable.
+        """
+        if not model_catalog_service.is_loaded:
+            return
+
+        model_info = model_catalog_service.get_cached_model(model)
+        if model_info is None:
+            raise ValueError(f"Unknown model '{model}'")
+
+        limit = model_info.max_completion_tokens or model_info.context_length
+        if max_tokens is not None and limit and max_tokens > limit:
+            raise ValueError(f"Max_tokens exceeds the limit of {model} ({limit})")
+
     def parse_preset_config(self, preset: ModelPreset) -> dict[str, Any]:
         """Parse preset configuration into a usable format."""
         config = {
@@ -14,6 +14,7 @@ from qdrant_client.http.models import (
     VectorParams,
 )
 
+from app.core.circuit_breaker import circuit_breaker_registry
 from app.core.config import settings
 from app.core.logging import get_logger
 
@@ -40,6 +41,15 @@ class QdrantService:
         # Use environment-specific collection name
         self.collection_name = settings.get_collection_name(settings.qdrant_collection_name)
 
+        # Circuit breaker + bulkhead for Qdrant calls
+        self.circuit_breaker = circuit_breaker_registry.get_or_create(
+            name="qdrant",
+            failure_threshold=5,
+            recovery_timeout=30,
+            timeout_seconds=30,
+            max_concurrent=50,
+        )
+
     async def ensure_collection_exists(
         self,
         collection_name: Optional[str] = None,
@@ -57,13 +67,14 @@ class QdrantService:
         collection_name = collection_name or self.collection_name
 
         try:
-            collections = await self.client.get_collections()
+            collections = await self.circuit_breaker.call(self.client.get_collections)
             collection_exists = any(
                 col.name == collection_name for col in collections.collections
             )
 
             if not collection_exists:
-                await self.client.create_collection(
+                await self.circuit_breaker.call(
+                    self.client.create_collection,
                     collection_name=collection_name,
                     vectors_config=VectorParams(
                         size=vector_size,
@@ -115,7 +126,8 @@ class QdrantService:
         collection_name = collection_name or self.collection_name
 
         try:
-            await self.client.upsert(
+            await self.circuit_breaker.call(
+                self.client.upsert,
                 collection_name=collection_name,
                 points=points,
             )
@@ -172,7 +184,8 @@ class QdrantService:
             query_filter = Filter(must=must_conditions)
 
         try:
-            results = await self.client.search(
+            results = await self.circuit_breaker.call(
+                self.client.search,
                 collection_name=collection_name,
                 query_vector=query_vector,
                 limit=limit,
@@ -211,7 +224,8 @@ class QdrantService:
         collection_name = collection_name or self.collection_name
 
         try:
-            await self.client.delete(
+            await self.circuit_breaker.call(
+                self.client.delete,
                 collection_name=collection_name,
                 points_selector=models.PointIdsList(
                     points=[str(point_id) for point_id in point_ids],
@@ -248,7 +262,9 @@ class QdrantService:
         collection_name = collection_name or self.collection_name
 
         try:
-            info = await self.client.get_collection(collection_name=collection_name)
+            info = await self.circuit_breaker.call(
+                self.client.get_collection, collection_name=collection_name
+            )
 
             return {
                 "name": collection_name,
@@ -284,7 +300,8 @@ class QdrantService:
         collection_name = collection_name or self.collection_name
 
         try:
-            results = await self.client.retrieve(
+            results = await self.circuit_breaker.call(
+                self.client.retrieve,
                 collection_name=collection_name,
                 ids=[str(point_id) for point_id in point_ids],
                 with_vectors=True,
@@ -328,7 +345,8 @@ class QdrantService:
         """
         try:
             # Get points from source
-            points = await self.client.retrieve(
+            points = await self.circuit_breaker.call(
+                self.client.retrieve,
                 collection_name=source_collection,
                 ids=[str(point_id) for point_id in point_ids],
                 with_vectors=True,
@@ -358,7 +376,8 @@ class QdrantService:
             ]
 
             # Upsert into target collection
-            await self.client.upsert(
+            await self.circuit_breaker.call(
+                self.client.upsert,
                 collection_name=target_collection,
                 points=points_to_insert,
             )
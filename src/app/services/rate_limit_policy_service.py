@@ -0,0 +1,475 @@
+"""
+Plan-aware rate limit policies.
+
+RateLimitMiddleware needs the caller's limits on every request. They are
+resolved from the caller's identity without a database query on the hot
+path:
+
+- Bearer JWT  -> user ID (signature check only) -> subscription plan
+- X-API-Key   -> external API client (prefix lookup + HMAC digest match)
+                 -> custom per-client limits or the external API default
+- neither     -> client IP with anonymous limits
+
+Paid subscriptions and API clients are bulk-loaded at startup and reloaded
+periodically; users without a paid subscription are on the free plan.
+Verified API keys are kept in an in-process TTL cache. Keys still stored
+as bcrypt hashes are verified on the password executor once and migrated
+to HMAC digests. Plan and client changes update this worker's tables
+immediately via set_user_plan / invalidate_api_client. Client changes are
+broadcast on the rate_limit_policy:invalidate channel so other workers
+reload too (plan changes arrive through plan_cache_service).
+
+Anonymous callers are keyed by IP. X-Forwarded-For is only read when the
+app runs behind rate_limit_trusted_proxy_count proxies, and then only the
+hop added by the outermost trusted proxy is used: earlier hops are
+client-controlled.
+
+Routes are weighted by cost class, so expensive endpoints (LLM calls, image
+generation) consume more of the per-minute budget than cheap reads.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from dataclasses import dataclass, replace
+from typing import Optional
+from uuid import UUID
+
+from jose import JWTError
+from sqlalchemy import select, update
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.constants import API_V1_PREFIX
+from app.core.logging import get_logger
+from app.core.redis_client import get_redis_client
+from app.core.security import (
+    generate_api_key_prefix,
+    get_user_id_from_token,
+    hash_api_key,
+    is_legacy_api_key_hash,
+    password_executor,
+    verify_api_key,
+)
+from app.core.singleflight import SingleFlight
+from app.db.base import AsyncSessionLocal
+from app.models.external_api import ExternalAPIClient
+from app.models.subscription import Subscription
+from app.utils.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+
+INVALIDATION_CHANNEL = "rate_limit_policy:invalidate"
+
+# Subscription statuses that grant the subscribed plan
+ACTIVE_SUBSCRIPTION_STATUSES = ("active", "trial")
+
+# Tokens consumed per request by cost class
+COST_CLASS_COSTS: dict[str, int] = {
+    "exempt": 0,
+    "read": 1,
+    "ingest": 2,
+    "llm": 2,
+    "generation": 5,
+}
+
+# (method or None for any, path prefix, cost class); first match wins
+ROUTE_COST_CLASSES: tuple[tuple[Optional[str], str, str], ...] = (
+    ("OPTIONS", "/", "exempt"),  # CORS preflight
+    (None, "/health", "exempt"),
+    (None, "/metrics", "exempt"),
+    (None, "/docs", "exempt"),
+    (None, "/redoc", "exempt"),
+    (None, "/openapi.json", "exempt"),
+    (None, f"{API_V1_PREFIX}/health", "exempt"),
+    ("POST", f"{API_V1_PREFIX}/images", "generation"),
+    ("POST", f"{API_V1_PREFIX}/asr", "generation"),
+    ("POST", f"{API_V1_PREFIX}/chat", "llm"),
+    ("POST", f"{API_V1_PREFIX}/tools", "llm"),
+    ("POST", f"{API_V1_PREFIX}/documents", "ingest"),
+)
+
+
+def plan_limits(plan: str) -> tuple[int, int]:
+    """
+    Get the (per minute, per day) request limits of a plan.
+
+    Args:
+        plan: anonymous, free, premium, unlimited, enterprise or test
+
+    Returns:
+        Tuple of (limit_per_minute, limit_per_day); unknown plans get free limits
+    """
+    limits = {
+        "anonymous": (settings.rate_limit_anonymous, settings.rate_limit_anonymous_per_day),
+        "free": (settings.rate_limit_free, settings.rate_limit_free_per_day),
+        "premium": (settings.rate_limit_premium, settings.rate_limit_premium_per_day),
+        "unlimited": (settings.rate_limit_unlimited, settings.rate_limit_unlimited_per_day),
+        "enterprise": (settings.rate_limit_unlimited, settings.rate_limit_unlimited_per_day),
+        "test": (settings.rate_limit_test, settings.rate_limit_test_per_day),
+    }
+    return limits.get(plan, limits["free"])
+
+
+def route_cost(method: str, path: str) -> tuple[str, int]:
+    """
+    Get the cost class of a route.
+
+    Args:
+        method: HTTP method
+        path: Request path
+
+    Returns:
+        Tuple of (cost_class, tokens consumed per request)
+    """
+    for route_method, prefix, cost_class in ROUTE_COST_CLASSES:
+        if (route_method is None or route_method == method) and path.startswith(prefix):
+            return cost_class, COST_CLASS_COSTS[cost_class]
+    return "read", COST_CLASS_COSTS["read"]
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Rate limits that apply to a caller."""
+
+    client_key: str  # Rate limit identity: user:<id>, api:<client id> or ip:<address>
+    plan: str  # Plan (or API client tier) the limits come from
+    limit_per_minute: int
+    limit_per_day: int
+
+
+@dataclass(frozen=True)
+class _APIClientEntry:
+    """Bulk-loaded external API client."""
+
+    client_id: UUID
+    api_key_hash: str
+    tier: str
+    limit_per_minute: int
+    limit_per_day: int
+
+
+class RateLimitPolicyService:
+    """
+    Resolves callers to rate limit policies from in-memory tables.
+
+    Features:
+    - Bulk load of paid subscriptions and API clients at startup
+    - Periodic background reload (stale tables are kept on errors)
+    - Constant-time HMAC digest match of API keys within their prefix
+    - TTL cache of verified API keys, including unknown keys
+    - Lazy migration of bcrypt-hashed API keys to HMAC digests
+    - Immediate local updates on plan and client changes
+    - Client changes broadcast to all workers
+    """
+
+    def __init__(self):
+        """Initialize rate limit policy service."""
+        self.redis = get_redis_client("default")
+        self.refresh_interval_seconds = settings.rate_limit_policy_refresh_seconds
+        self.trusted_proxy_count = settings.rate_limit_trusted_proxy_count
+
+        self._user_plans: dict[UUID, str] = {}  # Paid plans only; everyone else is free
+        self._api_clients_by_prefix: dict[str, list[_APIClientEntry]] = {}
+        self._api_keys: TTLCache[str, Optional[_APIClientEntry]] = TTLCache(
+            maxsize=settings.rate_limit_api_key_cache_size,
+            ttl_seconds=settings.rate_limit_api_key_cache_ttl_seconds,
+        )
+        self._api_key_lookups: SingleFlight[Optional[_APIClientEntry]] = SingleFlight("rate_limit_api_keys")
+        self._loaded_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._listener_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the plan and API client tables have been loaded."""
+        return self._loaded_at is not None
+
+    async def resolve(self, request: Request) -> RateLimitPolicy:
+        """
+        Resolve the rate limit policy of a request's caller.
+
+        Args:
+            request: Incoming request
+
+        Returns:
+            RateLimitPolicy for the authenticated user, API client or client IP
+        """
+        api_key = request.headers.get("X-API-Key")
+        if api_key:
+            client = await self._get_api_client(api_key)
+            if client is not None:
+                return RateLimitPolicy(
+                    client_key=f"api:{client.client_id}",
+                    plan=client.tier,
+                    limit_per_minute=client.limit_per_minute,
+                    limit_per_day=client.limit_per_day,
+                )
+
+        user_id = self._get_user_id(request)
+        if user_id is not None:
+            return self._policy(f"user:{user_id}", self.get_user_plan(user_id))
+
+        return self._policy(f"ip:{self._get_client_ip(request)}", "anonymous")
+
+    def get_user_plan(self, user_id: UUID) -> str:
+        """Get a user's effective plan from memory (no I/O)."""
+        return self._user_plans.get(user_id, "free")
+
+    def set_user_plan(self, user_id: UUID, plan_type: str, status: str) -> None:
+        """
+        Update a user's plan after a subscription change.
+
+        Args:
+            user_id: User ID
+            plan_type: Subscription plan type
+            status: Subscription status
+        """
+        if status in ACTIVE_SUBSCRIPTION_STATUSES and plan_type != "free":
+            self._user_plans[user_id] = plan_type
+        else:
+            self._user_plans.pop(user_id, None)
+
+    async def invalidate_api_client(self, client_id: UUID) -> None:
+        """
+        Drop cached API keys and reload the client table in every worker.
+
+        Args:
+            client_id: External API client ID
+        """
+        self._api_keys.clear()
+        await self.refresh()
+
+        try:
+            await self.redis.publish(INVALIDATION_CHANNEL, json.dumps({"client_id": str(client_id)}))
+        except Exception as e:
+            logger.warning("rate_limit_api_client_publish_failed", client_id=str(client_id), error=str(e))
+
+        logger.info("rate_limit_api_client_invalidated", client_id=str(client_id))
+
+    async def refresh(self) -> bool:
+        """
+        Reload paid subscriptions and API clients from the database.
+
+        Returns:
+            True if the tables were reloaded (False keeps the previous copy)
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                plans = await db.execute(
+                    select(Subscription.user_id, Subscription.plan_type).where(
+                        Subscription.status.in_(ACTIVE_SUBSCRIPTION_STATUSES),
+                        Subscription.plan_type != "free",
+                    )
+                )
+                clients = await db.execute(
+                    select(ExternalAPIClient).where(
+                        ExternalAPIClient.status == "active",
+                        ExternalAPIClient.is_banned.is_(False),
+                        ExternalAPIClient.is_suspended.is_(False),
+                    )
+                )
+                user_plans = {user_id: plan_type for user_id, plan_type in plans.all()}
+                api_clients = clients.scalars().all()
+        except Exception as e:
+            logger.warning("rate_limit_policies_load_failed", error=str(e))
+            return False
+
+        by_prefix: dict[str, list[_APIClientEntry]] = {}
+        for client in api_clients:
+            by_prefix.setdefault(client.api_key_prefix, []).append(
+                _APIClientEntry(
+                    client_id=client.id,
+                    api_key_hash=client.api_key_hash,
+                    tier=client.tier,
+                    limit_per_minute=(
+                        client.custom_requests_per_minute or settings.external_api_default_rate_limit
+                    ),
+                    limit_per_day=(
+                        client.custom_requests_per_day
+                        or settings.external_api_default_rate_limit_per_day
+                    ),
+                )
+            )
+
+        self._user_plans = user_plans
+        self._api_clients_by_prefix = by_prefix
+        self._loaded_at = time.monotonic()
+
+        logger.info(
+            "rate_limit_policies_loaded",
+            paid_users=len(user_plans),
+            api_clients=len(api_clients),
+        )
+        return True
+
+    def start_background_refresh(self) -> None:
+        """Start the periodic reload and invalidation listener tasks (idempotent)."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop_background_refresh(self) -> None:
+        """Stop the periodic reload and invalidation listener tasks."""
+        for task in (self._refresh_task, self._listener_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresh_task = None
+        self._listener_task = None
+
+    async def _refresh_loop(self) -> None:
+        """Load the tables, then reload them every refresh_interval_seconds."""
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval_seconds)
+
+    async def _listen(self) -> None:
+        """Apply API client invalidations until cancelled (reconnects on errors)."""
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        await self._handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("rate_limit_policy_listener_failed", error=str(e))
+                await asyncio.sleep(self.refresh_interval_seconds)
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+
+    async def _handle_message(self, data: str) -> None:
+        """Drop cached API keys and reload clients after another worker's change."""
+        try:
+            client_id = json.loads(data)["client_id"]
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("rate_limit_policy_invalid_message", error=str(e))
+            return
+
+        self._api_keys.clear()
+        await self.refresh()
+
+        logger.info("rate_limit_api_client_invalidated_remotely", client_id=client_id)
+
+    def _policy(self, client_key: str, plan: str) -> RateLimitPolicy:
+        """Build a policy from plan limits."""
+        if settings.environment == "test":
+            plan = "test"
+        limit_per_minute, limit_per_day = plan_limits(plan)
+        return RateLimitPolicy(client_key, plan, limit_per_minute, limit_per_day)
+
+    @staticmethod
+    def _get_user_id(request: Request) -> Optional[UUID]:
+        """Get the user ID from a Bearer token (signature check only, no DB)."""
+        authorization = request.headers.get("Authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            return get_user_id_from_token(token)
+        except JWTError:
+            return None
+
+    def _get_client_ip(self, request: Request) -> str:
+        """
+        Get the client IP.
+
+        Each trusted proxy appends the address it received the request from,
+        so the client is the hop added by the outermost one. Hops before it
+        are sent by the client and can't be trusted.
+        """
+        if self.trusted_proxy_count > 0:
+            hops = [
+                hop.strip()
+                for hop in request.headers.get("X-Forwarded-For", "").split(",")
+                if hop.strip()
+            ]
+            if len(hops) >= self.trusted_proxy_count:
+                return hops[-self.trusted_proxy_count]
+        return request.client.host if request.client else "unknown"
+
+    async def _get_api_client(self, api_key: str) -> Optional[_APIClientEntry]:
+        """Resolve an API key to its client via the verified-key cache."""
+        digest = hashlib.sha256(api_key.encode()).hexdigest()
+        cached = self._api_keys.get(digest, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        client, _ = await self._api_key_lookups.do(digest, lambda: self._verify_api_key(api_key))
+        self._api_keys.set(digest, client)
+        return client
+
+    async def _verify_api_key(self, api_key: str) -> Optional[_APIClientEntry]:
+        """Find the client whose key hash matches (digests first, then legacy bcrypt hashes)."""
+        prefix = generate_api_key_prefix(api_key)
+        candidates = self._api_clients_by_prefix.get(prefix, [])
+        digest = hash_api_key(api_key)
+
+        for candidate in candidates:
+            if hmac.compare_digest(candidate.api_key_hash, digest):
+                return candidate
+
+        for candidate in candidates:
+            if not is_legacy_api_key_hash(candidate.api_key_hash):
+                continue
+            try:
+                if await password_executor.run(verify_api_key, api_key, candidate.api_key_hash):
+                    return await self._migrate_api_key(prefix, candidate, digest)
+            except ValueError:
+                # Not a hash the key context understands
+                continue
+        return None
+
+    async def _migrate_api_key(self, prefix: str, entry: _APIClientEntry, digest: str) -> _APIClientEntry:
+        """
+        Replace a client's bcrypt key hash with its HMAC digest.
+
+        Args:
+            prefix: API key prefix
+            entry: Client verified against its bcrypt hash
+            digest: HMAC digest of the key
+
+        Returns:
+            Client entry with the digest (the old entry if the update failed)
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(ExternalAPIClient)
+                    .where(
+                        ExternalAPIClient.id == entry.client_id,
+                        ExternalAPIClient.api_key_hash == entry.api_key_hash,
+                    )
+                    .values(api_key_hash=digest)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning("api_key_migration_failed", client_id=str(entry.client_id), error=str(e))
+            return entry
+
+        migrated = replace(entry, api_key_hash=digest)
+        self._api_clients_by_prefix[prefix] = [
+            migrated if candidate is entry else candidate
+            for candidate in self._api_clients_by_prefix.get(prefix, [])
+        ]
+
+        logger.info("api_key_migrated", client_id=str(entry.client_id))
+        return migrated
+
+
+rate_limit_policy_service = RateLimitPolicyService()
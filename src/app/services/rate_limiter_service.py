@@ -1,5 +1,25 @@
-"""Rate limiting service using Redis."""
-
+"""
+Rate limiting service using Redis.
+
+Both windows (per minute and per day) are enforced with GCRA (generic cell
+rate algorithm) in a single Lua script: one EVALSHA round trip checks and
+updates both limits atomically, so concurrent requests can't all read
+"under the limit" before any of them increments. Each window stores only
+its theoretical arrival time (TAT), which gives a smooth sliding window
+without per-request bookkeeping.
+
+HybridRateLimiter sits in front of the service: each worker leases a batch
+of tokens per client from Redis (one script call reserves the whole batch)
+and admits requests from the local lease, so busy clients far below their
+limit rarely touch Redis. Near the limit, leases shrink to exact
+per-request checks.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
@@ -8,10 +28,58 @@ import redis.asyncio as redis
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.core.metrics import track_rate_limit_check
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+MINUTE_MS = 60_000
+DAY_MS = 86_400_000
+
+# GCRA over both windows. KEYS: minute TAT, day TAT.
+# ARGV: limit per minute, limit per day, cost (0 = read-only).
+# Returns {allowed, remaining_minute, remaining_day, retry_after_ms,
+#          reset_minute_ms, reset_day_ms}. Both windows are only updated
+# when both allow the request.
+_GCRA_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local cost = tonumber(ARGV[3])
+local periods = {60000, 86400000}
+local windows = {}
+local allowed = 1
+local retry_after = 0
+
+for i = 1, 2 do
+    local limit = tonumber(ARGV[i])
+    local period = periods[i]
+    local interval = period / limit
+    local tat = tonumber(redis.call('GET', KEYS[i])) or now
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + cost * interval
+    local allow_at = new_tat - period
+    if allow_at > now then
+        allowed = 0
+        retry_after = math.max(retry_after, allow_at - now)
+    end
+    windows[i] = {tat, new_tat, interval, period}
+end
+
+local result = {allowed, 0, 0, math.ceil(retry_after), 0, 0}
+for i = 1, 2 do
+    local tat, new_tat, interval, period = unpack(windows[i])
+    if allowed == 1 and cost > 0 then
+        tat = new_tat
+        redis.call('SET', KEYS[i], string.format('%.3f', tat), 'PX', math.ceil(tat - now))
+    end
+    result[i + 1] = math.max(0, math.floor((period - (tat - now)) / interval))
+    result[i + 4] = math.ceil(tat - now)
+end
+return result
+"""
+
 
 class RateLimiterService:
     """
@@ -42,139 +110,365 @@ class RateLimiterService:
 
         self.redis = redis.from_url(redis_url, decode_responses=True)
 
+        # Loaded once and invoked with EVALSHA
+        self._gcra_script = self.redis.register_script(_GCRA_SCRIPT)
+
         logger.info(
             "rate_limiter_initialized",
             environment=settings.environment,
             redis_db=redis_db,
         )
 
+    @staticmethod
+    def _keys(client_id: UUID) -> list[str]:
+        """Get the minute and day TAT keys (hash-tagged to share a cluster slot)."""
+        client_id_str = str(client_id)
+        return [f"rate_limit:{{{client_id_str}}}:minute", f"rate_limit:{{{client_id_str}}}:day"]
+
+    @staticmethod
+    def _build_info(
+        limit_per_minute: int,
+        limit_per_day: int,
+        remaining_minute: int,
+        remaining_day: int,
+        retry_after_ms: int,
+        reset_minute_ms: int,
+        reset_day_ms: int,
+    ) -> dict:
+        """Build rate limit info (times in whole seconds, rounded up)."""
+        return {
+            "limit_per_minute": limit_per_minute,
+            "limit_per_day": limit_per_day,
+            "used_per_minute": limit_per_minute - remaining_minute,
+            "used_per_day": limit_per_day - remaining_day,
+            "remaining_per_minute": remaining_minute,
+            "remaining_per_day": remaining_day,
+            "reset_minute": math.ceil(reset_minute_ms / 1000),  # Seconds until minute window is full again
+            "reset_day": math.ceil(reset_day_ms / 1000),  # Seconds until day window is full again
+            "retry_after": math.ceil(retry_after_ms / 1000),  # Seconds until the next request is allowed
+        }
+
     async def check_rate_limit(
         self,
         client_id: UUID,
         limit_per_minute: int,
         limit_per_day: int,
+        cost: int = 1,
     ) -> tuple[bool, dict]:
         """
-        Check if a client has exceeded rate limits.
+        Check if a client has exceeded rate limits and record the request.
 
-        Uses sliding window algorithm for accurate rate limiting.
+        Both windows are checked and updated atomically in one EVALSHA call;
+        a request only consumes quota when both windows allow it. Redis
+        errors fail open.
 
         Args:
             client_id: Client ID
             limit_per_minute: Maximum requests per minute
-            limit_per_day: Maximum requests per day
+            limit_per_day: Maximum requests per rolling 24 hours
+            cost: Number of requests to consume (0 checks without consuming)
 
         Returns:
             Tuple of (is_allowed, rate_limit_info)
         """
-        client_id_str = str(client_id)
-        now = datetime.utcnow()
-
-        # Keys for Redis
-        minute_key = f"rate_limit:minute:{client_id_str}"
-        day_key = f"rate_limit:day:{client_id_str}:{now.strftime('%Y-%m-%d')}"
-
-        # Check per-minute limit
-        minute_count = await self.redis.get(minute_key)
-        minute_count = int(minute_count) if minute_count else 0
-
-        # Check per-day limit
-        day_count = await self.redis.get(day_key)
-        day_count = int(day_count) if day_count else 0
-
-        # Determine if request is allowed
-        is_allowed = minute_count < limit_per_minute and day_count < limit_per_day
-
-        rate_limit_info = {
-            "limit_per_minute": limit_per_minute,
-            "limit_per_day": limit_per_day,
-            "used_per_minute": minute_count,
-            "used_per_day": day_count,
-            "remaining_per_minute": max(0, limit_per_minute - minute_count),
-            "remaining_per_day": max(0, limit_per_day - day_count),
-            "reset_minute": 60 - now.second,  # Seconds until minute resets
-            "reset_day": (
-                86400
-                - (now.hour * 3600 + now.minute * 60 + now.second)  # Seconds until day resets
-            ),
-        }
-
-        if is_allowed:
-            # Increment counters
-            await self._increment_counters(minute_key, day_key)
+        if limit_per_minute <= 0 or limit_per_day <= 0:
+            return False, self._build_info(
+                limit_per_minute, limit_per_day, 0, 0, MINUTE_MS, MINUTE_MS, DAY_MS
+            )
+
+        try:
+            (
+                allowed,
+                remaining_minute,
+                remaining_day,
+                retry_after_ms,
+                reset_minute_ms,
+                reset_day_ms,
+            ) = await self._gcra_script(
+                keys=self._keys(client_id),
+                args=[limit_per_minute, limit_per_day, cost],
+            )
+        except Exception as e:
+            logger.warning("rate_limit_check_failed", client_id=str(client_id), error=str(e))
+            return True, self._build_info(
+                limit_per_minute, limit_per_day, limit_per_minute, limit_per_day, 0, 0, 0
+            )
+
+        is_allowed = bool(allowed)
+        rate_limit_info = self._build_info(
+            limit_per_minute,
+            limit_per_day,
+            int(remaining_minute),
+            int(remaining_day),
+            int(retry_after_ms),
+            int(reset_minute_ms),
+            int(reset_day_ms),
+        )
 
-        logger.info(
+        logger.debug(
             "rate_limit_check",
-            client_id=client_id_str,
+            client_id=str(client_id),
             is_allowed=is_allowed,
-            minute_count=minute_count,
-            day_count=day_count,
+            remaining_per_minute=rate_limit_info["remaining_per_minute"],
+            remaining_per_day=rate_limit_info["remaining_per_day"],
         )
 
         return is_allowed, rate_limit_info
 
-    async def _increment_counters(self, minute_key: str, day_key: str) -> None:
+    async def reset_limits(self, client_id: UUID) -> None:
         """
-        Increment rate limit counters.
+        Reset rate limits for a client (admin operation).
 
         Args:
-            minute_key: Redis key for per-minute counter
-            day_key: Redis key for per-day counter
+            client_id: Client ID
         """
-        # Increment minute counter and set expiry
-        await self.redis.incr(minute_key)
-        await self.redis.expire(minute_key, 60)  # Expire after 60 seconds
+        await self.redis.delete(*self._keys(client_id))
 
-        # Increment day counter and set expiry
-        await self.redis.incr(day_key)
-        await self.redis.expire(day_key, 86400)  # Expire after 24 hours
+        logger.info("rate_limits_reset", client_id=str(client_id))
 
-    async def reset_limits(self, client_id: UUID) -> None:
+    async def get_current_usage(
+        self,
+        client_id: UUID,
+        limit_per_minute: int,
+        limit_per_day: int,
+    ) -> dict:
         """
-        Reset rate limits for a client (admin operation).
+        Get current rate limit usage for a client without consuming quota.
 
         Args:
             client_id: Client ID
+            limit_per_minute: Maximum requests per minute
+            limit_per_day: Maximum requests per rolling 24 hours
+
+        Returns:
+            Current usage information
         """
-        client_id_str = str(client_id)
-        now = datetime.utcnow()
+        _, info = await self.check_rate_limit(client_id, limit_per_minute, limit_per_day, cost=0)
+
+        return {
+            "requests_this_minute": info["used_per_minute"],
+            "requests_today": info["used_per_day"],
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+
+    async def close(self) -> None:
+        """Close Redis connection."""
+        await self.redis.close()
+
+
+@dataclass
+class _Lease:
+    """Tokens a worker has reserved in Redis for one client."""
+
+    tokens: int = 0  # Reserved tokens not yet used
+    expires_at: float = 0.0  # Monotonic time after which unused tokens are dropped
+    size: int = 1  # Size of the next lease (grows while the client stays busy)
+    info: Optional[dict] = None  # Rate limit info from the last Redis reply
+    info_at: float = 0.0  # Monotonic time of the last Redis reply
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class HybridRateLimiter:
+    """
+    Local token-bucket pre-limiter backed by RateLimiterService.
+
+    Every token admitted locally was reserved in Redis first, so the
+    global limits are never exceeded; unused leased tokens expire and are
+    lost, which only makes the limiter slightly stricter. Lease sizes
+    follow the client's request rate (doubling while each lease is used up,
+    halving when tokens expire unused). They are capped by the remaining
+    per-minute burst and a fraction of the remaining daily quota, so near
+    either limit every request is checked exactly against Redis.
+
+    A lease lives as long as the per-minute window takes to earn its tokens
+    back (at least lease_ttl_seconds, at most a minute). Low-rate tiers
+    (5-10 requests per minute) get leases that last long enough to be used,
+    and a worker never holds tokens longer than the client would have
+    needed to spend them at its limit.
+    """
+
+    def __init__(
+        self,
+        service: Optional[RateLimiterService] = None,
+        max_lease: Optional[int] = None,
+        lease_fraction: Optional[float] = None,
+        lease_ttl_seconds: Optional[float] = None,
+        max_clients: Optional[int] = None,
+    ):
+        """
+        Initialize hybrid rate limiter.
 
-        minute_key = f"rate_limit:minute:{client_id_str}"
-        day_key = f"rate_limit:day:{client_id_str}:{now.strftime('%Y-%m-%d')}"
+        Args:
+            service: Redis rate limiter (created if not provided)
+            max_lease: Largest number of tokens leased at once
+            lease_fraction: Max share of the remaining quota per lease
+            lease_ttl_seconds: Lifetime of leased tokens
+            max_clients: Number of clients with a local lease to keep (LRU)
+        """
+        self.service = service or RateLimiterService()
+        self.max_lease = max_lease or settings.rate_limit_lease_max_tokens
+        self.lease_fraction = lease_fraction or settings.rate_limit_lease_fraction
+        self.lease_ttl_seconds = lease_ttl_seconds or settings.rate_limit_lease_ttl_seconds
+        self.max_clients = max_clients or settings.rate_limit_local_max_clients
+        self._leases: OrderedDict[str, _Lease] = OrderedDict()
+        self.local_checks = 0
+        self.redis_checks = 0
+
+    def _get_lease(self, client_id: UUID, limit_per_minute: int, limit_per_day: int) -> _Lease:
+        """Get (or create) the lease of a client, keyed by its limits."""
+        key = f"{client_id}:{limit_per_minute}:{limit_per_day}"
+        lease = self._leases.get(key)
+        if lease is None:
+            lease = self._leases[key] = _Lease()
+            if len(self._leases) > self.max_clients:
+                self._leases.popitem(last=False)
+        else:
+            self._leases.move_to_end(key)
+        return lease
+
+    @staticmethod
+    def _take(lease: _Lease, cost: int) -> bool:
+        """Take tokens from an unexpired lease."""
+        if lease.tokens >= cost and time.monotonic() < lease.expires_at:
+            lease.tokens -= cost
+            return True
+        return False
+
+    @staticmethod
+    def _local_info(lease: _Lease) -> dict:
+        """Rate limit info as seen by the client (leased tokens are still available to it)."""
+        info = dict(lease.info)
+        info["remaining_per_minute"] += lease.tokens
+        info["remaining_per_day"] += lease.tokens
+        info["used_per_minute"] -= lease.tokens
+        info["used_per_day"] -= lease.tokens
+        return info
+
+    def _next_lease_size(self, lease: _Lease, limit_per_minute: int, limit_per_day: int) -> int:
+        """Size the next lease from the client's recent usage and remaining quota."""
+        if lease.tokens:
+            # Tokens expired unused: client is slower than its leases
+            lease.size = max(1, lease.size // 2)
+        elif lease.info is not None:
+            # Previous lease (or exact check) was used up: client is busy
+            lease.size = min(lease.size * 2, self.max_lease)
+        lease.tokens = 0
+
+        if lease.info:
+            # Both windows have refilled at their rates since the last reply
+            elapsed = time.monotonic() - lease.info_at
+            remaining_per_minute = min(
+                limit_per_minute,
+                lease.info["remaining_per_minute"] + int(elapsed * limit_per_minute * 1000 / MINUTE_MS),
+            )
+            remaining_per_day = min(
+                limit_per_day,
+                lease.info["remaining_per_day"] + int(elapsed * limit_per_day * 1000 / DAY_MS),
+            )
+        else:
+            remaining_per_minute, remaining_per_day = limit_per_minute, limit_per_day
 
-        await self.redis.delete(minute_key)
-        await self.redis.delete(day_key)
+        # The minute window caps the burst a lease may take; the fraction
+        # keeps any one worker from reserving much of the daily quota
+        headroom = min(remaining_per_minute, int(remaining_per_day * self.lease_fraction))
+        return max(1, min(lease.size, headroom))
 
-        logger.info("rate_limits_reset", client_id=client_id_str)
+    def _lease_ttl(self, size: int, limit_per_minute: int) -> float:
+        """Lifetime of a lease: the time the minute window takes to earn its tokens back."""
+        return min(MINUTE_MS / 1000, max(self.lease_ttl_seconds, size * 60 / limit_per_minute))
 
-    async def get_current_usage(self, client_id: UUID) -> dict:
+    async def check_rate_limit(
+        self,
+        client_id: UUID,
+        limit_per_minute: int,
+        limit_per_day: int,
+        cost: int = 1,
+    ) -> tuple[bool, dict]:
         """
-        Get current rate limit usage for a client.
+        Check if a client has exceeded rate limits and record the request.
 
         Args:
             client_id: Client ID
+            limit_per_minute: Maximum requests per minute
+            limit_per_day: Maximum requests per rolling 24 hours
+            cost: Number of requests to consume
 
         Returns:
-            Current usage information
+            Tuple of (is_allowed, rate_limit_info)
         """
-        client_id_str = str(client_id)
-        now = datetime.utcnow()
+        lease = self._get_lease(client_id, limit_per_minute, limit_per_day)
+        if self._take(lease, cost):
+            self.local_checks += 1
+            track_rate_limit_check("local")
+            return True, self._local_info(lease)
+
+        # One refill per client at a time; concurrent requests use its tokens
+        async with lease.lock:
+            if self._take(lease, cost):
+                self.local_checks += 1
+                track_rate_limit_check("local")
+                return True, self._local_info(lease)
+
+            size = self._next_lease_size(lease, limit_per_minute, limit_per_day)
+            if size > cost:
+                self.redis_checks += 1
+                is_allowed, info = await self.service.check_rate_limit(
+                    client_id, limit_per_minute, limit_per_day, cost=size
+                )
+                if is_allowed:
+                    track_rate_limit_check("lease")
+                    lease.info = info
+                    lease.info_at = time.monotonic()
+                    lease.tokens = size - cost
+                    lease.expires_at = time.monotonic() + self._lease_ttl(size, limit_per_minute)
+                    return True, self._local_info(lease)
+
+            # Near the limit: exact per-request check
+            self.redis_checks += 1
+            track_rate_limit_check("exact")
+            is_allowed, info = await self.service.check_rate_limit(
+                client_id, limit_per_minute, limit_per_day, cost=cost
+            )
+            lease.info = info
+            lease.info_at = time.monotonic()
+            if not is_allowed:
+                lease.size = 1
+
+            return is_allowed, info
 
-        minute_key = f"rate_limit:minute:{client_id_str}"
-        day_key = f"rate_limit:day:{client_id_str}:{now.strftime('%Y-%m-%d')}"
-
-        minute_count = await self.redis.get(minute_key)
-        minute_count = int(minute_count) if minute_count else 0
+    async def reset_limits(self, client_id: UUID) -> None:
+        """
+        Reset rate limits for a client (admin operation).
 
-        day_count = await self.redis.get(day_key)
-        day_count = int(day_count) if day_count else 0
+        Args:
+            client_id: Client ID
+        """
+        prefix = f"{client_id}:"
+        for key in [key for key in self._leases if key.startswith(prefix)]:
+            del self._leases[key]
+        await self.service.reset_limits(client_id)
 
-        return {
-            "requests_this_minute": minute_count,
-            "requests_today": day_count,
-            "timestamp": now.isoformat(),
-        }
+    async def get_current_usage(
+        self,
+        client_id: UUID,
+        limit_per_minute: int,
+        limit_per_day: int,
+    ) -> dict:
+        """Get current rate limit usage for a client (leased tokens count as used)."""
+        return await self.service.get_current_usage(client_id, limit_per_minute, limit_per_day)
 
     async def close(self) -> None:
         """Close Redis connection."""
-        await self.redis.close()
+        await self.service.close()
+
+
+def create_rate_limiter() -> RateLimiterService | HybridRateLimiter:
+    """
+    Create the rate limiter configured for this worker.
+
+    Returns:
+        HybridRateLimiter if local leases are enabled, else RateLimiterService
+    """
+    if settings.rate_limit_local_leases_enabled:
+        return HybridRateLimiter()
+    return RateLimiterService()
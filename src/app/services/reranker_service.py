@@ -4,6 +4,7 @@ from typing import Literal, Optional
 
 from cohere import AsyncClient as CohereAsyncClient
 
+from app.core.circuit_breaker import circuit_breaker_registry
 from app.core.config import settings
 from app.core.logging import get_logger
 
@@ -50,6 +51,13 @@ class RerankerService:
                 raise ValueError("Cohere API key is required for reranker")
 
             self.client = CohereAsyncClient(api_key=settings.cohere_api_key)
+            self.circuit_breaker = circuit_breaker_registry.get_or_create(
+                name="cohere_rerank",
+                failure_threshold=5,
+                recovery_timeout=30,
+                timeout_seconds=15,
+                max_concurrent=20,
+            )
             logger.info(
                 "reranker_service_initialized",
                 provider="cohere",
@@ -111,8 +119,9 @@ class RerankerService:
                 top_k=top_k,
             )
 
-            # Call Cohere Rerank API
-            response = await self.client.rerank(
+            # Call Cohere Rerank API (falls back to original order when the circuit is open)
+            response = await self.circuit_breaker.call(
+                self.client.rerank,
                 model=self.model,
                 query=query,
                 documents=texts,
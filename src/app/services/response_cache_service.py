@@ -93,12 +93,13 @@ class ResponseCacheService:
         """
         try:
             # Check if collection exists
-            collections = await qdrant_service.client.get_collections()
+            collections = await qdrant_service.circuit_breaker.call(qdrant_service.client.get_collections)
             collection_names = [c.name for c in collections.collections]
 
             if self.collection_name not in collection_names:
                 # Create collection
-                await qdrant_service.client.create_collection(
+                await qdrant_service.circuit_breaker.call(
+                    qdrant_service.client.create_collection,
                     collection_name=self.collection_name,
                     vectors_config=VectorParams(
                         size=settings.embedding_dimension,  # 3072 for Gemini, 1024 for Cohere
@@ -130,6 +131,7 @@ class ResponseCacheService:
         query: str,
         conversation_id: Optional[UUID] = None,
         user_id: Optional[UUID] = None,
+        query_embedding: Optional[list[float]] = None,
     ) -> Optional[CachedResponse]:
         """
         Find semantically similar cached response.
@@ -138,16 +140,19 @@ class ResponseCacheService:
             query: User query
             conversation_id: Optional conversation context
             user_id: Optional user context
+            query_embedding: Precomputed query embedding (shared with retrieval)
 
         Returns:
             CachedResponse if similar query found, None otherwise
         """
         try:
-            # Generate query embedding
-            query_embedding = await embeddings_service.generate_embedding(query)
+            # Generate query embedding unless the caller already has one
+            if query_embedding is None:
+                query_embedding = await embeddings_service.embed_text(query, is_query=True)
 
             # Search cache collection
-            search_results = await qdrant_service.client.search(
+            search_results = await qdrant_service.circuit_breaker.call(
+                qdrant_service.client.search,
                 collection_name=self.collection_name,
                 query_vector=query_embedding,
                 limit=1,
@@ -176,7 +181,8 @@ class ResponseCacheService:
                     age_hours=(datetime.now(timezone.utc) - cached_at).total_seconds() / 3600,
                 )
                 # Delete expired entry
-                await qdrant_service.client.delete(
+                await qdrant_service.circuit_breaker.call(
+                    qdrant_service.client.delete,
                     collection_name=self.collection_name,
                     points_selector=[result.id],
                 )
@@ -184,7 +190,8 @@ class ResponseCacheService:
 
             # Cache hit! Increment hit count
             new_hit_count = payload.get("hit_count", 1) + 1
-            await qdrant_service.client.set_payload(
+            await qdrant_service.circuit_breaker.call(
+                qdrant_service.client.set_payload,
                 collection_name=self.collection_name,
                 payload={"hit_count": new_hit_count},
                 points=[result.id],
@@ -228,6 +235,7 @@ class ResponseCacheService:
         tokens_used: int = 0,
         conversation_id: Optional[UUID] = None,
         user_id: Optional[UUID] = None,
+        query_embedding: Optional[list[float]] = None,
     ) -> bool:
         """
         Cache a response with semantic indexing.
@@ -240,13 +248,15 @@ class ResponseCacheService:
             tokens_used: Tokens used for this response
             conversation_id: Optional conversation context
             user_id: Optional user context
+            query_embedding: Precomputed query embedding
 
         Returns:
             True if cached successfully, False otherwise
         """
         try:
-            # Generate query embedding
-            query_embedding = await embeddings_service.generate_embedding(query)
+            # Generate query embedding unless the caller already has one
+            if query_embedding is None:
+                query_embedding = await embeddings_service.embed_text(query, is_query=True)
 
             # Create point ID from query hash
             query_hash = hashlib.sha256(query.encode()).hexdigest()[:16]
@@ -271,7 +281,8 @@ class ResponseCacheService:
                 payload["user_id"] = str(user_id)
 
             # Store in Qdrant
-            await qdrant_service.client.upsert(
+            await qdrant_service.circuit_breaker.call(
+                qdrant_service.client.upsert,
                 collection_name=self.collection_name,
                 points=[
                     PointStruct(
@@ -313,7 +324,8 @@ class ResponseCacheService:
             offset = None
 
             while True:
-                results, offset = await qdrant_service.client.scroll(
+                results, offset = await qdrant_service.circuit_breaker.call(
+                    qdrant_service.client.scroll,
                     collection_name=self.collection_name,
                     limit=100,
                     offset=offset,
@@ -333,7 +345,8 @@ class ResponseCacheService:
 
                 # Delete expired entries
                 if expired_ids:
-                    await qdrant_service.client.delete(
+                    await qdrant_service.circuit_breaker.call(
+                        qdrant_service.client.delete,
                         collection_name=self.collection_name,
                         points_selector=expired_ids,
                     )
@@ -365,7 +378,8 @@ class ResponseCacheService:
         """
         try:
             # Get collection info
-            collection_info = await qdrant_service.client.get_collection(
+            collection_info = await qdrant_service.circuit_breaker.call(
+                qdrant_service.client.get_collection,
                 collection_name=self.collection_name
             )
 
@@ -375,7 +389,8 @@ class ResponseCacheService:
             total_tokens_saved = 0
 
             # Sample some entries to get stats (limit to 1000 for performance)
-            results, _ = await qdrant_service.client.scroll(
+            results, _ = await qdrant_service.circuit_breaker.call(
+                qdrant_service.client.scroll,
                 collection_name=self.collection_name,
                 limit=min(1000, total_entries),
                 with_payload=True,
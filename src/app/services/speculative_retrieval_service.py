@@ -0,0 +1,226 @@
+"""
+Speculative retrieval for the chat pipeline.
+
+Before the LLM call, a chat turn needs three things: the response-cache
+verdict, the intent classification and (for knowledge questions) the
+retrieved context. Running them in sequence adds their latencies together.
+Here they start together as soon as the message arrives:
+
+    embedding ──┬──> cache probe
+                └──> vector retrieval
+    intent ────────> (cancels retrieval if RAG isn't needed)
+       └ refine ····> (ambiguous intents only: reuses the embedding)
+
+The query is embedded once and shared by the cache probe and retrieval.
+Losing branches are cancelled: everything on a cache hit, retrieval when the
+intent doesn't need RAG. On a cache miss the pipeline is ready after its
+slowest stage instead of the sum of all stages.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.core.task_graph import TaskGraph
+from app.services.document_service import DocumentService
+from app.services.embeddings_service import embeddings_service
+from app.services.response_cache_service import CachedResponse, response_cache_service
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SpeculativeRetrievalResult:
+    """Outcome of the speculative pre-generation stage."""
+
+    cached_response: Optional[CachedResponse] = None
+    classification: Any = None
+    chunks: list[dict[str, Any]] = field(default_factory=list)
+    retrieval_attempted: bool = False
+
+    @property
+    def cache_hit(self) -> bool:
+        """Whether the response cache answered the query."""
+        return self.cached_response is not None
+
+
+def format_chunks(chunks: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Format search results as prompt sources.
+
+    Args:
+        chunks: Results from DocumentService.search_similar_chunks
+
+    Returns:
+        Sources with content, source, score and chunk_index
+    """
+    return [
+        {
+            "content": chunk.get("chunk_text") or chunk.get("text") or "",
+            "source": chunk.get("document_id") or "Unknown",
+            "score": chunk.get("score", 0.0),
+            "chunk_index": chunk.get("chunk_index"),
+        }
+        for chunk in chunks
+    ]
+
+
+def build_context(chunks: list[dict[str, Any]]) -> str:
+    """Build the prompt context string from formatted sources."""
+    return "\n\n---\n\n".join(
+        f"Source: {chunk['source']} (Relevance: {chunk['score']:.2%})\n{chunk['content']}"
+        for chunk in chunks
+    )
+
+
+class SpeculativeRetrievalService:
+    """
+    Runs embedding, cache probe, intent classification and retrieval concurrently.
+
+    Features:
+    - Single query embedding shared by the cache probe and retrieval
+    - Cache hit cancels classification and retrieval
+    - Intent without RAG cancels retrieval as soon as it is known
+    - Fail-open: embedding, cache and retrieval errors never fail the turn
+    """
+
+    def __init__(self, retrieval_limit: int = 5, score_threshold: float = 0.7):
+        """
+        Initialize speculative retrieval service.
+
+        Args:
+            retrieval_limit: Number of chunks to retrieve
+            score_threshold: Minimum vector similarity for retrieved chunks
+        """
+        self.retrieval_limit = retrieval_limit
+        self.score_threshold = score_threshold
+
+    async def retrieve(
+        self,
+        query: str,
+        db: AsyncSession,
+        query_embedding: Optional[list[float]] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Retrieve formatted knowledge-base chunks for a query.
+
+        Args:
+            query: User query
+            db: Database session
+            query_embedding: Precomputed query embedding
+
+        Returns:
+            Formatted sources (see format_chunks)
+        """
+        results = await DocumentService(db).search_similar_chunks(
+            query=query,
+            limit=self.retrieval_limit,
+            score_threshold=self.score_threshold,
+            query_embedding=query_embedding,
+        )
+        return format_chunks(results)
+
+    async def run(
+        self,
+        query: str,
+        classify: Callable[[], Awaitable[Any]],
+        requires_retrieval: Callable[[Any], bool],
+        db: Optional[AsyncSession] = None,
+        user_id: Optional[UUID] = None,
+        check_cache: bool = True,
+        refine_classification: Optional[
+            Callable[[Any, Callable[[], Awaitable[Optional[list[float]]]]], Awaitable[Any]]
+        ] = None,
+    ) -> SpeculativeRetrievalResult:
+        """
+        Run the pre-generation stages speculatively.
+
+        Args:
+            query: User query
+            classify: Async intent classifier for the query
+            requires_retrieval: Decides from the classification whether RAG is needed
+            db: Database session (retrieval is skipped without one)
+            user_id: Optional user context for the cache probe
+            check_cache: Probe the response cache
+            refine_classification: Optional second classification stage; called
+                with the classification and an awaitable getter for the shared
+                query embedding (only awaited if the stage needs it)
+
+        Returns:
+            SpeculativeRetrievalResult
+
+        Raises:
+            Exception: Classification errors
+        """
+        graph = TaskGraph(name="speculative-retrieval")
+
+        async def embed() -> list[float]:
+            return await embeddings_service.embed_text(query, is_query=True)
+
+        async def probe_cache(embedding: Optional[list[float]]) -> Optional[CachedResponse]:
+            return await response_cache_service.get_cached_response(
+                query=query,
+                user_id=user_id,
+                query_embedding=embedding,
+            )
+
+        async def retrieve(embedding: Optional[list[float]]) -> list[dict[str, Any]]:
+            return await self.retrieve(query, db, query_embedding=embedding)
+
+        async def classify_and_refine() -> Any:
+            classification = await classify()
+            if refine_classification is None:
+                return classification
+            return await refine_classification(classification, lambda: graph.result("embedding"))
+
+        def cancel_unneeded_retrieval(name: str, classification: Any) -> None:
+            if not requires_retrieval(classification):
+                graph.cancel("retrieval")
+
+        graph.add("embedding", embed, required=False)
+        if check_cache:
+            graph.add("cache", probe_cache, depends_on=("embedding",), required=False)
+        if db is not None:
+            graph.add("retrieval", retrieve, depends_on=("embedding",), required=False)
+            graph.add("intent", classify_and_refine, on_complete=cancel_unneeded_retrieval)
+        else:
+            graph.add("intent", classify_and_refine)
+
+        graph.start()
+        result = SpeculativeRetrievalResult()
+
+        try:
+            if check_cache:
+                result.cached_response = await graph.result("cache")
+                if result.cached_response is not None:
+                    graph.cancel()
+                    logger.info("speculative_retrieval_cache_hit", query=query[:50])
+                    return result
+
+            result.classification = await graph.result("intent")
+
+            if db is not None and requires_retrieval(result.classification):
+                result.retrieval_attempted = True
+                result.chunks = await graph.result("retrieval") or []
+
+        except BaseException:
+            graph.cancel()
+            raise
+
+        logger.info(
+            "speculative_retrieval_completed",
+            query=query[:50],
+            retrieval_attempted=result.retrieval_attempted,
+            chunks_count=len(result.chunks),
+            pending_steps=graph.pending,
+        )
+
+        graph.cancel()
+        return result
+
+
+# Global speculative retrieval service instance
+speculative_retrieval_service = SpeculativeRetrievalService()
@@ -1,21 +1,59 @@
 """Subscription and usage management service."""
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Optional, Sequence
 from uuid import UUID
 
 from app.core.logging import get_logger
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.subscription import (
     MonthlyUsageQuota,
-    PlanLimit,
     Subscription,
 )
+from app.services.plan_cache_service import CachedPlanLimit, plan_cache_service
 
 logger = get_logger(__name__)
 
+# UsageIncrement field -> MonthlyUsageQuota column
+_USAGE_COLUMNS = {
+    "messages": "messages_used",
+    "tokens": "tokens_used",
+    "images": "images_generated",
+    "documents": "documents_processed",
+    "audio_minutes": "audio_minutes_used",
+    "cost_usd": "total_cost_usd",
+    "cache_savings_usd": "cache_savings_usd",
+}
+
+
+@dataclass
+class UsageIncrement:
+    """Usage to add to a user's monthly quota."""
+
+    user_id: UUID
+    messages: int = 0
+    tokens: int = 0
+    images: int = 0
+    documents: int = 0
+    audio_minutes: int = 0
+    cost_usd: float = 0.0
+    cache_savings_usd: float = 0.0
+    month_year: Optional[str] = None  # Defaults to the current month
+
+    def to_row(self, default_month: Optional[str] = None) -> dict[str, Any]:
+        """Build a MonthlyUsageQuota insert row."""
+        row = {
+            "user_id": self.user_id,
+            "month_year": self.month_year or default_month or datetime.utcnow().strftime("%Y-%m"),
+        }
+        for field_name, column in _USAGE_COLUMNS.items():
+            row[column] = getattr(self, field_name)
+        return row
+
 
 class SubscriptionService:
     """
@@ -61,10 +99,7 @@ class SubscriptionService:
             raise ValueError("User already has an active subscription")
 
         # Get plan limits to validate plan and get pricing
-        result = await db.execute(
-            select(PlanLimit).where(PlanLimit.plan_type == plan_type)
-        )
-        plan_limit = result.scalar_one_or_none()
+        plan_limit = await plan_cache_service.get_plan(plan_type, db)
 
         if not plan_limit:
             raise ValueError(f"Plan type '{plan_type}' not found")
@@ -105,6 +140,7 @@ class SubscriptionService:
         db.add(subscription)
         await db.commit()
         await db.refresh(subscription)
+        await plan_cache_service.subscription_changed(user_id, subscription.plan_type, subscription.status)
 
         logger.info(
             "subscription_created",
@@ -169,6 +205,7 @@ class SubscriptionService:
 
         await db.commit()
         await db.refresh(subscription)
+        await plan_cache_service.subscription_changed(user_id, subscription.plan_type, subscription.status)
 
         logger.info(
             "subscription_updated",
@@ -196,6 +233,7 @@ class SubscriptionService:
 
         await db.commit()
         await db.refresh(subscription)
+        await plan_cache_service.subscription_changed(user_id, subscription.plan_type, subscription.status)
 
         logger.info(
             "subscription_cancelled",
@@ -205,6 +243,33 @@ class SubscriptionService:
 
         return subscription
 
+    @staticmethod
+    def _usage_upsert(rows: list[dict[str, Any]]):
+        """
+        Build an INSERT ... ON CONFLICT DO UPDATE that adds usage to monthly quotas.
+
+        Args:
+            rows: Quota rows (user_id, month_year and usage column increments)
+
+        Returns:
+            Upsert statement returning the updated quota rows
+        """
+        stmt = pg_insert(MonthlyUsageQuota).values(rows)
+        return (
+            stmt.on_conflict_do_update(
+                index_elements=[MonthlyUsageQuota.user_id, MonthlyUsageQuota.month_year],
+                set_={
+                    **{
+                        column: getattr(MonthlyUsageQuota, column) + getattr(stmt.excluded, column)
+                        for column in _USAGE_COLUMNS.values()
+                    },
+                    "updated_at": func.now(),
+                },
+            )
+            .returning(MonthlyUsageQuota)
+            .execution_options(populate_existing=True)
+        )
+
     async def track_usage(
         self,
         user_id: UUID,
@@ -216,10 +281,14 @@ class SubscriptionService:
         audio_minutes: int = 0,
         cost_usd: float = 0.0,
         cache_savings_usd: float = 0.0,
+        commit: bool = True,
     ) -> MonthlyUsageQuota:
         """
         Track user usage for the current month.
 
+        Uses a single atomic UPSERT, so concurrent turns never lose updates
+        and the new totals come back without a refresh.
+
         Args:
             user_id: User ID
             db: Database session
@@ -230,50 +299,76 @@ class SubscriptionService:
             audio_minutes: Minutes of audio processed
             cost_usd: Cost in USD
             cache_savings_usd: Cache savings in USD
+            commit: Commit immediately; pass False to run inside a caller's transaction
 
         Returns:
-            Updated MonthlyUsageQuota
+            MonthlyUsageQuota with the new totals
         """
-        month_year = datetime.utcnow().strftime("%Y-%m")
-
-        # Get or create quota
-        result = await db.execute(
-            select(MonthlyUsageQuota).where(
-                MonthlyUsageQuota.user_id == user_id,
-                MonthlyUsageQuota.month_year == month_year,
-            )
+        increment = UsageIncrement(
+            user_id=user_id,
+            messages=messages,
+            tokens=tokens,
+            images=images,
+            documents=documents,
+            audio_minutes=audio_minutes,
+            cost_usd=cost_usd,
+            cache_savings_usd=cache_savings_usd,
         )
-        quota = result.scalar_one_or_none()
-
-        if quota:
-            # Update existing quota
-            quota.messages_used += messages
-            quota.tokens_used += tokens
-            quota.images_generated += images
-            quota.documents_processed += documents
-            quota.audio_minutes_used += audio_minutes
-            quota.total_cost_usd += cost_usd
-            quota.cache_savings_usd += cache_savings_usd
-        else:
-            # Create new quota
-            quota = MonthlyUsageQuota(
-                user_id=user_id,
-                month_year=month_year,
-                messages_used=messages,
-                tokens_used=tokens,
-                images_generated=images,
-                documents_processed=documents,
-                audio_minutes_used=audio_minutes,
-                total_cost_usd=cost_usd,
-                cache_savings_usd=cache_savings_usd,
-            )
-            db.add(quota)
 
-        await db.commit()
-        await db.refresh(quota)
+        result = await db.execute(self._usage_upsert([increment.to_row()]))
+        quota = result.scalar_one()
+
+        if commit:
+            await db.commit()
 
         return quota
 
+    async def track_usage_batch(
+        self,
+        increments: Sequence[UsageIncrement],
+        db: AsyncSession,
+        commit: bool = True,
+        chunk_size: int = 1000,
+    ) -> int:
+        """
+        Apply many usage increments with multi-row UPSERTs.
+
+        Increments for the same user and month are summed first (one row
+        can't be updated twice by the same statement), and rows are written
+        in key order so concurrent batches lock rows in the same order.
+
+        Args:
+            increments: Usage increments (e.g. aggregated by a background job)
+            db: Database session
+            commit: Commit after the last chunk
+            chunk_size: Rows per statement
+
+        Returns:
+            Number of quota rows updated or created
+        """
+        default_month = datetime.utcnow().strftime("%Y-%m")
+        totals: dict[tuple[UUID, str], dict[str, Any]] = {}
+        for increment in increments:
+            row = increment.to_row(default_month)
+            key = (row["user_id"], row["month_year"])
+            total = totals.get(key)
+            if total is None:
+                totals[key] = row
+            else:
+                for column in _USAGE_COLUMNS.values():
+                    total[column] += row[column]
+
+        rows = [totals[key] for key in sorted(totals, key=lambda key: (str(key[0]), key[1]))]
+        for offset in range(0, len(rows), chunk_size):
+            await db.execute(self._usage_upsert(rows[offset:offset + chunk_size]))
+
+        if commit and rows:
+            await db.commit()
+
+        logger.debug("usage_batch_tracked", increments=len(increments), rows=len(rows))
+
+        return len(rows)
+
     async def get_usage_quota(
         self, user_id: UUID, db: AsyncSession, month_year: str | None = None
     ) -> MonthlyUsageQuota | None:
@@ -298,15 +393,12 @@ class SubscriptionService:
         Returns:
             Dictionary with usage status and limits
         """
-        subscription = await self.get_subscription(user_id, db)
+        subscription = await plan_cache_service.get_subscription(user_id, db)
         if not subscription:
             raise ValueError("No active subscription found")
 
         # Get plan limits
-        result = await db.execute(
-            select(PlanLimit).where(PlanLimit.plan_type == subscription.plan_type)
-        )
-        plan_limit = result.scalar_one_or_none()
+        plan_limit = await plan_cache_service.get_plan(subscription.plan_type, db)
 
         if not plan_limit:
             raise ValueError(f"Plan limits not found for {subscription.plan_type}")
@@ -361,10 +453,7 @@ class SubscriptionService:
     ) -> Subscription:
         """Handle plan upgrade or downgrade."""
         # Get new plan limits
-        result = await db.execute(
-            select(PlanLimit).where(PlanLimit.plan_type == new_plan_type)
-        )
-        new_plan = result.scalar_one_or_none()
+        new_plan = await plan_cache_service.get_plan(new_plan_type, db)
 
         if not new_plan:
             raise ValueError(f"Plan type '{new_plan_type}' not found")
@@ -386,17 +475,13 @@ class SubscriptionService:
 
         return subscription
 
-    async def get_plan_limits(self, plan_type: str, db: AsyncSession) -> PlanLimit | None:
-        """Get limits for a specific plan."""
-        result = await db.execute(
-            select(PlanLimit).where(PlanLimit.plan_type == plan_type)
-        )
-        return result.scalar_one_or_none()
+    async def get_plan_limits(self, plan_type: str, db: AsyncSession) -> CachedPlanLimit | None:
+        """Get limits for a specific plan (from the plan cache)."""
+        return await plan_cache_service.get_plan(plan_type, db)
 
-    async def list_all_plans(self, db: AsyncSession) -> list[PlanLimit]:
-        """List all available plans."""
-        result = await db.execute(select(PlanLimit).order_by(PlanLimit.monthly_price_usd))
-        return list(result.scalars().all())
+    async def list_all_plans(self, db: AsyncSession) -> list[CachedPlanLimit]:
+        """List all available plans (from the plan cache)."""
+        return await plan_cache_service.list_plans(db)
 
 
 # Global service instance
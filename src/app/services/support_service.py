@@ -11,6 +11,7 @@ from sqlalchemy.orm import selectinload
 from app.core.logging import get_logger
 from app.models.support_ticket import SupportTicket, SupportTicketResponse
 from app.models.user import User
+from app.repositories.base import estimate_count, paginate
 
 logger = get_logger(__name__)
 
@@ -99,39 +100,32 @@ class SupportService:
         self,
         user_id: UUID,
         status_filter: Optional[str] = None,
-        page: int = 1,
         page_size: int = 20,
+        cursor: Optional[str] = None,
     ) -> dict:
         """
-        List tickets for a specific user.
+        List tickets for a specific user, newest first.
 
         Args:
             user_id: ID of user
             status_filter: Filter by status
-            page: Page number
             page_size: Items per page
+            cursor: next_cursor of the previous page
 
         Returns:
             Paginated ticket list
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
         """
         query = select(SupportTicket).where(SupportTicket.user_id == user_id)
 
         if status_filter:
             query = query.where(SupportTicket.status == status_filter)
 
-        query = query.order_by(SupportTicket.created_at.desc())
-
-        # Count total
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
-
-        # Paginate
-        offset = (page - 1) * page_size
-        query = query.offset(offset).limit(page_size)
-
-        result = await self.db.execute(query)
-        tickets = result.scalars().all()
+        page = await paginate(
+            self.db, query, [SupportTicket.created_at], SupportTicket.id, page_size, cursor
+        )
 
         return {
             "tickets": [
@@ -145,13 +139,12 @@ class SupportService:
                     "updated_at": ticket.updated_at.isoformat(),
                     "resolved_at": ticket.resolved_at.isoformat() if ticket.resolved_at else None,
                 }
-                for ticket in tickets
+                for ticket in page.items
             ],
             "pagination": {
-                "page": page,
                 "page_size": page_size,
-                "total": total,
-                "total_pages": (total + page_size - 1) // page_size,
+                "next_cursor": page.next_cursor,
+                "has_more": page.has_more,
             },
         }
 
@@ -162,8 +155,8 @@ class SupportService:
         category_filter: Optional[str] = None,
         priority_filter: Optional[str] = None,
         assigned_to_me: bool = False,
-        page: int = 1,
         page_size: int = 50,
+        cursor: Optional[str] = None,
     ) -> dict:
         """
         List all tickets (admin view).
@@ -174,11 +167,15 @@ class SupportService:
             category_filter: Filter by category
             priority_filter: Filter by priority
             assigned_to_me: Show only tickets assigned to this admin
-            page: Page number
             page_size: Items per page
+            cursor: next_cursor of the previous page
 
         Returns:
-            Paginated ticket list with user information
+            Paginated ticket list with user information (estimated_total
+            only without filters)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
         """
         query = select(SupportTicket).options(selectinload(SupportTicket.responses))
 
@@ -195,21 +192,19 @@ class SupportService:
         if assigned_to_me:
             query = query.where(SupportTicket.assigned_to_admin_id == admin_user_id)
 
-        query = query.order_by(
-            SupportTicket.priority.desc(), SupportTicket.created_at.desc()
+        page = await paginate(
+            self.db,
+            query,
+            [SupportTicket.priority, SupportTicket.created_at],
+            SupportTicket.id,
+            page_size,
+            cursor,
         )
+        tickets = page.items
 
-        # Count total
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
-
-        # Paginate
-        offset = (page - 1) * page_size
-        query = query.offset(offset).limit(page_size)
-
-        result = await self.db.execute(query)
-        tickets = result.scalars().all()
+        estimated_total = None
+        if not (status_filter or category_filter or priority_filter or assigned_to_me):
+            estimated_total = await estimate_count(self.db, SupportTicket)
 
         return {
             "tickets": [
@@ -231,10 +226,10 @@ class SupportService:
                 for ticket in tickets
             ],
             "pagination": {
-                "page": page,
                 "page_size": page_size,
-                "total": total,
-                "total_pages": (total + page_size - 1) // page_size,
+                "next_cursor": page.next_cursor,
+                "has_more": page.has_more,
+                "estimated_total": estimated_total,
             },
         }
 
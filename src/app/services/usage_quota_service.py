@@ -0,0 +1,620 @@
+"""
+Monthly usage quotas backed by Redis counters.
+
+Checking a chat message against the user's plan used to take three
+queries (subscription, plan limits, monthly quota) and the usage was then
+written back with another UPSERT. On the hot path, quotas are now checked
+and incremented with one EVALSHA against Redis hashes per user and month:
+
+- usage_quota:{user_id}:{YYYY-MM}          -> running monthly totals
+- usage_quota:{user_id}:{YYYY-MM}:delta    -> increments not yet in PostgreSQL
+- usage_quota:{user_id}:{YYYY-MM}:flushing -> delta taken by a running flush
+- usage_quota:{user_id}:{YYYY-MM}:epoch    -> number of flushes taken
+- usage_quota:dirty                        -> user-months with a pending delta
+
+The user's plan comes from rate_limit_policy_service and plan limits from
+plan_cache_service, so a check does no database I/O.
+
+A background flusher periodically takes the pending deltas and persists
+them to MonthlyUsageQuota with multi-row UPSERTs. PostgreSQL stays the
+source of truth: missing counters (new month, Redis restart, expiry) are
+rebuilt from the quota row plus any pending delta. A rebuild is skipped
+while a flush of the same user-month is in flight, so a delta is never
+counted twice or lost between Redis and PostgreSQL.
+
+With usage_quota_redis_enabled off, quotas are checked against the
+MonthlyUsageQuota row and incremented with an UPSERT (two steps, so
+concurrent requests can overshoot a limit slightly, as before the Redis
+counters). Redis errors fail open: the request is allowed and the
+increment is written straight to PostgreSQL. Missing limits fail closed: the first
+enforced check waits for plans to load and raises if they can't be.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import track_usage_quota_check, track_usage_quota_flush
+from app.core.redis_client import get_redis_client
+from app.db.base import AsyncSessionLocal
+from app.services.plan_cache_service import plan_cache_service
+from app.services.rate_limit_policy_service import rate_limit_policy_service
+from app.services.subscription_service import UsageIncrement, subscription_service
+
+logger = get_logger(__name__)
+
+# Counter field -> MonthlyUsageQuota column
+COUNTER_COLUMNS = {
+    "messages": "messages_used",
+    "tokens": "tokens_used",
+    "images": "images_generated",
+    "documents": "documents_processed",
+    "audio_minutes": "audio_minutes_used",
+    "cost_usd": "total_cost_usd",
+    "cache_savings_usd": "cache_savings_usd",
+}
+
+# Counter field -> PlanLimit column (cost fields are counted, not limited)
+LIMIT_COLUMNS = {
+    "messages": "max_messages_per_month",
+    "tokens": "max_tokens_per_month",
+    "images": "max_images_per_month",
+    "documents": "max_documents_per_month",
+    "audio_minutes": "max_audio_minutes_per_month",
+}
+
+# Fields counted with HINCRBYFLOAT (the scripts match the same suffix)
+_FLOAT_SUFFIX = "_usd"
+
+DIRTY_KEY = "usage_quota:dirty"
+
+# Check-and-increment. KEYS: counters, delta, dirty set.
+# ARGV: dirty member, counter TTL, enforce (1/0), then (field, amount,
+# limit) triples; limit -1 means not limited. An amount of 0 only checks
+# that the field isn't used up. Returns {1, '', totals} when applied,
+# {0, field, totals} when a limit would be exceeded, and {-1} when the
+# counters are cold (with enforce=0 the increment is still kept in delta).
+_CONSUME_SCRIPT = """
+local function incr(key, name, amount)
+    if string.sub(name, -4) == '_usd' then
+        redis.call('HINCRBYFLOAT', key, name, amount)
+    else
+        redis.call('HINCRBY', key, name, amount)
+    end
+end
+
+local warm = redis.call('EXISTS', KEYS[1]) == 1
+local enforce = ARGV[3] == '1'
+if enforce and not warm then
+    return {-1}
+end
+
+if enforce then
+    for i = 4, #ARGV, 3 do
+        local limit = tonumber(ARGV[i + 2])
+        if limit >= 0 then
+            local amount = tonumber(ARGV[i + 1])
+            local used = tonumber(redis.call('HGET', KEYS[1], ARGV[i])) or 0
+            if used + amount > limit or (amount == 0 and used >= limit) then
+                return {0, ARGV[i], redis.call('HGETALL', KEYS[1])}
+            end
+        end
+    end
+end
+
+for i = 4, #ARGV, 3 do
+    if tonumber(ARGV[i + 1]) ~= 0 then
+        if warm then
+            incr(KEYS[1], ARGV[i], ARGV[i + 1])
+        end
+        incr(KEYS[2], ARGV[i], ARGV[i + 1])
+    end
+end
+redis.call('SADD', KEYS[3], ARGV[1])
+
+if not warm then
+    return {-1}
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return {1, '', redis.call('HGETALL', KEYS[1])}
+"""
+
+# Rebuild cold counters. KEYS: counters, delta, flushing, epoch.
+# ARGV: counter TTL, flush epoch read before the database, then (field,
+# PostgreSQL total) pairs. Returns 1 if the counters are warm, 0 if a
+# flush ran or is running since the database read (the caller retries later).
+_PRIME_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 1
+end
+if redis.call('EXISTS', KEYS[3]) == 1 or (redis.call('GET', KEYS[4]) or '0') ~= ARGV[2] then
+    return 0
+end
+for i = 3, #ARGV, 2 do
+    local value = tonumber(ARGV[i + 1]) + (tonumber(redis.call('HGET', KEYS[2], ARGV[i])) or 0)
+    if string.sub(ARGV[i], -4) == '_usd' then
+        redis.call('HSET', KEYS[1], ARGV[i], string.format('%.10f', value))
+    else
+        redis.call('HSET', KEYS[1], ARGV[i], string.format('%d', value))
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+# Take pending deltas for a flush. KEYS: (delta, flushing, epoch) per
+# user-month. ARGV: epoch TTL. Deltas are merged into flushing (which may
+# hold a delta of an interrupted flush) and the epoch is bumped. Returns
+# the flushing hash of each user-month.
+_TAKE_SCRIPT = """
+local taken = {}
+for i = 1, #KEYS, 3 do
+    local delta = redis.call('HGETALL', KEYS[i])
+    for j = 1, #delta, 2 do
+        if string.sub(delta[j], -4) == '_usd' then
+            redis.call('HINCRBYFLOAT', KEYS[i + 1], delta[j], delta[j + 1])
+        else
+            redis.call('HINCRBY', KEYS[i + 1], delta[j], delta[j + 1])
+        end
+    end
+    redis.call('DEL', KEYS[i])
+    redis.call('INCR', KEYS[i + 2])
+    redis.call('EXPIRE', KEYS[i + 2], ARGV[1])
+    taken[#taken + 1] = redis.call('HGETALL', KEYS[i + 1])
+end
+return taken
+"""
+
+# Return taken deltas after a failed flush. KEYS: dirty set, then
+# (flushing, delta) per user-month. ARGV: dirty members.
+_RESTORE_SCRIPT = """
+for i = 2, #KEYS, 2 do
+    local flushing = redis.call('HGETALL', KEYS[i])
+    for j = 1, #flushing, 2 do
+        if string.sub(flushing[j], -4) == '_usd' then
+            redis.call('HINCRBYFLOAT', KEYS[i + 1], flushing[j], flushing[j + 1])
+        else
+            redis.call('HINCRBY', KEYS[i + 1], flushing[j], flushing[j + 1])
+        end
+    end
+    redis.call('DEL', KEYS[i])
+end
+redis.call('SADD', KEYS[1], unpack(ARGV))
+return 1
+"""
+
+
+class QuotaUnavailableError(Exception):
+    """Raised when limits can't be enforced because plans aren't loaded."""
+
+
+@dataclass
+class QuotaResult:
+    """Outcome of a quota check-and-increment."""
+
+    allowed: bool
+    exceeded: Optional[str] = None  # Counter field whose limit was hit
+    usage: dict[str, float] = field(default_factory=dict)  # Monthly totals (empty if unknown)
+    limits: dict[str, int] = field(default_factory=dict)  # Limits of the user's plan
+
+
+def current_month() -> str:
+    """Get the current quota month (YYYY-MM, UTC)."""
+    return datetime.utcnow().strftime("%Y-%m")
+
+
+class UsageQuotaService:
+    """
+    Monthly usage quota counters in Redis with write-behind to PostgreSQL.
+
+    Features:
+    - Atomic check-and-increment in a single EVALSHA
+    - Plan limits from the in-memory plan cache
+    - Background flush of pending deltas with multi-row UPSERTs
+    - Cold counters rebuilt from PostgreSQL plus pending deltas
+    - Fail-open: Redis errors allow the request and write PostgreSQL directly
+    """
+
+    def __init__(self):
+        """Initialize usage quota service."""
+        self.redis = get_redis_client("default")
+        self.flush_interval_seconds = settings.usage_quota_flush_interval_seconds
+        self.flush_batch_size = settings.usage_quota_flush_batch_size
+        self.counter_ttl_seconds = settings.usage_quota_counter_ttl_seconds
+
+        self._flush_task: Optional[asyncio.Task] = None
+        self._load_lock = asyncio.Lock()
+
+        # Scripts are loaded once and invoked with EVALSHA
+        self._consume_script = self.redis.register_script(_CONSUME_SCRIPT)
+        self._prime_script = self.redis.register_script(_PRIME_SCRIPT)
+        self._take_script = self.redis.register_script(_TAKE_SCRIPT)
+        self._restore_script = self.redis.register_script(_RESTORE_SCRIPT)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether quotas are counted in Redis."""
+        return settings.usage_quota_redis_enabled
+
+    @staticmethod
+    def _keys(user_id: UUID, month_year: str) -> dict[str, str]:
+        """Get the Redis keys of a user-month."""
+        base = f"usage_quota:{user_id}:{month_year}"
+        return {
+            "counters": base,
+            "delta": f"{base}:delta",
+            "flushing": f"{base}:flushing",
+            "epoch": f"{base}:epoch",
+        }
+
+    def get_limits(self, plan: str) -> dict[str, int]:
+        """
+        Get the monthly limits of a plan from memory (no I/O).
+
+        Args:
+            plan: Subscription plan type
+
+        Returns:
+            Counter field -> limit; empty if the plan has no PlanLimit row
+        """
+        plan_limit = plan_cache_service.get_cached_plan(plan)
+        if plan_limit is None:
+            return {}
+        return {name: getattr(plan_limit, column) for name, column in LIMIT_COLUMNS.items()}
+
+    async def consume(
+        self,
+        user_id: UUID,
+        messages: int = 0,
+        tokens: int = 0,
+        images: int = 0,
+        documents: int = 0,
+        audio_minutes: int = 0,
+        cost_usd: float = 0.0,
+        cache_savings_usd: float = 0.0,
+        also_check: tuple[str, ...] = (),
+        enforce: bool = True,
+    ) -> QuotaResult:
+        """
+        Atomically check a user's monthly quota and add usage to it.
+
+        Every field with a positive amount is checked against the plan
+        limit; nothing is added if any of them would exceed it.
+
+        Args:
+            user_id: User ID
+            messages: Number of messages
+            tokens: Number of tokens
+            images: Number of images generated
+            documents: Number of documents processed
+            audio_minutes: Minutes of audio processed
+            cost_usd: Cost in USD
+            cache_savings_usd: Cache savings in USD
+            also_check: Fields that must not be used up, without adding to them
+                (e.g. tokens for a chat message whose tokens are counted later)
+            enforce: Check limits; False only records usage
+
+        Returns:
+            QuotaResult; allowed is False only if a limit would be exceeded
+
+        Raises:
+            QuotaUnavailableError: If enforcing and plan limits can't be loaded
+        """
+        amounts = {
+            "messages": messages,
+            "tokens": tokens,
+            "images": images,
+            "documents": documents,
+            "audio_minutes": audio_minutes,
+            "cost_usd": cost_usd or 0.0,
+            "cache_savings_usd": cache_savings_usd or 0.0,
+        }
+        amounts = {name: amount for name, amount in amounts.items() if amount}
+        if enforce:
+            await self._ensure_limits_loaded()
+        limits = self.get_limits(rate_limit_policy_service.get_user_plan(user_id)) if enforce else {}
+
+        if not self.enabled:
+            return await self._consume_directly(user_id, amounts, also_check, limits)
+
+        month_year = current_month()
+        keys = self._keys(user_id, month_year)
+        args = [f"{user_id}:{month_year}", self.counter_ttl_seconds, 1 if enforce else 0]
+        for name in sorted(set(amounts) | set(also_check)):
+            args.extend([name, amounts.get(name, 0), limits.get(name, -1)])
+
+        try:
+            result = await self._consume_script(
+                keys=[keys["counters"], keys["delta"], DIRTY_KEY],
+                args=args,
+            )
+            if int(result[0]) == -1 and enforce:
+                # Cold counters: rebuild from PostgreSQL and check again,
+                # or just record if a flush is in flight
+                if not await self._prime(user_id, month_year):
+                    args[2] = 0
+                result = await self._consume_script(
+                    keys=[keys["counters"], keys["delta"], DIRTY_KEY],
+                    args=args,
+                )
+        except Exception as e:
+            logger.warning("usage_quota_check_failed", user_id=str(user_id), error=str(e))
+            track_usage_quota_check("error")
+            await self._record_directly(user_id, amounts)
+            return QuotaResult(allowed=True, limits=limits)
+
+        status = int(result[0])
+        if status == -1:
+            track_usage_quota_check("cold" if enforce else "recorded")
+            return QuotaResult(allowed=True, limits=limits)
+
+        usage = self._parse_hash(result[2])
+        if status == 0:
+            track_usage_quota_check("denied")
+            logger.info("usage_quota_exceeded", user_id=str(user_id), counter=result[1])
+            return QuotaResult(allowed=False, exceeded=result[1], usage=usage, limits=limits)
+
+        track_usage_quota_check("allowed" if enforce else "recorded")
+        return QuotaResult(allowed=True, usage=usage, limits=limits)
+
+    async def record(self, user_id: UUID, **amounts: Any) -> None:
+        """
+        Add usage without checking limits (e.g. tokens of a finished turn).
+
+        Args:
+            user_id: User ID
+            **amounts: Counter increments (messages, tokens, cost_usd, ...)
+        """
+        await self.consume(user_id, enforce=False, **amounts)
+
+    async def refund(self, user_id: UUID, **amounts: Any) -> None:
+        """
+        Give back usage taken by consume() for work that then failed.
+
+        Args:
+            user_id: User ID
+            **amounts: Counter amounts to subtract (images, documents, ...)
+        """
+        await self.record(user_id, **{name: -amount for name, amount in amounts.items()})
+
+    async def _ensure_limits_loaded(self) -> None:
+        """
+        Wait for plan limits and user plans before enforcing them.
+
+        Both load in the background at startup; until then every plan
+        would look unlimited. The first check loads them (once, for all
+        concurrent checks).
+
+        Raises:
+            QuotaUnavailableError: If they can't be loaded
+        """
+        if plan_cache_service.is_loaded and rate_limit_policy_service.is_loaded:
+            return
+
+        async with self._load_lock:
+            if not plan_cache_service.is_loaded:
+                await plan_cache_service.reload_plans()
+            if not rate_limit_policy_service.is_loaded:
+                await rate_limit_policy_service.refresh()
+
+        if not (plan_cache_service.is_loaded and rate_limit_policy_service.is_loaded):
+            track_usage_quota_check("unavailable")
+            raise QuotaUnavailableError("Usage limits are not available yet")
+
+    async def get_usage_limits(self, user_id: UUID, db: AsyncSession) -> dict[str, Any]:
+        """
+        Get the user's monthly usage and limits from the counters.
+
+        Falls back to subscription_service.check_usage_limits (PostgreSQL)
+        when counters are disabled, unavailable or the plan has no limits.
+
+        Args:
+            user_id: User ID
+            db: Database session for the fallback
+
+        Returns:
+            Dictionary with usage status and limits
+        """
+        limits = self.get_limits(rate_limit_policy_service.get_user_plan(user_id))
+        if not self.enabled or not limits:
+            return await subscription_service.check_usage_limits(user_id=user_id, db=db)
+
+        month_year = current_month()
+        counters_key = self._keys(user_id, month_year)["counters"]
+        try:
+            usage = self._parse_hash(await self.redis.hgetall(counters_key))
+            if not usage and await self._prime(user_id, month_year):
+                usage = self._parse_hash(await self.redis.hgetall(counters_key))
+        except Exception as e:
+            logger.warning("usage_quota_read_failed", user_id=str(user_id), error=str(e))
+            usage = {}
+
+        if not usage:
+            return await subscription_service.check_usage_limits(user_id=user_id, db=db)
+
+        stats: dict[str, Any] = {}
+        for name, limit in LIMIT_COLUMNS.items():
+            used = int(usage.get(name, 0))
+            stats[name] = {"used": used, "limit": limits[name], "remaining": max(0, limits[name] - used)}
+        stats["total_cost_usd"] = usage.get("cost_usd", 0.0)
+        stats["cache_savings_usd"] = usage.get("cache_savings_usd", 0.0)
+        return stats
+
+    async def flush(self) -> int:
+        """
+        Persist pending deltas to MonthlyUsageQuota.
+
+        Deltas are taken from Redis in batches and written with multi-row
+        UPSERTs. If a write fails, the taken deltas are returned to Redis
+        and retried on the next flush.
+
+        Returns:
+            Number of quota rows written
+        """
+        written = 0
+        while True:
+            members = await self.redis.spop(DIRTY_KEY, self.flush_batch_size)
+            if not members:
+                return written
+
+            user_months = [self._parse_member(member) for member in members]
+            keys = [self._keys(user_id, month_year) for user_id, month_year in user_months]
+
+            taken = await self._take_script(
+                keys=[key for k in keys for key in (k["delta"], k["flushing"], k["epoch"])],
+                args=[self.counter_ttl_seconds],
+            )
+
+            increments = []
+            for (user_id, month_year), delta in zip(user_months, taken):
+                amounts = self._parse_hash(delta)
+                if amounts:
+                    increments.append(UsageIncrement(user_id=user_id, month_year=month_year, **amounts))
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    rows = await subscription_service.track_usage_batch(increments, db)
+            except Exception:
+                await self._restore_script(
+                    keys=[DIRTY_KEY, *[key for k in keys for key in (k["flushing"], k["delta"])]],
+                    args=members,
+                )
+                raise
+
+            await self.redis.delete(*[k["flushing"] for k in keys])
+
+            written += rows
+            track_usage_quota_flush(rows)
+            logger.debug("usage_quota_flushed", user_months=len(members), rows=rows)
+
+            if len(members) < self.flush_batch_size:
+                return written
+
+    def start_background_flush(self) -> None:
+        """Start the periodic flush task (idempotent)."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop_background_flush(self) -> None:
+        """Stop the periodic flush task and flush what is pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error("usage_quota_final_flush_failed", error=str(e))
+
+    async def _flush_loop(self) -> None:
+        """Flush pending deltas every flush_interval_seconds."""
+        while True:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("usage_quota_flush_failed", error=str(e))
+            await asyncio.sleep(self.flush_interval_seconds)
+
+    async def _prime(self, user_id: UUID, month_year: str) -> bool:
+        """Rebuild cold counters from PostgreSQL plus the pending delta."""
+        keys = self._keys(user_id, month_year)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.exists(keys["flushing"])
+            pipe.get(keys["epoch"])
+            flushing, epoch = await pipe.execute()
+        if flushing:
+            return False
+
+        async with AsyncSessionLocal() as db:
+            quota = await subscription_service.get_usage_quota(user_id, db, month_year)
+
+        args: list[Any] = [self.counter_ttl_seconds, epoch or "0"]
+        for name, column in COUNTER_COLUMNS.items():
+            args.extend([name, float(getattr(quota, column) or 0) if quota else 0])
+
+        primed = bool(
+            await self._prime_script(
+                keys=[keys["counters"], keys["delta"], keys["flushing"], keys["epoch"]],
+                args=args,
+            )
+        )
+        logger.debug("usage_quota_primed", user_id=str(user_id), month_year=month_year, primed=primed)
+        return primed
+
+    async def _consume_directly(
+        self,
+        user_id: UUID,
+        amounts: dict[str, Any],
+        also_check: tuple[str, ...],
+        limits: dict[str, int],
+    ) -> QuotaResult:
+        """
+        Check limits against the PostgreSQL quota row, then record (Redis disabled).
+
+        Args:
+            user_id: User ID
+            amounts: Counter increments
+            also_check: Fields that must not be used up
+            limits: Plan limits to enforce (empty when only recording)
+
+        Returns:
+            QuotaResult; nothing is recorded when a limit would be exceeded
+        """
+        checked = [name for name in sorted(set(amounts) | set(also_check)) if limits.get(name, -1) >= 0]
+        if checked:
+            async with AsyncSessionLocal() as db:
+                quota = await subscription_service.get_usage_quota(user_id, db, current_month())
+            usage = {
+                name: float(getattr(quota, column) or 0) if quota else 0.0
+                for name, column in COUNTER_COLUMNS.items()
+            }
+            for name in checked:
+                amount, used, limit = amounts.get(name, 0), usage[name], limits[name]
+                if used + amount > limit or (amount == 0 and used >= limit):
+                    track_usage_quota_check("denied")
+                    logger.info("usage_quota_exceeded", user_id=str(user_id), counter=name)
+                    return QuotaResult(allowed=False, exceeded=name, usage=usage, limits=limits)
+
+        await self._record_directly(user_id, amounts)
+        return QuotaResult(allowed=True, limits=limits)
+
+    async def _record_directly(self, user_id: UUID, amounts: dict[str, Any]) -> None:
+        """Write usage straight to PostgreSQL (Redis disabled or unavailable)."""
+        if not amounts:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await subscription_service.track_usage(user_id=user_id, db=db, **amounts)
+        except Exception as e:
+            logger.error("usage_quota_direct_write_failed", user_id=str(user_id), error=str(e))
+
+    @staticmethod
+    def _parse_member(member: str) -> tuple[UUID, str]:
+        """Split a dirty-set member into (user_id, month_year)."""
+        user_id, month_year = member.rsplit(":", 1)
+        return UUID(user_id), month_year
+
+    @staticmethod
+    def _parse_hash(flat: Any) -> dict[str, Any]:
+        """Parse a counter hash (HGETALL dict or flat script reply)."""
+        if not isinstance(flat, dict):
+            flat = dict(zip(flat[::2], flat[1::2]))
+        return {
+            name: float(value) if name.endswith(_FLOAT_SUFFIX) else int(float(value))
+            for name, value in flat.items()
+            if name in COUNTER_COLUMNS
+        }
+
+
+usage_quota_service = UsageQuotaService()
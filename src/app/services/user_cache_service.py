@@ -0,0 +1,371 @@
+"""
+Cached snapshots of authenticated users.
+
+get_current_user used to load the caller's User row on every authenticated
+request. The profile fields endpoints read are now served from two tiers:
+
+- In-process TTL cache (no I/O)
+- user_cache:user:{user_id} in Redis, shared by all workers (one GET)
+
+Only a miss in both tiers reads the database. Snapshots never contain
+credentials (password hash, Google ID).
+
+Snapshots are stamped with the user's token version, kept in
+user_cache:token_version:{user_id}. Access tokens carry the version they
+were issued at (the "ver" claim). Bans, role changes and logout bump the
+version, which revokes the user's outstanding access tokens and makes every
+cached snapshot stale. Profile changes that shouldn't sign the user out
+(email verification, profile fill-ins) only drop the snapshots and leave the
+version alone. Either is broadcast on the user_cache:invalidate channel so
+other workers drop their copy immediately; a worker that misses the message
+serves its copy for at most the in-process TTL.
+
+Redis errors fail open: the user is loaded from the database and the token
+version isn't checked.
+"""
+
+import asyncio
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import track_user_cache_lookup
+from app.core.redis_client import get_redis_client
+from app.models.user import User
+from app.utils.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+INVALIDATION_CHANNEL = "user_cache:invalidate"
+
+# Store a snapshot only if the token version hasn't changed since it was
+# read (before loading the user). KEYS: token version, snapshot.
+# ARGV: version read, snapshot JSON, TTL. Returns 1 if stored.
+_STORE_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# Bump the token version and drop the snapshot. KEYS: token version,
+# snapshot. Returns the new version.
+_INVALIDATE_SCRIPT = """
+local version = redis.call('INCR', KEYS[1])
+redis.call('DEL', KEYS[2])
+return version
+"""
+
+_DATETIME_FIELDS = ("created_at", "updated_at", "last_login_at")
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Immutable copy of the User fields read by endpoints."""
+
+    id: UUID
+    token_version: int  # Token version the snapshot was loaded at
+    email: Optional[str]
+    full_name: Optional[str]
+    profile_picture_url: Optional[str]
+    profile_picture_uploaded: bool
+    marja_preference: Optional[str]
+    preferred_language: str
+    is_email_verified: bool
+    is_active: bool
+    account_type: str
+    role: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    last_login_at: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, user: User, token_version: int) -> "CachedUser":
+        """Copy a User row."""
+        return cls(
+            id=user.id,
+            token_version=token_version,
+            email=user.email,
+            full_name=user.full_name,
+            profile_picture_url=user.profile_picture_url,
+            profile_picture_uploaded=bool(user.profile_picture_uploaded),
+            marja_preference=user.marja_preference,
+            preferred_language=user.preferred_language,
+            is_email_verified=bool(user.is_email_verified),
+            is_active=bool(user.is_active),
+            account_type=user.account_type,
+            role=user.role,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            last_login_at=user.last_login_at,
+        )
+
+    @classmethod
+    def from_json(cls, data: str) -> "CachedUser":
+        """Parse a snapshot stored in Redis."""
+        values: dict[str, Any] = json.loads(data)
+        values["id"] = UUID(values["id"])
+        for name in _DATETIME_FIELDS:
+            if values.get(name) is not None:
+                values[name] = datetime.fromisoformat(values[name])
+        return cls(**values)
+
+    def to_json(self) -> str:
+        """Serialize the snapshot for Redis."""
+        values = asdict(self)
+        values["id"] = str(self.id)
+        for name in _DATETIME_FIELDS:
+            if values[name] is not None:
+                values[name] = values[name].isoformat()
+        return json.dumps(values)
+
+    def to_user(self) -> User:
+        """
+        Build a transient User from the snapshot.
+
+        The User isn't attached to a session: read it, but load the row
+        before changing it.
+        """
+        values = asdict(self)
+        del values["token_version"]
+        return User(**values)
+
+
+class UserCacheService:
+    """
+    Two-tier cache of authenticated users with token versions.
+
+    Features:
+    - In-process TTL cache in front of shared Redis snapshots
+    - Snapshots stamped with the token version they were loaded at
+    - Explicit invalidation that also revokes outstanding access tokens
+    - Invalidation broadcast to all workers
+    - Fail-open: Redis errors fall back to the database
+    """
+
+    def __init__(self):
+        """Initialize user cache service."""
+        self.redis = get_redis_client("default")
+        self.enabled = settings.user_cache_enabled
+        self.redis_ttl_seconds = settings.user_cache_redis_ttl_seconds
+
+        self._users: TTLCache[UUID, CachedUser] = TTLCache(
+            maxsize=settings.user_cache_max_users,
+            ttl_seconds=settings.user_cache_ttl_seconds,
+        )
+        self._store_script = self.redis.register_script(_STORE_SCRIPT)
+        self._invalidate_script = self.redis.register_script(_INVALIDATE_SCRIPT)
+        self._listener_task: Optional[asyncio.Task] = None
+
+    async def get_user(self, user_id: UUID, token_version: int, db: AsyncSession) -> Optional[CachedUser]:
+        """
+        Get a snapshot of a user at least as new as a token's version.
+
+        The caller compares versions: a token older than the snapshot's
+        token_version has been revoked.
+
+        Args:
+            user_id: User ID
+            token_version: Version claim of the caller's access token
+            db: Database session used on a miss
+
+        Returns:
+            CachedUser or None if the user doesn't exist
+        """
+        if not self.enabled:
+            return await self._load(user_id, db, version=None)
+
+        cached = self._users.get(user_id)
+        if cached is not None and cached.token_version >= token_version:
+            track_user_cache_lookup("local")
+            return cached
+
+        try:
+            data = await self.redis.get(self._user_key(user_id))
+            if data:
+                cached = CachedUser.from_json(data)
+                if cached.token_version >= token_version:
+                    self._users.set(user_id, cached)
+                    track_user_cache_lookup("redis")
+                    return cached
+
+            version = int(await self.redis.get(self._version_key(user_id)) or 0)
+        except Exception as e:
+            logger.warning("user_cache_read_failed", user_id=str(user_id), error=str(e))
+            return await self._load(user_id, db, version=None)
+
+        return await self._load(user_id, db, version=version)
+
+    async def get_token_version(self, user_id: UUID) -> int:
+        """
+        Get the version to put in a new access token.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Current token version (0 if unknown)
+        """
+        try:
+            return int(await self.redis.get(self._version_key(user_id)) or 0)
+        except Exception as e:
+            logger.warning("user_cache_version_read_failed", user_id=str(user_id), error=str(e))
+            return 0
+
+    async def invalidate_user(self, user_id: UUID) -> None:
+        """
+        Drop a user's snapshots and revoke their access tokens.
+
+        Call after committing a change to the user (ban, role change) or on
+        logout. The user signs in again to get a token at the new version.
+
+        Args:
+            user_id: User ID
+        """
+        self._users.pop(user_id)
+
+        try:
+            version = await self._invalidate_script(
+                keys=[self._version_key(user_id), self._user_key(user_id)]
+            )
+            await self.redis.publish(
+                INVALIDATION_CHANNEL, json.dumps({"user_id": str(user_id), "version": int(version)})
+            )
+        except Exception as e:
+            logger.warning("user_cache_invalidate_failed", user_id=str(user_id), error=str(e))
+            return
+
+        logger.info("user_cache_invalidated", user_id=str(user_id), token_version=int(version))
+
+    async def evict_user(self, user_id: UUID) -> None:
+        """
+        Drop a user's snapshots without revoking their access tokens.
+
+        Call after committing a profile change that doesn't affect access
+        (email verification, profile fill-ins); the next request reloads the
+        user at the current token version.
+
+        Args:
+            user_id: User ID
+        """
+        self._users.pop(user_id)
+
+        try:
+            await self.redis.delete(self._user_key(user_id))
+            await self.redis.publish(INVALIDATION_CHANNEL, json.dumps({"user_id": str(user_id)}))
+        except Exception as e:
+            logger.warning("user_cache_evict_failed", user_id=str(user_id), error=str(e))
+            return
+
+        logger.info("user_cache_evicted", user_id=str(user_id))
+
+    def clear(self) -> None:
+        """Drop all in-process snapshots."""
+        self._users.clear()
+
+    def start_background_refresh(self) -> None:
+        """Start the invalidation listener (idempotent)."""
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop_background_refresh(self) -> None:
+        """Stop the invalidation listener."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    async def _listen(self) -> None:
+        """Apply invalidations until cancelled (reconnects on errors)."""
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self._handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("user_cache_listener_failed", error=str(e))
+                await asyncio.sleep(settings.user_cache_ttl_seconds)
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+
+    def _handle_message(self, data: str) -> None:
+        """Drop the snapshot named by an invalidation message."""
+        try:
+            message = json.loads(data)
+            self._users.pop(UUID(message["user_id"]))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("user_cache_invalid_message", error=str(e))
+
+    async def _load(self, user_id: UUID, db: AsyncSession, version: Optional[int]) -> Optional[CachedUser]:
+        """
+        Load a user from the database and cache the snapshot.
+
+        Args:
+            user_id: User ID
+            db: Database session
+            version: Token version read before loading (None skips caching
+                and the version check)
+
+        Returns:
+            CachedUser or None if the user doesn't exist
+        """
+        # Read from the primary: a lagging replica could predate the change
+        # that bumped the version, and the snapshot would outlive the lag
+        result = await db.execute(
+            select(User).where(User.id == user_id).execution_options(use_primary=True)
+        )
+        row = result.scalar_one_or_none()
+        track_user_cache_lookup("database")
+        if row is None:
+            return None
+
+        user = CachedUser.from_model(row, token_version=version or 0)
+        if version is None:
+            return user
+
+        try:
+            stored = await self._store_script(
+                keys=[self._version_key(user_id), self._user_key(user_id)],
+                args=[version, user.to_json(), self.redis_ttl_seconds],
+            )
+        except Exception as e:
+            logger.warning("user_cache_store_failed", user_id=str(user_id), error=str(e))
+            return user
+
+        # Not stored: the user was invalidated while loading, keep the
+        # snapshot out of memory too
+        if stored:
+            self._users.set(user_id, user)
+        return user
+
+    @staticmethod
+    def _user_key(user_id: UUID) -> str:
+        """Redis key of a user's snapshot."""
+        return f"user_cache:user:{user_id}"
+
+    @staticmethod
+    def _version_key(user_id: UUID) -> str:
+        """Redis key of a user's token version."""
+        return f"user_cache:token_version:{user_id}"
+
+
+user_cache_service = UserCacheService()
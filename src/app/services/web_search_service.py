@@ -3,7 +3,9 @@
 from typing import Any, Literal, Optional
 
 import httpx
+from app.core.circuit_breaker import circuit_breaker_registry
 from app.core.config import settings
+from app.core.http_client import get_http_client
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -48,6 +50,24 @@ class WebSearchService:
         elif self.provider == "openrouter" and not settings.openrouter_api_key:
             raise ValueError("OPENROUTER_API_KEY is required when WEB_SEARCH_PROVIDER=openrouter")
 
+        # Circuit breaker + bulkhead for the Serper API
+        self.serper_circuit_breaker = circuit_breaker_registry.get_or_create(
+            name="serper_api",
+            failure_threshold=5,
+            recovery_timeout=60,
+            timeout_seconds=35,
+            max_concurrent=20,
+        )
+
+        # Circuit breaker + bulkhead for OpenRouter web search completions
+        self.openrouter_circuit_breaker = circuit_breaker_registry.get_or_create(
+            name="openrouter_web_search",
+            failure_threshold=5,
+            recovery_timeout=60,
+            timeout_seconds=65,
+            max_concurrent=20,
+        )
+
         logger.info(
             "web_search_service_initialized",
             provider=self.provider,
@@ -117,10 +137,14 @@ class WebSearchService:
             "num": max_results,
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers, timeout=30.0)
+        async def post_search() -> dict[str, Any]:
+            response = await get_http_client("serper").post(
+                url, json=payload, headers=headers, timeout=30.0
+            )
             response.raise_for_status()
-            data = response.json()
+            return response.json()
+
+        data = await self.serper_circuit_breaker.call(post_search)
 
         logger.info(
             "web_search_completed",
@@ -295,10 +319,14 @@ class WebSearchService:
                 "search_context_size": settings.web_search_context_size
             }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers, timeout=60.0)
+        async def post_search() -> dict[str, Any]:
+            response = await get_http_client("openrouter").post(
+                url, json=payload, headers=headers, timeout=60.0
+            )
             response.raise_for_status()
-            data = response.json()
+            return response.json()
+
+        data = await self.openrouter_circuit_breaker.call(post_search)
 
         # Extract the response
         message = data["choices"][0]["message"]
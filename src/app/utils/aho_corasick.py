@@ -0,0 +1,107 @@
+"""
+Aho-Corasick multi-pattern string matcher.
+
+Finds every occurrence of every pattern in a single left-to-right pass
+over the text, regardless of how many patterns there are. Each pattern
+carries a value (e.g. the intent category it belongs to), so one scan
+tags all matches at once instead of running a substring search per
+pattern.
+"""
+
+from collections import deque
+from typing import Generic, Iterable, Iterator, NamedTuple, TypeVar
+
+T = TypeVar('T')
+
+
+class Match(NamedTuple, Generic[T]):
+    """A pattern occurrence in the scanned text."""
+
+    start: int
+    end: int
+    value: T
+
+
+class AhoCorasick(Generic[T]):
+    """
+    Precompiled Aho-Corasick automaton.
+
+    Matching is case-sensitive; lowercase both patterns and text for
+    case-insensitive matching.
+    """
+
+    def __init__(self, patterns: Iterable[tuple[str, T]]):
+        """
+        Build the automaton.
+
+        Args:
+            patterns: (pattern, value) pairs; empty patterns are ignored
+        """
+        # Trie: transitions per state, outputs as (pattern length, value)
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[tuple[int, T], ...]] = [()]
+        self.pattern_count = 0
+
+        for pattern, value in patterns:
+            if pattern:
+                self._add(pattern, value)
+
+        self._build_failure_links()
+
+    def _add(self, pattern: str, value: T) -> None:
+        """Insert a pattern into the trie."""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += ((len(pattern), value),)
+        self.pattern_count += 1
+
+    def _build_failure_links(self) -> None:
+        """Compute failure links breadth-first and merge suffix outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Match[T]]:
+        """
+        Yield every (possibly overlapping) pattern occurrence in the text.
+
+        Args:
+            text: Text to scan
+
+        Yields:
+            Matches in order of their end position
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        root = goto[0]
+        state = 0
+
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0) if state else root.get(char, 0)
+            if output[state]:
+                end = index + 1
+                for length, value in output[state]:
+                    yield Match(end - length, end, value)
+
+    def values_in(self, text: str) -> set[T]:
+        """Get the values of all patterns occurring in the text."""
+        return {match.value for match in self.iter_matches(text)}
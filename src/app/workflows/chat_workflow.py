@@ -2,10 +2,10 @@
 Temporal workflow for chat message processing.
 
 This workflow orchestrates the complete RAG pipeline:
-1. Intent classification
-2. Context retrieval (if needed)
-3. Response generation
-4. Caching
+1. Query embedding, intent classification, cache probe and context
+   retrieval, started speculatively in parallel
+2. Response generation
+3. Caching
 
 Benefits over Celery:
 - Durable execution (survives worker crashes)
@@ -28,10 +28,14 @@ from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.services.embeddings_service import embeddings_service
 from app.services.intent_detector import IntentDetector, IntentType
-from app.services.document_service import DocumentService
 from app.services.langgraph_service import get_langgraph_service
 from app.services.response_cache_service import response_cache_service
+from app.services.speculative_retrieval_service import (
+    build_context,
+    speculative_retrieval_service,
+)
 from app.services.enhanced_chat_service import EnhancedChatService
 
 logger = get_logger(__name__)
@@ -109,8 +113,33 @@ class ChatWorkflowResult:
 # ACTIVITIES
 # ============================================================================
 
+@activity.defn(name="embed_query")
+async def embed_query_activity(query: str) -> Optional[list[float]]:
+    """
+    Embed the query once for the cache probe and retrieval.
+
+    Activity timeout: 30 seconds
+    Retries: 2
+    """
+    try:
+        return await embeddings_service.embed_text(query, is_query=True)
+
+    except Exception as e:
+        logger.error(
+            "query_embedding_failed",
+            query=query[:50],
+            error=str(e),
+        )
+        # Consumers embed the query themselves
+        return None
+
+
 @activity.defn(name="check_response_cache")
-async def check_response_cache_activity(query: str, user_id: str) -> Optional[dict]:
+async def check_response_cache_activity(
+    query: str,
+    user_id: str,
+    query_embedding: Optional[list[float]] = None,
+) -> Optional[dict]:
     """
     Check if response is cached.
     
@@ -128,6 +157,7 @@ async def check_response_cache_activity(query: str, user_id: str) -> Optional[di
         cached = await response_cache_service.get_cached_response(
             query=query,
             user_id=UUID(user_id) if user_id else None,
+            query_embedding=query_embedding,
         )
         
         if cached:
@@ -175,7 +205,7 @@ async def classify_intent_activity(message: str, user_id: str) -> IntentClassifi
         
         # Detect intents
         intent_detector = IntentDetector()
-        intents = await intent_detector.detect_intents(message)
+        intents = intent_detector.detect_intents(message)
         
         # Determine primary intent and requirements
         if intents:
@@ -235,6 +265,7 @@ async def retrieve_context_activity(
     query: str,
     user_id: str,
     intent: str,
+    query_embedding: Optional[list[float]] = None,
 ) -> RetrievalResult:
     """
     Retrieve relevant context from vector DB.
@@ -252,36 +283,15 @@ async def retrieve_context_activity(
         
         # Get database session
         async with async_session_maker() as db:
-            # Use DocumentService for semantic search
-            doc_service = DocumentService(db)
-            
-            chunks = await doc_service.semantic_search(
+            formatted_chunks = await speculative_retrieval_service.retrieve(
                 query=query,
-                limit=5,
-                user_id=UUID(user_id) if user_id else None,
-                min_score=0.7,
+                db=db,
+                query_embedding=query_embedding,
             )
             
-            # Format results
-            formatted_chunks = [
-                {
-                    "content": chunk.content,
-                    "source": chunk.document.title if hasattr(chunk, 'document') else "Unknown",
-                    "score": getattr(chunk, 'score', 0.0),
-                    "chunk_index": chunk.chunk_index,
-                }
-                for chunk in chunks
-            ]
-            
-            # Build context string
-            context = "\n\n---\n\n".join([
-                f"Source: {c['source']} (Relevance: {c['score']:.2%})\n{c['content']}"
-                for c in formatted_chunks
-            ])
-            
             result = RetrievalResult(
                 chunks=formatted_chunks,
-                context=context,
+                context=build_context(formatted_chunks),
                 sources=formatted_chunks,
             )
             
@@ -437,11 +447,10 @@ class ChatWorkflow:
     Main chat processing workflow.
     
     Orchestrates:
-    1. Cache check
-    2. Intent classification
-    3. Context retrieval (if needed)
-    4. Response generation
-    5. Response caching
+    1. Cache check, intent classification and context retrieval, started
+       together (losing branches are cancelled)
+    2. Response generation
+    3. Response caching
     
     Duration: 1-5 minutes typical
     Timeout: 10 minutes max
@@ -467,18 +476,58 @@ class ChatWorkflow:
             user_id=input.user_id,
         )
         
-        # Step 1: Check cache (fast path)
-        cached_result = await workflow.execute_activity(
-            check_response_cache_activity,
-            args=[input.message, input.user_id],
+        # Step 1: Start embedding and intent classification together
+        embedding_handle = workflow.start_activity(
+            embed_query_activity,
+            args=[input.message],
             start_to_close_timeout=timedelta(seconds=30),
             retry_policy=RetryPolicy(
                 maximum_attempts=2,
                 initial_interval=timedelta(seconds=1),
             ),
         )
+        intent_handle = workflow.start_activity(
+            classify_intent_activity,
+            args=[input.message, input.user_id],
+            start_to_close_timeout=timedelta(seconds=30),
+            retry_policy=RetryPolicy(
+                maximum_attempts=3,
+                initial_interval=timedelta(seconds=2),
+                maximum_interval=timedelta(seconds=10),
+            ),
+        )
+        
+        # Step 2: Probe the cache and retrieve context speculatively with the
+        # shared embedding, before the intent is known
+        query_embedding = await embedding_handle
+        
+        cache_handle = None
+        if input.enable_caching:
+            cache_handle = workflow.start_activity(
+                check_response_cache_activity,
+                args=[input.message, input.user_id, query_embedding],
+                start_to_close_timeout=timedelta(seconds=30),
+                retry_policy=RetryPolicy(
+                    maximum_attempts=2,
+                    initial_interval=timedelta(seconds=1),
+                ),
+            )
+        retrieval_handle = workflow.start_activity(
+            retrieve_context_activity,
+            args=[input.message, input.user_id, "speculative", query_embedding],
+            start_to_close_timeout=timedelta(seconds=60),
+            retry_policy=RetryPolicy(
+                maximum_attempts=3,
+                initial_interval=timedelta(seconds=2),
+            ),
+        )
         
-        if cached_result and input.enable_caching:
+        # Fast path: a cache hit cancels classification and retrieval
+        cached_result = await cache_handle if cache_handle is not None else None
+        
+        if cached_result:
+            intent_handle.cancel()
+            retrieval_handle.cancel()
             logger.info(
                 "workflow_completed_from_cache",
                 workflow_id=workflow_id,
@@ -493,30 +542,14 @@ class ChatWorkflow:
                 workflow_id=workflow_id,
             )
         
-        # Step 2: Classify intent
-        intent_result = await workflow.execute_activity(
-            classify_intent_activity,
-            args=[input.message, input.user_id],
-            start_to_close_timeout=timedelta(seconds=30),
-            retry_policy=RetryPolicy(
-                maximum_attempts=3,
-                initial_interval=timedelta(seconds=2),
-                maximum_interval=timedelta(seconds=10),
-            ),
-        )
+        # Step 3: Use the retrieved context only if the intent needs RAG
+        intent_result = await intent_handle
         
-        # Step 3: Retrieve context (conditional)
         retrieval_result = None
         if intent_result.requires_rag:
-            retrieval_result = await workflow.execute_activity(
-                retrieve_context_activity,
-                args=[input.message, input.user_id, intent_result.primary_intent],
-                start_to_close_timeout=timedelta(seconds=60),
-                retry_policy=RetryPolicy(
-                    maximum_attempts=3,
-                    initial_interval=timedelta(seconds=2),
-                ),
-            )
+            retrieval_result = await retrieval_handle
+        else:
+            retrieval_handle.cancel()
         
         # Step 4: Generate response
         generation_result = await workflow.execute_activity(
@@ -580,6 +613,7 @@ class ChatWorkflow:
 
 # Export activities for worker registration
 chat_activities = [
+    embed_query_activity,
     check_response_cache_activity,
     classify_intent_activity,
     retrieve_context_activity,
@@ -1,6 +1,7 @@
 """Comprehensive integration tests for admin endpoints."""
 
 import pytest
+from datetime import datetime, timezone
 from uuid import uuid4, UUID
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy import select
@@ -8,6 +9,7 @@ from sqlalchemy import select
 from app.main import app
 from app.models.user import User
 from app.models.admin import AdminAPIKey
+from app.repositories.base import encode_cursor
 from tests.factories import UserFactory
 
 
@@ -230,20 +232,22 @@ class TestAdminUserListing:
         assert "users" in data
         assert "pagination" in data
         assert isinstance(data["users"], list)
-        assert "total" in data["pagination"]
-        assert "page" in data["pagination"]
+        assert "next_cursor" in data["pagination"]
+        assert "has_more" in data["pagination"]
         assert "page_size" in data["pagination"]
 
     @pytest.mark.asyncio
     async def test_list_users_with_pagination(self, db_session):
         """Test user listing with custom pagination."""
         async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/api/v1/admin/users?page=1&page_size=10")
+            response = await client.get("/api/v1/admin/users?page_size=10")
 
         assert response.status_code == 200
         data = response.json()
-        assert data["pagination"]["page"] == 1
         assert data["pagination"]["page_size"] == 10
+        assert len(data["users"]) <= 10
+        if data["pagination"]["has_more"]:
+            assert data["pagination"]["next_cursor"]
 
     @pytest.mark.asyncio
     async def test_list_users_with_search(self, db_session):
@@ -266,12 +270,12 @@ class TestAdminUserListing:
         assert "users" in data
 
     @pytest.mark.asyncio
-    async def test_list_users_invalid_page(self):
-        """Test user listing with invalid page number."""
+    async def test_list_users_invalid_cursor(self):
+        """Test user listing with a malformed cursor."""
         async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/api/v1/admin/users?page=0")
+            response = await client.get("/api/v1/admin/users?cursor=not-a-cursor")
 
-        assert response.status_code == 422
+        assert response.status_code == 400
 
     @pytest.mark.asyncio
     async def test_list_users_invalid_page_size(self):
@@ -884,15 +888,16 @@ class TestAdminEndpointsEdgeCases:
     """Test edge cases for admin endpoints."""
 
     @pytest.mark.asyncio
-    async def test_large_page_number(self):
-        """Test user listing with very large page number."""
+    async def test_cursor_past_last_user(self):
+        """Test user listing with a cursor past the oldest user."""
+        cursor = encode_cursor([datetime(2000, 1, 1, tzinfo=timezone.utc), uuid4()])
         async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/api/v1/admin/users?page=999999")
+            response = await client.get(f"/api/v1/admin/users?cursor={cursor}")
 
         assert response.status_code == 200
         data = response.json()
-        # Should return empty list or handle gracefully
-        assert "users" in data
+        assert data["users"] == []
+        assert data["pagination"]["next_cursor"] is None
 
     @pytest.mark.asyncio
     async def test_unicode_in_api_key_name(self):
@@ -216,13 +216,22 @@ class TestListUserTickets:
 
         # Test first page
         async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/api/v1/support/tickets/my?page=1&page_size=2")
+            response = await client.get("/api/v1/support/tickets/my?page_size=2")
 
         assert response.status_code == 200
         data = response.json()
         assert len(data["tickets"]) <= 2
-        assert data["page"] == 1
-        assert data["page_size"] == 2
+        assert data["pagination"]["page_size"] == 2
+
+        # Test second page
+        if data["pagination"]["has_more"]:
+            cursor = data["pagination"]["next_cursor"]
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.get(f"/api/v1/support/tickets/my?page_size=2&cursor={cursor}")
+
+            assert response.status_code == 200
+            first_ids = {ticket["ticket_id"] for ticket in data["tickets"]}
+            assert not first_ids & {ticket["ticket_id"] for ticket in response.json()["tickets"]}
 
     @pytest.mark.asyncio
     async def test_list_my_tickets_filter_by_status(self, db_session):
@@ -238,12 +247,12 @@ class TestListUserTickets:
             assert ticket["status"] == "open"
 
     @pytest.mark.asyncio
-    async def test_list_my_tickets_invalid_page(self):
-        """Test listing tickets with invalid page number."""
+    async def test_list_my_tickets_invalid_cursor(self):
+        """Test listing tickets with a malformed cursor."""
         async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/api/v1/support/tickets/my?page=0")
+            response = await client.get("/api/v1/support/tickets/my?cursor=not-a-cursor")
 
-        assert response.status_code == 422
+        assert response.status_code == 400
 
     @pytest.mark.asyncio
     async def test_list_my_tickets_invalid_page_size(self):
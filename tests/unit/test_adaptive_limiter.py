@@ -0,0 +1,220 @@
+"""Unit tests for the adaptive concurrency limiter."""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core.adaptive_limiter import (
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimiterRegistry,
+    LoadSheddingError,
+)
+
+
+class RateLimitedError(Exception):
+    """Upstream error carrying a 429 status code."""
+
+    status_code = 429
+
+
+def make_limiter(**kwargs) -> AdaptiveConcurrencyLimiter:
+    """Create a limiter with small test defaults."""
+    params = {"initial_limit": 2, "min_limit": 1, "max_limit": 10, "queue_size": 10}
+    params.update(kwargs)
+    return AdaptiveConcurrencyLimiter(name="test-model", **params)
+
+
+class TestAdmission:
+    """Test slot acquisition and queueing."""
+
+    @pytest.mark.asyncio
+    async def test_admits_up_to_limit_then_queues(self):
+        """Test that calls above the limit wait for a released slot."""
+        # Arrange
+        limiter = make_limiter(initial_limit=1)
+        await limiter.acquire()
+
+        # Act
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # Assert
+        assert limiter.queued == 1
+        assert not waiter.done()
+
+        limiter.release()
+        await waiter
+        assert limiter.in_flight == 1
+        assert limiter.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_is_fifo(self):
+        """Test that queued calls are admitted in arrival order."""
+        # Arrange
+        limiter = make_limiter(initial_limit=1)
+        await limiter.acquire()
+        order = []
+
+        async def worker(label: str):
+            await limiter.acquire()
+            order.append(label)
+            limiter.release()
+
+        tasks = [asyncio.create_task(worker(label)) for label in ("a", "b", "c")]
+        await asyncio.sleep(0)
+
+        # Act
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+        # Assert
+        assert order == ["a", "b", "c"]
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_sheds_when_queue_is_full(self):
+        """Test that a full queue rejects immediately."""
+        # Arrange
+        limiter = make_limiter(initial_limit=1, queue_size=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # Act & Assert
+        with pytest.raises(LoadSheddingError):
+            await limiter.acquire()
+
+        waiter.cancel()
+
+    @pytest.mark.asyncio
+    async def test_sheds_early_when_expected_wait_exceeds_deadline(self):
+        """Test deadline-aware admission rejects without queueing."""
+        # Arrange
+        limiter = make_limiter(initial_limit=1)
+        limiter._long_latency = 10.0  # Calls take ~10s
+        await limiter.acquire()
+
+        # Act & Assert
+        with pytest.raises(LoadSheddingError) as exc_info:
+            await limiter.acquire(deadline=time.monotonic() + 1.0)
+
+        assert exc_info.value.retry_after_seconds == pytest.approx(10.0)
+        assert limiter.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_sheds_when_deadline_passes_in_queue(self):
+        """Test that a queued call is shed once its deadline passes."""
+        # Arrange
+        limiter = make_limiter(initial_limit=1)
+        await limiter.acquire()
+
+        # Act & Assert
+        with pytest.raises(LoadSheddingError):
+            await limiter.acquire(deadline=time.monotonic() + 0.01)
+
+        assert limiter.queued == 0
+        assert limiter.in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_frees_its_place(self):
+        """Test that cancelling a queued call doesn't leak a slot."""
+        # Arrange
+        limiter = make_limiter(initial_limit=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # Act
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        limiter.release()
+
+        # Assert
+        assert limiter.queued == 0
+        assert limiter.in_flight == 0
+
+
+class TestLimitAdaptation:
+    """Test AIMD limit changes."""
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_decreases_limit(self):
+        """Test that a 429 shrinks the limit multiplicatively."""
+        # Arrange
+        limiter = make_limiter(initial_limit=10)
+        func = AsyncMock(side_effect=RateLimitedError("429"))
+
+        # Act
+        with pytest.raises(RateLimitedError):
+            await limiter.run(func)
+
+        # Assert
+        assert limiter.limit == pytest.approx(7.0)
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_limit_never_drops_below_minimum(self):
+        """Test the lower bound of the limit."""
+        limiter = make_limiter(initial_limit=2, min_limit=1)
+
+        for _ in range(5):
+            limiter._last_decrease = 0.0
+            await limiter.acquire()
+            limiter.release(rate_limited=True)
+
+        assert limiter.limit == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_healthy_latency_grows_saturated_limit(self):
+        """Test additive increase while the limit is fully used."""
+        # Arrange
+        limiter = make_limiter(initial_limit=2)
+        await limiter.acquire()
+        await limiter.acquire()
+
+        # Act
+        limiter.release(latency=1.0)
+
+        # Assert
+        assert limiter.limit == pytest.approx(2.5)
+
+    @pytest.mark.asyncio
+    async def test_latency_spike_decreases_limit(self):
+        """Test that latency well above the long-term average backs off."""
+        # Arrange
+        limiter = make_limiter(initial_limit=10)
+        limiter._short_latency = limiter._long_latency = 1.0
+
+        # Act
+        await limiter.acquire()
+        limiter.release(latency=20.0)
+
+        # Assert
+        assert limiter.limit == pytest.approx(7.0)
+
+    @pytest.mark.asyncio
+    async def test_other_errors_leave_limit_unchanged(self):
+        """Test that non-429 failures are left to the circuit breaker."""
+        limiter = make_limiter(initial_limit=5)
+
+        with pytest.raises(RuntimeError):
+            await limiter.run(AsyncMock(side_effect=RuntimeError("boom")))
+
+        assert limiter.limit == pytest.approx(5.0)
+        assert limiter.in_flight == 0
+
+
+class TestRegistry:
+    """Test per-model limiter registry."""
+
+    def test_one_limiter_per_name_with_defaults(self):
+        """Test that limiters are created once with shared defaults."""
+        registry = ConcurrencyLimiterRegistry(initial_limit=3, queue_size=5)
+
+        limiter = registry.get_or_create("openai/gpt-4o-mini")
+
+        assert registry.get_or_create("openai/gpt-4o-mini") is limiter
+        assert registry.get_or_create("anthropic/claude-3.5-sonnet") is not limiter
+        assert limiter.get_state()["limit"] == 3
+        assert limiter.queue_size == 5
@@ -0,0 +1,42 @@
+"""Unit tests for the Aho-Corasick multi-pattern matcher."""
+
+from app.utils.aho_corasick import AhoCorasick, Match
+
+
+class TestAhoCorasick:
+    """Test cases for AhoCorasick."""
+
+    def test_finds_all_overlapping_matches(self):
+        """Test that overlapping and nested patterns are all reported."""
+        matcher = AhoCorasick([("he", 1), ("she", 2), ("his", 3), ("hers", 4)])
+
+        matches = list(matcher.iter_matches("ushers"))
+
+        assert matches == [Match(1, 4, 2), Match(2, 4, 1), Match(2, 6, 4)]
+
+    def test_values_in_text(self):
+        """Test collecting the values of matched patterns."""
+        matcher = AhoCorasick([("search web", "web"), ("image", "image"), ("deep search", "deep")])
+
+        assert matcher.values_in("please search web for an image") == {"web", "image"}
+        assert matcher.values_in("nothing here") == set()
+
+    def test_persian_and_arabic_patterns(self):
+        """Test matching non-Latin scripts."""
+        matcher = AhoCorasick([("تصویر بساز", "image"), ("ابحث في الإنترنت", "web")])
+
+        assert matcher.values_in("یک تصویر بساز از حرم") == {"image"}
+        assert matcher.values_in("ابحث في الإنترنت عن التاريخ") == {"web"}
+
+    def test_duplicate_patterns_keep_every_value(self):
+        """Test that the same pattern can carry several values."""
+        matcher = AhoCorasick([("google", "web"), ("google", "brand")])
+
+        assert matcher.values_in("google it") == {"web", "brand"}
+
+    def test_empty_patterns_are_ignored(self):
+        """Test that empty patterns don't match everywhere."""
+        matcher = AhoCorasick([("", "empty"), ("a", "a")])
+
+        assert matcher.pattern_count == 1
+        assert list(matcher.iter_matches("bab")) == [Match(1, 2, "a")]
@@ -0,0 +1,101 @@
+"""Unit tests for user cache invalidation in the auth service."""
+
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.services.auth import AuthService
+
+
+def scalar_result(value):
+    """Build a query result whose scalar_one_or_none() returns value."""
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = value
+    return result
+
+
+@pytest.fixture
+def mock_user_cache():
+    """Mock the user cache service."""
+    with patch("app.services.auth.user_cache_service") as mock_cache:
+        mock_cache.invalidate_user = AsyncMock()
+        mock_cache.evict_user = AsyncMock()
+        mock_cache.get_token_version = AsyncMock(return_value=1)
+        yield mock_cache
+
+
+def make_db(*results) -> AsyncMock:
+    """Build a database session returning the given query results in order."""
+    db = AsyncMock()
+    db.add = MagicMock()
+    db.execute.side_effect = list(results)
+    return db
+
+
+class TestUserCacheInvalidation:
+    """Test that profile changes drop cached user snapshots."""
+
+    @pytest.mark.asyncio
+    async def test_verify_email_evicts_user(self, mock_user_cache):
+        """Test that a verified email isn't served stale and the session survives."""
+        # Arrange
+        user = SimpleNamespace(id=uuid4(), is_email_verified=False)
+        otp = SimpleNamespace(attempts_count=0, max_attempts=3, is_used=False, used_at=None)
+        db = make_db(scalar_result(otp), scalar_result(user), scalar_result(None))
+
+        # Act
+        await AuthService(db).verify_email("user@example.com", "123456")
+
+        # Assert
+        assert user.is_email_verified is True
+        db.commit.assert_awaited_once()
+        mock_user_cache.evict_user.assert_awaited_once_with(user.id)
+        mock_user_cache.invalidate_user.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_google_login_evicts_updated_profile(self, mock_user_cache):
+        """Test that a filled-in profile is evicted without revoking other devices."""
+        # Arrange
+        user = SimpleNamespace(
+            id=uuid4(),
+            is_email_verified=False,
+            profile_picture_url=None,
+            full_name="Ali",
+            last_login_at=None,
+        )
+        db = make_db(scalar_result(user), scalar_result(SimpleNamespace()))
+
+        # Act
+        await AuthService(db).google_oauth_login(
+            {"email": "user@example.com", "sub": "google-sub", "picture": "https://pic"}
+        )
+
+        # Assert
+        assert user.profile_picture_url == "https://pic"
+        mock_user_cache.evict_user.assert_awaited_once_with(user.id)
+        mock_user_cache.invalidate_user.assert_not_called()
+        assert db.commit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unchanged_google_login_keeps_tokens(self, mock_user_cache):
+        """Test that a returning Google user's other sessions aren't revoked."""
+        # Arrange
+        user = SimpleNamespace(
+            id=uuid4(),
+            is_email_verified=True,
+            profile_picture_url="https://pic",
+            full_name="Ali",
+            last_login_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        )
+        db = make_db(scalar_result(user), scalar_result(SimpleNamespace()))
+
+        # Act
+        await AuthService(db).google_oauth_login(
+            {"email": "user@example.com", "sub": "google-sub", "name": "Ali", "picture": "https://pic"}
+        )
+
+        # Assert
+        mock_user_cache.evict_user.assert_not_called()
+        mock_user_cache.invalidate_user.assert_not_called()
@@ -0,0 +1,81 @@
+"""Unit tests for the bounded executor."""
+
+import asyncio
+import threading
+import pytest
+
+from app.core.adaptive_limiter import LoadSheddingError
+from app.core.bounded_executor import BoundedExecutor
+
+
+@pytest.fixture
+def executor():
+    """Create an executor with one thread and one queue slot."""
+    executor = BoundedExecutor("test", workers=1, queue_size=1)
+    yield executor
+    executor.shutdown()
+
+
+class TestBoundedExecutor:
+    """Test running blocking calls off the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_runs_on_dedicated_thread(self, executor):
+        """Test that calls run on the executor's threads, not the loop's."""
+        name = await executor.run(lambda: threading.current_thread().name)
+
+        assert name.startswith("test")
+        assert executor.get_state()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_event_loop_keeps_running(self, executor):
+        """Test that a blocking call doesn't stall other coroutines."""
+        # Arrange
+        release = threading.Event()
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while not release.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        # Act
+        ticker = asyncio.create_task(tick())
+        blocking = asyncio.create_task(executor.run(release.wait, 5))
+        await asyncio.sleep(0.1)
+        release.set()
+        await blocking
+        await ticker
+
+        # Assert
+        assert ticks > 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_shed(self, executor):
+        """Test that calls beyond the threads and queue are rejected."""
+        # Arrange
+        release = threading.Event()
+        running = asyncio.create_task(executor.run(release.wait, 5))
+        queued = asyncio.create_task(executor.run(release.wait, 5))
+        await asyncio.sleep(0)
+
+        # Act & Assert
+        assert (executor.in_flight, executor.queued) == (1, 1)
+        with pytest.raises(LoadSheddingError):
+            await executor.run(release.wait, 5)
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert executor.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate(self, executor):
+        """Test that exceptions from the blocking call reach the caller."""
+        def fail():
+            raise ValueError("bad hash")
+
+        with pytest.raises(ValueError, match="bad hash"):
+            await executor.run(fail)
+
+        assert executor.get_state()["in_flight"] == 0
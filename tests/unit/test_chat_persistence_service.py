@@ -0,0 +1,171 @@
+"""Unit tests for the chat turn unit of work."""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql
+
+from app.models.chat import Message
+from app.services.chat_persistence_service import ChatTurnUnitOfWork
+from app.services.conversation_cache_service import ConversationCacheService
+
+
+def make_db(unit: ChatTurnUnitOfWork):
+    """Point the unit at a session mock whose INSERT ... RETURNING yields its rows."""
+    created_at = datetime(2025, 1, 1, 12, 0, 0)
+    insert_result = MagicMock()
+    # RETURNING order isn't guaranteed for multi-row VALUES
+    insert_result.all.return_value = [
+        MagicMock(id=message.id, created_at=created_at) for message in reversed(unit.messages)
+    ]
+
+    unit.db.execute = AsyncMock(side_effect=[insert_result, MagicMock()])
+    return unit.db
+
+
+class TestChatTurnUnitOfWork:
+    """Test batching of chat turn writes."""
+
+    def test_add_message_rejects_unknown_fields(self):
+        """Test that fields which are not Message columns are rejected."""
+        unit = ChatTurnUnitOfWork(db=AsyncMock(), user_id=uuid4(), conversation_id=uuid4())
+
+        with pytest.raises(ValueError, match="model_used"):
+            unit.add_message("assistant", "Answer", model_used="gpt-4")
+
+    def test_rows_share_the_same_columns(self):
+        """Test that rows are uniform so they insert as one statement."""
+        unit = ChatTurnUnitOfWork(db=AsyncMock(), user_id=uuid4(), conversation_id=uuid4())
+        unit.add_message("user", "Question")
+        unit.add_message("assistant", "Answer", llm_model="gpt-4", total_tokens_used=42)
+
+        rows = unit._build_rows()
+
+        assert rows[0].keys() == rows[1].keys()
+        assert rows[0]["llm_model"] is None
+        assert rows[1]["total_tokens_used"] == 42
+
+    def test_rows_get_increasing_timestamps(self):
+        """Test that the answer sorts after the question despite sharing a transaction."""
+        unit = ChatTurnUnitOfWork(db=AsyncMock(), user_id=uuid4(), conversation_id=uuid4())
+        unit.add_message("user", "Question")
+        unit.add_message("assistant", "Answer")
+
+        rows = unit._build_rows()
+        sql = str(insert(Message).values(rows).compile(dialect=postgresql.dialect()))
+
+        assert "clock_timestamp()" in sql
+        assert [row["created_at"].right.value for row in rows] == [
+            timedelta(0),
+            timedelta(microseconds=1),
+        ]
+
+    @pytest.mark.asyncio
+    @patch('app.services.chat_persistence_service.leaderboard_service')
+    @patch('app.services.chat_persistence_service.conversation_cache_service')
+    @patch('app.services.chat_persistence_service.usage_quota_service')
+    @patch('app.services.chat_persistence_service.subscription_service')
+    async def test_commit_writes_turn_in_one_transaction(
+        self, mock_subscription_service, mock_usage_quota_service, mock_cache, mock_leaderboard
+    ):
+        """Test that messages, counters and usage share a single commit."""
+        # Arrange
+        user_id = uuid4()
+        conversation_id = uuid4()
+        mock_subscription_service.track_usage = AsyncMock()
+        mock_usage_quota_service.enabled = False
+        mock_usage_quota_service.record = AsyncMock()
+        mock_cache.append_messages = AsyncMock()
+        mock_cache.serialize_message = ConversationCacheService.serialize_message
+        mock_leaderboard.record_messages = AsyncMock()
+
+        unit = ChatTurnUnitOfWork(db=AsyncMock(), user_id=user_id, conversation_id=conversation_id)
+        unit.add_message("user", "Question")
+        unit.add_message("assistant", "Answer")
+        unit.add_usage(messages=1, tokens=150, cost_usd=0.01)
+        db = make_db(unit)
+
+        # Act
+        messages = await unit.commit()
+
+        # Assert
+        assert db.execute.call_count == 2  # INSERT ... RETURNING + conversation UPDATE
+        db.commit.assert_called_once()
+        db.refresh.assert_not_called()
+        assert mock_subscription_service.track_usage.call_args[1]["commit"] is False
+        mock_usage_quota_service.record.assert_not_called()
+        assert all(message.created_at is not None for message in messages)
+
+        cached = mock_cache.append_messages.call_args[0][1]
+        assert [m["role"] for m in cached] == ["user", "assistant"]
+        mock_leaderboard.record_messages.assert_awaited_once_with(user_id, 1)  # User messages only
+
+    @pytest.mark.asyncio
+    @patch('app.services.chat_persistence_service.leaderboard_service')
+    @patch('app.services.chat_persistence_service.conversation_cache_service')
+    @patch('app.services.chat_persistence_service.usage_quota_service')
+    @patch('app.services.chat_persistence_service.subscription_service')
+    async def test_commit_counts_usage_in_redis_after_commit(
+        self, mock_subscription_service, mock_usage_quota_service, mock_cache, mock_leaderboard
+    ):
+        """Test that usage goes to the Redis quota counters, not the transaction."""
+        # Arrange
+        user_id = uuid4()
+        mock_subscription_service.track_usage = AsyncMock()
+        mock_usage_quota_service.enabled = True
+        mock_usage_quota_service.record = AsyncMock()
+        mock_cache.append_messages = AsyncMock()
+        mock_cache.serialize_message = ConversationCacheService.serialize_message
+        mock_leaderboard.record_messages = AsyncMock()
+
+        unit = ChatTurnUnitOfWork(db=AsyncMock(), user_id=user_id, conversation_id=uuid4())
+        unit.add_message("user", "Question")
+        unit.add_usage(tokens=150, cost_usd=0.01)
+        db = make_db(unit)
+
+        # Act
+        await unit.commit()
+
+        # Assert
+        db.commit.assert_called_once()
+        mock_subscription_service.track_usage.assert_not_called()
+        mock_usage_quota_service.record.assert_awaited_once_with(
+            user_id,
+            messages=0,
+            tokens=150,
+            cost_usd=0.01,
+            cache_savings_usd=0.0,
+        )
+
+    @pytest.mark.asyncio
+    @patch('app.services.chat_persistence_service.leaderboard_service')
+    @patch('app.services.chat_persistence_service.conversation_cache_service')
+    @patch('app.services.chat_persistence_service.usage_quota_service')
+    @patch('app.services.chat_persistence_service.subscription_service')
+    async def test_commit_rolls_back_on_failure(
+        self, mock_subscription_service, mock_usage_quota_service, mock_cache, mock_leaderboard
+    ):
+        """Test that a failed write rolls back and leaves the cache untouched."""
+        # Arrange
+        mock_subscription_service.track_usage = AsyncMock(side_effect=RuntimeError("DB error"))
+        mock_usage_quota_service.enabled = False
+        mock_cache.append_messages = AsyncMock()
+        mock_cache.serialize_message = ConversationCacheService.serialize_message
+        mock_leaderboard.record_messages = AsyncMock()
+
+        unit = ChatTurnUnitOfWork(db=AsyncMock(), user_id=uuid4(), conversation_id=uuid4())
+        unit.add_message("user", "Question")
+        unit.add_usage(messages=1, tokens=10)
+        db = make_db(unit)
+
+        # Act & Assert
+        with pytest.raises(RuntimeError, match="DB error"):
+            await unit.commit()
+
+        db.rollback.assert_called_once()
+        db.commit.assert_not_called()
+        mock_cache.append_messages.assert_not_called()
+        mock_leaderboard.record_messages.assert_not_called()
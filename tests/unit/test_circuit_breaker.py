@@ -0,0 +1,172 @@
+"""Unit tests for circuit breakers, bulkheads and shared breaker state."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.circuit_breaker import (
+    BulkheadFullError,
+    CircuitBreaker,
+    CircuitBreakerError,
+    CircuitState,
+)
+
+
+def shared_breaker(**kwargs) -> CircuitBreaker:
+    """Create a shared-state breaker with a mocked Redis client."""
+    breaker = CircuitBreaker(name="test", shared_state=True, **kwargs)
+    breaker._redis = MagicMock()
+    breaker._redis.pttl = AsyncMock(return_value=-2)
+    breaker._record_failure_script = AsyncMock(return_value=0)
+    return breaker
+
+
+class TestCircuitBreaker:
+    """Test local circuit breaker state transitions."""
+
+    @pytest.mark.asyncio
+    async def test_opens_after_failure_threshold(self):
+        """Test that the circuit opens and blocks calls after repeated failures."""
+        # Arrange
+        breaker = CircuitBreaker(name="test", failure_threshold=2)
+        failing = AsyncMock(side_effect=RuntimeError("upstream down"))
+
+        # Act
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await breaker.call(failing)
+
+        # Assert
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitBreakerError):
+            await breaker.call(failing)
+        assert failing.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_failures(self):
+        """Test that 429 and other 4xx responses don't open the circuit."""
+        # Arrange
+        breaker = CircuitBreaker(name="test", failure_threshold=2)
+        rate_limited = RuntimeError("rate limited")
+        rate_limited.status_code = 429
+        bad_request = RuntimeError("bad request")
+        bad_request.response = MagicMock(status_code=400)
+
+        # Act
+        for error in (rate_limited, bad_request, rate_limited):
+            with pytest.raises(RuntimeError):
+                await breaker.call(AsyncMock(side_effect=error))
+
+        # Assert
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.failure_count == 0
+
+    @pytest.mark.asyncio
+    async def test_server_errors_are_failures(self):
+        """Test that 5xx responses still count towards opening the circuit."""
+        breaker = CircuitBreaker(name="test", failure_threshold=1)
+        unavailable = RuntimeError("service unavailable")
+        unavailable.status_code = 503
+
+        with pytest.raises(RuntimeError):
+            await breaker.call(AsyncMock(side_effect=unavailable))
+
+        assert breaker.state == CircuitState.OPEN
+
+
+class TestBulkhead:
+    """Test concurrency limits."""
+
+    @pytest.mark.asyncio
+    async def test_rejects_calls_when_full(self):
+        """Test that calls beyond max_concurrent are shed after the queue wait."""
+        # Arrange
+        breaker = CircuitBreaker(name="test", max_concurrent=1, max_queue_wait_seconds=0.01)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(breaker.call(slow))
+        await asyncio.sleep(0)
+
+        # Act & Assert
+        with pytest.raises(BulkheadFullError):
+            await breaker.call(slow)
+
+        release.set()
+        assert await first == "done"
+        assert breaker.in_flight == 0
+        assert breaker.state == CircuitState.CLOSED  # Shedding is not a failure
+
+    def test_bulkhead_error_is_circuit_breaker_error(self):
+        """Test that callers handling CircuitBreakerError also handle shedding."""
+        assert issubclass(BulkheadFullError, CircuitBreakerError)
+
+    @pytest.mark.asyncio
+    async def test_slot_released_after_failure(self):
+        """Test that a failing call frees its bulkhead slot."""
+        breaker = CircuitBreaker(name="test", max_concurrent=1, max_queue_wait_seconds=0.01)
+
+        with pytest.raises(RuntimeError):
+            await breaker.call(AsyncMock(side_effect=RuntimeError("boom")))
+
+        assert await breaker.call(AsyncMock(return_value="ok")) == "ok"
+
+
+class TestSharedState:
+    """Test circuit state shared through Redis."""
+
+    @pytest.mark.asyncio
+    async def test_adopts_remote_open_state(self):
+        """Test that a circuit opened by another worker blocks local calls."""
+        # Arrange
+        breaker = shared_breaker(recovery_timeout=60)
+        breaker._redis.pttl = AsyncMock(return_value=30_000)
+        func = AsyncMock()
+
+        # Act & Assert
+        with pytest.raises(CircuitBreakerError):
+            await breaker.call(func)
+
+        func.assert_not_called()
+        assert breaker.state == CircuitState.OPEN
+        # Local recovery is aligned with the remaining shared window
+        assert 29 <= breaker.recovery_timeout - (
+            breaker.last_state_change - breaker.last_failure_time
+        ).total_seconds() <= 30
+
+    @pytest.mark.asyncio
+    async def test_shared_threshold_opens_circuit(self):
+        """Test that reaching the fleet-wide threshold opens the local circuit."""
+        # Arrange
+        breaker = shared_breaker(failure_threshold=5)
+        breaker._record_failure_script = AsyncMock(return_value=1)
+
+        # Act
+        with pytest.raises(RuntimeError):
+            await breaker.call(AsyncMock(side_effect=RuntimeError("boom")))
+
+        # Assert - one local failure, but the shared window reached the threshold
+        assert breaker.failure_count == 1
+        assert breaker.state == CircuitState.OPEN
+        keys = breaker._record_failure_script.call_args[1]["keys"]
+        assert keys == ["circuit_breaker:test:failures", "circuit_breaker:test:open"]
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_fail_open(self):
+        """Test that Redis outages don't block calls."""
+        # Arrange
+        breaker = shared_breaker()
+        breaker._redis.pttl = AsyncMock(side_effect=ConnectionError("redis down"))
+        breaker._record_failure_script = AsyncMock(side_effect=ConnectionError("redis down"))
+
+        # Act
+        result = await breaker.call(AsyncMock(return_value="ok"))
+        with pytest.raises(RuntimeError):
+            await breaker.call(AsyncMock(side_effect=RuntimeError("boom")))
+
+        # Assert
+        assert result == "ok"
+        assert breaker.state == CircuitState.CLOSED
@@ -0,0 +1,97 @@
+"""Unit tests for the conversation context cache service."""
+
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from app.services.conversation_cache_service import ConversationCacheService
+
+
+def make_pipeline(results):
+    """Create an async-context-manager pipeline mock returning results."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=results)
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=False)
+    return pipe
+
+
+@pytest.fixture
+def service():
+    """Create service with mocked Redis client."""
+    service = ConversationCacheService()
+    service.redis = MagicMock()
+    service._append_script = AsyncMock(return_value=1)
+    return service
+
+
+class TestGetContext:
+    """Test cache reads."""
+
+    @pytest.mark.asyncio
+    async def test_get_context_hit(self, service):
+        """Test that cached messages are returned on a hit."""
+        cached = [{"id": str(uuid4()), "role": "user", "content": "Salam", "created_at": None}]
+        service.redis.pipeline.return_value = make_pipeline(
+            [{"primed": "1"}, [json.dumps(m) for m in cached]]
+        )
+
+        context = await service.get_context(uuid4())
+
+        assert context is not None
+        assert context.messages == cached
+
+    @pytest.mark.asyncio
+    async def test_get_context_miss(self, service):
+        """Test that a missing meta hash is reported as a miss."""
+        service.redis.pipeline.return_value = make_pipeline([{}, []])
+
+        assert await service.get_context(uuid4()) is None
+
+    @pytest.mark.asyncio
+    async def test_get_context_fails_open(self, service):
+        """Test that Redis errors are treated as a miss."""
+        service.redis.pipeline.side_effect = ConnectionError("Redis down")
+
+        assert await service.get_context(uuid4()) is None
+
+
+class TestWrites:
+    """Test cache priming and write-through."""
+
+    @pytest.mark.asyncio
+    async def test_prime_caps_message_window(self, service):
+        """Test that priming only keeps the most recent messages."""
+        service.max_messages = 2
+        pipe = make_pipeline([])
+        service.redis.pipeline.return_value = pipe
+        messages = [{"role": "user", "content": str(i)} for i in range(5)]
+
+        assert await service.prime(uuid4(), messages) is True
+
+        pushed = pipe.rpush.call_args[0][1:]
+        assert [json.loads(m)["content"] for m in pushed] == ["3", "4"]
+
+    @pytest.mark.asyncio
+    async def test_append_messages_uses_script(self, service):
+        """Test that appends go through the atomic script."""
+        conversation_id = uuid4()
+        message = {"role": "assistant", "content": "Wa alaykum salam"}
+
+        assert await service.append_messages(conversation_id, [message]) is True
+
+        call_kwargs = service._append_script.call_args[1]
+        assert call_kwargs["keys"][0] == f"conv_ctx:{conversation_id}:messages"
+        assert json.loads(call_kwargs["args"][2]) == message
+
+    @pytest.mark.asyncio
+    async def test_append_failure_invalidates(self, service):
+        """Test that a failed append drops the cached context."""
+        service._append_script.side_effect = ConnectionError("Redis down")
+        service.redis.delete = AsyncMock()
+
+        result = await service.append_messages(uuid4(), [{"role": "user", "content": "Hi"}])
+
+        assert result is False
+        service.redis.delete.assert_called_once()
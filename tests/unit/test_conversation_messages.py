@@ -0,0 +1,116 @@
+"""Unit tests for conversation message history serialization and streaming."""
+
+import json
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.api.v1.conversations import _message_response, _stream_messages
+
+
+def make_row(**overrides) -> SimpleNamespace:
+    """Build a row with the MESSAGE_COLUMNS attributes."""
+    values = dict(
+        id=uuid4(),
+        role="assistant",
+        content="Salam",
+        final_model_used="anthropic/claude-3.5-sonnet",
+        total_tokens_used=42,
+        cached_tokens_read=None,
+        cache_discount_usd=Decimal("0.000120"),
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class AsyncRows:
+    """Async iterator over rows, like a streamed result."""
+
+    def __init__(self, rows, fail_after=None):
+        self.rows = rows
+        self.fail_after = fail_after
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for index, row in enumerate(self.rows):
+            if index == self.fail_after:
+                raise ConnectionError("connection lost")
+            yield row
+
+
+def make_session_factory(result) -> MagicMock:
+    """Build a RoutingSessionLocal replacement whose session streams result."""
+    session = AsyncMock()
+    session.stream.return_value = result
+    factory = MagicMock()
+    factory.return_value.__aenter__.return_value = session
+    return factory
+
+
+class TestMessageResponse:
+    """Test message serialization."""
+
+    def test_projected_columns_map_to_response(self):
+        """Test that model and token columns fill the response fields."""
+        row = make_row()
+
+        response = _message_response(row)
+
+        assert response.model_used == "anthropic/claude-3.5-sonnet"
+        assert response.tokens_used == 42
+        assert response.cache_discount_usd == 0.00012
+        assert response.created_at == "2026-01-01T00:00:00+00:00"
+
+
+class TestStreamMessages:
+    """Test NDJSON streaming."""
+
+    @pytest.mark.asyncio
+    async def test_one_line_per_message_in_order(self):
+        """Test that each row becomes one JSON line."""
+        # Arrange
+        rows = [make_row(content=f"message {i}") for i in range(3)]
+        factory = make_session_factory(AsyncRows(rows))
+
+        # Act
+        with patch("app.api.v1.conversations.RoutingSessionLocal", factory):
+            chunks = [chunk async for chunk in _stream_messages(uuid4(), uuid4())]
+
+        # Assert
+        assert all(chunk.endswith(b"\n") for chunk in chunks)
+        lines = [json.loads(chunk) for chunk in chunks]
+        assert [line["content"] for line in lines] == ["message 0", "message 1", "message 2"]
+        assert lines[0]["id"] == str(rows[0].id)
+
+    @pytest.mark.asyncio
+    async def test_query_uses_server_side_batches(self):
+        """Test that rows are fetched with yield_per instead of all at once."""
+        factory = make_session_factory(AsyncRows([]))
+
+        with patch("app.api.v1.conversations.RoutingSessionLocal", factory):
+            assert [chunk async for chunk in _stream_messages(uuid4(), uuid4())] == []
+
+        session = factory.return_value.__aenter__.return_value
+        query = session.stream.await_args[0][0]
+        assert query.get_execution_options()["yield_per"] > 0
+
+    @pytest.mark.asyncio
+    async def test_error_mid_stream_propagates(self):
+        """Test that a database error ends the stream after the rows sent."""
+        # Arrange
+        factory = make_session_factory(AsyncRows([make_row(), make_row()], fail_after=1))
+        chunks = []
+
+        # Act & Assert
+        with patch("app.api.v1.conversations.RoutingSessionLocal", factory):
+            with pytest.raises(ConnectionError):
+                async for chunk in _stream_messages(uuid4(), uuid4()):
+                    chunks.append(chunk)
+
+        assert len(chunks) == 1
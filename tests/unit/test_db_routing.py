@@ -0,0 +1,148 @@
+"""Unit tests for read-replica session routing."""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from sqlalchemy import Column, Integer, create_engine, insert, select, text, update
+from sqlalchemy.orm import declarative_base
+
+from app.db.routing import ReadOnlySessionError, ReplicaPool, RoutingSession
+
+ItemBase = declarative_base()
+
+
+class Item(ItemBase):
+    """Row present with a different value on each database."""
+
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False)
+
+
+def make_engine(value: int):
+    """Create an in-memory database holding one item with the given value."""
+    engine = create_engine("sqlite://")
+    ItemBase.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Item).values(id=1, value=value))
+    return engine
+
+
+def make_async_engine(sync_engine, host: str):
+    """Wrap a sync engine like the AsyncEngine the pool holds."""
+    url = SimpleNamespace(host=host, port=5432)
+    return SimpleNamespace(sync_engine=sync_engine, url=url)
+
+
+@pytest.fixture
+def primary():
+    """Primary database (value 1)."""
+    return make_engine(1)
+
+
+@pytest.fixture
+def replicas():
+    """Pool with one healthy replica (value 2)."""
+    pool = ReplicaPool([make_async_engine(make_engine(2), "replica-1")], max_lag_seconds=5, check_interval_seconds=5)
+    pool._healthy = list(pool.engines)
+    return pool
+
+
+def read_value(session) -> int:
+    """Read the item's value through the session."""
+    return session.execute(select(Item.value).where(Item.id == 1)).scalar_one()
+
+
+class TestRoutingSession:
+    """Test statement routing."""
+
+    def test_reads_go_to_replica(self, primary, replicas):
+        """Test that a fresh session reads from the replica."""
+        with RoutingSession(bind=primary, replicas=replicas) as session:
+            assert read_value(session) == 2
+
+    def test_write_pins_session_to_primary(self, primary, replicas):
+        """Test that reads after a write see the primary."""
+        with RoutingSession(bind=primary, replicas=replicas) as session:
+            session.execute(update(Item).values(value=10))
+
+            assert session.pinned
+            assert read_value(session) == 10
+
+    def test_flush_pins_session_to_primary(self, primary, replicas):
+        """Test that ORM writes go to the primary and pin the session."""
+        with RoutingSession(bind=primary, replicas=replicas) as session:
+            session.add(Item(id=2, value=5))
+            session.flush()
+
+            assert session.pinned
+            assert session.get(Item, 2).value == 5
+
+    def test_use_primary_option(self, primary, replicas):
+        """Test that a read can ask for the primary without pinning."""
+        with RoutingSession(bind=primary, replicas=replicas) as session:
+            query = select(Item.value).execution_options(use_primary=True)
+
+            assert session.execute(query).scalar_one() == 1
+            assert not session.pinned
+
+    def test_pinned_session(self, primary, replicas):
+        """Test that a session created pinned never reads from a replica."""
+        with RoutingSession(bind=primary, replicas=replicas, pinned=True) as session:
+            assert read_value(session) == 1
+
+    def test_no_healthy_replica_reads_primary(self, primary, replicas):
+        """Test that reads fall back to the primary without replicas."""
+        replicas._healthy = []
+
+        with RoutingSession(bind=primary, replicas=replicas) as session:
+            assert read_value(session) == 1
+
+    def test_read_only_session_rejects_writes(self, primary, replicas):
+        """Test that read-only sessions raise instead of writing."""
+        with RoutingSession(bind=primary, replicas=replicas, read_only=True) as session:
+            assert session.execute(text("SELECT value FROM items")).scalar_one() == 2
+
+            with pytest.raises(ReadOnlySessionError):
+                session.execute(update(Item).values(value=10))
+
+        with primary.connect() as conn:
+            assert conn.execute(select(Item.value)).scalar_one() == 1
+
+
+class TestReplicaPool:
+    """Test replica health checks."""
+
+    @pytest.mark.asyncio
+    async def test_lagging_and_unreachable_replicas_are_dropped(self):
+        """Test that only replicas within the lag limit receive reads."""
+        # Arrange
+        engines = [make_async_engine(None, f"replica-{i}") for i in range(3)]
+        pool = ReplicaPool(engines, max_lag_seconds=5, check_interval_seconds=5)
+        pool._measure_lag = AsyncMock(side_effect=[0.5, 30.0, None])
+
+        # Act
+        await pool.check()
+
+        # Assert
+        assert pool.healthy == [engines[0]]
+        assert pool.get_state()["lag_seconds"] == {
+            "replica-0:5432": 0.5,
+            "replica-1:5432": 30.0,
+            "replica-2:5432": None,
+        }
+
+    @pytest.mark.asyncio
+    async def test_replica_returns_after_catching_up(self):
+        """Test that a dropped replica receives reads again once it passes."""
+        engine = make_async_engine(None, "replica-1")
+        pool = ReplicaPool([engine], max_lag_seconds=5, check_interval_seconds=5)
+        pool._measure_lag = AsyncMock(side_effect=[30.0, 1.0])
+
+        await pool.check()
+        assert pool.choose() is None
+
+        await pool.check()
+        assert pool.healthy == [engine]
@@ -69,10 +69,12 @@ class TestDocumentServiceCreateDocument:
     """Test cases for document creation."""
 
     @pytest.mark.asyncio
+    @patch("app.services.document_service.leaderboard_service")
     @patch("app.services.document_service.chonkie_service")
     async def test_create_document_success(
         self,
         mock_chonkie_service,
+        mock_leaderboard_service,
         document_service,
         mock_db,
         sample_user_id,
@@ -99,6 +101,7 @@ class TestDocumentServiceCreateDocument:
         ]
         mock_chonkie_service.chunk_text.return_value = mock_chunks
         mock_chonkie_service.estimate_token_count.side_effect = [25, 25]
+        mock_leaderboard_service.record_document_upload = AsyncMock()
 
         # Call create_document
         result = await document_service.create_document(
@@ -135,6 +138,7 @@ class TestDocumentServiceCreateDocument:
         assert mock_db.flush.call_count == 2  # After document and after chunks
         assert mock_db.commit.called
         assert mock_db.refresh.called
+        mock_leaderboard_service.record_document_upload.assert_awaited_once_with(sample_user_id)
 
         # Verify chonkie was called
         mock_chonkie_service.chunk_text.assert_called_once_with(
@@ -210,10 +214,12 @@ class TestDocumentServiceCreateDocument:
         assert mock_db.commit.called
 
     @pytest.mark.asyncio
+    @patch("app.services.document_service.leaderboard_service")
     @patch("app.services.document_service.chonkie_service")
     async def test_create_document_with_all_parameters(
         self,
         mock_chonkie_service,
+        mock_leaderboard_service,
         document_service,
         mock_db,
         sample_user_id,
@@ -232,6 +238,7 @@ class TestDocumentServiceCreateDocument:
         ]
         mock_chonkie_service.chunk_text.return_value = mock_chunks
         mock_chonkie_service.estimate_token_count.return_value = 12
+        mock_leaderboard_service.record_document_upload = AsyncMock()
 
         # Call with all parameters
         await document_service.create_document(
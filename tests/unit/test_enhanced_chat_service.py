@@ -1,12 +1,17 @@
 """Comprehensive unit tests for Enhanced Chat Service."""
 
+import asyncio
 import pytest
 import json
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
+from app.core.config import settings
+from app.services.conversation_cache_service import ConversationContext
 from app.services.enhanced_chat_service import EnhancedChatService
-from app.services.intent_detector import IntentResult, IntentType
+from app.services.intent_detector import Intent, IntentType
+from app.services.usage_quota_service import QuotaResult
 
 
 class TestEnhancedChatServiceInitialization:
@@ -27,8 +32,8 @@ class TestEnhancedChatServiceQuotaChecking:
     """Test cases for quota checking."""
 
     @pytest.mark.asyncio
-    @patch('app.services.enhanced_chat_service.subscription_service')
-    async def test_chat_checks_quota_before_processing(self, mock_subscription_service):
+    @patch('app.services.enhanced_chat_service.usage_quota_service')
+    async def test_chat_checks_quota_before_processing(self, mock_usage_quota_service):
         """Test that chat checks usage limits before processing."""
         # Arrange
         service = EnhancedChatService()
@@ -36,7 +41,7 @@ class TestEnhancedChatServiceQuotaChecking:
         user_id = uuid4()
         conversation_id = uuid4()
 
-        mock_subscription_service.check_usage_limits = AsyncMock()
+        mock_usage_quota_service.consume = AsyncMock(return_value=QuotaResult(allowed=True))
 
         # Act & Assert - Will fail at later stage but quota check should be called
         try:
@@ -50,14 +55,15 @@ class TestEnhancedChatServiceQuotaChecking:
             pass  # Expected to fail due to other mocking issues
 
         # Assert quota check was called
-        mock_subscription_service.check_usage_limits.assert_called_once_with(
-            user_id=user_id,
-            db=mock_db,
+        mock_usage_quota_service.consume.assert_called_once_with(
+            user_id,
+            messages=1,
+            also_check=("tokens",),
         )
 
     @pytest.mark.asyncio
-    @patch('app.services.enhanced_chat_service.subscription_service')
-    async def test_chat_raises_error_when_quota_exceeded(self, mock_subscription_service):
+    @patch('app.services.enhanced_chat_service.usage_quota_service')
+    async def test_chat_raises_error_when_quota_exceeded(self, mock_usage_quota_service):
         """Test that chat raises error when quota is exceeded."""
         # Arrange
         service = EnhancedChatService()
@@ -65,12 +71,12 @@ class TestEnhancedChatServiceQuotaChecking:
         user_id = uuid4()
         conversation_id = uuid4()
 
-        mock_subscription_service.check_usage_limits = AsyncMock(
-            side_effect=ValueError("Quota exceeded")
+        mock_usage_quota_service.consume = AsyncMock(
+            return_value=QuotaResult(allowed=False, exceeded="messages")
         )
 
         # Act & Assert
-        with pytest.raises(ValueError, match="Quota exceeded"):
+        with pytest.raises(ValueError, match="Monthly messages quota exceeded"):
             await service.chat(
                 user_id=user_id,
                 conversation_id=conversation_id,
@@ -83,7 +89,7 @@ class TestEnhancedChatServiceIntentDetection:
     """Test cases for intent detection and execution."""
 
     @pytest.mark.asyncio
-    @patch('app.services.enhanced_chat_service.subscription_service')
+    @patch('app.services.enhanced_chat_service.usage_quota_service')
     @patch('app.services.enhanced_chat_service.intent_detector')
     @patch('app.services.enhanced_chat_service.image_generation_service')
     @patch('app.services.enhanced_chat_service.settings')
@@ -92,7 +98,7 @@ class TestEnhancedChatServiceIntentDetection:
         mock_settings,
         mock_image_service,
         mock_intent_detector,
-        mock_subscription_service,
+        mock_usage_quota_service,
     ):
         """Test that image generation intent is detected and executed."""
         # Arrange
@@ -113,17 +119,18 @@ class TestEnhancedChatServiceIntentDetection:
         mock_settings.langfuse_enabled = False
 
         # Mock quota check
-        mock_subscription_service.check_usage_limits = AsyncMock()
-        mock_subscription_service.track_usage = AsyncMock()
+        mock_usage_quota_service.consume = AsyncMock(return_value=QuotaResult(allowed=True))
+        mock_usage_quota_service.record = AsyncMock()
 
         # Mock intent detection
-        image_intent = IntentResult(
+        image_intent = Intent(
             intent_type=IntentType.IMAGE_GENERATION,
             confidence=0.95,
             extracted_query="beautiful mosque at sunset",
             priority=10,
         )
         mock_intent_detector.detect_intents.return_value = [image_intent]
+        mock_intent_detector.classifier = None
 
         # Mock image generation
         generated_image = {
@@ -139,7 +146,7 @@ class TestEnhancedChatServiceIntentDetection:
         ])
         mock_message = MagicMock()
         mock_message.id = uuid4()
-        service._save_message = AsyncMock(return_value=mock_message)
+        service._persist_turn = AsyncMock(return_value=mock_message.id)
 
         # Mock OpenRouter response
         openrouter_response = {
@@ -164,14 +171,14 @@ class TestEnhancedChatServiceIntentDetection:
         mock_image_service.generate_image.assert_called_once()
 
     @pytest.mark.asyncio
-    @patch('app.services.enhanced_chat_service.subscription_service')
+    @patch('app.services.enhanced_chat_service.usage_quota_service')
     @patch('app.services.enhanced_chat_service.intent_detector')
     @patch('app.services.enhanced_chat_service.settings')
     async def test_chat_detects_web_search_intent(
         self,
         mock_settings,
         mock_intent_detector,
-        mock_subscription_service,
+        mock_usage_quota_service,
     ):
         """Test that web search intent is detected."""
         # Arrange
@@ -191,17 +198,18 @@ class TestEnhancedChatServiceIntentDetection:
         mock_settings.langfuse_enabled = False
 
         # Mock quota check
-        mock_subscription_service.check_usage_limits = AsyncMock()
-        mock_subscription_service.track_usage = AsyncMock()
+        mock_usage_quota_service.consume = AsyncMock(return_value=QuotaResult(allowed=True))
+        mock_usage_quota_service.record = AsyncMock()
 
         # Mock intent detection
-        web_search_intent = IntentResult(
+        web_search_intent = Intent(
             intent_type=IntentType.WEB_SEARCH,
             confidence=0.85,
             extracted_query="Islamic history",
             priority=8,
         )
         mock_intent_detector.detect_intents.return_value = [web_search_intent]
+        mock_intent_detector.classifier = None
 
         # Mock message operations
         service._build_messages = AsyncMock(return_value=[
@@ -209,7 +217,7 @@ class TestEnhancedChatServiceIntentDetection:
         ])
         mock_message = MagicMock()
         mock_message.id = uuid4()
-        service._save_message = AsyncMock(return_value=mock_message)
+        service._persist_turn = AsyncMock(return_value=mock_message.id)
 
         # Mock OpenRouter response
         openrouter_response = {
@@ -234,14 +242,14 @@ class TestEnhancedChatServiceIntentDetection:
         assert result["intent_results"]["web_search_requested"]["type"] == "standard"
 
     @pytest.mark.asyncio
-    @patch('app.services.enhanced_chat_service.subscription_service')
+    @patch('app.services.enhanced_chat_service.usage_quota_service')
     @patch('app.services.enhanced_chat_service.intent_detector')
     @patch('app.services.enhanced_chat_service.settings')
     async def test_chat_skips_low_confidence_intents(
         self,
         mock_settings,
         mock_intent_detector,
-        mock_subscription_service,
+        mock_usage_quota_service,
     ):
         """Test that low-confidence intents are not executed."""
         # Arrange
@@ -261,17 +269,18 @@ class TestEnhancedChatServiceIntentDetection:
         mock_settings.langfuse_enabled = False
 
         # Mock quota check
-        mock_subscription_service.check_usage_limits = AsyncMock()
-        mock_subscription_service.track_usage = AsyncMock()
+        mock_usage_quota_service.consume = AsyncMock(return_value=QuotaResult(allowed=True))
+        mock_usage_quota_service.record = AsyncMock()
 
         # Mock intent detection with low confidence
-        low_confidence_intent = IntentResult(
+        low_confidence_intent = Intent(
             intent_type=IntentType.IMAGE_GENERATION,
             confidence=0.50,  # Below 0.70 threshold
             extracted_query="maybe an image",
             priority=10,
         )
         mock_intent_detector.detect_intents.return_value = [low_confidence_intent]
+        mock_intent_detector.classifier = None
 
         # Mock message operations
         service._build_messages = AsyncMock(return_value=[
@@ -279,7 +288,7 @@ class TestEnhancedChatServiceIntentDetection:
         ])
         mock_message = MagicMock()
         mock_message.id = uuid4()
-        service._save_message = AsyncMock(return_value=mock_message)
+        service._persist_turn = AsyncMock(return_value=mock_message.id)
 
         # Mock OpenRouter response
         openrouter_response = {
@@ -300,6 +309,143 @@ class TestEnhancedChatServiceIntentDetection:
         # Assert - Low confidence intent should not be executed
         assert "intent_results" not in result or len(result.get("intent_results", {})) == 0
 
+    @pytest.mark.asyncio
+    @patch('app.services.enhanced_chat_service.embeddings_service')
+    @patch('app.services.enhanced_chat_service.intent_detector')
+    async def test_ambiguous_intents_are_refined_before_execution(
+        self,
+        mock_intent_detector,
+        mock_embeddings_service,
+    ):
+        """Test that keyword-only intents are checked by the classifier first."""
+        # Arrange
+        service = EnhancedChatService()
+        keyword_intent = Intent(
+            intent_type=IntentType.IMAGE_GENERATION,
+            confidence=0.95,
+            priority=10,
+            metadata={"matched_by": ["keyword"], "needs_confirmation": True},
+        )
+        mock_intent_detector.is_ambiguous.return_value = True
+        mock_intent_detector.refine_intents.return_value = []
+        mock_embeddings_service.embed_text = AsyncMock(return_value=[0.1, 0.2])
+
+        # Act
+        refined = await service._refine_intents("picture this", [keyword_intent])
+
+        # Assert
+        assert refined == []
+        mock_intent_detector.refine_intents.assert_called_once_with(
+            "picture this", [keyword_intent], [0.1, 0.2]
+        )
+
+    @pytest.mark.asyncio
+    @patch('app.services.enhanced_chat_service.embeddings_service')
+    @patch('app.services.enhanced_chat_service.intent_detector')
+    async def test_unconfirmed_keyword_intent_is_not_executed(
+        self,
+        mock_intent_detector,
+        mock_embeddings_service,
+    ):
+        """Test that a keyword-only intent stays unexecuted when it can't be verified."""
+        # Arrange
+        service = EnhancedChatService()
+        keyword_intent = Intent(
+            intent_type=IntentType.IMAGE_GENERATION,
+            confidence=0.95,
+            priority=10,
+            metadata={"matched_by": ["keyword"], "needs_confirmation": True},
+        )
+        mock_intent_detector.is_ambiguous.return_value = True
+        mock_embeddings_service.embed_text = AsyncMock(side_effect=RuntimeError("embedding down"))
+
+        # Act
+        refined = await service._refine_intents("picture this", [keyword_intent])
+
+        # Assert
+        assert refined == [keyword_intent]
+        assert keyword_intent.is_actionable is False
+
+
+class TestEnhancedChatServiceConcurrentIntents:
+    """Test cases for concurrent intent execution."""
+
+    @pytest.mark.asyncio
+    @patch('app.services.enhanced_chat_service.AsyncSessionLocal')
+    @patch('app.services.enhanced_chat_service.usage_quota_service')
+    @patch('app.services.enhanced_chat_service.intent_detector')
+    @patch('app.services.enhanced_chat_service.image_generation_service')
+    @patch('app.services.enhanced_chat_service.settings')
+    async def test_image_generation_overlaps_llm_call(
+        self,
+        mock_settings,
+        mock_image_service,
+        mock_intent_detector,
+        mock_usage_quota_service,
+        mock_session_local,
+    ):
+        """Test that intent actions run concurrently with the LLM call."""
+        # Arrange
+        service = EnhancedChatService()
+        service.openrouter = AsyncMock()
+
+        mock_settings.image_generation_enabled = True
+        mock_settings.prompt_caching_enabled = False
+        mock_settings.llm_model = "anthropic/claude-3-sonnet"
+        mock_settings.llm_temperature = 0.7
+        mock_settings.llm_max_tokens = 1000
+        mock_settings.model_routing_enabled = False
+        mock_settings.langfuse_enabled = False
+
+        mock_session_local.return_value.__aenter__ = AsyncMock(return_value=AsyncMock())
+        mock_session_local.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        mock_usage_quota_service.consume = AsyncMock(return_value=QuotaResult(allowed=True))
+        mock_usage_quota_service.record = AsyncMock()
+
+        mock_intent_detector.detect_intents.return_value = [
+            Intent(
+                intent_type=IntentType.IMAGE_GENERATION,
+                confidence=0.95,
+                extracted_query="mosque",
+                priority=10,
+            )
+        ]
+        mock_intent_detector.classifier = None
+
+        async def slow_image(**kwargs):
+            await asyncio.sleep(0.2)
+            return {"id": str(uuid4()), "url": "https://storage.example.com/image.png"}
+
+        async def slow_completion(**kwargs):
+            await asyncio.sleep(0.2)
+            return {
+                "choices": [{"message": {"content": "Here it is"}}],
+                "model": "anthropic/claude-3-sonnet",
+                "usage": {"total_tokens": 10, "prompt_tokens": 5, "completion_tokens": 5},
+            }
+
+        mock_image_service.generate_image = slow_image
+        service.openrouter.chat_completion = slow_completion
+        service._build_messages = AsyncMock(return_value=[{"role": "user", "content": "mosque"}])
+        mock_message = MagicMock()
+        mock_message.id = uuid4()
+        service._persist_turn = AsyncMock(return_value=mock_message.id)
+
+        # Act
+        start = time.perf_counter()
+        result = await service.chat(
+            user_id=uuid4(),
+            conversation_id=uuid4(),
+            message_content="Generate an image of a mosque",
+            db=AsyncMock(),
+        )
+        elapsed = time.perf_counter() - start
+
+        # Assert - latency is the slowest step, not the sum
+        assert "generated_image" in result["intent_results"]
+        assert elapsed < 0.35
+
 
 class TestEnhancedChatServiceMessageOperations:
     """Test cases for message building and saving."""
@@ -375,8 +521,9 @@ class TestEnhancedChatServiceMessageOperations:
         mock_msg2.role = "assistant"
         mock_msg2.content = "Prayer is one of the pillars of Islam"
 
+        # Newest first, as returned by the windowed query
         mock_result = MagicMock()
-        mock_result.scalars.return_value.all.return_value = [mock_msg1, mock_msg2]
+        mock_result.scalars.return_value.all.return_value = [mock_msg2, mock_msg1]
         mock_db.execute.return_value = mock_result
 
         # Act
@@ -396,113 +543,132 @@ class TestEnhancedChatServiceMessageOperations:
         assert messages[2]["role"] == "user"
         assert messages[2]["content"] == "Tell me more"
 
+
+class TestEnhancedChatServiceContextCache:
+    """Test cases for the hot conversation context cache."""
+
     @pytest.mark.asyncio
-    async def test_save_message_user_message(self):
-        """Test saving a user message."""
+    @patch('app.services.enhanced_chat_service.conversation_cache_service')
+    async def test_build_messages_uses_cached_history(self, mock_cache):
+        """Test that a cache hit skips the history query."""
         # Arrange
         service = EnhancedChatService()
         mock_db = AsyncMock()
         conversation_id = uuid4()
 
-        mock_message = MagicMock()
-        mock_message.id = uuid4()
-        mock_db.refresh = AsyncMock()
+        mock_cache.get_context = AsyncMock(return_value=ConversationContext(
+            messages=[
+                {"role": "user", "content": "What is prayer?"},
+                {"role": "assistant", "content": "Prayer is one of the pillars of Islam"},
+            ],
+        ))
 
         # Act
-        result = await service._save_message(
+        messages = await service._build_messages(
             conversation_id=conversation_id,
-            role="user",
-            content="Hello",
+            new_message="Tell me more",
+            system_prompt=None,
             db=mock_db,
         )
 
         # Assert
-        mock_db.add.assert_called_once()
-        mock_db.commit.assert_called_once()
+        mock_db.execute.assert_not_called()
+        assert messages[0]["content"] == "What is prayer?"
+        assert messages[-1] == {"role": "user", "content": "Tell me more"}
 
     @pytest.mark.asyncio
-    async def test_save_message_assistant_message_with_metadata(self):
-        """Test saving assistant message with comprehensive metadata."""
+    @patch('app.services.enhanced_chat_service.conversation_cache_service')
+    async def test_build_messages_primes_cache_on_miss(self, mock_cache):
+        """Test that a cache miss loads from the database and primes the cache."""
         # Arrange
         service = EnhancedChatService()
         mock_db = AsyncMock()
         conversation_id = uuid4()
 
+        mock_cache.get_context = AsyncMock(return_value=None)
+        mock_cache.prime = AsyncMock(return_value=True)
+        mock_cache.serialize_message = lambda msg: {"role": msg.role, "content": msg.content}
+
+        mock_msg = MagicMock()
+        mock_msg.role = "user"
+        mock_msg.content = "What is prayer?"
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = [mock_msg]
+        mock_db.execute.return_value = mock_result
+
         # Act
-        result = await service._save_message(
+        messages = await service._build_messages(
             conversation_id=conversation_id,
-            role="assistant",
-            content="Here's my response",
-            model_used="anthropic/claude-3-sonnet",
-            tokens_used=150,
-            cached_tokens_read=50,
-            cached_tokens_write=100,
-            cache_discount_usd=0.05,
-            cache_breakpoint_count=2,
-            routing_strategy="fallback",
-            fallback_used=True,
+            new_message="Tell me more",
+            system_prompt=None,
             db=mock_db,
         )
 
         # Assert
-        mock_db.add.assert_called_once()
-        mock_db.commit.assert_called_once()
-
-        # Verify message fields
-        saved_message = mock_db.add.call_args[0][0]
-        assert saved_message.role == "assistant"
-        assert saved_message.content == "Here's my response"
-        assert saved_message.model_used == "anthropic/claude-3-sonnet"
-        assert saved_message.tokens_used == 150
-        assert saved_message.cached_tokens_read == 50
-        assert saved_message.cached_tokens_write == 100
-        assert saved_message.fallback_used is True
+        mock_db.execute.assert_called_once()
+        query = mock_db.execute.call_args[0][0]
+        assert query._limit_clause.value == settings.conversation_cache_max_messages
+        mock_cache.prime.assert_called_once_with(
+            conversation_id, [{"role": "user", "content": "What is prayer?"}]
+        )
+        assert len(messages) == 2
 
 
 class TestEnhancedChatServiceUsageTracking:
     """Test cases for usage tracking."""
 
     @pytest.mark.asyncio
-    @patch('app.services.enhanced_chat_service.subscription_service')
-    async def test_track_usage_called_after_chat(self, mock_subscription_service):
-        """Test that usage is tracked after successful chat."""
+    @patch('app.services.enhanced_chat_service.ChatTurnUnitOfWork')
+    async def test_persist_turn_commits_messages_and_usage_together(self, mock_unit_class):
+        """Test that a chat turn is written through a single unit of work."""
         # Arrange
         service = EnhancedChatService()
         mock_db = AsyncMock()
         user_id = uuid4()
+        conversation_id = uuid4()
 
-        mock_subscription_service.track_usage = AsyncMock()
+        assistant_message = MagicMock()
+        assistant_message.id = uuid4()
+        mock_unit = MagicMock()
+        mock_unit.add_message.side_effect = [MagicMock(), assistant_message]
+        mock_unit.commit = AsyncMock()
+        mock_unit_class.return_value = mock_unit
 
         # Act
-        await service._track_usage(
+        result = await service._persist_turn(
             user_id=user_id,
+            conversation_id=conversation_id,
+            user_content="What is Khums?",
+            assistant_content="Khums is...",
             tokens=150,
             cost_usd=0.01,
             cache_savings_usd=0.005,
             db=mock_db,
+            llm_model="anthropic/claude-3-sonnet",
         )
 
         # Assert
-        mock_subscription_service.track_usage.assert_called_once_with(
-            user_id=user_id,
-            db=mock_db,
-            messages=1,
+        assert result == assistant_message.id
+        assert mock_unit.add_message.call_count == 2
+        assert mock_unit.add_message.call_args[1]["llm_model"] == "anthropic/claude-3-sonnet"
+        mock_unit.add_usage.assert_called_once_with(
             tokens=150,
             cost_usd=0.01,
             cache_savings_usd=0.005,
         )
+        mock_unit.commit.assert_called_once()
 
 
 class TestEnhancedChatServiceStreaming:
     """Test cases for streaming responses."""
 
     @pytest.mark.asyncio
-    @patch('app.services.enhanced_chat_service.subscription_service')
+    @patch('app.services.enhanced_chat_service.usage_quota_service')
     @patch('app.services.enhanced_chat_service.settings')
     async def test_stream_response_yields_content_chunks(
         self,
         mock_settings,
-        mock_subscription_service,
+        mock_usage_quota_service,
     ):
         """Test that streaming yields content chunks."""
         # Arrange
@@ -518,21 +684,20 @@ class TestEnhancedChatServiceStreaming:
         mock_settings.llm_model = "anthropic/claude-3-sonnet"
 
         # Mock quota check
-        mock_subscription_service.check_usage_limits = AsyncMock()
-        mock_subscription_service.track_usage = AsyncMock()
+        mock_usage_quota_service.consume = AsyncMock(return_value=QuotaResult(allowed=True))
+        mock_usage_quota_service.record = AsyncMock()
 
-        # Mock message saving
-        mock_message = MagicMock()
-        mock_message.id = uuid4()
-        service._save_message = AsyncMock(return_value=mock_message)
+        # Mock persistence
+        service._persist_user_message = AsyncMock()
+        service._persist_turn_in_background = MagicMock()
 
         # Mock OpenRouter streaming response
-        async def mock_stream():
+        async def mock_stream(**kwargs):
             yield {"choices": [{"delta": {"content": "Hello"}}]}
             yield {"choices": [{"delta": {"content": " world"}}]}
             yield {"model": "anthropic/claude-3-sonnet", "usage": {"total_tokens": 50}}
 
-        service.openrouter.chat_completion = mock_stream
+        service.openrouter.stream_chat_completion = mock_stream
 
         # Act
         chat_params = {
@@ -556,12 +721,85 @@ class TestEnhancedChatServiceStreaming:
         assert content_chunk["type"] == "content"
         assert content_chunk["content"] == "Hello"
 
+        # The question is written first, the reply after the final chunk
+        service._persist_user_message.assert_awaited_once_with(user_id, conversation_id, "Test")
+        metadata = json.loads(chunks[-1])
+        persist_kwargs = service._persist_turn_in_background.call_args[1]
+        assert persist_kwargs["user_content"] is None
+        assert persist_kwargs["assistant_content"] == "Hello world"
+        assert str(persist_kwargs["assistant_message_id"]) == metadata["message_id"]
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_keeps_user_message(self):
+        """Test that the question is persisted even when the stream fails."""
+        # Arrange
+        service = EnhancedChatService()
+        service._persist_user_message = AsyncMock()
+        service._persist_turn_in_background = MagicMock()
+
+        async def mock_stream(**kwargs):
+            yield {"choices": [{"delta": {"content": "Hel"}}]}
+            raise ConnectionError("upstream reset")
+
+        service.openrouter = MagicMock()
+        service.openrouter.stream_chat_completion = mock_stream
+
+        # Act
+        chunks = [
+            chunk
+            async for chunk in service._stream_response(
+                user_id=uuid4(),
+                conversation_id=uuid4(),
+                message_content="Test",
+                chat_params={"messages": [], "model": "anthropic/claude-3-sonnet"},
+                db=AsyncMock(),
+            )
+        ]
+
+        # Assert
+        assert json.loads(chunks[-1])["type"] == "error"
+        service._persist_user_message.assert_awaited_once()
+        service._persist_turn_in_background.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_client_disconnect_cancels_intent_graph(self):
+        """Test that closing the stream mid-response cancels running intent actions."""
+        # Arrange
+        service = EnhancedChatService()
+        service._persist_user_message = AsyncMock()
+        service._persist_turn_in_background = MagicMock()
+        intent_graph = MagicMock()
+
+        async def mock_stream(**kwargs):
+            yield {"choices": [{"delta": {"content": "Hello"}}]}
+            yield {"choices": [{"delta": {"content": " world"}}]}
+
+        service.openrouter = MagicMock()
+        service.openrouter.stream_chat_completion = mock_stream
+
+        stream = service._stream_response(
+            user_id=uuid4(),
+            conversation_id=uuid4(),
+            message_content="Test",
+            chat_params={"messages": [], "model": "anthropic/claude-3-sonnet"},
+            db=AsyncMock(),
+            intent_graph=intent_graph,
+        )
+
+        # Act
+        await stream.__anext__()
+        await stream.aclose()  # What the server does when the client goes away
+
+        # Assert
+        intent_graph.cancel.assert_called_once()
+        service._persist_turn_in_background.assert_not_called()
+
 
 class TestEnhancedChatServiceErrorHandling:
     """Test cases for error handling."""
 
     @pytest.mark.asyncio
-    @patch('app.services.enhanced_chat_service.subscription_service')
+    @patch('app.services.enhanced_chat_service.usage_quota_service')
     @patch('app.services.enhanced_chat_service.intent_detector')
     @patch('app.services.enhanced_chat_service.image_generation_service')
     @patch('app.services.enhanced_chat_service.settings')
@@ -570,7 +808,7 @@ class TestEnhancedChatServiceErrorHandling:
         mock_settings,
         mock_image_service,
         mock_intent_detector,
-        mock_subscription_service,
+        mock_usage_quota_service,
     ):
         """Test that chat continues even if intent execution fails."""
         # Arrange
@@ -591,17 +829,18 @@ class TestEnhancedChatServiceErrorHandling:
         mock_settings.langfuse_enabled = False
 
         # Mock quota check
-        mock_subscription_service.check_usage_limits = AsyncMock()
-        mock_subscription_service.track_usage = AsyncMock()
+        mock_usage_quota_service.consume = AsyncMock(return_value=QuotaResult(allowed=True))
+        mock_usage_quota_service.record = AsyncMock()
 
         # Mock intent detection
-        image_intent = IntentResult(
+        image_intent = Intent(
             intent_type=IntentType.IMAGE_GENERATION,
             confidence=0.95,
             extracted_query="test image",
             priority=10,
         )
         mock_intent_detector.detect_intents.return_value = [image_intent]
+        mock_intent_detector.classifier = None
 
         # Mock image generation to fail
         mock_image_service.generate_image = AsyncMock(
@@ -614,7 +853,7 @@ class TestEnhancedChatServiceErrorHandling:
         ])
         mock_message = MagicMock()
         mock_message.id = uuid4()
-        service._save_message = AsyncMock(return_value=mock_message)
+        service._persist_turn = AsyncMock(return_value=mock_message.id)
 
         # Mock OpenRouter response
         openrouter_response = {
@@ -639,12 +878,12 @@ class TestEnhancedChatServiceErrorHandling:
         assert "generated_image" not in result.get("intent_results", {})
 
     @pytest.mark.asyncio
-    @patch('app.services.enhanced_chat_service.subscription_service')
+    @patch('app.services.enhanced_chat_service.usage_quota_service')
     @patch('app.services.enhanced_chat_service.settings')
     async def test_chat_raises_error_when_openrouter_fails(
         self,
         mock_settings,
-        mock_subscription_service,
+        mock_usage_quota_service,
     ):
         """Test that chat raises error when OpenRouter fails."""
         # Arrange
@@ -664,7 +903,7 @@ class TestEnhancedChatServiceErrorHandling:
         mock_settings.langfuse_enabled = False
 
         # Mock quota check
-        mock_subscription_service.check_usage_limits = AsyncMock()
+        mock_usage_quota_service.consume = AsyncMock(return_value=QuotaResult(allowed=True))
 
         # Mock message operations
         service._build_messages = AsyncMock(return_value=[
@@ -691,12 +930,12 @@ class TestEnhancedChatServiceConfiguration:
     """Test cases for configuration options."""
 
     @pytest.mark.asyncio
-    @patch('app.services.enhanced_chat_service.subscription_service')
+    @patch('app.services.enhanced_chat_service.usage_quota_service')
     @patch('app.services.enhanced_chat_service.settings')
     async def test_chat_respects_custom_parameters(
         self,
         mock_settings,
-        mock_subscription_service,
+        mock_usage_quota_service,
     ):
         """Test that chat respects custom model, temperature, and max_tokens."""
         # Arrange
@@ -716,8 +955,8 @@ class TestEnhancedChatServiceConfiguration:
         mock_settings.langfuse_enabled = False
 
         # Mock quota check
-        mock_subscription_service.check_usage_limits = AsyncMock()
-        mock_subscription_service.track_usage = AsyncMock()
+        mock_usage_quota_service.consume = AsyncMock(return_value=QuotaResult(allowed=True))
+        mock_usage_quota_service.record = AsyncMock()
 
         # Mock message operations
         service._build_messages = AsyncMock(return_value=[
@@ -725,7 +964,7 @@ class TestEnhancedChatServiceConfiguration:
         ])
         mock_message = MagicMock()
         mock_message.id = uuid4()
-        service._save_message = AsyncMock(return_value=mock_message)
+        service._persist_turn = AsyncMock(return_value=mock_message.id)
 
         # Mock OpenRouter response
         openrouter_response = {
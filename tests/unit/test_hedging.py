@@ -0,0 +1,167 @@
+"""Unit tests for hedged request execution."""
+
+import asyncio
+import pytest
+
+from app.core.hedging import HedgeBudget, HedgingPolicy, LatencyTracker
+
+
+def delayed(value, delay, error=None):
+    """Create an attempt factory resolving after delay seconds."""
+    async def attempt():
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return value
+    return attempt
+
+
+@pytest.fixture
+def policy():
+    """Create a policy with a short default hedge deadline."""
+    return HedgingPolicy(
+        name="test",
+        min_delay_seconds=0.01,
+        default_delay_seconds=0.05,
+        budget_ratio=1.0,
+        min_samples=3,
+    )
+
+
+class TestLatencyTracker:
+    """Test rolling latency percentiles."""
+
+    def test_percentile_requires_min_samples(self):
+        """Test that no percentile is reported before min_samples."""
+        tracker = LatencyTracker(min_samples=3)
+        tracker.record("model", 1.0)
+
+        assert tracker.percentile("model", 0.95) is None
+
+    def test_percentile_over_window(self):
+        """Test that the percentile uses only the most recent samples."""
+        tracker = LatencyTracker(window_size=10, min_samples=1)
+        for value in range(100):
+            tracker.record("model", float(value))
+
+        assert tracker.percentile("model", 0.5) == 94.0
+        assert tracker.percentile("model", 1.0) == 99.0
+
+
+class TestHedgeBudget:
+    """Test the hedge token bucket."""
+
+    def test_budget_limits_hedges(self):
+        """Test that hedges are limited to the earned budget."""
+        budget = HedgeBudget(ratio=0.5, max_tokens=1.0)
+
+        assert budget.try_withdraw() is True
+        assert budget.try_withdraw() is False
+
+        budget.deposit()
+        budget.deposit()
+        assert budget.try_withdraw() is True
+
+
+class TestHedgingPolicy:
+    """Test hedged execution."""
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self, policy):
+        """Test that no hedge is sent when the primary answers in time."""
+        outcome = await policy.execute([
+            ("primary", delayed("a", 0)),
+            ("backup", delayed("b", 0)),
+        ])
+
+        assert outcome.key == "primary"
+        assert outcome.attempted == ["primary"]
+        assert not outcome.hedged
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged_and_cancelled(self, policy):
+        """Test that a hedge wins over a slow primary, which is cancelled."""
+        cancelled = asyncio.Event()
+
+        async def slow_primary():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        outcome = await asyncio.wait_for(
+            policy.execute([("primary", slow_primary), ("backup", delayed("b", 0))]),
+            timeout=1,
+        )
+        await asyncio.sleep(0)
+
+        assert outcome.key == "backup"
+        assert outcome.result == "b"
+        assert outcome.hedged
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_completed_loser_is_discarded(self, policy):
+        """Test that an attempt finishing alongside the winner is released."""
+        go = asyncio.Event()
+
+        async def primary():
+            await go.wait()
+            return "a"
+
+        async def backup():
+            go.set()
+            return "b"
+
+        discarded = []
+
+        async def discard(result):
+            discarded.append(result)
+
+        outcome = await policy.execute([("primary", primary), ("backup", backup)], discard=discard)
+
+        assert outcome.hedged
+        assert discarded == [{"a": "b", "b": "a"}[outcome.result]]
+
+    @pytest.mark.asyncio
+    async def test_deadline_follows_observed_percentile(self, policy):
+        """Test that the hedge deadline tracks per-key latency history."""
+        for _ in range(3):
+            policy.record_latency("primary", 0.2)
+
+        assert policy.hedge_delay("primary") == 0.2
+        assert policy.hedge_delay("unknown") == 0.05
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_waits_for_primary(self, policy):
+        """Test that no hedge is sent without budget."""
+        policy.budget.tokens = 0
+        policy.budget.ratio = 0
+
+        outcome = await policy.execute([
+            ("primary", delayed("a", 0.1)),
+            ("backup", delayed("b", 0)),
+        ])
+
+        assert outcome.key == "primary"
+        assert outcome.attempted == ["primary"]
+
+    @pytest.mark.asyncio
+    async def test_failure_fails_over(self, policy):
+        """Test that an error launches the next attempt immediately."""
+        outcome = await policy.execute([
+            ("primary", delayed(None, 0, error=RuntimeError("503"))),
+            ("backup", delayed("b", 0)),
+        ])
+
+        assert outcome.key == "backup"
+
+    @pytest.mark.asyncio
+    async def test_all_failures_raise_last_error(self, policy):
+        """Test that the last error is raised when every attempt fails."""
+        with pytest.raises(RuntimeError, match="second"):
+            await policy.execute([
+                ("primary", delayed(None, 0, error=RuntimeError("first"))),
+                ("backup", delayed(None, 0, error=RuntimeError("second"))),
+            ])
@@ -0,0 +1,96 @@
+"""Unit tests for shared outbound HTTP clients."""
+
+import pytest
+from unittest.mock import patch
+
+from app.core import http_client
+from app.core.http_client import (
+    close_http_clients,
+    collect_http_pool_metrics,
+    get_http_client,
+    get_pool_stats,
+)
+
+
+@pytest.fixture(autouse=True)
+async def reset_clients():
+    """Close shared clients between tests."""
+    yield
+    await close_http_clients()
+
+
+class TestSharedHTTPClients:
+    """Test the shared client registry."""
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused(self):
+        """Test that the same pooled client is returned for a name."""
+        assert get_http_client("openrouter") is get_http_client("openrouter")
+        assert get_http_client("openrouter") is not get_http_client("serper")
+
+    @pytest.mark.asyncio
+    async def test_profile_limits_and_timeouts(self):
+        """Test that clients are built from their profile."""
+        client = get_http_client("scraping")
+        profile = http_client.HTTP_CLIENT_PROFILES["scraping"]
+
+        assert client.follow_redirects is True
+        assert client.timeout.read == profile.read_timeout
+        assert client.timeout.connect == profile.connect_timeout
+
+    @pytest.mark.asyncio
+    @patch('app.core.http_client._http2_available', return_value=False)
+    async def test_http2_falls_back_without_h2(self, mock_http2_available):
+        """Test that a missing h2 package doesn't break client creation."""
+        client = get_http_client("default")
+
+        assert client.is_closed is False
+
+    @pytest.mark.asyncio
+    async def test_close_recreates_on_next_use(self):
+        """Test that clients closed at shutdown are recreated lazily."""
+        client = get_http_client("default")
+
+        await close_http_clients()
+
+        assert client.is_closed
+        assert get_http_client("default") is not client
+
+
+class TestPoolMetrics:
+    """Test connection pool metrics."""
+
+    def test_stats_for_unknown_client(self):
+        """Test that clients which were never used report no stats."""
+        assert get_pool_stats("never-used") is None
+
+    @pytest.mark.asyncio
+    async def test_idle_pool_stats(self):
+        """Test stats of a fresh pool."""
+        get_http_client("serper")
+
+        stats = get_pool_stats("serper")
+
+        assert stats == {"active": 0, "idle": 0, "waiting": 0, "max_connections": 50}
+
+    @pytest.mark.asyncio
+    async def test_changed_pool_internals_report_unknown(self):
+        """Test that a pool without the expected internals degrades instead of failing."""
+        client = get_http_client("serper")
+
+        with patch.object(client._transport, "_pool", object()):
+            stats = get_pool_stats("serper")
+
+        assert stats == {"active": None, "idle": None, "waiting": None, "max_connections": 50}
+
+    @pytest.mark.asyncio
+    @patch('app.core.metrics.track_http_pool')
+    async def test_collect_exports_every_client(self, mock_track_http_pool):
+        """Test that collection exports one sample set per shared client."""
+        get_http_client("openrouter")
+        get_http_client("serper")
+
+        collect_http_pool_metrics()
+
+        clients = {c.kwargs["client"] for c in mock_track_http_pool.call_args_list}
+        assert clients == {"openrouter", "serper"}
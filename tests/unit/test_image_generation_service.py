@@ -0,0 +1,108 @@
+"""Unit tests for image generation quota reservation."""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import httpx
+
+from app.services.image_generation_service import ImageGenerationService
+from app.services.usage_quota_service import QuotaResult
+
+
+@pytest.fixture
+def image_service():
+    """Create an image generation service."""
+    return ImageGenerationService()
+
+
+@pytest.fixture
+def mock_plans():
+    """Put every user on a plan that allows image generation."""
+    with patch("app.services.image_generation_service.plan_cache_service") as mock_plan_cache:
+        mock_plan_cache.get_subscription = AsyncMock(return_value=SimpleNamespace(plan_type="premium"))
+        mock_plan_cache.get_plan = AsyncMock(
+            return_value=SimpleNamespace(image_generation_enabled=True, max_images_per_month=50)
+        )
+        yield mock_plan_cache
+
+
+@pytest.fixture
+def mock_quota():
+    """Mock the usage quota service with Redis counters enabled."""
+    with patch("app.services.image_generation_service.usage_quota_service") as mock_quota_service:
+        mock_quota_service.enabled = True
+        mock_quota_service.consume = AsyncMock(return_value=QuotaResult(allowed=True))
+        mock_quota_service.record = AsyncMock()
+        mock_quota_service.refund = AsyncMock()
+        yield mock_quota_service
+
+
+@pytest.fixture
+def mock_http():
+    """Mock the shared OpenRouter HTTP client."""
+    client = MagicMock()
+    client.post = AsyncMock()
+    with patch("app.services.image_generation_service.get_http_client", return_value=client):
+        yield client
+
+
+class TestImageQuota:
+    """Test that images are reserved atomically and refunded on failure."""
+
+    @pytest.mark.asyncio
+    @patch("app.services.image_generation_service.settings")
+    async def test_image_is_reserved_before_generation(
+        self, mock_settings, image_service, mock_plans, mock_quota, mock_http
+    ):
+        """Test that the image is counted by consume() and the cost recorded after."""
+        # Arrange
+        user_id = uuid4()
+        mock_settings.image_generation_enabled = True
+        mock_http.post.return_value = MagicMock(json=MagicMock(return_value={"data": [{"url": "https://img"}]}))
+        db = AsyncMock()
+        db.add = MagicMock()
+
+        # Act
+        result = await image_service.generate_image("a cat", user_id, db, model="flux-schnell")
+
+        # Assert
+        assert result["url"] == "https://img"
+        mock_quota.consume.assert_awaited_once_with(user_id, images=1)
+        mock_quota.record.assert_awaited_once_with(user_id, cost_usd=0.003)
+        mock_quota.refund.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.image_generation_service.settings")
+    async def test_failed_generation_refunds_image(
+        self, mock_settings, image_service, mock_plans, mock_quota, mock_http
+    ):
+        """Test that an upstream failure gives the reserved image back."""
+        # Arrange
+        user_id = uuid4()
+        mock_settings.image_generation_enabled = True
+        mock_http.post.side_effect = httpx.ConnectError("connection refused")
+
+        # Act & Assert
+        with pytest.raises(httpx.ConnectError):
+            await image_service.generate_image("a cat", user_id, AsyncMock())
+
+        mock_quota.refund.assert_awaited_once_with(user_id, images=1)
+
+    @pytest.mark.asyncio
+    @patch("app.services.image_generation_service.settings")
+    async def test_exhausted_quota_is_denied(
+        self, mock_settings, image_service, mock_plans, mock_quota, mock_http
+    ):
+        """Test that a denied reservation never calls the provider."""
+        # Arrange
+        mock_settings.image_generation_enabled = True
+        mock_quota.consume.return_value = QuotaResult(allowed=False, exceeded="images")
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="limit reached"):
+            await image_service.generate_image("a cat", uuid4(), AsyncMock())
+
+        mock_http.post.assert_not_called()
+        mock_quota.refund.assert_not_called()
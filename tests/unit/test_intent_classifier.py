@@ -0,0 +1,101 @@
+"""Unit tests for the embedding-centroid intent classifier."""
+
+import pytest
+from unittest.mock import MagicMock
+
+np = pytest.importorskip("numpy")
+
+from app.services.intent_classifier import IntentCentroidClassifier, load_intent_classifier
+from app.services.intent_detector import IntentDetector, IntentType
+
+
+@pytest.fixture
+def classifier():
+    """Classifier with orthogonal image / question / conversation centroids."""
+    return IntentCentroidClassifier.from_examples({
+        IntentType.IMAGE_GENERATION.value: [[1.0, 0.0, 0.0], [0.9, 0.1, 0.0]],
+        IntentType.QUESTION_ANSWER.value: [[0.0, 1.0, 0.0], [0.1, 0.9, 0.0]],
+        IntentType.CONVERSATION.value: [[0.0, 0.0, 1.0]],
+    })
+
+
+class TestIntentCentroidClassifier:
+    """Test centroid building and scoring."""
+
+    def test_predicts_nearest_centroid(self, classifier):
+        """Test that the best cosine similarity wins."""
+        prediction = classifier.predict([0.2, 3.0, 0.1])
+
+        assert prediction.intent == IntentType.QUESTION_ANSWER.value
+        assert prediction.score == pytest.approx(max(prediction.scores.values()))
+        assert set(prediction.scores) == set(classifier.labels)
+
+    def test_rejects_mismatched_embedding(self, classifier):
+        """Test that embeddings of another model/dimension are ignored."""
+        assert classifier.predict([1.0, 0.0]) is None
+        assert classifier.predict([0.0, 0.0, 0.0]) is None
+
+    def test_save_and_load_roundtrip(self, classifier, tmp_path):
+        """Test persisting centroids as .npz."""
+        path = tmp_path / "centroids.npz"
+
+        classifier.save(path)
+        loaded = IntentCentroidClassifier.load(path)
+
+        assert loaded.labels == classifier.labels
+        assert np.allclose(loaded.centroids, classifier.centroids)
+
+    def test_missing_file_disables_classifier(self, tmp_path):
+        """Test that a bad path leaves the second stage off."""
+        assert load_intent_classifier(None) is None
+        assert load_intent_classifier(str(tmp_path / "missing.npz")) is None
+
+
+class TestIntentRefinement:
+    """Test the second stage in IntentDetector."""
+
+    def test_vetoes_ambiguous_keyword_intent(self, classifier):
+        """Test that a lone keyword hit is dropped when the embedding disagrees."""
+        # Arrange - "رسم" (draw) also appears in "رسم و رسوم" (customs)
+        detector = IntentDetector(classifier=classifier)
+        message = "رسم و رسوم عزاداری محرم از کجا آمده است"
+
+        # Act
+        keyword_only = detector.detect_intents(message)
+        refined = detector.detect_intents(message, query_embedding=[0.05, 1.0, 0.0])
+
+        # Assert
+        assert keyword_only[0].intent_type == IntentType.IMAGE_GENERATION
+        assert keyword_only[0].metadata["matched_by"] == ["keyword"]
+        assert keyword_only[0].is_actionable is False
+        assert IntentType.IMAGE_GENERATION not in [i.intent_type for i in refined]
+        assert refined[-1].intent_type == IntentType.CONVERSATION
+
+    def test_keeps_confirmed_intent(self, classifier):
+        """Test that an ambiguous intent the classifier agrees with is kept."""
+        detector = IntentDetector(classifier=classifier)
+
+        intents = detector.detect_intents("صورة مسجد جميل", query_embedding=[1.0, 0.1, 0.0])
+
+        image_intent = next(i for i in intents if i.intent_type == IntentType.IMAGE_GENERATION)
+        assert image_intent.metadata["classifier_score"] > 0.9
+        assert image_intent.is_actionable is True
+
+    def test_skips_classifier_when_unambiguous(self):
+        """Test that keyword + pattern agreement doesn't run the classifier."""
+        classifier = MagicMock()
+        detector = IntentDetector(classifier=classifier)
+
+        intents = detector.detect_intents("create image of a mosque", query_embedding=[0.0, 1.0, 0.0])
+
+        assert intents[0].intent_type == IntentType.IMAGE_GENERATION
+        assert intents[0].metadata["matched_by"] == ["keyword", "pattern"]
+        classifier.predict.assert_not_called()
+
+    def test_no_embedding_keeps_keyword_result(self, classifier):
+        """Test that the second stage never requires an embedding."""
+        detector = IntentDetector(classifier=classifier)
+
+        intents = detector.detect_intents("ارسم مسجدا جميلا")
+
+        assert intents[0].intent_type == IntentType.IMAGE_GENERATION
@@ -2,7 +2,7 @@
 
 import pytest
 
-from app.services.intent_detector import intent_detector, IntentType, Intent
+from app.services.intent_detector import intent_detector, Intent, IntentDetector, IntentType
 
 
 class TestIntentDetector:
@@ -285,6 +285,34 @@ class TestIntentDetector:
         assert web_intent is not None
 
 
+class TestSinglePassMatching:
+    """Test the combined keyword automaton and regex."""
+
+    def test_categories_match_at_same_position(self):
+        """Test that a category matching where an earlier one matched isn't lost."""
+
+        class OverlappingDetector(IntentDetector):
+            WEB_SEARCH_PATTERNS = [r"check\s+this\s+online"]
+            AUDIO_PATTERNS = [r"check\s+this"]
+
+        detector = OverlappingDetector()
+
+        intent_types = [i.intent_type for i in detector.detect_intents("check this online please")]
+
+        assert IntentType.WEB_SEARCH in intent_types
+        assert IntentType.AUDIO_TRANSCRIPTION in intent_types
+
+    def test_image_prompt_uses_first_keyword_in_list_order(self):
+        """Test prompt extraction from the keyword automaton matches."""
+        message = "Please draw image: a garden, or create image of the Kaaba at night"
+
+        intents = intent_detector.detect_intents(message)
+
+        image_intent = next(i for i in intents if i.intent_type == IntentType.IMAGE_GENERATION)
+        # "create image" precedes "draw image" in IMAGE_KEYWORDS
+        assert image_intent.extracted_query == "the Kaaba at night"
+
+
 class TestIntentClass:
     """Test the Intent dataclass."""
 
@@ -317,6 +345,51 @@ class TestIntentClass:
         assert "web_search" in repr_str
         assert "0.85" in repr_str
 
+    def test_keyword_only_intent_needs_confirmation(self):
+        """Test that a lone keyword match doesn't trigger an action until confirmed."""
+        intent = Intent(
+            intent_type=IntentType.IMAGE_GENERATION,
+            confidence=0.95,
+            priority=10,
+            metadata={"matched_by": ["keyword"], "needs_confirmation": True},
+        )
+        assert intent.is_actionable is False
+
+        intent.metadata["classifier_score"] = 0.81
+        assert intent.is_actionable is True
+
+    def test_pattern_and_low_confidence_intents(self):
+        """Test the action gate for pattern matches and weak intents."""
+        pattern_intent = Intent(
+            intent_type=IntentType.IMAGE_GENERATION,
+            confidence=0.95,
+            priority=10,
+            metadata={"matched_by": ["pattern"]},
+        )
+        weak_intent = Intent(intent_type=IntentType.CODE_ANALYSIS, confidence=0.65, priority=7)
+
+        assert pattern_intent.is_actionable is True
+        assert weak_intent.is_actionable is False
+
+    @pytest.mark.parametrize(
+        "message,intent_type",
+        [
+            ("تصویر بساز از مسجد", IntentType.IMAGE_GENERATION),
+            ("ابحث في الانترنت عن الصلاة", IntentType.WEB_SEARCH),
+        ],
+    )
+    def test_keyword_intent_actionable_without_classifier(self, message, intent_type):
+        """Test that keyword-only Persian/Arabic requests act when no classifier is configured."""
+        detector = IntentDetector()
+        detector.classifier = None
+
+        intents = detector.detect_intents(message)
+
+        intent = next(i for i in intents if i.intent_type == intent_type)
+        assert intent.metadata["matched_by"] == ["keyword"]
+        assert "needs_confirmation" not in intent.metadata
+        assert intent.is_actionable is True
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
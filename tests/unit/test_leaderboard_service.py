@@ -0,0 +1,301 @@
+"""Unit tests for the Redis sorted-set leaderboard service."""
+
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.services.leaderboard_service import LeaderboardService
+
+
+@pytest.fixture
+def redis_client():
+    """Create a mocked Redis client whose pipelines are configured per test."""
+    client = MagicMock()
+    client.register_script.side_effect = lambda script: AsyncMock()
+    client.pipe = MagicMock()
+    client.pipe.execute = AsyncMock()
+    client.pipeline.return_value.__aenter__ = AsyncMock(return_value=client.pipe)
+    client.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+    for command in ("zadd", "rename", "delete", "zunionstore"):
+        setattr(client, command, AsyncMock())
+    return client
+
+
+@pytest.fixture
+def leaderboard(redis_client):
+    """Create a leaderboard service using the mocked Redis client."""
+    with patch("app.services.leaderboard_service.get_redis_client", return_value=redis_client), \
+            patch("app.services.leaderboard_service.track_leaderboard_read"):
+        service = LeaderboardService()
+        service.enabled = True
+        yield service
+
+
+def make_user(user_id=None, full_name="Ali"):
+    """Build a user with the fields the leaderboard reads."""
+    return SimpleNamespace(
+        id=user_id or uuid4(),
+        full_name=full_name,
+        email="ali@example.com",
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def users_result(users):
+    """Build the result of the user hydration query."""
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = users
+    return result
+
+
+def rows_result(rows):
+    """Build the result of a GROUP BY count query."""
+    result = MagicMock()
+    result.all.return_value = rows
+    return result
+
+
+class TestIncrements:
+    """Test incremental updates."""
+
+    @pytest.mark.asyncio
+    async def test_messages_increment_board_and_overall(self, leaderboard):
+        """Test that one script call updates every timeframe of both boards."""
+        # Arrange
+        user_id = uuid4()
+
+        # Act
+        await leaderboard.record_messages(user_id, 2)
+
+        # Assert
+        call = leaderboard._increment_script.await_args.kwargs
+        assert call["keys"] == [
+            "leaderboard:messages:all_time",
+            "leaderboard:messages:month",
+            "leaderboard:messages:week",
+            "leaderboard:overall:all_time",
+            "leaderboard:overall:month",
+            "leaderboard:overall:week",
+        ]
+        assert call["args"] == [str(user_id), 2, 2]
+
+    @pytest.mark.asyncio
+    async def test_document_upload_is_worth_ten_points(self, leaderboard):
+        """Test that uploads add their weight to the overall board."""
+        await leaderboard.record_document_upload(uuid4())
+
+        assert leaderboard._increment_script.await_args.kwargs["args"][1:] == [1, 10]
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_record(self, leaderboard):
+        """Test that anonymous users and empty turns skip Redis."""
+        await leaderboard.record_conversation(None)
+        await leaderboard.record_messages(uuid4(), 0)
+
+        leaderboard._increment_script.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_redis_error_fails_open(self, leaderboard):
+        """Test that a failed increment doesn't fail the write it follows."""
+        leaderboard._increment_script.side_effect = ConnectionError("Redis down")
+
+        await leaderboard.record_conversation(uuid4())
+
+
+class TestLeaderboards:
+    """Test leaderboard reads."""
+
+    @pytest.mark.asyncio
+    async def test_board_read_from_redis_with_one_profile_query(self, leaderboard, redis_client):
+        """Test that the top users come from the sorted set and profiles in one query."""
+        # Arrange
+        first, second = make_user(), make_user(full_name=None)
+        redis_client.pipe.execute.return_value = [1, [(str(first.id), 5.0), (str(second.id), 3.0)]]
+        db = AsyncMock()
+        db.execute.return_value = users_result([second, first])
+
+        # Act
+        result = await leaderboard.get_document_upload_leaderboard("week", 10, db)
+
+        # Assert
+        redis_client.pipe.zrevrange.assert_called_once_with("leaderboard:documents:week", 0, 9, withscores=True)
+        db.execute.assert_awaited_once()
+        assert [(entry["rank"], entry["upload_count"]) for entry in result] == [(1, 5), (2, 3)]
+        assert result[1]["display_name"] == "Anonymous"
+
+    @pytest.mark.asyncio
+    async def test_missing_board_falls_back_to_database(self, leaderboard, redis_client):
+        """Test that a board not built yet is computed with GROUP BY."""
+        # Arrange
+        user = make_user()
+        redis_client.pipe.execute.return_value = [0, []]
+        db = AsyncMock()
+        db.execute.side_effect = [rows_result([(user.id, 7)]), users_result([user])]
+
+        # Act
+        result = await leaderboard.get_chat_activity_leaderboard("all_time", 10, db)
+
+        # Assert
+        assert result == [{
+            "rank": 1,
+            "user_id": str(user.id),
+            "display_name": "Ali",
+            "email": "ali@example.com",
+            "message_count": 7,
+        }]
+
+    @pytest.mark.asyncio
+    async def test_redis_error_falls_back_to_database(self, leaderboard, redis_client):
+        """Test that reads survive Redis being down."""
+        redis_client.pipe.execute.side_effect = ConnectionError("Redis down")
+        db = AsyncMock()
+        db.execute.side_effect = [rows_result([]), users_result([])]
+
+        assert await leaderboard.get_conversation_leaderboard("month", 10, db) == []
+
+    @pytest.mark.asyncio
+    async def test_overall_breakdown_from_board_scores(self, leaderboard, redis_client):
+        """Test that the overall board is broken down with one ZMSCORE per board."""
+        # Arrange
+        user = make_user()
+        redis_client.pipe.execute.side_effect = [
+            [1, [(str(user.id), 15.0)]],
+            [[1.0], [2.0], [1.0]],  # documents, conversations, messages
+        ]
+        db = AsyncMock()
+        db.execute.return_value = users_result([user])
+
+        # Act
+        result = await leaderboard.get_overall_leaderboard("all_time", 10, db)
+
+        # Assert
+        assert result[0]["total_score"] == 15
+        assert result[0]["breakdown"] == {"document_uploads": 1, "conversations": 2, "messages": 1}
+
+
+    @pytest.mark.asyncio
+    async def test_sentinel_is_not_ranked(self, leaderboard, redis_client):
+        """Test that the member keeping an empty board alive is skipped on reads."""
+        # Arrange
+        user = make_user()
+        redis_client.pipe.execute.return_value = [1, [(str(user.id), 2.0), ("_", float("-inf"))]]
+        db = AsyncMock()
+        db.execute.return_value = users_result([user])
+
+        # Act
+        result = await leaderboard.get_conversation_leaderboard("week", 10, db)
+
+        # Assert
+        assert [entry["user_id"] for entry in result] == [str(user.id)]
+
+    @pytest.mark.asyncio
+    async def test_overall_breakdown_error_falls_back_to_database(self, leaderboard, redis_client):
+        """Test that Redis failing after the top read still serves the overall board."""
+        # Arrange
+        user = make_user()
+        redis_client.pipe.execute.side_effect = [
+            [1, [(str(user.id), 15.0)]],
+            ConnectionError("Redis down"),
+        ]
+        db = AsyncMock()
+        db.execute.side_effect = [
+            rows_result([(user.id, 1)]),  # documents
+            rows_result([]),  # conversations
+            rows_result([(user.id, 3)]),  # messages
+            users_result([user]),
+        ]
+
+        # Act
+        result = await leaderboard.get_overall_leaderboard("week", 10, db)
+
+        # Assert
+        assert result[0]["total_score"] == 13
+        assert result[0]["breakdown"] == {"document_uploads": 1, "conversations": 0, "messages": 3}
+
+
+class TestUserStatistics:
+    """Test per-user statistics."""
+
+    @pytest.mark.asyncio
+    async def test_statistics_and_rank_from_redis(self, leaderboard, redis_client):
+        """Test that counts are ZSCOREs and the rank is a ZREVRANK."""
+        # Arrange
+        user = make_user()
+        redis_client.pipe.execute.return_value = [1, 2.0, None, 30.0, 4]
+        db = AsyncMock()
+        user_result = MagicMock()
+        user_result.scalar_one_or_none.return_value = user
+        db.execute.return_value = user_result
+
+        # Act
+        result = await leaderboard.get_user_statistics(user.id, db)
+
+        # Assert
+        assert result["statistics"] == {
+            "document_uploads": 2,
+            "conversations": 0,
+            "messages": 30,
+            "overall_score": 50,
+        }
+        assert result["rank"] == 5
+        db.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unknown_user(self, leaderboard):
+        """Test that a missing user raises ValueError."""
+        db = AsyncMock()
+        user_result = MagicMock()
+        user_result.scalar_one_or_none.return_value = None
+        db.execute.return_value = user_result
+
+        with pytest.raises(ValueError, match="User not found"):
+            await leaderboard.get_user_statistics(uuid4(), db)
+
+
+class TestReconcile:
+    """Test rebuilding boards from PostgreSQL."""
+
+    @pytest.mark.asyncio
+    async def test_boards_are_swapped_in_atomically(self, leaderboard, redis_client):
+        """Test that boards are built in scratch keys and renamed over the live ones."""
+        # Arrange
+        user_id = uuid4()
+        db = AsyncMock()
+        db.execute.return_value = rows_result([(user_id, 3)])
+        redis_client.zunionstore.return_value = 1
+
+        # Act
+        await leaderboard.reconcile(db)
+
+        # Assert
+        assert db.execute.await_count == 9  # 3 boards x 3 timeframes
+        redis_client.zadd.assert_any_await("leaderboard:documents:week:rebuild", {str(user_id): 3})
+        redis_client.rename.assert_any_await("leaderboard:documents:week:rebuild", "leaderboard:documents:week")
+        redis_client.zunionstore.assert_any_await(
+            "leaderboard:overall:all_time:rebuild",
+            {
+                "leaderboard:documents:all_time": 10,
+                "leaderboard:conversations:all_time": 2,
+                "leaderboard:messages:all_time": 1,
+            },
+        )
+        redis_client.rename.assert_any_await("leaderboard:overall:all_time:rebuild", "leaderboard:overall:all_time")
+
+    @pytest.mark.asyncio
+    async def test_empty_board_keeps_sentinel(self, leaderboard, redis_client):
+        """Test that a timeframe without activity leaves an empty board that takes increments."""
+        # Arrange
+        db = AsyncMock()
+        db.execute.return_value = rows_result([])
+        redis_client.zunionstore.return_value = 1
+
+        # Act
+        await leaderboard.reconcile(db)
+
+        # Assert
+        redis_client.zadd.assert_any_await("leaderboard:messages:week:rebuild", {"_": float("-inf")})
+        redis_client.rename.assert_any_await("leaderboard:messages:week:rebuild", "leaderboard:messages:week")
+        redis_client.rename.assert_any_await("leaderboard:overall:week:rebuild", "leaderboard:overall:week")
+        assert all(call.args[0].endswith(":rebuild") for call in redis_client.delete.await_args_list)
@@ -0,0 +1,262 @@
+"""Unit tests for the cached OpenRouter model catalog."""
+
+import json
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.model_catalog_service import (
+    ModelCatalogService,
+    ModelCatalogUnavailableError,
+    ModelInfo,
+)
+
+MODULE = 'app.services.model_catalog_service'
+
+
+@pytest.fixture
+def raw_models():
+    """Raw /models entries."""
+    return [
+        {
+            "id": "anthropic/claude-3.5-sonnet",
+            "name": "Claude 3.5 Sonnet",
+            "context_length": 200000,
+            "pricing": {
+                "prompt": "0.000003",
+                "completion": "0.000015",
+                "request": "0",
+                "input_cache_read": "0.0000003",
+                "input_cache_write": "0.00000375",
+            },
+            "top_provider": {"context_length": 200000, "max_completion_tokens": 8192},
+            "supported_parameters": ["max_tokens", "temperature", "tools"],
+        },
+        {
+            "id": "openai/gpt-4o-mini",
+            "name": "GPT-4o-mini",
+            "context_length": 128000,
+            "pricing": {"prompt": "0.00000015", "completion": "0.0000006"},
+            "top_provider": {"context_length": 128000, "max_completion_tokens": 16384},
+            "supported_parameters": ["max_tokens", "structured_outputs", "response_format"],
+        },
+        {
+            "id": "openrouter/auto",
+            "name": "Auto Router",
+            "pricing": {"prompt": "-1", "completion": "-1"},
+        },
+    ]
+
+
+@pytest.fixture
+def catalog(raw_models):
+    """Create a catalog loaded with the raw models."""
+    with patch(f'{MODULE}.get_redis_client'):
+        service = ModelCatalogService()
+    service._set_models(raw_models, time.time())
+    return service
+
+
+class TestModelInfo:
+    """Test model pricing and limits."""
+
+    def test_compute_cost_prices_cached_tokens(self, raw_models):
+        """Test that cached prompt tokens are billed at the cache read price."""
+        model = ModelInfo.from_api(raw_models[0])
+
+        cost = model.compute_cost(prompt_tokens=1000, completion_tokens=100, cached_tokens=800)
+
+        # 200 uncached + 800 cached prompt tokens + 100 completion tokens
+        expected = 200 * 0.000003 + 800 * 0.0000003 + 100 * 0.000015
+        assert cost == pytest.approx(expected)
+        assert model.compute_cache_savings(800) == pytest.approx(800 * (0.000003 - 0.0000003))
+
+    def test_variable_pricing_is_unknown(self, raw_models):
+        """Test that negative (variable) prices yield no cost."""
+        model = ModelInfo.from_api(raw_models[2])
+
+        assert not model.has_pricing
+        assert model.compute_cost(prompt_tokens=10, completion_tokens=10) is None
+
+
+class TestModelCatalogLookups:
+    """Test in-memory lookups used on the request path."""
+
+    def test_compute_cost_from_usage(self, catalog):
+        """Test cost computation from an OpenAI-format usage dict."""
+        usage = {
+            "prompt_tokens": 1000,
+            "completion_tokens": 500,
+            "total_tokens": 1500,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+
+        cost = catalog.compute_cost("openai/gpt-4o-mini", usage)
+
+        assert cost == pytest.approx(1000 * 0.00000015 + 500 * 0.0000006)
+
+    def test_unknown_model_has_no_cost(self, catalog):
+        """Test that unknown models are not priced."""
+        assert catalog.compute_cost("unknown/model", {"prompt_tokens": 10}) is None
+
+    def test_clamp_max_tokens(self, catalog):
+        """Test that max_tokens is limited to the model's completion limit."""
+        assert catalog.clamp_max_tokens("anthropic/claude-3.5-sonnet", 100000) == 8192
+        assert catalog.clamp_max_tokens("anthropic/claude-3.5-sonnet", 1000) == 1000
+        assert catalog.clamp_max_tokens("unknown/model", 100000) == 100000
+
+    def test_filter_fallback_models(self, catalog):
+        """Test that unknown and incapable fallbacks are dropped."""
+        fallbacks = ["anthropic/claude-3.5-sonnet", "deprecated/model", "openai/gpt-4o-mini"]
+
+        assert catalog.filter_fallback_models(fallbacks) == [
+            "anthropic/claude-3.5-sonnet",
+            "openai/gpt-4o-mini",
+        ]
+        assert catalog.filter_fallback_models(
+            fallbacks, required_parameters=("structured_outputs",)
+        ) == ["openai/gpt-4o-mini"]
+
+    def test_lookups_are_noops_before_load(self):
+        """Test that an unloaded catalog leaves requests unchanged."""
+        with patch(f'{MODULE}.get_redis_client'):
+            service = ModelCatalogService()
+
+        assert service.filter_fallback_models(["a/b"]) == ["a/b"]
+        assert service.clamp_max_tokens("a/b", 100) == 100
+        assert service.compute_cost("a/b", {"prompt_tokens": 1}) is None
+
+
+class TestModelCatalogLoading:
+    """Test loading and refreshing the catalog."""
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.get_redis_client')
+    async def test_loads_shared_copy_from_redis(self, mock_get_redis_client, raw_models):
+        """Test that a Redis copy avoids fetching from OpenRouter."""
+        # Arrange
+        mock_get_redis_client.return_value.get = AsyncMock(
+            return_value=json.dumps({"fetched_at": time.time(), "data": raw_models})
+        )
+        service = ModelCatalogService()
+        service._fetch_models = AsyncMock()
+
+        # Act
+        model = await service.get_model("openai/gpt-4o-mini")
+
+        # Assert
+        assert model.max_completion_tokens == 16384
+        service._fetch_models.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.get_redis_client')
+    async def test_fetches_and_stores_on_redis_miss(self, mock_get_redis_client, raw_models):
+        """Test that a Redis miss fetches the catalog and shares it."""
+        # Arrange
+        redis = mock_get_redis_client.return_value
+        redis.get = AsyncMock(return_value=None)
+        redis.setex = AsyncMock()
+        service = ModelCatalogService()
+        service._fetch_models = AsyncMock(return_value=raw_models)
+
+        # Act
+        models = await service.get_raw_models()
+
+        # Assert
+        assert models == raw_models
+        redis.setex.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.get_redis_client')
+    async def test_failed_refresh_keeps_previous_catalog(self, mock_get_redis_client, raw_models):
+        """Test that refresh errors keep serving the stale catalog."""
+        # Arrange
+        service = ModelCatalogService()
+        service._set_models(raw_models, time.time())
+        service._fetch_models = AsyncMock(side_effect=RuntimeError("OpenRouter down"))
+
+        # Act
+        refreshed = await service.refresh()
+
+        # Assert
+        assert refreshed is False
+        assert service.get_cached_model("openai/gpt-4o-mini") is not None
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.get_redis_client')
+    async def test_unavailable_catalog_raises(self, mock_get_redis_client):
+        """Test that a catalog that was never loaded isn't reported as empty."""
+        # Arrange
+        mock_get_redis_client.return_value.get = AsyncMock(return_value=None)
+        mock_get_redis_client.return_value.setex = AsyncMock()
+        service = ModelCatalogService()
+        service._fetch_models = AsyncMock(side_effect=RuntimeError("OpenRouter down"))
+
+        # Act & Assert
+        with pytest.raises(ModelCatalogUnavailableError):
+            await service.get_raw_models()
+
+
+class TestModelCatalogSync:
+    """Test the background sync shared by workers."""
+
+    @pytest.fixture
+    def redis(self):
+        """Mock the cache Redis client."""
+        with patch(f'{MODULE}.get_redis_client') as mock_get_redis_client:
+            client = mock_get_redis_client.return_value
+            client.get = AsyncMock(return_value=None)
+            client.set = AsyncMock(return_value=True)
+            client.setex = AsyncMock()
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_fresh_shared_copy_is_not_refetched(self, redis, raw_models):
+        """Test that workers read a fresh Redis copy instead of calling OpenRouter."""
+        # Arrange
+        redis.get.return_value = json.dumps({"fetched_at": time.time(), "data": raw_models})
+        service = ModelCatalogService()
+        service._fetch_models = AsyncMock()
+
+        # Act
+        await service.sync()
+
+        # Assert
+        assert service.get_cached_model("openai/gpt-4o-mini") is not None
+        service._fetch_models.assert_not_called()
+        redis.set.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stale_copy_is_refetched_by_lock_holder(self, redis, raw_models):
+        """Test that the worker taking the lock refetches a stale copy."""
+        # Arrange
+        stale = time.time() - 2 * 3600
+        redis.get.return_value = json.dumps({"fetched_at": stale, "data": raw_models})
+        service = ModelCatalogService()
+        service.refresh_interval_seconds = 3600
+        service._fetch_models = AsyncMock(return_value=raw_models)
+
+        # Act
+        await service.sync()
+
+        # Assert
+        redis.set.assert_awaited_once_with("model_catalog:refresh:lock", "1", nx=True, ex=3600)
+        service._fetch_models.assert_awaited_once()
+        assert service._fetched_at > stale
+
+    @pytest.mark.asyncio
+    async def test_other_workers_keep_stale_copy(self, redis, raw_models):
+        """Test that workers without the lock don't call OpenRouter."""
+        # Arrange
+        redis.get.return_value = json.dumps({"fetched_at": time.time() - 2 * 3600, "data": raw_models})
+        redis.set.return_value = None
+        service = ModelCatalogService()
+        service.refresh_interval_seconds = 3600
+        service._fetch_models = AsyncMock()
+
+        # Act
+        await service.sync()
+
+        # Assert
+        service._fetch_models.assert_not_called()
+        assert service.get_cached_model("openai/gpt-4o-mini") is not None
@@ -1,9 +1,11 @@
 """Unit tests for OpenRouter service."""
 
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
+from app.core.hedging import HedgingPolicy
 from app.services.openrouter_service import OpenRouterService
 
 
@@ -137,6 +139,7 @@ class TestChatCompletion:
             mock_settings.enable_auto_router = False
             mock_settings.model_routing_enabled = True
             mock_settings.default_fallback_models = ["openai/gpt-4o", "openai/gpt-4o-mini"]
+            mock_settings.llm_hedging_enabled = False
             mock_settings.prompt_caching_enabled = False
             mock_settings.track_user_ids = False
             mock_settings.usage_tracking_enabled = False
@@ -170,6 +173,245 @@ class TestChatCompletion:
                 assert "models" in payload or "model" in payload
 
 
+class TestHedgedCompletion:
+    """Test hedged requests across fallback models."""
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged_to_fallback_model(self):
+        """Test that a slow primary is hedged and the fallback's answer is used."""
+        with patch("app.services.openrouter_service.settings") as mock_settings:
+            mock_settings.openrouter_api_key = "test-key"
+            mock_settings.openrouter_base_url = "https://openrouter.ai/api/v1"
+            mock_settings.openrouter_app_url = "https://test.com"
+            mock_settings.openrouter_app_name = "Test App"
+            mock_settings.enable_auto_router = False
+            mock_settings.model_routing_enabled = True
+            mock_settings.prompt_caching_enabled = False
+            mock_settings.track_user_ids = False
+            mock_settings.usage_tracking_enabled = True
+            mock_settings.structured_outputs_enabled = False
+            mock_settings.langfuse_enabled = False
+            mock_settings.llm_hedge_max_attempts = 2
+
+            service = OpenRouterService()
+            service.hedging_policy = HedgingPolicy(
+                name="test", min_delay_seconds=0.01, default_delay_seconds=0.05
+            )
+
+            requested = []
+
+            async def create(**params):
+                requested.append(params)
+                if params["model"] == "anthropic/claude-3.5-sonnet":
+                    await asyncio.sleep(10)
+                response = MagicMock()
+                response.model = params["model"]
+                response.choices = []
+                response.usage = None
+                return response
+
+            service.client = MagicMock()
+            service.client.chat.completions.create = create
+
+            with patch("app.services.openrouter_service.track_llm_hedge"):
+                result = await service.chat_completion(
+                    messages=[{"role": "user", "content": "Hello"}],
+                    model="anthropic/claude-3.5-sonnet",
+                    fallback_models=["openai/gpt-4o"],
+                    hedge=True,
+                )
+
+            assert result["model"] == "openai/gpt-4o"
+            assert result["fallback_used"] is True
+            assert result["models_attempted"] == ["anthropic/claude-3.5-sonnet", "openai/gpt-4o"]
+            # Each hedged attempt targets a single model
+            assert all("models" not in params.get("extra_body", {}) for params in requested)
+
+
+    @pytest.mark.asyncio
+    async def test_stream_is_hedged_on_first_chunk(self):
+        """Test that a stream slow to start is raced and the loser is closed."""
+        with patch("app.services.openrouter_service.settings") as mock_settings:
+            mock_settings.openrouter_api_key = "test-key"
+            mock_settings.openrouter_base_url = "https://openrouter.ai/api/v1"
+            mock_settings.openrouter_app_url = "https://test.com"
+            mock_settings.openrouter_app_name = "Test App"
+            mock_settings.enable_auto_router = False
+            mock_settings.model_routing_enabled = True
+            mock_settings.prompt_caching_enabled = False
+            mock_settings.track_user_ids = False
+            mock_settings.usage_tracking_enabled = True
+            mock_settings.structured_outputs_enabled = False
+            mock_settings.langfuse_enabled = False
+            mock_settings.llm_concurrency_enabled = False
+            mock_settings.llm_dedup_enabled = False
+            mock_settings.llm_hedge_max_attempts = 2
+
+            service = OpenRouterService()
+            service.stream_hedging_policy = HedgingPolicy(
+                name="test", min_delay_seconds=0.01, default_delay_seconds=0.05
+            )
+
+            closed = []
+
+            def chunk(model, content):
+                item = MagicMock()
+                item.model = model
+                item.choices = [MagicMock(index=0, finish_reason=None)]
+                item.choices[0].delta.content = content
+                item.usage = None
+                return item
+
+            async def upstream(model, first_chunk_delay):
+                try:
+                    await asyncio.sleep(first_chunk_delay)
+                    for content in ["Khums ", "is ", "one fifth"]:
+                        yield chunk(model, content)
+                finally:
+                    closed.append(model)
+
+            async def create(**params):
+                slow = params["model"] == "anthropic/claude-3.5-sonnet"
+                return upstream(params["model"], 10 if slow else 0)
+
+            service.client = MagicMock()
+            service.client.chat.completions.create = create
+
+            with patch("app.services.openrouter_service.track_llm_hedge") as mock_track:
+                chunks = [
+                    c async for c in service.stream_chat_completion(
+                        messages=[{"role": "user", "content": "What is Khums?"}],
+                        model="anthropic/claude-3.5-sonnet",
+                        fallback_models=["openai/gpt-4o"],
+                        hedge=True,
+                    )
+                ]
+            await asyncio.sleep(0)
+
+            assert [c["choices"][0]["delta"]["content"] for c in chunks] == ["Khums ", "is ", "one fifth"]
+            assert {c["model"] for c in chunks} == {"openai/gpt-4o"}
+            mock_track.assert_called_once_with(provider="openrouter", hedge_won=True)
+            assert set(closed) == {"anthropic/claude-3.5-sonnet", "openai/gpt-4o"}
+
+class TestCompletionDeduplication:
+    """Test in-flight deduplication of identical completions."""
+
+    def make_service(self, mock_settings):
+        """Create a service with deterministic dedup settings."""
+        mock_settings.openrouter_api_key = "test-key"
+        mock_settings.openrouter_base_url = "https://openrouter.ai/api/v1"
+        mock_settings.openrouter_app_url = "https://test.com"
+        mock_settings.openrouter_app_name = "Test App"
+        mock_settings.enable_auto_router = False
+        mock_settings.model_routing_enabled = False
+        mock_settings.prompt_caching_enabled = False
+        mock_settings.track_user_ids = True
+        mock_settings.usage_tracking_enabled = False
+        mock_settings.structured_outputs_enabled = False
+        mock_settings.langfuse_enabled = False
+        mock_settings.llm_hedging_enabled = False
+        mock_settings.llm_dedup_enabled = True
+        mock_settings.llm_dedup_max_temperature = 0.0
+        return OpenRouterService()
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_requests_share_one_call(self):
+        """Test that a burst of identical deterministic requests costs one completion."""
+        with patch("app.services.openrouter_service.settings") as mock_settings:
+            service = self.make_service(mock_settings)
+
+            calls = []
+
+            async def create(**params):
+                calls.append(params)
+                await asyncio.sleep(0.05)
+                response = MagicMock()
+                response.model = params["model"]
+                response.choices = []
+                response.usage = None
+                return response
+
+            service.client = MagicMock()
+            service.client.chat.completions.create = create
+
+            with patch("app.services.openrouter_service.track_llm_dedup") as mock_track:
+                results = await asyncio.gather(*[
+                    service.chat_completion(
+                        messages=[{"role": "user", "content": "What is  Khums? "}],
+                        model="openai/gpt-4o",
+                        user_id=uuid4(),  # Different users still share the call
+                        temperature=0.0,
+                    )
+                    for _ in range(5)
+                ])
+
+            assert len(calls) == 1
+            assert all(result["model"] == "openai/gpt-4o" for result in results)
+            assert mock_track.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_non_deterministic_requests_are_not_shared(self):
+        """Test that sampled requests each get their own completion."""
+        with patch("app.services.openrouter_service.settings") as mock_settings:
+            service = self.make_service(mock_settings)
+
+            response = MagicMock()
+            response.model = "openai/gpt-4o"
+            response.choices = []
+            response.usage = None
+            service.client = MagicMock()
+            service.client.chat.completions.create = AsyncMock(return_value=response)
+
+            await asyncio.gather(*[
+                service.chat_completion(
+                    messages=[{"role": "user", "content": "Tell me a story"}],
+                    model="openai/gpt-4o",
+                    temperature=0.7,
+                )
+                for _ in range(3)
+            ])
+
+            assert service.client.chat.completions.create.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_identical_streams_fan_out(self):
+        """Test that concurrent identical streams read one upstream stream."""
+        with patch("app.services.openrouter_service.settings") as mock_settings:
+            service = self.make_service(mock_settings)
+
+            def chunk(content):
+                item = MagicMock()
+                item.model = "openai/gpt-4o"
+                item.choices = [MagicMock(index=0, finish_reason=None)]
+                item.choices[0].delta.content = content
+                item.usage = None
+                return item
+
+            async def upstream():
+                for content in ["Khums ", "is ", "one fifth"]:
+                    await asyncio.sleep(0.01)
+                    yield chunk(content)
+
+            service.client = MagicMock()
+            service.client.chat.completions.create = AsyncMock(side_effect=lambda **_: upstream())
+
+            async def consume():
+                return [
+                    c["choices"][0]["delta"]["content"]
+                    async for c in service.stream_chat_completion(
+                        messages=[{"role": "user", "content": "What is Khums?"}],
+                        model="openai/gpt-4o",
+                        temperature=0.0,
+                    )
+                ]
+
+            with patch("app.services.openrouter_service.track_llm_dedup"):
+                streams = await asyncio.gather(consume(), consume(), consume())
+
+            assert service.client.chat.completions.create.call_count == 1
+            assert all(stream == ["Khums ", "is ", "one fifth"] for stream in streams)
+
+
 class TestMessageCaching:
     """Test message caching functionality."""
 
@@ -291,12 +533,8 @@ class TestUtilityMethods:
                 ]
             }
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_get = AsyncMock()
-                mock_get.return_value.status_code = 200
-                mock_get.return_value.json.return_value = mock_response
-                mock_get.return_value.raise_for_status = MagicMock()
-                mock_client.return_value.__aenter__.return_value.get = mock_get
+            with patch("app.services.openrouter_service.model_catalog_service") as mock_catalog:
+                mock_catalog.get_raw_models = AsyncMock(return_value=mock_response["data"])
 
                 models = await service.get_models()
 
@@ -318,12 +556,12 @@ class TestUtilityMethods:
                 "data": {"label": "test-key", "usage": 10.5, "limit": 100.0}
             }
 
-            with patch("httpx.AsyncClient") as mock_client:
+            with patch("app.services.openrouter_service.get_http_client") as mock_get_http_client:
                 mock_get = AsyncMock()
                 mock_get.return_value.status_code = 200
                 mock_get.return_value.json.return_value = mock_response
                 mock_get.return_value.raise_for_status = MagicMock()
-                mock_client.return_value.__aenter__.return_value.get = mock_get
+                mock_get_http_client.return_value.get = mock_get
 
                 credits = await service.get_credits()
 
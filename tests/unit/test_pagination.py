@@ -0,0 +1,162 @@
+"""Unit tests for keyset pagination."""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from sqlalchemy import Column, DateTime, Integer, String, create_engine, select
+from sqlalchemy.orm import Session, declarative_base
+
+from app.repositories.base import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    estimate_count,
+    paginate,
+)
+
+ItemBase = declarative_base()
+
+
+class Item(ItemBase):
+    """Table with duplicate sort keys to exercise the ID tie-breaker."""
+
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    group = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+
+class SyncSessionAdapter:
+    """Expose a sync SQLite session through the AsyncSession execute API."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def execute(self, *args, **kwargs):
+        return self.session.execute(*args, **kwargs)
+
+
+@pytest.fixture
+def db():
+    """Create an in-memory table of 25 items, five per timestamp."""
+    engine = create_engine("sqlite://")
+    ItemBase.metadata.create_all(engine)
+    start = datetime(2026, 1, 1)
+    with Session(engine) as session:
+        session.add_all(
+            Item(id=i, group="even" if i % 2 == 0 else "odd", created_at=start + timedelta(hours=i // 5))
+            for i in range(25)
+        )
+        session.commit()
+        yield SyncSessionAdapter(session)
+
+
+async def collect(db, query, limit: int, descending: bool = True) -> list[list[int]]:
+    """Walk every page of a query and return the IDs of each page."""
+    pages = []
+    cursor = None
+    while True:
+        page = await paginate(db, query, [Item.created_at], Item.id, limit, cursor, descending)
+        pages.append([item.id for item in page.items])
+        if not page.has_more:
+            return pages
+        cursor = page.next_cursor
+
+
+class TestCursor:
+    """Test cursor encoding."""
+
+    def test_round_trip_keeps_types(self):
+        """Test that datetimes and UUIDs decode to the values encoded."""
+        values = [datetime(2026, 1, 1, tzinfo=timezone.utc), "high", 3, uuid4()]
+
+        assert decode_cursor(encode_cursor(values), 4) == values
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor([1]), encode_cursor([None, 1]), "e30"])
+    def test_malformed_cursor(self, cursor):
+        """Test that garbage, wrong-sized and NULL cursors are rejected."""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, 2)
+
+
+class TestPaginate:
+    """Test paging through a query."""
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_every_row_once(self, db):
+        """Test that pages split ties by ID without skipping or repeating rows."""
+        pages = await collect(db, select(Item), limit=7)
+
+        assert [len(page) for page in pages] == [7, 7, 7, 4]
+        assert sum(pages, []) == list(range(24, -1, -1))
+
+    @pytest.mark.asyncio
+    async def test_ascending_with_filter(self, db):
+        """Test ascending order over a filtered query."""
+        pages = await collect(db, select(Item).where(Item.group == "even"), limit=5, descending=False)
+
+        assert sum(pages, []) == list(range(0, 25, 2))
+
+    @pytest.mark.asyncio
+    async def test_exact_last_page_has_no_cursor(self, db):
+        """Test that a page ending on the last row doesn't point to an empty page."""
+        page = await paginate(db, select(Item), [Item.created_at], Item.id, limit=25)
+
+        assert len(page.items) == 25
+        assert page.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_cursor_for_other_query_is_rejected(self, db):
+        """Test that a cursor with the wrong number of keys is rejected."""
+        with pytest.raises(InvalidCursorError):
+            await paginate(db, select(Item), [Item.created_at], Item.id, 5, encode_cursor([1]))
+
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("values", [
+        ["2026-01-01", 3],  # String for a datetime
+        [uuid4(), 3],  # UUID for a datetime
+        [datetime(2026, 1, 1), "3"],  # String for an integer ID
+        [datetime(2026, 1, 1), True],  # Boolean for an integer ID
+        [datetime(2026, 1, 1), 2**70],  # Out of BIGINT range
+    ])
+    async def test_cursor_with_wrong_types_is_rejected(self, db, values):
+        """Test that crafted values are rejected before reaching the database."""
+        with pytest.raises(InvalidCursorError):
+            await paginate(db, select(Item), [Item.created_at], Item.id, 5, encode_cursor(values))
+
+    @pytest.mark.asyncio
+    async def test_aware_cursor_for_naive_column_is_converted(self, db):
+        """Test that a timezone-aware datetime is compared in UTC against a naive column."""
+        cursor = encode_cursor([datetime(2026, 1, 1, 5, tzinfo=timezone(timedelta(hours=3))), 10])
+
+        page = await paginate(db, select(Item), [Item.created_at], Item.id, 5, cursor)
+
+        # Before 02:00 UTC: the ten items of 00:00 and 01:00, newest first
+        assert [item.id for item in page.items] == [9, 8, 7, 6, 5]
+
+class TestEstimateCount:
+    """Test reltuples estimates."""
+
+    @pytest.mark.asyncio
+    async def test_estimate(self):
+        """Test that the planner estimate is returned."""
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = 1234.0
+        db = AsyncMock()
+        db.execute.return_value = result
+
+        assert await estimate_count(db, Item) == 1234
+
+    @pytest.mark.asyncio
+    async def test_unanalyzed_table(self):
+        """Test that a table never analyzed (reltuples -1) has no estimate."""
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = -1
+        db = AsyncMock()
+        db.execute.return_value = result
+
+        assert await estimate_count(db, Item) is None
@@ -0,0 +1,205 @@
+"""Unit tests for the plan limits and subscription cache."""
+
+import json
+import pytest
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.models.subscription import PlanLimit, Subscription
+from app.services.plan_cache_service import (
+    INVALIDATION_CHANNEL,
+    CachedPlanLimit,
+    PlanCacheService,
+)
+
+
+@pytest.fixture
+def plan_cache():
+    """Create a plan cache with a mocked Redis client."""
+    client = MagicMock()
+    client.get = AsyncMock(return_value="3")
+    client.incr = AsyncMock(return_value=4)
+    client.publish = AsyncMock()
+    with patch("app.services.plan_cache_service.get_redis_client", return_value=client):
+        service = PlanCacheService()
+    return service
+
+
+def make_plan(plan_type: str = "premium", **overrides) -> PlanLimit:
+    """Build a PlanLimit row."""
+    values = dict(
+        plan_type=plan_type,
+        max_messages_per_month=1000,
+        max_tokens_per_month=1000000,
+        max_images_per_month=100,
+        max_documents_per_month=100,
+        max_audio_minutes_per_month=100,
+        monthly_price_usd=Decimal("9.99"),
+        yearly_price_usd=Decimal("99.99"),
+    )
+    values.update(overrides)
+    return PlanLimit(**values)
+
+
+def make_result(row=None, rows=None) -> MagicMock:
+    """Build a database result for scalar_one_or_none / scalars().all()."""
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = row
+    result.scalars.return_value.all.return_value = rows or []
+    return result
+
+
+class TestPlans:
+    """Test cached plan limits."""
+
+    def test_cached_plan_copies_row_with_defaults(self):
+        """Test that unset columns take model defaults and prices become floats."""
+        plan = CachedPlanLimit.from_model(make_plan(presets_limit=10))
+
+        assert plan.presets_limit == 10
+        assert plan.max_context_length == 4096
+        assert plan.image_generation_enabled is False
+        assert plan.monthly_price_usd == 9.99
+
+    @pytest.mark.asyncio
+    async def test_plan_miss_reads_through_once(self, plan_cache):
+        """Test that a missing plan is loaded once and then served from memory."""
+        # Arrange
+        db = AsyncMock()
+        db.execute.return_value = make_result(row=make_plan())
+
+        # Act
+        first = await plan_cache.get_plan("premium", db)
+        second = await plan_cache.get_plan("premium", db)
+
+        # Assert
+        assert first is second
+        assert first.max_messages_per_month == 1000
+        db.execute.assert_called_once()
+        assert plan_cache.get_cached_plan("premium") is first
+
+    @pytest.mark.asyncio
+    async def test_unknown_plan_is_not_cached(self, plan_cache):
+        """Test that a plan that doesn't exist is looked up again next time."""
+        db = AsyncMock()
+        db.execute.return_value = make_result(row=None)
+
+        assert await plan_cache.get_plan("invalid", db) is None
+        assert await plan_cache.get_plan("invalid", db) is None
+        assert db.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_reload_records_published_version(self, plan_cache):
+        """Test that the table is stamped with the version read before loading."""
+        # Arrange
+        db = AsyncMock()
+        db.execute.return_value = make_result(
+            rows=[make_plan("premium"), make_plan("free", monthly_price_usd=Decimal("0"))]
+        )
+
+        # Act
+        plans = await plan_cache.list_plans(db)
+
+        # Assert
+        assert [plan.plan_type for plan in plans] == ["free", "premium"]
+        assert plan_cache.version == 3
+
+    @pytest.mark.asyncio
+    async def test_newer_plan_version_triggers_reload(self, plan_cache):
+        """Test that workers reload only for versions they haven't loaded."""
+        # Arrange
+        plan_cache._version = 3
+        plan_cache.reload_plans = AsyncMock()
+
+        # Act
+        await plan_cache._handle_message(json.dumps({"type": "plans", "version": 3}))
+        await plan_cache._handle_message(json.dumps({"type": "plans", "version": 4}))
+
+        # Assert
+        plan_cache.reload_plans.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_publish_bumps_version_and_reloads(self, plan_cache):
+        """Test that a plan change is versioned, broadcast and applied locally."""
+        # Arrange
+        plan_cache.reload_plans = AsyncMock()
+
+        # Act
+        await plan_cache.publish_plans_changed()
+
+        # Assert
+        plan_cache.redis.publish.assert_awaited_once_with(
+            INVALIDATION_CHANNEL, json.dumps({"type": "plans", "version": 4})
+        )
+        plan_cache.reload_plans.assert_awaited_once()
+
+
+class TestSubscriptions:
+    """Test cached subscriptions."""
+
+    @pytest.mark.asyncio
+    async def test_missing_subscription_is_cached(self, plan_cache):
+        """Test that users without a subscription don't query on every request."""
+        db = AsyncMock()
+        db.execute.return_value = make_result(row=None)
+        user_id = uuid4()
+
+        assert await plan_cache.get_subscription(user_id, db) is None
+        assert await plan_cache.get_subscription(user_id, db) is None
+        db.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch("app.services.plan_cache_service.rate_limit_policy_service")
+    async def test_subscription_change_invalidates_and_broadcasts(self, mock_policy, plan_cache):
+        """Test that a change drops the local entry and notifies other workers."""
+        # Arrange
+        user_id = uuid4()
+        db = AsyncMock()
+        db.execute.return_value = make_result(
+            row=Subscription(
+                id=uuid4(), user_id=user_id, plan_type="free", status="active", billing_cycle="monthly"
+            )
+        )
+        await plan_cache.get_subscription(user_id, db)
+
+        # Act
+        await plan_cache.subscription_changed(user_id, "premium", "active")
+
+        # Assert
+        assert user_id not in plan_cache._subscriptions
+        mock_policy.set_user_plan.assert_called_once_with(user_id, "premium", "active")
+        message = json.loads(plan_cache.redis.publish.await_args[0][1])
+        assert message == {
+            "type": "subscription",
+            "user_id": str(user_id),
+            "plan_type": "premium",
+            "status": "active",
+        }
+
+    @pytest.mark.asyncio
+    @patch("app.services.plan_cache_service.rate_limit_policy_service")
+    async def test_subscription_message_from_other_worker(self, mock_policy, plan_cache):
+        """Test that a broadcast subscription change is applied locally."""
+        # Arrange
+        user_id = uuid4()
+        plan_cache._subscriptions.set(user_id, None)
+        data = json.dumps({"type": "subscription", "user_id": str(user_id), "plan_type": "premium", "status": "trial"})
+
+        # Act
+        await plan_cache._handle_message(data)
+
+        # Assert
+        assert user_id not in plan_cache._subscriptions
+        mock_policy.set_user_plan.assert_called_once_with(user_id, "premium", "trial")
+
+    @pytest.mark.asyncio
+    async def test_publish_failure_keeps_local_change(self, plan_cache):
+        """Test that Redis errors don't fail the subscription change."""
+        plan_cache.redis.publish.side_effect = ConnectionError("redis down")
+        user_id = uuid4()
+        plan_cache._subscriptions.set(user_id, None)
+
+        await plan_cache.subscription_changed(user_id, "free", "cancelled")
+
+        assert user_id not in plan_cache._subscriptions
@@ -7,6 +7,15 @@ from uuid import uuid4
 
 from app.services.presets_service import PresetsService
 from app.models.subscription import ModelPreset, PlanLimit, Subscription
+from app.services.plan_cache_service import plan_cache_service
+
+
+@pytest.fixture(autouse=True)
+def clear_plan_cache():
+    """Start every test with empty plan and subscription caches."""
+    plan_cache_service.clear()
+    yield
+    plan_cache_service.clear()
 
 
 class TestCreatePreset:
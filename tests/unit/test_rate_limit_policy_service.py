@@ -0,0 +1,219 @@
+"""Unit tests for plan-aware rate limit policies."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.security import hash_api_key
+from app.services.rate_limit_policy_service import (
+    RateLimitPolicyService,
+    _APIClientEntry,
+    plan_limits,
+    route_cost,
+)
+
+
+def make_request(headers: dict | None = None, host: str = "203.0.113.7") -> MagicMock:
+    """Create a request stub with headers and a client address."""
+    request = MagicMock()
+    request.headers = headers or {}
+    request.client.host = host
+    return request
+
+
+@pytest.fixture
+def policy_service():
+    """Create a policy service outside the test environment override."""
+    with patch.object(settings, "environment", "dev"):
+        yield RateLimitPolicyService()
+
+
+class TestRouteCost:
+    """Test route cost classes."""
+
+    def test_health_and_preflight_are_exempt(self):
+        """Test that monitoring and CORS preflight cost nothing."""
+        assert route_cost("GET", "/health") == ("exempt", 0)
+        assert route_cost("GET", "/api/v1/health/ready") == ("exempt", 0)
+        assert route_cost("OPTIONS", "/api/v1/chat/") == ("exempt", 0)
+
+    def test_expensive_routes_cost_more(self):
+        """Test LLM and generation routes."""
+        assert route_cost("POST", "/api/v1/chat/") == ("llm", 2)
+        assert route_cost("POST", "/api/v1/images/generate") == ("generation", 5)
+
+    def test_reads_cost_one(self):
+        """Test the default cost class."""
+        assert route_cost("GET", "/api/v1/images/history") == ("read", 1)
+        assert route_cost("GET", "/api/v1/conversations/") == ("read", 1)
+
+
+class TestResolve:
+    """Test caller to policy resolution."""
+
+    @pytest.mark.asyncio
+    async def test_anonymous_caller_is_limited_by_ip(self, policy_service):
+        """Test the anonymous fallback ignores X-Forwarded-For without trusted proxies."""
+        policy = await policy_service.resolve(make_request({"X-Forwarded-For": "198.51.100.1, 10.0.0.1"}))
+
+        assert policy.client_key == "ip:203.0.113.7"
+        assert policy.plan == "anonymous"
+        assert (policy.limit_per_minute, policy.limit_per_day) == plan_limits("anonymous")
+
+    @pytest.mark.asyncio
+    async def test_spoofed_forwarded_hops_are_ignored(self, policy_service):
+        """Test that only the hop added by the trusted proxy is used."""
+        # Arrange
+        policy_service.trusted_proxy_count = 1
+        request = make_request({"X-Forwarded-For": "1.2.3.4, 198.51.100.1"}, host="10.0.0.1")
+
+        # Act
+        policy = await policy_service.resolve(request)
+
+        # Assert
+        assert policy.client_key == "ip:198.51.100.1"
+
+    @pytest.mark.asyncio
+    async def test_authenticated_user_gets_paid_plan(self, policy_service):
+        """Test that the subscription plan comes from memory."""
+        # Arrange
+        user_id = uuid4()
+        policy_service.set_user_plan(user_id, "premium", "active")
+
+        # Act
+        with patch(
+            "app.services.rate_limit_policy_service.get_user_id_from_token",
+            return_value=user_id,
+        ):
+            policy = await policy_service.resolve(make_request({"Authorization": "Bearer token"}))
+
+        # Assert
+        assert policy.client_key == f"user:{user_id}"
+        assert policy.plan == "premium"
+        assert policy.limit_per_minute == settings.rate_limit_premium
+
+    @pytest.mark.asyncio
+    async def test_cancelled_subscription_falls_back_to_free(self, policy_service):
+        """Test plan invalidation on subscription changes."""
+        user_id = uuid4()
+        policy_service.set_user_plan(user_id, "premium", "active")
+
+        policy_service.set_user_plan(user_id, "premium", "cancelled")
+
+        assert policy_service.get_user_plan(user_id) == "free"
+
+    @pytest.mark.asyncio
+    async def test_api_key_is_verified_once(self, policy_service):
+        """Test that verified API keys are served from the TTL cache."""
+        # Arrange
+        api_key = "pk_abcdefghijklmnop"
+        entry = _APIClientEntry(
+            client_id=uuid4(),
+            api_key_hash=hash_api_key(api_key),
+            tier="premium",
+            limit_per_minute=120,
+            limit_per_day=50000,
+        )
+        policy_service._api_clients_by_prefix = {"pk_abcde": [entry]}
+        request = make_request({"X-API-Key": api_key})
+
+        # Act
+        with patch(
+            "app.services.rate_limit_policy_service.hash_api_key", side_effect=hash_api_key
+        ) as digest:
+            first = await policy_service.resolve(request)
+            second = await policy_service.resolve(request)
+
+        # Assert
+        assert first == second
+        assert first.client_key == f"api:{entry.client_id}"
+        assert first.limit_per_minute == 120
+        digest.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_digest_match_skips_bcrypt(self, policy_service):
+        """Test that keys stored as digests never reach the bcrypt check."""
+        # Arrange
+        api_key = "pk_abcdefghijklmnop"
+        legacy = _APIClientEntry(uuid4(), "$2b$12$legacy", "free", 60, 10000)
+        current = _APIClientEntry(uuid4(), hash_api_key(api_key), "premium", 120, 50000)
+        policy_service._api_clients_by_prefix = {"pk_abcde": [legacy, current]}
+
+        # Act
+        with patch("app.services.rate_limit_policy_service.verify_api_key") as verify:
+            policy = await policy_service.resolve(make_request({"X-API-Key": api_key}))
+
+        # Assert
+        assert policy.client_key == f"api:{current.client_id}"
+        verify.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.rate_limit_policy_service.AsyncSessionLocal")
+    async def test_legacy_bcrypt_key_is_migrated(self, mock_session_local, policy_service):
+        """Test that a bcrypt-hashed key is replaced by its digest on first use."""
+        # Arrange
+        api_key = "pk_abcdefghijklmnop"
+        db = AsyncMock()
+        mock_session_local.return_value.__aenter__ = AsyncMock(return_value=db)
+        mock_session_local.return_value.__aexit__ = AsyncMock(return_value=False)
+        legacy = _APIClientEntry(uuid4(), "$2b$12$legacy", "premium", 120, 50000)
+        policy_service._api_clients_by_prefix = {"pk_abcde": [legacy]}
+
+        # Act
+        with patch(
+            "app.services.rate_limit_policy_service.verify_api_key", return_value=True
+        ):
+            policy = await policy_service.resolve(make_request({"X-API-Key": api_key}))
+
+        # Assert
+        assert policy.client_key == f"api:{legacy.client_id}"
+        db.execute.assert_awaited_once()
+        db.commit.assert_awaited_once()
+        migrated = policy_service._api_clients_by_prefix["pk_abcde"][0]
+        assert migrated.api_key_hash == hash_api_key(api_key)
+
+    @pytest.mark.asyncio
+    async def test_unknown_api_key_falls_back_without_hash_checks(self, policy_service):
+        """Test that keys with an unknown prefix never reach the hash check."""
+        with patch("app.services.rate_limit_policy_service.verify_api_key") as verify:
+            policy = await policy_service.resolve(make_request({"X-API-Key": "pk_unknown_key"}))
+
+        assert policy.plan == "anonymous"
+        verify.assert_not_called()
+
+
+class TestInvalidation:
+    """Test API client invalidation across workers."""
+
+    @pytest.mark.asyncio
+    async def test_invalidation_is_broadcast(self, policy_service):
+        """Test that a client change reloads locally and notifies other workers."""
+        # Arrange
+        client_id = uuid4()
+        policy_service.redis = MagicMock()
+        policy_service.redis.publish = AsyncMock()
+        policy_service.refresh = AsyncMock(return_value=True)
+
+        # Act
+        await policy_service.invalidate_api_client(client_id)
+
+        # Assert
+        policy_service.refresh.assert_awaited_once()
+        policy_service.redis.publish.assert_awaited_once_with(
+            "rate_limit_policy:invalidate", f'{{"client_id": "{client_id}"}}'
+        )
+
+    @pytest.mark.asyncio
+    async def test_remote_invalidation_drops_cached_keys(self, policy_service):
+        """Test that a broadcast from another worker clears verified keys and reloads."""
+        # Arrange
+        policy_service.refresh = AsyncMock(return_value=True)
+        policy_service._api_keys.set("digest", None)
+
+        # Act
+        await policy_service._handle_message(f'{{"client_id": "{uuid4()}"}}')
+
+        # Assert
+        assert policy_service._api_keys.get("digest", "missing") == "missing"
+        policy_service.refresh.assert_awaited_once()
@@ -0,0 +1,289 @@
+"""Unit tests for the Redis rate limiter service."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.services.rate_limit_policy_service import plan_limits
+from app.services.rate_limiter_service import HybridRateLimiter, RateLimiterService
+
+
+@pytest.fixture
+def limiter():
+    """Create a rate limiter with a mocked Redis client and GCRA script."""
+    client = MagicMock()
+    client.register_script.return_value = AsyncMock()
+    client.delete = AsyncMock()
+    with patch("app.services.rate_limiter_service.redis.from_url", return_value=client):
+        service = RateLimiterService()
+    return service
+
+
+def make_info(remaining_minute: int, remaining_day: int = 10000) -> dict:
+    """Build rate limit info as returned by RateLimiterService."""
+    return RateLimiterService._build_info(60, 10000, remaining_minute, remaining_day, 0, 1000, 1000)
+
+
+class FakeGCRA:
+    """In-memory GCRA over both windows, driven by a fake clock."""
+
+    def __init__(self, clock: list[float]):
+        """Initialize with a one-element list holding the current time in seconds."""
+        self.clock = clock
+        self.tats = [0.0, 0.0]
+
+    async def check_rate_limit(self, client_id, limit_per_minute, limit_per_day, cost=1):
+        """Check and reserve cost requests like the Lua script."""
+        now = self.clock[0]
+        windows = []
+        for tat, limit, period in zip(self.tats, (limit_per_minute, limit_per_day), (60.0, 86400.0)):
+            interval = period / limit
+            tat = max(tat, now)
+            windows.append((tat, tat + cost * interval, interval, period))
+        allowed = all(new_tat - period <= now for _, new_tat, _, period in windows)
+        if allowed:
+            self.tats = [new_tat for _, new_tat, _, _ in windows]
+        remaining = [
+            int((period - ((new_tat if allowed else tat) - now)) / interval)
+            for tat, new_tat, interval, period in windows
+        ]
+        return allowed, RateLimiterService._build_info(
+            limit_per_minute, limit_per_day, remaining[0], remaining[1], 0, 0, 0
+        )
+
+
+@pytest.fixture
+def hybrid():
+    """Create a hybrid limiter over a mocked Redis rate limiter."""
+    service = MagicMock()
+    service.check_rate_limit = AsyncMock(return_value=(True, make_info(50)))
+    service.reset_limits = AsyncMock()
+    return HybridRateLimiter(
+        service=service,
+        max_lease=8,
+        lease_fraction=0.5,
+        lease_ttl_seconds=60.0,
+        max_clients=2,
+    )
+
+
+class TestCheckRateLimit:
+    """Test the single-call rate limit check."""
+
+    @pytest.mark.asyncio
+    async def test_allowed_request_uses_one_script_call(self, limiter):
+        """Test that both windows are checked with a single EVALSHA."""
+        # Arrange
+        client_id = uuid4()
+        limiter._gcra_script.return_value = [1, 59, 9999, 0, 1000, 8640]
+
+        # Act
+        is_allowed, info = await limiter.check_rate_limit(client_id, 60, 10000)
+
+        # Assert
+        assert is_allowed is True
+        limiter._gcra_script.assert_awaited_once_with(
+            keys=[f"rate_limit:{{{client_id}}}:minute", f"rate_limit:{{{client_id}}}:day"],
+            args=[60, 10000, 1],
+        )
+        assert info["remaining_per_minute"] == 59
+        assert info["remaining_per_day"] == 9999
+        assert info["used_per_minute"] == 1
+        assert info["reset_minute"] == 1
+        assert info["reset_day"] == 9
+        assert info["retry_after"] == 0
+
+    @pytest.mark.asyncio
+    async def test_denied_request_reports_retry_after(self, limiter):
+        """Test that a denied request carries the wait until the next slot."""
+        # Arrange
+        limiter._gcra_script.return_value = [0, 0, 9940, 1500, 60000, 518400]
+
+        # Act
+        is_allowed, info = await limiter.check_rate_limit(uuid4(), 60, 10000)
+
+        # Assert
+        assert is_allowed is False
+        assert info["remaining_per_minute"] == 0
+        assert info["used_per_minute"] == 60
+        assert info["retry_after"] == 2
+        assert info["reset_minute"] == 60
+
+    @pytest.mark.asyncio
+    async def test_zero_limit_denies_without_redis(self, limiter):
+        """Test that a zero limit denies without calling the script."""
+        is_allowed, info = await limiter.check_rate_limit(uuid4(), 0, 10000)
+
+        assert is_allowed is False
+        assert info["retry_after"] == 60
+        limiter._gcra_script.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_redis_error_fails_open(self, limiter):
+        """Test that Redis errors allow the request."""
+        # Arrange
+        limiter._gcra_script.side_effect = ConnectionError("redis down")
+
+        # Act
+        is_allowed, info = await limiter.check_rate_limit(uuid4(), 60, 10000)
+
+        # Assert
+        assert is_allowed is True
+        assert info["remaining_per_minute"] == 60
+
+
+class TestUsage:
+    """Test usage inspection and admin reset."""
+
+    @pytest.mark.asyncio
+    async def test_current_usage_does_not_consume_quota(self, limiter):
+        """Test that usage is read with a zero-cost script call."""
+        # Arrange
+        limiter._gcra_script.return_value = [1, 50, 9900, 0, 10000, 864000]
+
+        # Act
+        usage = await limiter.get_current_usage(uuid4(), 60, 10000)
+
+        # Assert
+        assert usage["requests_this_minute"] == 10
+        assert usage["requests_today"] == 100
+        assert limiter._gcra_script.await_args.kwargs["args"] == [60, 10000, 0]
+
+    @pytest.mark.asyncio
+    async def test_reset_deletes_both_windows(self, limiter):
+        """Test that reset clears the minute and day state."""
+        client_id = uuid4()
+
+        await limiter.reset_limits(client_id)
+
+        limiter.redis.delete.assert_awaited_once_with(
+            f"rate_limit:{{{client_id}}}:minute", f"rate_limit:{{{client_id}}}:day"
+        )
+
+
+class TestHybridRateLimiter:
+    """Test local token leases in front of Redis."""
+
+    @pytest.mark.asyncio
+    async def test_busy_client_is_served_from_growing_leases(self, hybrid):
+        """Test that lease sizes double and most checks skip Redis."""
+        # Arrange
+        client_id = uuid4()
+
+        # Act
+        results = [await hybrid.check_rate_limit(client_id, 60, 10000) for _ in range(15)]
+
+        # Assert
+        assert all(is_allowed for is_allowed, _ in results)
+        costs = [call.kwargs.get("cost", 1) for call in hybrid.service.check_rate_limit.await_args_list]
+        assert costs == [1, 2, 4, 8]
+        assert hybrid.local_checks == 11
+        assert hybrid.redis_checks == 4
+
+    @pytest.mark.asyncio
+    async def test_local_info_counts_leased_tokens_as_remaining(self, hybrid):
+        """Test that reported remaining quota includes unused local tokens."""
+        # Arrange
+        client_id = uuid4()
+        await hybrid.check_rate_limit(client_id, 60, 10000)
+
+        # Act
+        _, info = await hybrid.check_rate_limit(client_id, 60, 10000)
+
+        # Assert
+        assert info["remaining_per_minute"] == 51
+
+    @pytest.mark.asyncio
+    async def test_near_limit_checks_every_request_exactly(self, hybrid):
+        """Test that leases collapse to single checks when quota is low."""
+        # Arrange
+        client_id = uuid4()
+        hybrid.service.check_rate_limit.return_value = (True, make_info(1))
+
+        # Act
+        for _ in range(4):
+            await hybrid.check_rate_limit(client_id, 60, 10000)
+
+        # Assert
+        costs = [call.kwargs.get("cost", 1) for call in hybrid.service.check_rate_limit.await_args_list]
+        assert costs == [1, 1, 1, 1]
+        assert hybrid.local_checks == 0
+
+    @pytest.mark.asyncio
+    async def test_denied_lease_falls_back_to_exact_check(self, hybrid):
+        """Test that a lease Redis can't grant is retried as one request."""
+        # Arrange
+        client_id = uuid4()
+        await hybrid.check_rate_limit(client_id, 60, 10000)
+        hybrid.service.check_rate_limit.side_effect = [
+            (False, make_info(1)),
+            (True, make_info(0)),
+        ]
+
+        # Act
+        is_allowed, info = await hybrid.check_rate_limit(client_id, 60, 10000)
+
+        # Assert
+        assert is_allowed is True
+        assert info["remaining_per_minute"] == 0
+        costs = [call.kwargs.get("cost", 1) for call in hybrid.service.check_rate_limit.await_args_list]
+        assert costs == [1, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_denied_request_is_not_cached(self, hybrid):
+        """Test that denials always go back to Redis."""
+        # Arrange
+        client_id = uuid4()
+        hybrid.service.check_rate_limit.return_value = (False, make_info(0))
+
+        # Act
+        first, _ = await hybrid.check_rate_limit(client_id, 60, 10000)
+        second, _ = await hybrid.check_rate_limit(client_id, 60, 10000)
+
+        # Assert
+        assert first is False and second is False
+        assert hybrid.service.check_rate_limit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_reset_drops_local_lease(self, hybrid):
+        """Test that an admin reset discards leased tokens."""
+        # Arrange
+        client_id = uuid4()
+        await hybrid.check_rate_limit(client_id, 60, 10000)
+        await hybrid.check_rate_limit(client_id, 60, 10000)
+
+        # Act
+        await hybrid.reset_limits(client_id)
+
+        # Assert
+        assert not hybrid._leases
+        hybrid.service.reset_limits.assert_awaited_once_with(client_id)
+
+    @pytest.mark.asyncio
+    async def test_lease_table_is_bounded(self, hybrid):
+        """Test that the least recently used clients are evicted."""
+        for _ in range(3):
+            await hybrid.check_rate_limit(uuid4(), 60, 10000)
+
+        assert len(hybrid._leases) == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("plan", ["anonymous", "free"])
+    async def test_low_rate_tiers_are_served_locally(self, plan):
+        """Test that default settings serve most requests of 5-10 rpm tiers from leases."""
+        # Arrange
+        limit_per_minute, limit_per_day = plan_limits(plan)
+        clock = [1000.0]
+        hybrid = HybridRateLimiter(service=FakeGCRA(clock))
+        client_id = uuid4()
+
+        # Act: ten minutes of requests at the tier's limit
+        results = []
+        with patch("app.services.rate_limiter_service.time.monotonic", side_effect=lambda: clock[0]):
+            for _ in range(limit_per_minute * 10):
+                results.append(await hybrid.check_rate_limit(client_id, limit_per_minute, limit_per_day))
+                clock[0] += 60 / limit_per_minute
+
+        # Assert
+        assert all(is_allowed for is_allowed, _ in results)
+        assert hybrid.local_checks > 2 * hybrid.redis_checks
@@ -2,14 +2,25 @@
 
 import pytest
 from datetime import datetime, timedelta
+from unittest.mock import patch
+from uuid import uuid4
 from jose import jwt
+from passlib.hash import bcrypt
 
 from app.core.security import (
     hash_password,
+    hash_password_async,
+    pwd_context,
+    verify_and_update_password,
     verify_password,
     create_access_token,
     create_refresh_token,
     decode_token,
+    get_token_identity,
+    hash_api_key,
+    is_legacy_api_key_hash,
+    verify_api_key,
+    TOKEN_VERSION_CLAIM,
 )
 from jose import JWTError
 from app.core.config import settings
@@ -71,6 +82,40 @@ class TestPasswordHashing:
         assert verify_password(password, hashed) is True
 
 
+class TestAsyncPasswordHashing:
+    """Test suite for password hashing on the password executor."""
+
+    @pytest.mark.asyncio
+    async def test_hash_password_async_verifies(self):
+        """Test hash_password_async produces a verifiable hash."""
+        hashed = await hash_password_async("TestPassword123!")
+
+        assert await verify_and_update_password("TestPassword123!", hashed) == (True, None)
+
+    @pytest.mark.asyncio
+    async def test_wrong_password_is_not_rehashed(self):
+        """Test a wrong password neither verifies nor returns a new hash."""
+        hashed = hash_password("TestPassword123!")
+
+        assert await verify_and_update_password("WrongPassword", hashed) == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_hash_with_other_rounds_is_rehashed(self):
+        """Test a hash made with other cost parameters is replaced on login."""
+        # Arrange
+        rounds = settings.password_bcrypt_rounds - 1
+        old_hash = bcrypt.using(rounds=rounds).hash("TestPassword123!")
+
+        # Act
+        valid, new_hash = await verify_and_update_password("TestPassword123!", old_hash)
+
+        # Assert
+        assert valid is True
+        assert new_hash is not None
+        assert not pwd_context.needs_update(new_hash)
+        assert verify_password("TestPassword123!", new_hash)
+
+
 class TestJWTTokens:
     """Test suite for JWT token functions."""
 
@@ -184,6 +229,52 @@ class TestJWTTokens:
         assert access_payload["type"] == "access"
         assert refresh_payload["type"] == "refresh"
 
+    def test_token_identity_includes_version(self):
+        """Test the user ID and token version are read from the claims."""
+        user_id = uuid4()
+        token = create_access_token(user_id, {TOKEN_VERSION_CLAIM: 3})
+
+        assert get_token_identity(token) == (user_id, 3)
+
+    def test_token_without_version_is_version_zero(self):
+        """Test tokens issued before versioning are version 0."""
+        user_id = uuid4()
+        token = create_access_token(user_id)
+
+        assert get_token_identity(token) == (user_id, 0)
+
+
+class TestAPIKeyHashing:
+    """Test suite for API key digests."""
+
+    def test_hash_api_key_is_deterministic(self):
+        """Test the same key always has the same digest (lookup by digest)."""
+        assert hash_api_key("pk_test_key") == hash_api_key("pk_test_key")
+        assert hash_api_key("pk_test_key") != hash_api_key("pk_other_key")
+        assert not is_legacy_api_key_hash(hash_api_key("pk_test_key"))
+
+    def test_digest_depends_on_pepper(self):
+        """Test a leaked digest can't be checked without the pepper."""
+        digest = hash_api_key("pk_test_key")
+
+        with patch.object(settings, "api_key_pepper", "another-pepper"):
+            assert hash_api_key("pk_test_key") != digest
+
+    def test_verify_api_key_digest(self):
+        """Test verification against a digest."""
+        digest = hash_api_key("pk_test_key")
+
+        assert verify_api_key("pk_test_key", digest) is True
+        assert verify_api_key("pk_wrong_key", digest) is False
+
+    def test_verify_api_key_legacy_bcrypt(self):
+        """Test keys hashed with bcrypt still verify until migrated."""
+        legacy_hash = hash_password("pk_test_key")
+
+        assert is_legacy_api_key_hash(legacy_hash)
+        assert verify_api_key("pk_test_key", legacy_hash) is True
+        assert verify_api_key("pk_wrong_key", legacy_hash) is False
+
 
 class TestPasswordStrength:
     """Test suite for password strength validation."""
@@ -0,0 +1,133 @@
+"""Unit tests for in-flight request coalescing."""
+
+import asyncio
+import pytest
+
+from app.core.singleflight import SingleFlight, StreamFanout
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent awaitables."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that only the first caller runs the factory."""
+        # Arrange
+        group = SingleFlight(name="test")
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        # Act
+        results = await asyncio.gather(*[group.do("key", factory) for _ in range(5)])
+
+        # Assert
+        assert calls == 1
+        assert [result for result, _ in results] == ["answer"] * 5
+        assert [shared for _, shared in results].count(False) == 1
+        assert group.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test that a failed call fails all joined callers."""
+        group = SingleFlight(name="test")
+
+        async def factory():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            group.do("key", factory), group.do("key", factory), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_doesnt_cancel_others(self):
+        """Test that the shared call survives while someone still waits."""
+        # Arrange
+        group = SingleFlight(name="test")
+
+        async def factory():
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        first = asyncio.create_task(group.do("key", factory))
+        second = asyncio.create_task(group.do("key", factory))
+        await asyncio.sleep(0)
+
+        # Act
+        first.cancel()
+
+        # Assert
+        assert await second == ("answer", True)
+
+    @pytest.mark.asyncio
+    async def test_upstream_cancelled_when_all_callers_leave(self):
+        """Test that abandoned calls are cancelled and forgotten."""
+        group = SingleFlight(name="test")
+        cancelled = asyncio.Event()
+
+        async def factory():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        caller = asyncio.create_task(group.do("key", factory))
+        await asyncio.sleep(0)
+        caller.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert group.in_flight == 0
+
+
+class TestStreamFanout:
+    """Test fan-out of a shared stream."""
+
+    @pytest.mark.asyncio
+    async def test_subscribers_receive_full_stream(self):
+        """Test that early and late subscribers both get every item once."""
+        # Arrange
+        fanout = StreamFanout(name="test")
+        started = 0
+
+        async def source():
+            nonlocal started
+            started += 1
+            for item in range(3):
+                await asyncio.sleep(0.01)
+                yield item
+
+        async def consume(delay):
+            await asyncio.sleep(delay)
+            return [item async for item in fanout.subscribe("key", source)]
+
+        # Act - the second subscriber joins after the first item was produced
+        results = await asyncio.gather(consume(0), consume(0.015))
+
+        # Assert
+        assert started == 1
+        assert results == [[0, 1, 2], [0, 1, 2]]
+        assert fanout.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_error_reaches_subscribers(self):
+        """Test that an upstream error is raised to every subscriber."""
+        fanout = StreamFanout(name="test")
+
+        async def source():
+            yield 1
+            raise RuntimeError("stream broke")
+
+        async def consume():
+            return [item async for item in fanout.subscribe("key", source)]
+
+        results = await asyncio.gather(consume(), consume(), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
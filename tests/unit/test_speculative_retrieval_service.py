@@ -0,0 +1,192 @@
+"""Unit tests for speculative retrieval in the chat pipeline."""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.speculative_retrieval_service import (
+    SpeculativeRetrievalService,
+    build_context,
+    format_chunks,
+)
+
+MODULE = 'app.services.speculative_retrieval_service'
+
+
+def delayed(value, delay):
+    """Create an async function returning value after delay seconds."""
+    async def func(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return value
+    return func
+
+
+@pytest.fixture
+def search_results():
+    """Raw search results from DocumentService."""
+    return [
+        {"chunk_text": "Khums is one fifth...", "document_id": "doc-1", "score": 0.91, "chunk_index": 0},
+    ]
+
+
+class TestSpeculativeRetrieval:
+    """Test concurrent cache probe, classification and retrieval."""
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.DocumentService')
+    @patch(f'{MODULE}.response_cache_service')
+    @patch(f'{MODULE}.embeddings_service')
+    async def test_cache_miss_costs_only_the_slowest_stage(
+        self, mock_embeddings, mock_cache, mock_document_service, search_results
+    ):
+        """Test that stages overlap and the embedding is computed once."""
+        # Arrange
+        embedding = [0.1, 0.2]
+        mock_embeddings.embed_text = AsyncMock(side_effect=delayed(embedding, 0.1))
+        mock_cache.get_cached_response = AsyncMock(side_effect=delayed(None, 0.1))
+        search = AsyncMock(side_effect=delayed(search_results, 0.1))
+        mock_document_service.return_value.search_similar_chunks = search
+        service = SpeculativeRetrievalService()
+
+        # Act
+        start = time.perf_counter()
+        result = await service.run(
+            query="What is Khums?",
+            classify=delayed({"requires_rag": True}, 0.2),
+            requires_retrieval=lambda c: c["requires_rag"],
+            db=MagicMock(),
+        )
+        elapsed = time.perf_counter() - start
+
+        # Assert - embedding (0.1) + max(cache, retrieval) (0.1) overlaps intent (0.2)
+        assert elapsed < 0.35
+        assert not result.cache_hit
+        assert result.retrieval_attempted
+        assert result.chunks == format_chunks(search_results)
+        mock_embeddings.embed_text.assert_called_once()
+        assert mock_cache.get_cached_response.call_args[1]["query_embedding"] == embedding
+        assert search.call_args[1]["query_embedding"] == embedding
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.DocumentService')
+    @patch(f'{MODULE}.response_cache_service')
+    @patch(f'{MODULE}.embeddings_service')
+    async def test_cache_hit_cancels_other_branches(
+        self, mock_embeddings, mock_cache, mock_document_service
+    ):
+        """Test that a cache hit returns without waiting for classification or retrieval."""
+        # Arrange
+        cached = MagicMock(response="Cached answer")
+        mock_embeddings.embed_text = AsyncMock(return_value=[0.1])
+        mock_cache.get_cached_response = AsyncMock(return_value=cached)
+        mock_document_service.return_value.search_similar_chunks = AsyncMock(
+            side_effect=delayed([], 10)
+        )
+        service = SpeculativeRetrievalService()
+
+        # Act
+        result = await asyncio.wait_for(
+            service.run(
+                query="What is Salat?",
+                classify=delayed({"requires_rag": True}, 10),
+                requires_retrieval=lambda c: c["requires_rag"],
+                db=MagicMock(),
+            ),
+            timeout=1,
+        )
+
+        # Assert
+        assert result.cached_response is cached
+        assert result.classification is None
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.DocumentService')
+    @patch(f'{MODULE}.response_cache_service')
+    @patch(f'{MODULE}.embeddings_service')
+    async def test_intent_without_rag_skips_retrieval(
+        self, mock_embeddings, mock_cache, mock_document_service
+    ):
+        """Test that retrieval is cancelled when the intent doesn't need RAG."""
+        # Arrange
+        mock_embeddings.embed_text = AsyncMock(return_value=[0.1])
+        mock_cache.get_cached_response = AsyncMock(return_value=None)
+        mock_document_service.return_value.search_similar_chunks = AsyncMock(
+            side_effect=delayed([], 10)
+        )
+        service = SpeculativeRetrievalService()
+
+        # Act
+        result = await asyncio.wait_for(
+            service.run(
+                query="Draw a mosque",
+                classify=delayed({"requires_rag": False}, 0),
+                requires_retrieval=lambda c: c["requires_rag"],
+                db=MagicMock(),
+            ),
+            timeout=1,
+        )
+
+        # Assert
+        assert not result.retrieval_attempted
+        assert result.chunks == []
+        assert result.classification == {"requires_rag": False}
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.response_cache_service')
+    @patch(f'{MODULE}.embeddings_service')
+    async def test_embedding_failure_fails_open(self, mock_embeddings, mock_cache):
+        """Test that an embedding error doesn't fail the turn."""
+        # Arrange
+        mock_embeddings.embed_text = AsyncMock(side_effect=RuntimeError("quota"))
+        mock_cache.get_cached_response = AsyncMock(return_value=None)
+        service = SpeculativeRetrievalService()
+
+        # Act
+        result = await service.run(
+            query="Salam",
+            classify=delayed({"requires_rag": False}, 0),
+            requires_retrieval=lambda c: c["requires_rag"],
+        )
+
+        # Assert
+        assert result.classification == {"requires_rag": False}
+        assert mock_cache.get_cached_response.call_args[1]["query_embedding"] is None
+
+    @pytest.mark.asyncio
+    @patch(f'{MODULE}.response_cache_service')
+    @patch(f'{MODULE}.embeddings_service')
+    async def test_refinement_reuses_shared_embedding(self, mock_embeddings, mock_cache):
+        """Test that the second classification stage gets the pipeline's embedding."""
+        # Arrange
+        embedding = [0.1, 0.2]
+        mock_embeddings.embed_text = AsyncMock(return_value=embedding)
+        mock_cache.get_cached_response = AsyncMock(return_value=None)
+        service = SpeculativeRetrievalService()
+
+        async def refine(classification, get_embedding):
+            return {**classification, "embedding": await get_embedding()}
+
+        # Act
+        result = await service.run(
+            query="Draw a mosque",
+            classify=delayed({"requires_rag": False}, 0),
+            requires_retrieval=lambda c: c["requires_rag"],
+            refine_classification=refine,
+        )
+
+        # Assert
+        assert result.classification == {"requires_rag": False, "embedding": embedding}
+        mock_embeddings.embed_text.assert_called_once()
+
+
+
+class TestContextFormatting:
+    """Test prompt context formatting."""
+
+    def test_build_context_includes_sources(self, search_results):
+        """Test that the context cites source and relevance."""
+        context = build_context(format_chunks(search_results))
+
+        assert "Source: doc-1 (Relevance: 91.00%)" in context
+        assert "Khums is one fifth..." in context
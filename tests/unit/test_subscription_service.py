@@ -5,8 +5,19 @@ from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
-from app.services.subscription_service import SubscriptionService
+from sqlalchemy.dialects import postgresql
+
+from app.services.subscription_service import SubscriptionService, UsageIncrement
 from app.models.subscription import Subscription, PlanLimit, MonthlyUsageQuota
+from app.services.plan_cache_service import plan_cache_service
+
+
+@pytest.fixture(autouse=True)
+def clear_plan_cache():
+    """Start every test with empty plan and subscription caches."""
+    plan_cache_service.clear()
+    yield
+    plan_cache_service.clear()
 
 
 class TestCreateSubscription:
@@ -141,18 +152,19 @@ class TestUsageTracking:
     """Test usage tracking functionality."""
 
     @pytest.mark.asyncio
-    async def test_track_usage_new_quota(self):
-        """Test tracking usage creates new quota."""
+    async def test_track_usage_is_single_upsert(self):
+        """Test tracking usage runs one INSERT ... ON CONFLICT DO UPDATE."""
+        # Arrange
         service = SubscriptionService()
         user_id = uuid4()
 
         mock_db = AsyncMock()
+        updated_quota = MagicMock(messages_used=11, tokens_used=1100)
+        mock_result = MagicMock()
+        mock_result.scalar_one.return_value = updated_quota
+        mock_db.execute.return_value = mock_result
 
-        # Mock no existing quota
-        mock_quota_result = MagicMock()
-        mock_quota_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_quota_result
-
+        # Act
         quota = await service.track_usage(
             user_id=user_id,
             db=mock_db,
@@ -162,46 +174,87 @@ class TestUsageTracking:
             cache_savings_usd=0.0005,
         )
 
-        # Verify new quota was added
-        mock_db.add.assert_called_once()
+        # Assert
+        assert quota is updated_quota
+        mock_db.execute.assert_called_once()
+        sql = str(mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (user_id, month_year) DO UPDATE" in sql
+        assert "messages_used = (monthly_usage_quotas.messages_used + excluded.messages_used)" in sql
+        assert "RETURNING" in sql
+        mock_db.add.assert_not_called()
+        mock_db.refresh.assert_not_called()
         mock_db.commit.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_track_usage_existing_quota(self):
-        """Test tracking usage updates existing quota."""
+    async def test_track_usage_without_commit(self):
+        """Test tracking usage inside a caller's transaction."""
         service = SubscriptionService()
-        user_id = uuid4()
-        month_year = datetime.utcnow().strftime("%Y-%m")
+        mock_db = AsyncMock()
+        mock_db.execute.return_value = MagicMock()
+
+        await service.track_usage(user_id=uuid4(), db=mock_db, messages=1, commit=False)
 
+        mock_db.execute.assert_called_once()
+        mock_db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_track_usage_batch_sums_rows_per_user_month(self):
+        """Test the batched variant aggregates before upserting."""
+        # Arrange
+        service = SubscriptionService()
+        user_a, user_b = uuid4(), uuid4()
+        month_year = datetime.utcnow().strftime("%Y-%m")
         mock_db = AsyncMock()
 
-        # Mock existing quota
-        mock_quota_result = MagicMock()
-        existing_quota = MagicMock()
-        existing_quota.messages_used = 10
-        existing_quota.tokens_used = 1000
-        existing_quota.images_generated = 2
-        existing_quota.documents_processed = 1
-        existing_quota.audio_minutes_used = 5
-        existing_quota.total_cost_usd = 0.05
-        existing_quota.cache_savings_usd = 0.01
-        mock_quota_result.scalar_one_or_none.return_value = existing_quota
-        mock_db.execute.return_value = mock_quota_result
+        increments = [
+            UsageIncrement(user_id=user_a, messages=1, tokens=100),
+            UsageIncrement(user_id=user_b, messages=2, tokens=50),
+            UsageIncrement(user_id=user_a, messages=1, tokens=20, cost_usd=0.01),
+            UsageIncrement(user_id=user_a, messages=5, month_year="2000-01"),
+        ]
 
-        quota = await service.track_usage(
-            user_id=user_id,
-            db=mock_db,
-            messages=1,
-            tokens=100,
-            images=1,
-            cost_usd=0.002,
-            cache_savings_usd=0.001,
-        )
+        # Act
+        rows = await service.track_usage_batch(increments, db=mock_db)
+
+        # Assert
+        assert rows == 3
+        mock_db.execute.assert_called_once()
+        params = mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect()).params
+        totals = {
+            (params[f"user_id_m{i}"], params[f"month_year_m{i}"]): params[f"messages_used_m{i}"]
+            for i in range(rows)
+        }
+        assert totals == {
+            (user_a, month_year): 2,
+            (user_b, month_year): 2,
+            (user_a, "2000-01"): 5,
+        }
+        mock_db.commit.assert_called_once()
 
-        # Verify quota was updated (not added)
-        mock_db.add.assert_not_called()
+    @pytest.mark.asyncio
+    async def test_track_usage_batch_chunks_statements(self):
+        """Test large batches are split into several statements."""
+        service = SubscriptionService()
+        mock_db = AsyncMock()
+        increments = [UsageIncrement(user_id=uuid4(), messages=1) for _ in range(5)]
+
+        rows = await service.track_usage_batch(increments, db=mock_db, chunk_size=2)
+
+        assert rows == 5
+        assert mock_db.execute.call_count == 3
         mock_db.commit.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_track_usage_batch_empty(self):
+        """Test that an empty batch does nothing."""
+        service = SubscriptionService()
+        mock_db = AsyncMock()
+
+        assert await service.track_usage_batch([], db=mock_db) == 0
+
+        mock_db.execute.assert_not_called()
+        mock_db.commit.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_check_usage_limits(self):
         """Test checking usage against limits."""
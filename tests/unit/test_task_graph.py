@@ -0,0 +1,149 @@
+"""Unit tests for the async task-graph executor."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.task_graph import TaskGraph, TaskGraphError
+
+
+class TestTaskGraphExecution:
+    """Test step scheduling and results."""
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self):
+        """Test that independent steps overlap instead of running in sequence."""
+        graph = TaskGraph(name="test")
+
+        async def slow(value):
+            await asyncio.sleep(0.1)
+            return value
+
+        graph.add("a", lambda: slow("a"))
+        graph.add("b", lambda: slow("b"))
+        graph.add("c", lambda: slow("c"))
+
+        start = time.perf_counter()
+        graph.start()
+        results = await graph.wait_all()
+        elapsed = time.perf_counter() - start
+
+        assert results == {"a": "a", "b": "b", "c": "c"}
+        assert elapsed < 0.25
+
+    @pytest.mark.asyncio
+    async def test_dependency_results_are_passed(self):
+        """Test that dependent steps receive dependency results as kwargs."""
+        graph = TaskGraph(name="test")
+
+        async def load():
+            return [1, 2, 3]
+
+        async def total(history):
+            return sum(history)
+
+        graph.add("history", load)
+        graph.add("total", total, depends_on=("history",))
+        graph.start()
+
+        assert await graph.result("total") == 6
+
+    @pytest.mark.asyncio
+    async def test_completion_callback_fires(self):
+        """Test that on_complete receives each result as it finishes."""
+        graph = TaskGraph(name="test")
+        merged = {}
+
+        async def value():
+            return "done"
+
+        graph.add("step", value, on_complete=lambda name, result: merged.update({name: result}))
+        await graph.wait_all()
+
+        assert merged == {"step": "done"}
+
+    def test_unknown_dependency_rejected(self):
+        """Test that depending on an unknown step is rejected."""
+        graph = TaskGraph(name="test")
+
+        async def noop():
+            return None
+
+        with pytest.raises(TaskGraphError):
+            graph.add("step", noop, depends_on=("missing",))
+
+
+class TestTaskGraphFailures:
+    """Test timeouts and failure handling."""
+
+    @pytest.mark.asyncio
+    async def test_optional_step_timeout_is_swallowed(self):
+        """Test that an optional step that times out does not fail the graph."""
+        graph = TaskGraph(name="test")
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "ok"
+
+        graph.add("hang", hang, timeout_seconds=0.05, required=False)
+        graph.add("fast", fast)
+
+        results = await graph.wait_all()
+
+        assert results == {"fast": "ok"}
+        assert isinstance(graph.errors["hang"], asyncio.TimeoutError)
+
+    @pytest.mark.asyncio
+    async def test_required_step_failure_raises(self):
+        """Test that a failing required step propagates its error."""
+        graph = TaskGraph(name="test")
+
+        async def boom():
+            raise ValueError("boom")
+
+        graph.add("boom", boom)
+        graph.start()
+
+        with pytest.raises(ValueError, match="boom"):
+            await graph.result("boom")
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_pending_steps(self):
+        """Test that cancel() stops steps that have not finished."""
+        graph = TaskGraph(name="test")
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        graph.add("hang", hang, required=False)
+        graph.start()
+        await asyncio.sleep(0)
+        graph.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await graph.result("hang")
+
+    @pytest.mark.asyncio
+    async def test_cancel_named_steps_only(self):
+        """Test that cancel() with names leaves other steps running."""
+        graph = TaskGraph(name="test")
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def fast():
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        graph.add("hang", hang, required=False)
+        graph.add("fast", fast)
+        graph.start()
+        await asyncio.sleep(0)
+        graph.cancel("hang")
+
+        assert await graph.result("fast") == "ok"
+        with pytest.raises(asyncio.CancelledError):
+            await graph.result("hang")
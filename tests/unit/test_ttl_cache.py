@@ -0,0 +1,80 @@
+"""Unit tests for the in-process TTL cache."""
+
+from unittest.mock import patch
+
+from app.utils.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    """Test expiration and LRU eviction."""
+
+    def test_get_returns_cached_value(self):
+        """Test a basic set/get round trip."""
+        cache = TTLCache(maxsize=10, ttl_seconds=60)
+
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert "key" in cache
+        assert len(cache) == 1
+
+    def test_entries_expire(self):
+        """Test that expired entries are treated as missing."""
+        # Arrange
+        cache = TTLCache(maxsize=10, ttl_seconds=60)
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+
+        # Act & Assert
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=159.0):
+            assert cache.get("key") == "value"
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=160.0):
+            assert cache.get("key", "default") == "default"
+        assert len(cache) == 0
+
+    def test_per_entry_ttl(self):
+        """Test overriding the TTL for one entry."""
+        cache = TTLCache(maxsize=10, ttl_seconds=60)
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=0.0):
+            cache.set("short", 1, ttl_seconds=5)
+
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=10.0):
+            assert cache.get("short") is None
+
+    def test_cached_none_is_distinguishable(self):
+        """Test that None can be cached (e.g. negative lookups)."""
+        cache = TTLCache(maxsize=10, ttl_seconds=60)
+        missing = object()
+
+        cache.set("unknown", None)
+
+        assert cache.get("unknown", missing) is None
+        assert cache.get("other", missing) is missing
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test LRU eviction when the cache is full."""
+        # Arrange
+        cache = TTLCache(maxsize=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        # Act
+        cache.set("c", 3)
+
+        # Assert
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_pop_and_clear(self):
+        """Test explicit invalidation."""
+        cache = TTLCache(maxsize=10, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert cache.pop("a") == 1
+        assert cache.pop("a") is None
+
+        cache.clear()
+        assert len(cache) == 0
@@ -0,0 +1,369 @@
+"""Unit tests for the Redis-backed usage quota service."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.services.plan_cache_service import CachedPlanLimit
+from app.services.usage_quota_service import DIRTY_KEY, QuotaUnavailableError, UsageQuotaService
+
+
+@pytest.fixture
+def quota_service():
+    """Create a usage quota service with a mocked Redis client and scripts."""
+    client = MagicMock()
+    client.register_script.side_effect = lambda script: AsyncMock()
+    client.spop = AsyncMock(return_value=[])
+    client.delete = AsyncMock()
+    client.hgetall = AsyncMock(return_value={})
+    with patch("app.services.usage_quota_service.get_redis_client", return_value=client):
+        service = UsageQuotaService()
+    return service
+
+
+@pytest.fixture
+def mock_plans():
+    """Put every user on the free plan."""
+    free_plan = CachedPlanLimit(
+        plan_type="free",
+        max_messages_per_month=100,
+        max_tokens_per_month=50000,
+        max_images_per_month=0,
+        max_documents_per_month=5,
+        max_audio_minutes_per_month=0,
+    )
+    with patch("app.services.usage_quota_service.rate_limit_policy_service") as mock_policy, \
+            patch("app.services.usage_quota_service.plan_cache_service") as mock_plan_cache:
+        mock_policy.get_user_plan.return_value = "free"
+        mock_plan_cache.get_cached_plan.side_effect = lambda plan: free_plan if plan == "free" else None
+        yield mock_policy
+
+
+def make_session_factory(db: AsyncMock) -> MagicMock:
+    """Build an AsyncSessionLocal replacement yielding the given session."""
+    session = MagicMock()
+    session.return_value.__aenter__ = AsyncMock(return_value=db)
+    session.return_value.__aexit__ = AsyncMock(return_value=False)
+    return session
+
+
+class TestConsume:
+    """Test the atomic check-and-increment."""
+
+    @pytest.mark.asyncio
+    async def test_allowed_message_uses_one_script_call(self, quota_service, mock_plans):
+        """Test that a check and its increment are a single EVALSHA."""
+        # Arrange
+        user_id = uuid4()
+        quota_service._consume_script.return_value = [1, "", ["messages", "3", "tokens", "1200", "cost_usd", "0.25"]]
+
+        # Act
+        result = await quota_service.consume(user_id, messages=1, also_check=("tokens",))
+
+        # Assert
+        assert result.allowed is True
+        assert result.usage == {"messages": 3, "tokens": 1200, "cost_usd": 0.25}
+        assert result.limits["messages"] == 100
+        quota_service._consume_script.assert_awaited_once()
+        call = quota_service._consume_script.await_args.kwargs
+        month_year = call["args"][0].rsplit(":", 1)[1]
+        assert call["keys"] == [
+            f"usage_quota:{user_id}:{month_year}",
+            f"usage_quota:{user_id}:{month_year}:delta",
+            DIRTY_KEY,
+        ]
+        assert call["args"][2:] == [1, "messages", 1, 100, "tokens", 0, 50000]
+
+    @pytest.mark.asyncio
+    async def test_exceeded_limit_is_denied(self, quota_service, mock_plans):
+        """Test that a denial reports the counter that hit its limit."""
+        # Arrange
+        quota_service._consume_script.return_value = [0, "messages", ["messages", "100", "tokens", "9000"]]
+
+        # Act
+        result = await quota_service.consume(uuid4(), messages=1)
+
+        # Assert
+        assert result.allowed is False
+        assert result.exceeded == "messages"
+        assert result.usage["messages"] == 100
+
+    @pytest.mark.asyncio
+    async def test_cold_counters_are_primed_and_checked_again(self, quota_service, mock_plans):
+        """Test that missing counters are rebuilt before enforcing."""
+        # Arrange
+        quota_service._prime = AsyncMock(return_value=True)
+        quota_service._consume_script.side_effect = [[-1], [1, "", ["messages", "1"]]]
+
+        # Act
+        result = await quota_service.consume(uuid4(), messages=1)
+
+        # Assert
+        assert result.allowed is True
+        quota_service._prime.assert_awaited_once()
+        second_call = quota_service._consume_script.await_args_list[1].kwargs
+        assert second_call["args"][2] == 1
+
+    @pytest.mark.asyncio
+    async def test_cold_counters_during_flush_only_record(self, quota_service, mock_plans):
+        """Test that usage is kept in the delta when counters can't be rebuilt yet."""
+        # Arrange
+        quota_service._prime = AsyncMock(return_value=False)
+        quota_service._consume_script.side_effect = [[-1], [-1]]
+
+        # Act
+        result = await quota_service.consume(uuid4(), messages=1)
+
+        # Assert
+        assert result.allowed is True
+        second_call = quota_service._consume_script.await_args_list[1].kwargs
+        assert second_call["args"][2] == 0
+
+    @pytest.mark.asyncio
+    @patch("app.services.usage_quota_service.subscription_service")
+    @patch("app.services.usage_quota_service.AsyncSessionLocal")
+    async def test_redis_error_fails_open_and_writes_postgres(
+        self, mock_session_local, mock_subscription_service, quota_service, mock_plans
+    ):
+        """Test that Redis errors allow the request and keep the usage."""
+        # Arrange
+        user_id = uuid4()
+        db = AsyncMock()
+        mock_session_local.side_effect = make_session_factory(db)
+        mock_subscription_service.track_usage = AsyncMock()
+        quota_service._consume_script.side_effect = ConnectionError("redis down")
+
+        # Act
+        result = await quota_service.consume(user_id, messages=1, cost_usd=0.02)
+
+        # Assert
+        assert result.allowed is True
+        mock_subscription_service.track_usage.assert_awaited_once_with(
+            user_id=user_id, db=db, messages=1, cost_usd=0.02
+        )
+
+    @pytest.mark.asyncio
+    async def test_record_skips_limits(self, quota_service, mock_plans):
+        """Test that recorded usage is never checked against limits."""
+        # Arrange
+        quota_service._consume_script.return_value = [1, "", ["tokens", "1500"]]
+
+        # Act
+        await quota_service.record(uuid4(), tokens=1500, cost_usd=0.01)
+
+        # Assert
+        args = quota_service._consume_script.await_args.kwargs["args"]
+        assert args[2:] == [0, "cost_usd", 0.01, -1, "tokens", 1500, -1]
+
+    @pytest.mark.asyncio
+    async def test_refund_subtracts_reserved_usage(self, quota_service, mock_plans):
+        """Test that a refund records the negated amounts without a check."""
+        quota_service._consume_script.return_value = [1, "", ["images", "0"]]
+
+        await quota_service.refund(uuid4(), images=1)
+
+        args = quota_service._consume_script.await_args.kwargs["args"]
+        assert args[2:] == [0, "images", -1, -1]
+
+
+class TestRedisDisabled:
+    """Test enforcement with the counters kept in PostgreSQL only."""
+
+    @pytest.mark.asyncio
+    @patch("app.services.usage_quota_service.subscription_service")
+    @patch("app.services.usage_quota_service.AsyncSessionLocal")
+    @patch("app.services.usage_quota_service.settings")
+    async def test_exhausted_quota_is_denied_without_redis(
+        self, mock_settings, mock_session_local, mock_subscription_service, quota_service, mock_plans
+    ):
+        """Test that the quota row is checked and nothing is recorded on a denial."""
+        # Arrange
+        mock_settings.usage_quota_redis_enabled = False
+        mock_session_local.side_effect = make_session_factory(AsyncMock())
+        mock_subscription_service.get_usage_quota = AsyncMock(
+            return_value=MagicMock(messages_used=100, tokens_used=0)
+        )
+        mock_subscription_service.track_usage = AsyncMock()
+
+        # Act
+        result = await quota_service.consume(uuid4(), messages=1)
+
+        # Assert
+        assert result.allowed is False
+        assert result.exceeded == "messages"
+        mock_subscription_service.track_usage.assert_not_called()
+        quota_service._consume_script.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.usage_quota_service.subscription_service")
+    @patch("app.services.usage_quota_service.AsyncSessionLocal")
+    @patch("app.services.usage_quota_service.settings")
+    async def test_usage_within_quota_is_recorded_without_redis(
+        self, mock_settings, mock_session_local, mock_subscription_service, quota_service, mock_plans
+    ):
+        """Test that allowed usage is written to PostgreSQL."""
+        # Arrange
+        user_id = uuid4()
+        db = AsyncMock()
+        mock_settings.usage_quota_redis_enabled = False
+        mock_session_local.side_effect = make_session_factory(db)
+        mock_subscription_service.get_usage_quota = AsyncMock(return_value=None)
+        mock_subscription_service.track_usage = AsyncMock()
+
+        # Act
+        result = await quota_service.consume(user_id, messages=1)
+
+        # Assert
+        assert result.allowed is True
+        mock_subscription_service.track_usage.assert_awaited_once_with(user_id=user_id, db=db, messages=1)
+
+
+class TestLimitsLoading:
+    """Test enforcement before the background loads finish."""
+
+    @pytest.mark.asyncio
+    async def test_first_check_waits_for_limits(self, quota_service, mock_plans):
+        """Test that limits are loaded before a check instead of treated as unlimited."""
+        # Arrange
+        with patch("app.services.usage_quota_service.plan_cache_service") as mock_plan_cache:
+            mock_plan_cache.is_loaded = False
+
+            async def load():
+                mock_plan_cache.is_loaded = True
+                return True
+
+            mock_plan_cache.reload_plans = AsyncMock(side_effect=load)
+            mock_plan_cache.get_cached_plan.return_value = None
+            quota_service._consume_script.return_value = [1, "", []]
+
+            # Act
+            await quota_service.consume(uuid4(), images=1)
+
+        # Assert
+        mock_plan_cache.reload_plans.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unloadable_limits_fail_closed(self, quota_service, mock_plans):
+        """Test that a check raises rather than allowing usage with no limits."""
+        with patch("app.services.usage_quota_service.plan_cache_service") as mock_plan_cache:
+            mock_plan_cache.is_loaded = False
+            mock_plan_cache.reload_plans = AsyncMock(return_value=False)
+
+            with pytest.raises(QuotaUnavailableError):
+                await quota_service.consume(uuid4(), images=1)
+
+        quota_service._consume_script.assert_not_called()
+
+
+class TestFlush:
+    """Test the background flush to PostgreSQL."""
+
+    @pytest.mark.asyncio
+    @patch("app.services.usage_quota_service.subscription_service")
+    @patch("app.services.usage_quota_service.AsyncSessionLocal")
+    async def test_flush_writes_deltas_in_one_batch(
+        self, mock_session_local, mock_subscription_service, quota_service
+    ):
+        """Test that pending deltas become one multi-row UPSERT."""
+        # Arrange
+        first, second = uuid4(), uuid4()
+        db = AsyncMock()
+        mock_session_local.side_effect = make_session_factory(db)
+        mock_subscription_service.track_usage_batch = AsyncMock(return_value=2)
+        quota_service.redis.spop.return_value = [f"{first}:2026-10", f"{second}:2026-10"]
+        quota_service._take_script.return_value = [
+            ["messages", "3", "tokens", "900", "cost_usd", "0.03"],
+            ["images", "1"],
+        ]
+
+        # Act
+        written = await quota_service.flush()
+
+        # Assert
+        assert written == 2
+        increments = mock_subscription_service.track_usage_batch.await_args[0][0]
+        assert increments[0].user_id == first
+        assert increments[0].month_year == "2026-10"
+        assert (increments[0].messages, increments[0].tokens, increments[0].cost_usd) == (3, 900, 0.03)
+        assert increments[1].images == 1
+        quota_service.redis.delete.assert_awaited_once_with(
+            f"usage_quota:{first}:2026-10:flushing", f"usage_quota:{second}:2026-10:flushing"
+        )
+
+    @pytest.mark.asyncio
+    @patch("app.services.usage_quota_service.subscription_service")
+    @patch("app.services.usage_quota_service.AsyncSessionLocal")
+    async def test_failed_flush_restores_deltas(
+        self, mock_session_local, mock_subscription_service, quota_service
+    ):
+        """Test that taken deltas go back to Redis when the write fails."""
+        # Arrange
+        user_id = uuid4()
+        member = f"{user_id}:2026-10"
+        mock_session_local.side_effect = make_session_factory(AsyncMock())
+        mock_subscription_service.track_usage_batch = AsyncMock(side_effect=RuntimeError("DB error"))
+        quota_service.redis.spop.return_value = [member]
+        quota_service._take_script.return_value = [["messages", "2"]]
+
+        # Act & Assert
+        with pytest.raises(RuntimeError, match="DB error"):
+            await quota_service.flush()
+
+        quota_service._restore_script.assert_awaited_once_with(
+            keys=[
+                DIRTY_KEY,
+                f"usage_quota:{user_id}:2026-10:flushing",
+                f"usage_quota:{user_id}:2026-10:delta",
+            ],
+            args=[member],
+        )
+        quota_service.redis.delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_flush_without_pending_usage_is_a_noop(self, quota_service):
+        """Test that an empty dirty set writes nothing."""
+        written = await quota_service.flush()
+
+        assert written == 0
+        quota_service._take_script.assert_not_awaited()
+
+
+class TestUsageLimits:
+    """Test usage statistics from the counters."""
+
+    @pytest.mark.asyncio
+    async def test_usage_limits_come_from_counters(self, quota_service, mock_plans):
+        """Test that usage stats are built without a database query."""
+        # Arrange
+        db = AsyncMock()
+        quota_service.redis.hgetall.return_value = {
+            "messages": "40",
+            "tokens": "60000",
+            "cost_usd": "1.5000000000",
+        }
+
+        # Act
+        stats = await quota_service.get_usage_limits(uuid4(), db)
+
+        # Assert
+        assert stats["messages"] == {"used": 40, "limit": 100, "remaining": 60}
+        assert stats["tokens"]["remaining"] == 0
+        assert stats["total_cost_usd"] == 1.5
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.usage_quota_service.subscription_service")
+    async def test_unknown_plan_falls_back_to_database(self, mock_subscription_service, quota_service, mock_plans):
+        """Test that plans without loaded limits use the PostgreSQL check."""
+        # Arrange
+        db = AsyncMock()
+        user_id = uuid4()
+        mock_plans.get_user_plan.return_value = "premium"
+        mock_subscription_service.check_usage_limits = AsyncMock(return_value={"messages": {}})
+
+        # Act
+        stats = await quota_service.get_usage_limits(user_id, db)
+
+        # Assert
+        assert stats == {"messages": {}}
+        mock_subscription_service.check_usage_limits.assert_awaited_once_with(user_id=user_id, db=db)
@@ -0,0 +1,222 @@
+"""Unit tests for the authenticated user cache."""
+
+import json
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.models.user import User
+from app.services.user_cache_service import (
+    INVALIDATION_CHANNEL,
+    CachedUser,
+    UserCacheService,
+)
+
+
+@pytest.fixture
+def user_cache():
+    """Create a user cache with a mocked Redis client and scripts."""
+    client = MagicMock()
+    client.register_script.side_effect = lambda script: AsyncMock(return_value=1)
+    client.get = AsyncMock(return_value=None)
+    client.delete = AsyncMock()
+    client.publish = AsyncMock()
+    with patch("app.services.user_cache_service.get_redis_client", return_value=client):
+        service = UserCacheService()
+    service.enabled = True
+    return service
+
+
+def make_user(**overrides) -> User:
+    """Build a User row."""
+    values = dict(
+        id=uuid4(),
+        email="user@example.com",
+        password_hash="hash",
+        full_name="Test User",
+        profile_picture_uploaded=False,
+        preferred_language="fa",
+        is_email_verified=True,
+        is_active=True,
+        account_type="free",
+        role="user",
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+    values.update(overrides)
+    return User(**values)
+
+
+def make_db(row=None) -> AsyncMock:
+    """Build a database session returning the given user."""
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = row
+    db = AsyncMock()
+    db.execute.return_value = result
+    return db
+
+
+class TestCachedUser:
+    """Test user snapshots."""
+
+    def test_snapshot_round_trips_through_json(self):
+        """Test that a snapshot read from Redis equals the one stored."""
+        user = CachedUser.from_model(make_user(), token_version=2)
+
+        assert CachedUser.from_json(user.to_json()) == user
+
+    def test_snapshot_has_no_credentials(self):
+        """Test that password hashes never reach Redis."""
+        user = CachedUser.from_model(make_user(), token_version=0)
+
+        assert "hash" not in json.loads(user.to_json()).values()
+        assert user.to_user().password_hash is None
+
+
+class TestGetUser:
+    """Test the two-tier lookup."""
+
+    @pytest.mark.asyncio
+    async def test_miss_loads_once_then_serves_from_memory(self, user_cache):
+        """Test that only the first request queries the database."""
+        # Arrange
+        row = make_user()
+        db = make_db(row)
+        user_cache.redis.get.side_effect = [None, "4"]
+
+        # Act
+        first = await user_cache.get_user(row.id, 4, db)
+        second = await user_cache.get_user(row.id, 4, db)
+
+        # Assert
+        assert first is second
+        assert first.token_version == 4
+        db.execute.assert_called_once()
+        args = user_cache._store_script.await_args.kwargs["args"]
+        assert args[0] == 4
+
+    @pytest.mark.asyncio
+    async def test_redis_snapshot_skips_database(self, user_cache):
+        """Test that a snapshot stored by another worker is used."""
+        # Arrange
+        snapshot = CachedUser.from_model(make_user(), token_version=1)
+        user_cache.redis.get.return_value = snapshot.to_json()
+        db = make_db()
+
+        # Act
+        user = await user_cache.get_user(snapshot.id, 1, db)
+
+        # Assert
+        assert user == snapshot
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_newer_token_skips_stale_snapshot(self, user_cache):
+        """Test that a snapshot older than the token is reloaded."""
+        # Arrange
+        row = make_user(role="admin")
+        user_cache._users.set(row.id, CachedUser.from_model(make_user(id=row.id), token_version=1))
+        user_cache.redis.get.side_effect = [None, "2"]
+        db = make_db(row)
+
+        # Act
+        user = await user_cache.get_user(row.id, 2, db)
+
+        # Assert
+        assert user.role == "admin"
+        assert user.token_version == 2
+
+    @pytest.mark.asyncio
+    async def test_snapshot_invalidated_while_loading_is_not_kept(self, user_cache):
+        """Test that a load racing an invalidation isn't cached."""
+        # Arrange
+        row = make_user()
+        user_cache.redis.get.side_effect = [None, "0"]
+        user_cache._store_script.return_value = 0
+
+        # Act
+        await user_cache.get_user(row.id, 0, make_db(row))
+
+        # Assert
+        assert row.id not in user_cache._users
+
+    @pytest.mark.asyncio
+    async def test_redis_error_falls_back_to_database(self, user_cache):
+        """Test that Redis errors load the user without a version check."""
+        # Arrange
+        row = make_user()
+        user_cache.redis.get.side_effect = ConnectionError("redis down")
+
+        # Act
+        user = await user_cache.get_user(row.id, 0, make_db(row))
+
+        # Assert
+        assert user.id == row.id
+        assert row.id not in user_cache._users
+        user_cache._store_script.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unknown_user(self, user_cache):
+        """Test that a missing user is None and not cached."""
+        user_id = uuid4()
+
+        assert await user_cache.get_user(user_id, 0, make_db(None)) is None
+        assert user_id not in user_cache._users
+
+
+class TestInvalidation:
+    """Test explicit invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_invalidate_bumps_version_and_broadcasts(self, user_cache):
+        """Test that invalidation drops the snapshot and revokes tokens."""
+        # Arrange
+        user_id = uuid4()
+        user_cache._users.set(user_id, CachedUser.from_model(make_user(id=user_id), token_version=0))
+        user_cache._invalidate_script.return_value = 1
+
+        # Act
+        await user_cache.invalidate_user(user_id)
+
+        # Assert
+        assert user_id not in user_cache._users
+        user_cache._invalidate_script.assert_awaited_once_with(
+            keys=[f"user_cache:token_version:{user_id}", f"user_cache:user:{user_id}"]
+        )
+        user_cache.redis.publish.assert_awaited_once_with(
+            INVALIDATION_CHANNEL, json.dumps({"user_id": str(user_id), "version": 1})
+        )
+
+    @pytest.mark.asyncio
+    async def test_evict_keeps_token_version(self, user_cache):
+        """Test that eviction drops the snapshot without revoking tokens."""
+        # Arrange
+        user_id = uuid4()
+        user_cache._users.set(user_id, CachedUser.from_model(make_user(id=user_id), token_version=0))
+
+        # Act
+        await user_cache.evict_user(user_id)
+
+        # Assert
+        assert user_id not in user_cache._users
+        user_cache._invalidate_script.assert_not_called()
+        user_cache.redis.delete.assert_awaited_once_with(f"user_cache:user:{user_id}")
+        user_cache.redis.publish.assert_awaited_once_with(
+            INVALIDATION_CHANNEL, json.dumps({"user_id": str(user_id)})
+        )
+
+    def test_message_from_other_worker_drops_snapshot(self, user_cache):
+        """Test that a broadcast invalidation is applied locally."""
+        user_id = uuid4()
+        user_cache._users.set(user_id, CachedUser.from_model(make_user(id=user_id), token_version=0))
+
+        user_cache._handle_message(json.dumps({"user_id": str(user_id), "version": 1}))
+
+        assert user_id not in user_cache._users
+
+    @pytest.mark.asyncio
+    async def test_token_version_defaults_to_zero_on_error(self, user_cache):
+        """Test that new tokens can be issued while Redis is down."""
+        user_cache.redis.get.side_effect = ConnectionError("redis down")
+
+        assert await user_cache.get_token_version(uuid4()) == 0
@@ -99,8 +99,8 @@ class TestOpenRouterSearch:
 
     @pytest.mark.asyncio
     @patch("app.services.web_search_service.settings")
-    @patch("httpx.AsyncClient")
-    async def test_openrouter_search_success(self, mock_client_class, mock_settings):
+    @patch("app.services.web_search_service.get_http_client")
+    async def test_openrouter_search_success(self, mock_get_http_client, mock_settings):
         """Test successful OpenRouter search with web plugin."""
         # Setup mock settings
         mock_settings.web_search_enabled = True
@@ -129,12 +129,10 @@ class TestOpenRouterSearch:
         }
         mock_response.raise_for_status = Mock()
 
-        # Setup mock client
+        # Setup mock shared client
         mock_client = AsyncMock()
         mock_client.post = AsyncMock(return_value=mock_response)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock()
-        mock_client_class.return_value = mock_client
+        mock_get_http_client.return_value = mock_client
 
         # Execute search
         service = WebSearchService()
@@ -159,8 +157,8 @@ class TestOpenRouterSearch:
 
     @pytest.mark.asyncio
     @patch("app.services.web_search_service.settings")
-    @patch("httpx.AsyncClient")
-    async def test_openrouter_search_with_annotations(self, mock_client_class, mock_settings):
+    @patch("app.services.web_search_service.get_http_client")
+    async def test_openrouter_search_with_annotations(self, mock_get_http_client, mock_settings):
         """Test OpenRouter search with annotations (URL citations)."""
         # Setup mock settings
         mock_settings.web_search_enabled = True
@@ -210,12 +208,10 @@ class TestOpenRouterSearch:
         }
         mock_response.raise_for_status = Mock()
 
-        # Setup mock client
+        # Setup mock shared client
         mock_client = AsyncMock()
         mock_client.post = AsyncMock(return_value=mock_response)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock()
-        mock_client_class.return_value = mock_client
+        mock_get_http_client.return_value = mock_client
 
         # Execute search
         service = WebSearchService()
@@ -235,9 +231,9 @@ class TestOpenRouterSearch:
 
     @pytest.mark.asyncio
     @patch("app.services.web_search_service.settings")
-    @patch("httpx.AsyncClient")
+    @patch("app.services.web_search_service.get_http_client")
     async def test_openrouter_search_fallback_on_model_failure(
-        self, mock_client_class, mock_settings
+        self, mock_get_http_client, mock_settings
     ):
         """Test OpenRouter search falls back to alternative models on failure."""
         # Setup mock settings
@@ -275,14 +271,12 @@ class TestOpenRouterSearch:
         }
         mock_success_response.raise_for_status = Mock()
 
-        # Setup mock client with two responses
+        # Setup mock shared client with two responses
         mock_client = AsyncMock()
         mock_client.post = AsyncMock(
             side_effect=[mock_error_response, mock_success_response]
         )
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock()
-        mock_client_class.return_value = mock_client
+        mock_get_http_client.return_value = mock_client
 
         # Execute search
         service = WebSearchService()
@@ -314,9 +308,9 @@ class TestOpenRouterSearch:
 
     @pytest.mark.asyncio
     @patch("app.services.web_search_service.settings")
-    @patch("httpx.AsyncClient")
+    @patch("app.services.web_search_service.get_http_client")
     async def test_openrouter_search_all_models_fail(
-        self, mock_client_class, mock_settings
+        self, mock_get_http_client, mock_settings
     ):
         """Test OpenRouter search raises error when all models fail."""
         # Setup mock settings
@@ -341,12 +335,10 @@ class TestOpenRouterSearch:
             response=mock_error_response
         )
 
-        # Setup mock client to always fail
+        # Setup mock shared client to always fail
         mock_client = AsyncMock()
         mock_client.post = AsyncMock(return_value=mock_error_response)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock()
-        mock_client_class.return_value = mock_client
+        mock_get_http_client.return_value = mock_client
 
         # Execute search and expect error
         service = WebSearchService()